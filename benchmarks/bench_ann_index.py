@@ -0,0 +1,162 @@
+"""CORTEX Benchmarks — Per-project ANN index vs exact sqlite-vec search.
+
+Builds a synthetic multi-tenant corpus: clustered 384-dim unit vectors in
+``fact_embeddings``, split across projects of very different sizes, with
+a share of deprecated facts. For the target project it measures:
+  - exact oracle: full ``vec_distance_l2`` scan filtered to the project
+  - legacy path: vec0 ``MATCH`` with ``k = top_k * 3``, filtered afterwards
+  - ANN index at several ``nprobe`` settings
+and reports p50/p99 latency and recall@10 against the oracle.
+
+Usage:
+    cd cortex
+    .venv/bin/python benchmarks/bench_ann_index.py [--rows 200000] [--share 0.05]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import sqlite_vec
+
+from cortex.schema import CREATE_EMBEDDINGS_FLOAT32
+from cortex.search.ann import AnnIndexManager
+
+DIM = 384
+TOP_K = 10
+TARGET = "tenant-small"
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.enable_load_extension(True)
+    sqlite_vec.load(conn)
+    conn.enable_load_extension(False)
+    return conn
+
+
+def build_db(path: str, rows: int, share: float, seed: int = 7) -> np.ndarray:
+    """Populate facts + fact_embeddings; return target-project query vectors."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(64, DIM)).astype(np.float32)
+    conn = _connect(path)
+    conn.execute(
+        "CREATE TABLE facts (id INTEGER PRIMARY KEY, project TEXT, valid_until TEXT)"
+    )
+    conn.execute("CREATE INDEX idx_facts_project ON facts(project)")
+    conn.execute(CREATE_EMBEDDINGS_FLOAT32.strip().rstrip(";"))
+
+    batch = 10_000
+    for start in range(0, rows, batch):
+        n = min(batch, rows - start)
+        vecs = centers[rng.integers(0, len(centers), n)] + 0.4 * rng.normal(size=(n, DIM))
+        vecs = (vecs / np.linalg.norm(vecs, axis=1, keepdims=True)).astype(np.float32)
+        ids = range(start + 1, start + n + 1)
+        projects = np.where(rng.random(n) < share, TARGET, "tenant-large")
+        deprecated = rng.random(n) < 0.1
+        conn.executemany(
+            "INSERT INTO facts (id, project, valid_until) VALUES (?, ?, ?)",
+            [
+                (fid, str(p), "2026-01-01" if d else None)
+                for fid, p, d in zip(ids, projects, deprecated, strict=True)
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO fact_embeddings (fact_id, embedding) VALUES (?, ?)",
+            [(fid, v.tobytes()) for fid, v in zip(ids, vecs, strict=True)],
+        )
+    conn.commit()
+    conn.close()
+
+    queries = centers[rng.integers(0, len(centers), 100)] + 0.4 * rng.normal(size=(100, DIM))
+    return (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _timed(fn, queries) -> tuple[list[list[int]], list[float]]:
+    hits, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        hits.append(fn(q))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return hits, sorted(latencies)
+
+
+def _recall(hits: list[list[int]], truth: list[list[int]]) -> float:
+    return sum(len(set(h) & set(t)) for h, t in zip(hits, truth, strict=True)) / (
+        TOP_K * len(truth)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--share", type=float, default=0.05, help="target project's share")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "bench.db")
+        print("=" * 72)
+        print("  CORTEX BENCHMARK — ANN Index vs Exact sqlite-vec")
+        print("=" * 72)
+        print(f"  corpus={args.rows} × {DIM}d   target share={args.share:.0%}   k={TOP_K}")
+        print()
+        queries = build_db(db, args.rows, args.share)
+        conn = _connect(db)
+
+        def oracle(q):
+            rows = conn.execute(
+                "SELECT ve.fact_id FROM fact_embeddings ve JOIN facts f ON f.id = ve.fact_id "
+                "WHERE f.project = ? AND f.valid_until IS NULL "
+                "ORDER BY vec_distance_l2(ve.embedding, ?) LIMIT ?",
+                (TARGET, q.tobytes(), TOP_K),
+            ).fetchall()
+            return [r[0] for r in rows]
+
+        def legacy(q):
+            rows = conn.execute(
+                "SELECT ve.fact_id FROM fact_embeddings ve JOIN facts f ON f.id = ve.fact_id "
+                "WHERE ve.embedding MATCH ? AND k = ? "
+                "AND f.project = ? AND f.valid_until IS NULL ORDER BY ve.distance",
+                (q.tobytes(), TOP_K * 3, TARGET),
+            ).fetchall()
+            return [r[0] for r in rows[:TOP_K]]
+
+        truth, oracle_lat = _timed(oracle, queries)
+        rows = [("exact scan", 1.0, oracle_lat)]
+        hits, lat = _timed(legacy, queries)
+        rows.append(("vec0 k*3", _recall(hits, truth), lat))
+
+        manager = AnnIndexManager(db, index_dir=os.path.join(tmp, "ann"), min_rows=1)
+        start = time.perf_counter()
+        manager.get(TARGET)
+        build_s = time.perf_counter() - start
+        for nprobe in (4, 8, 16, 32):
+            manager.nprobe = nprobe
+            hits, lat = _timed(
+                lambda q: [fid for fid, _ in manager.search(TARGET, q.tolist(), TOP_K)], queries
+            )
+            rows.append((f"ann np={nprobe}", _recall(hits, truth), lat))
+        manager.close()
+        conn.close()
+
+    header = f"{'method':<14}{'p50 ms':>10}{'p99 ms':>10}{'recall@10':>12}"
+    print(header)
+    print("-" * len(header))
+    for name, recall, lat in rows:
+        p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))]
+        print(f"{name:<14}{statistics.median(lat):>10.2f}{p99:>10.2f}{recall:>12.3f}")
+    print()
+    print(f"  ANN build (train + add): {build_s:.2f}s")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
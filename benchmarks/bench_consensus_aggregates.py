@@ -0,0 +1,128 @@
+"""CORTEX Benchmarks — Consensus rescoring, full recompute vs running aggregates.
+
+Seeds one hot fact with ``--votes`` v2 votes from distinct agents, then casts
+``--rounds`` more votes on it and rescores the fact each time:
+  - recompute: re-read every vote joined with ``agents`` and sum in Python
+    (the previous ``_recalculate_consensus_v2``)
+  - aggregate: ``record_vote`` applies the delta to ``consensus_aggregates``
+Finally ``reconcile_aggregates`` audits the result.
+
+Usage:
+    cd cortex
+    .venv/bin/python benchmarks/bench_consensus_aggregates.py [--votes 10000] [--rounds 200]
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Add parent to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosqlite
+
+from cortex.consensus.aggregates import consensus_score, reconcile_aggregates, record_vote
+from cortex.migrations.mig_consensus import _migration_017_consensus_aggregates
+from cortex.schema import (
+    CREATE_AGENTS,
+    CREATE_FACTS,
+    CREATE_RWC_INDEXES,
+    CREATE_TRUST_EDGES,
+    CREATE_VOTES_V2,
+)
+
+
+def _rep(i: int) -> float:
+    return 0.5 + (i % 10) / 10
+
+
+def _seed(db: str, votes: int) -> None:
+    with sqlite3.connect(db) as conn:
+        conn.executescript(
+            CREATE_FACTS + CREATE_AGENTS + CREATE_VOTES_V2 + CREATE_TRUST_EDGES + CREATE_RWC_INDEXES
+        )
+        conn.execute(
+            "INSERT INTO facts (id, project, content, valid_from) VALUES (1, 'b', 'f', '')"
+        )
+        conn.executemany(
+            "INSERT INTO agents (id, public_key, name, reputation_score) VALUES (?, '', ?, ?)",
+            [(f"agent-{i}", f"agent-{i}", _rep(i)) for i in range(votes)],
+        )
+        conn.executemany(
+            "INSERT INTO consensus_votes_v2 (fact_id, agent_id, vote, vote_weight, "
+            "agent_rep_at_vote) VALUES (1, ?, ?, 0.5, 0.5)",
+            [(f"agent-{i}", 1 if i % 3 else -1) for i in range(votes)],
+        )
+        _migration_017_consensus_aggregates(conn)
+    conn.close()
+
+
+async def _recompute(conn, agent: int, value: int) -> float:
+    await conn.execute(
+        "INSERT OR REPLACE INTO consensus_votes_v2 "
+        "(fact_id, agent_id, vote, vote_weight, agent_rep_at_vote) VALUES (1, ?, ?, ?, ?)",
+        (f"agent-{agent}", value, _rep(agent), _rep(agent)),
+    )
+    cursor = await conn.execute(
+        "SELECT v.vote, v.vote_weight, a.reputation_score FROM consensus_votes_v2 v "
+        "JOIN agents a ON v.agent_id = a.id WHERE v.fact_id = 1 AND a.is_active = 1"
+    )
+    votes = await cursor.fetchall()
+    weighted_sum = sum(v[0] * max(v[1], v[2]) for v in votes)
+    total_weight = sum(max(v[1], v[2]) for v in votes)
+    return consensus_score(weighted_sum, total_weight)
+
+
+async def _aggregate(conn, agent: int, value: int) -> float:
+    weighted_sum, total_weight, _ = await record_vote(
+        conn, 1, f"agent-{agent}", value, _rep(agent)
+    )
+    return consensus_score(weighted_sum, total_weight)
+
+
+async def _run(db: str, votes: int, rounds: int, fn) -> tuple[float, float]:
+    conn = await aiosqlite.connect(db)
+    start = time.perf_counter()
+    score = 0.0
+    for i in range(rounds):
+        score = await fn(conn, (i * 7) % votes, -1 if i % 2 else 1)
+        await conn.commit()
+    elapsed = time.perf_counter() - start
+    if fn is _aggregate:
+        report = await reconcile_aggregates(conn, repair=False)
+        if report["drifted"]:
+            raise SystemExit(f"aggregates drifted: {report['drifted']}")
+    await conn.close()
+    return rounds / elapsed, score
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--votes", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  CORTEX BENCHMARK — Consensus Aggregates")
+    print("=" * 60)
+    print(f"  votes on the hot fact={args.votes:,}   rounds={args.rounds}")
+    print()
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for name, fn in (("recompute", _recompute), ("aggregate", _aggregate)):
+            db = os.path.join(tmp, f"{name}.db")
+            _seed(db, args.votes)
+            results[name] = asyncio.run(_run(db, args.votes, args.rounds, fn))
+            rate, score = results[name]
+            print(f"  {name:<10} {rate:>10.0f} votes/s   final score {score:.6f}")
+        print(f"  speedup: {results['aggregate'][0] / results['recompute'][0]:.1f}x")
+    print()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""CORTEX Benchmarks — Graph-RAG traversal latency.
+
+Seeds ``--entities`` entities and ``--relations`` relations with a skewed
+(hub-heavy) degree distribution, then times ``--queries`` random
+``find_context_subgraph`` (depth 2) and ``find_path`` (depth 3) lookups:
+  - legacy: Python BFS, one query per node / per layer (the previous
+    implementation)
+  - sql: recursive ``WITH RECURSIVE`` traversal
+  - snapshot: in-memory CSR snapshot (the graph is hot, ledger head unchanged)
+and checks that sql and snapshot return identical results. Finally it
+times the Graph-RAG stage of a ``--top-k`` search: one subgraph per result
+(overlapping seeds) versus one ``find_context_subgraphs`` batch.
+
+Usage:
+    cd cortex
+    .venv/bin/python benchmarks/bench_graph_traversal.py [--entities 50000] [--relations 200000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Add parent to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cortex.engine import CortexEngine
+from cortex.graph import SQLiteBackend, traversal
+
+_NEIGHBORS = """SELECT e.id, e.name, er.relation_type, er.weight FROM entity_relations er
+    JOIN entities e ON (CASE WHEN er.source_entity_id = ? THEN er.target_entity_id
+                        ELSE er.source_entity_id END = e.id)
+    WHERE er.source_entity_id = ? OR er.target_entity_id = ?"""
+
+
+def legacy_path(conn, source: str, target: str, max_depth: int) -> list:
+    id_map = {
+        row[1]: row[0]
+        for row in conn.execute(
+            "SELECT id, name FROM entities WHERE name IN (?, ?)", (source, target)
+        )
+    }
+    if source not in id_map or target not in id_map:
+        return []
+    start_id, end_id = id_map[source], id_map[target]
+    queue, visited = [(start_id, [])], {start_id}
+    while queue:
+        curr_id, path = queue.pop(0)
+        if len(path) >= max_depth:
+            continue
+        for nid, nname, rtype, weight in conn.execute(_NEIGHBORS, (curr_id,) * 3):
+            step = {
+                "source": source if curr_id == start_id else "intermediate",
+                "target": nname,
+                "type": rtype,
+                "weight": weight,
+            }
+            if nid == end_id:
+                return path + [step]
+            if nid not in visited:
+                visited.add(nid)
+                queue.append((nid, path + [step]))
+    return []
+
+
+def legacy_subgraph(conn, seeds: list, depth: int, max_nodes: int) -> dict:
+    phs = ",".join("?" * len(seeds))
+    nodes, edges, visited, layer = {}, [], set(), []
+    for eid, name, etype in conn.execute(
+        f"SELECT id, name, entity_type FROM entities WHERE name IN ({phs})", seeds
+    ):
+        nodes[name] = {"id": eid, "type": etype}
+        layer.append(eid)
+        visited.add(eid)
+    for _ in range(depth):
+        if not layer or len(nodes) >= max_nodes:
+            break
+        phs = ",".join("?" * len(layer))
+        rows = conn.execute(
+            "SELECT e1.name, e1.entity_type, e1.id, e2.name, e2.entity_type, e2.id, "
+            "er.relation_type, er.weight FROM entity_relations er "
+            "JOIN entities e1 ON er.source_entity_id = e1.id "
+            "JOIN entities e2 ON er.target_entity_id = e2.id "
+            f"WHERE er.source_entity_id IN ({phs}) OR er.target_entity_id IN ({phs})",
+            layer + layer,
+        ).fetchall()
+        layer = []
+        for s_name, s_type, s_id, t_name, t_type, t_id, r_type, weight in rows:
+            for name, etype, eid in ((s_name, s_type, s_id), (t_name, t_type, t_id)):
+                if name not in nodes:
+                    nodes[name] = {"id": eid, "type": etype}
+                    if eid not in visited:
+                        layer.append(eid)
+                        visited.add(eid)
+            edge = {"source": s_name, "target": t_name, "type": r_type, "weight": weight}
+            if edge not in edges:
+                edges.append(edge)
+        if len(nodes) >= max_nodes:
+            break
+    return {"nodes": [{"name": k, **v} for k, v in nodes.items()], "edges": edges}
+
+
+def _seed(db: str, entities: int, relations: int) -> None:
+    CortexEngine(db_path=db, auto_embed=False).init_db_sync()
+    rng = random.Random(42)
+    conn = sqlite3.connect(db)
+    conn.executemany(
+        "INSERT INTO entities (id, name, entity_type, project, first_seen, last_seen) "
+        "VALUES (?, ?, 'tool', 'bench', '', '')",
+        [(i, f"entity-{i}") for i in range(1, entities + 1)],
+    )
+    pairs = set()
+    while len(pairs) < relations:
+        # Squaring a uniform draw skews endpoints towards low ids (hubs).
+        a = 1 + int(entities * rng.random() ** 2)
+        b = rng.randint(1, entities)
+        if a != b:
+            pairs.add((a, b))
+    conn.executemany(
+        "INSERT INTO entity_relations (source_entity_id, target_entity_id, relation_type, "
+        "weight, first_seen) VALUES (?, ?, 'related_to', 1.0, '')",
+        sorted(pairs),
+    )
+    conn.execute(
+        "INSERT INTO transactions (project, action, hash, timestamp) "
+        "VALUES ('bench', 'seed', 'x', '')"
+    )
+    conn.commit()
+    conn.close()
+
+
+def _queries(entities: int, count: int) -> list[tuple[str, str]]:
+    rng = random.Random(7)
+    return [
+        (f"entity-{rng.randint(1, entities)}", f"entity-{rng.randint(1, entities)}")
+        for _ in range(count)
+    ]
+
+
+async def _run(conn, queries, subgraph, path) -> tuple[float, float, list]:
+    out = []
+    start = time.perf_counter()
+    for seed, _ in queries:
+        out.append(await subgraph(conn, [seed]))
+    sub_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for source, target in queries:
+        out.append(await path(conn, source, target))
+    return sub_elapsed, time.perf_counter() - start, out
+
+
+async def _legacy_subgraph(conn, seeds):
+    return legacy_subgraph(conn, seeds, 2, 50)
+
+
+async def _legacy_path(conn, source, target):
+    return legacy_path(conn, source, target, 3)
+
+
+async def _subgraph(conn, seeds):
+    return await SQLiteBackend(conn).find_context_subgraph(seeds, depth=2, max_nodes=50)
+
+
+async def _path(conn, source, target):
+    return await SQLiteBackend(conn).find_path(source, target, max_depth=3)
+
+
+def _seed_sets(entities: int, count: int, top_k: int) -> list[list[list[str]]]:
+    """Per query, ``top_k`` seed sets drawn from one pool of related entities."""
+    rng = random.Random(11)
+    batches = []
+    for _ in range(count):
+        base = rng.randint(1, entities - 30)
+        batches.append([
+            [f"entity-{base + rng.randrange(30)}" for _ in range(rng.randint(1, 3))]
+            for _ in range(top_k)
+        ])
+    return batches
+
+
+async def _graph_rag(conn, batches, batched: bool) -> tuple[float, list]:
+    out = []
+    start = time.perf_counter()
+    for seed_sets in batches:
+        backend = SQLiteBackend(conn)
+        if batched:
+            out.append(await backend.find_context_subgraphs(seed_sets, depth=2, max_nodes=50))
+        else:
+            out.append([
+                await backend.find_context_subgraph(seeds, depth=2, max_nodes=50)
+                for seeds in seed_sets
+            ])
+    return time.perf_counter() - start, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, default=50_000)
+    parser.add_argument("--relations", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  CORTEX BENCHMARK — Graph Traversal")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "graph.db")
+        _seed(db, args.entities, args.relations)
+        print(f"  entities={args.entities:,}   relations={args.relations:,}   "
+              f"queries={args.queries}")
+        print()
+        queries = _queries(args.entities, args.queries)
+        conn = sqlite3.connect(db)
+        results = {}
+        for name, subgraph, path, hot_calls in (
+            ("legacy", _legacy_subgraph, _legacy_path, 0),
+            ("sql", _subgraph, _path, 0),
+            ("snapshot", _subgraph, _path, 1),
+        ):
+            traversal.clear_snapshots()
+            traversal.GRAPH_SNAPSHOT_HOT_CALLS = hot_calls
+            if hot_calls:
+                start = time.perf_counter()
+                asyncio.run(_subgraph(conn, ["entity-1"]))  # builds the snapshot
+                print(f"  snapshot built in {(time.perf_counter() - start) * 1e3:.0f} ms")
+            sub, pth, results[name] = asyncio.run(_run(conn, queries, subgraph, path))
+            print(f"  {name:<10} subgraph {sub * 1e3 / args.queries:>8.3f} ms/query   "
+                  f"path {pth * 1e3 / args.queries:>8.3f} ms/query")
+        if results["sql"] != results["snapshot"]:
+            raise SystemExit("sql and snapshot results differ")
+        print("  sql and snapshot results identical")
+        print()
+
+        traversal.clear_snapshots()
+        traversal.GRAPH_SNAPSHOT_HOT_CALLS = 0
+        batches = _seed_sets(args.entities, args.queries // 4, args.top_k)
+        rag = {}
+        for name, batched in (("per-result", False), ("batched", True)):
+            elapsed, rag[name] = asyncio.run(_graph_rag(conn, batches, batched))
+            print(f"  graph-rag {name:<11} {elapsed * 1e3 / len(batches):>8.2f} ms/search "
+                  f"(top_k={args.top_k})")
+        conn.close()
+    if rag["per-result"] != rag["batched"]:
+        raise SystemExit("batched subgraphs differ")
+    print("  batched subgraphs identical")
+    print()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""CORTEX Benchmarks — Ledger segment archives vs a JSON dump.
+
+Builds a checkpointed ledger of ``--tx`` transactions, then compares:
+  - JSON: ``transactions`` and ``merkle_roots`` dumped as one JSON document
+  - segments: ``export_segments`` (binary records, zlib per segment)
+and times ``verify_segments`` (streaming, no database) and
+``import_segments`` into an empty ledger.
+
+Usage:
+    cd cortex
+    .venv/bin/python benchmarks/bench_ledger_archive.py [--tx 100000] [--checkpoint 1000]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cortex.canonical import canonical_json, compute_tx_hash
+from cortex.engine.ledger_archive import export_segments, import_segments, verify_segments
+from cortex.merkle import pack_levels
+from cortex.migrations.mig_ledger import (
+    _migration_010_immutable_ledger,
+    _migration_016_merkle_tree_levels,
+)
+from cortex.schema import CREATE_TRANSACTIONS
+
+
+def _create(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.executescript(CREATE_TRANSACTIONS)
+    _migration_010_immutable_ledger(conn)
+    _migration_016_merkle_tree_levels(conn)
+    return conn
+
+
+def _build(path: str, count: int, checkpoint: int) -> None:
+    conn = _create(path)
+    prev, rows, roots = "GENESIS", [], []
+    for i in range(1, count + 1):
+        detail = canonical_json({"fact_id": i, "content": f"Fact {i} stored by the benchmark"})
+        ts = f"2026-01-01T00:00:{i % 60:02d}.{i:06d}"
+        h = compute_tx_hash(prev, f"project-{i % 7}", "store", detail, ts)
+        rows.append((i, f"project-{i % 7}", "store", detail, prev, h, ts))
+        prev = h
+        if i % checkpoint == 0:
+            root, levels = pack_levels([r[5] for r in rows[-checkpoint:]])
+            roots.append((root, i - checkpoint + 1, i, checkpoint, levels))
+    conn.executemany("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.executemany(
+        "INSERT INTO merkle_roots (root_hash, tx_start_id, tx_end_id, tx_count, tree_levels) "
+        "VALUES (?, ?, ?, ?, ?)",
+        roots,
+    )
+    conn.commit()
+    conn.close()
+
+
+def _json_dump(db: str, out: Path) -> None:
+    conn = sqlite3.connect(db)
+    conn.row_factory = sqlite3.Row
+    doc = {
+        "transactions": [dict(r) for r in conn.execute("SELECT * FROM transactions ORDER BY id")],
+        "merkle_roots": [
+            {**dict(r), "tree_levels": (r["tree_levels"] or b"").hex()}
+            for r in conn.execute("SELECT * FROM merkle_roots ORDER BY id")
+        ],
+    }
+    conn.close()
+    out.write_text(json.dumps(doc))
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tx", type=int, default=100_000)
+    parser.add_argument("--checkpoint", type=int, default=1000)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  CORTEX BENCHMARK — Ledger Segment Archives")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "source.db")
+        _build(db, args.tx, args.checkpoint)
+        json_path = Path(tmp) / "ledger.json"
+        _, json_s = _timed(lambda: _json_dump(db, json_path))
+        written, export_s = _timed(lambda: export_segments(db, Path(tmp) / "segments"))
+        report, verify_s = _timed(lambda: verify_segments([Path(tmp) / "segments"]))
+        if not report["valid"]:
+            raise SystemExit(f"verification failed: {report['violations'][:3]}")
+        target = os.path.join(tmp, "target.db")
+        _create(target).close()
+        imported, import_s = _timed(lambda: import_segments(target, [Path(tmp) / "segments"]))
+        if not imported["valid"]:
+            raise SystemExit(f"import failed: {imported['violations'][:3]}")
+
+        segment_bytes = sum(s["bytes"] for s in written)
+        json_bytes = json_path.stat().st_size
+        print(f"  transactions={args.tx:,}   checkpoint={args.checkpoint}")
+        print()
+        print(f"  {'JSON dump':<18} {json_bytes / 1e6:>8.1f} MB  {json_s * 1000:>8.0f} ms")
+        print(
+            f"  {'segment export':<18} {segment_bytes / 1e6:>8.1f} MB  {export_s * 1000:>8.0f} ms"
+            f"   ({len(written)} segments, {json_bytes / segment_bytes:.1f}x smaller)"
+        )
+        print(f"  {'segment verify':<18} {'':>11}  {verify_s * 1000:>8.0f} ms"
+              f"   ({args.tx / verify_s:,.0f} tx/s)")
+        print(f"  {'segment import':<18} {'':>11}  {import_s * 1000:>8.0f} ms")
+    print()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
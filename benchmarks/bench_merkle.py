@@ -0,0 +1,90 @@
+"""CORTEX Benchmarks — Merkle engine vs the previous hex-string trees.
+
+For batches of SHA-256 leaves it measures:
+  - legacy: the recursive ``MerkleNode`` tree that hashed decoded hex
+    string concatenations (the pre-unification ``cortex.merkle``)
+  - ``pack_levels``: digest buffers, iterative levels, all nodes kept
+  - ``MerkleAccumulator``: leaves appended one by one, then ``pack()``
+and checks that all three produce the same root.
+
+Usage:
+    cd cortex
+    .venv/bin/python benchmarks/bench_merkle.py [--sizes 1000 10000 100000] [--runs 5]
+"""
+
+import argparse
+import hashlib
+import os
+import statistics
+import sys
+import time
+
+# Add parent to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cortex.merkle import MerkleAccumulator, pack_levels
+
+
+class _LegacyNode:
+    __slots__ = ("hash", "left", "right")
+
+    def __init__(self, h, left=None, right=None):
+        self.hash, self.left, self.right = h, left, right
+
+
+def legacy_root(leaves: list[str]) -> str:
+    nodes = [_LegacyNode(h) for h in leaves]
+    while len(nodes) > 1:
+        nxt = []
+        for i in range(0, len(nodes), 2):
+            left = nodes[i]
+            right = nodes[i + 1] if i + 1 < len(nodes) else left
+            h = hashlib.sha256((left.hash + right.hash).encode()).hexdigest()
+            nxt.append(_LegacyNode(h, left, right))
+        nodes = nxt
+    return nodes[0].hash
+
+
+def accumulate(leaves: list[str]) -> str:
+    acc = MerkleAccumulator()
+    for leaf in leaves:
+        acc.append(leaf)
+    return acc.pack()[0]
+
+
+def _timed(fn, leaves, runs):
+    samples, result = [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn(leaves)
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print("=" * 68)
+    print("  CORTEX BENCHMARK — Merkle Engine")
+    print("=" * 68)
+    print(f"  {'leaves':>8}  {'legacy':>10}  {'pack_levels':>12}  {'accumulator':>12}  {'speedup':>8}")
+    for n in args.sizes:
+        leaves = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(n)]
+        expected, legacy_ms = _timed(legacy_root, leaves, args.runs)
+        packed, packed_ms = _timed(lambda ls: pack_levels(ls)[0], leaves, args.runs)
+        accumulated, acc_ms = _timed(accumulate, leaves, args.runs)
+        if not expected == packed == accumulated:
+            raise SystemExit(f"root mismatch at {n} leaves")
+        print(
+            f"  {n:>8}  {legacy_ms:>7.1f} ms  {packed_ms:>9.1f} ms  {acc_ms:>9.1f} ms  "
+            f"{legacy_ms / packed_ms:>7.1f}x"
+        )
+    print()
+    print("=" * 68)
+
+
+if __name__ == "__main__":
+    main()
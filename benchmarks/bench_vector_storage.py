@@ -0,0 +1,155 @@
+"""CORTEX Benchmarks — Vector storage format (JSON vs float32 vs int8).
+
+Measures, for the same random unit-vector corpus:
+  - Bound parameter bytes per row (what crosses the sqlite3 boundary)
+  - On-disk bytes per row (database file growth)
+  - KNN latency (p50, p99) for top-10 queries
+  - recall@10 against exact float32 KNN
+
+No embedding model is needed; vectors are synthetic 384-dim unit vectors.
+
+Usage:
+    cd cortex
+    .venv/bin/python benchmarks/bench_vector_storage.py [--rows 20000] [--queries 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlite_vec
+
+from cortex.schema import CREATE_EMBEDDINGS_FLOAT32, CREATE_EMBEDDINGS_INT8
+from cortex.search.vector import encode_vector, vector_param
+
+DIM = 384
+TOP_K = 10
+
+
+def _unit_vectors(n: int, seed: int) -> list[list[float]]:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        v = [rng.gauss(0.0, 1.0) for _ in range(DIM)]
+        norm = sum(x * x for x in v) ** 0.5
+        out.append([x / norm for x in v])
+    return out
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.enable_load_extension(True)
+    sqlite_vec.load(conn)
+    conn.enable_load_extension(False)
+    return conn
+
+
+def _encode(mode: str, vec: list[float]):
+    if mode == "json":
+        return json.dumps(vec)
+    return encode_vector(vec, mode)
+
+
+def bench_format(mode: str, corpus: list[list[float]], queries: list[list[float]]) -> dict:
+    """Load ``corpus`` through one binding mode and time ``queries``."""
+    storage = "int8" if mode == "int8" else "float32"
+    ddl = CREATE_EMBEDDINGS_INT8 if storage == "int8" else CREATE_EMBEDDINGS_FLOAT32
+    param = vector_param(storage)
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        conn = _connect(path)
+        conn.executescript(ddl)
+        conn.commit()
+        base_size = os.path.getsize(path)
+
+        payload_bytes = 0
+        start = time.perf_counter()
+        rows = []
+        for i, vec in enumerate(corpus, start=1):
+            blob = _encode(mode, vec)
+            payload_bytes += len(blob)
+            rows.append((i, blob))
+        conn.executemany(f"INSERT INTO fact_embeddings (fact_id, embedding) VALUES (?, {param})", rows)
+        conn.commit()
+        insert_s = time.perf_counter() - start
+        conn.execute("VACUUM")
+        disk_bytes = os.path.getsize(path) - base_size
+
+        sql = (
+            "SELECT fact_id FROM fact_embeddings "
+            f"WHERE embedding MATCH {param} AND k = ? ORDER BY distance"
+        )
+        latencies, hits = [], []
+        for q in queries:
+            t0 = time.perf_counter()
+            ids = [r[0] for r in conn.execute(sql, (_encode(mode, q), TOP_K))]
+            latencies.append((time.perf_counter() - t0) * 1000)
+            hits.append(ids)
+        conn.close()
+    finally:
+        os.remove(path)
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "param_bytes_per_row": payload_bytes / len(corpus),
+        "disk_bytes_per_row": disk_bytes / len(corpus),
+        "insert_rows_per_s": len(corpus) / insert_s,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "hits": hits,
+    }
+
+
+def _recall(candidate: list[list[int]], exact: list[list[int]]) -> float:
+    return statistics.mean(
+        len(set(c) & set(e)) / len(e) for c, e in zip(candidate, exact, strict=True)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print("=" * 72)
+    print("  CORTEX BENCHMARK — Vector Storage Format")
+    print("=" * 72)
+    print(f"  corpus={args.rows} × {DIM}d   queries={args.queries}   k={TOP_K}")
+    print()
+
+    corpus = _unit_vectors(args.rows, seed=7)
+    queries = _unit_vectors(args.queries, seed=11)
+
+    results = [bench_format(mode, corpus, queries) for mode in ("json", "float32", "int8")]
+    exact = results[1]["hits"]
+
+    header = f"{'mode':<9}{'param B/row':>12}{'disk B/row':>12}{'ins rows/s':>12}"
+    header += f"{'p50 ms':>9}{'p99 ms':>9}{'recall@10':>11}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['mode']:<9}{r['param_bytes_per_row']:>12.0f}{r['disk_bytes_per_row']:>12.0f}"
+            f"{r['insert_rows_per_s']:>12.0f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+            f"{_recall(r['hits'], exact):>11.3f}"
+        )
+    print()
+    print("  json = legacy json.dumps binding into FLOAT[384] (baseline)")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""CORTEX Benchmarks — Vote ledger appends, one by one vs batched.
+
+Appends ``--votes`` votes to a fresh vote ledger on a one-connection pool,
+first with ``append_vote`` (one transaction and commit per vote), then with
+``append_votes`` in batches of ``--batch``. Merkle checkpoints are created
+in the background in both runs, and the chain is verified afterwards.
+
+Usage:
+    cd cortex
+    .venv/bin/python benchmarks/bench_vote_ledger.py [--votes 5000] [--batch 100]
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Add parent to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cortex.connection_pool import CortexConnectionPool
+from cortex.consensus.vote_ledger import ImmutableVoteLedger
+from cortex.migrations.mig_ledger import _migration_014_vote_ledger_refinement
+from cortex.schema import CREATE_FACTS, CREATE_META
+
+
+async def _run(db: str, votes: int, batch: int) -> tuple[float, bool, int]:
+    with sqlite3.connect(db) as setup:
+        setup.executescript(CREATE_FACTS + CREATE_META)
+        _migration_014_vote_ledger_refinement(setup)
+        setup.executemany(
+            "INSERT INTO facts (id, project, content, valid_from) VALUES (?, 'bench', 'fact', '')",
+            [(i,) for i in range(1, 51)],
+        )
+    setup.close()
+
+    pool = CortexConnectionPool(db, min_connections=1, max_connections=2)
+    await pool.initialize()
+    ledger = ImmutableVoteLedger(pool)
+    start = time.perf_counter()
+    if batch <= 1:
+        for i in range(votes):
+            await ledger.append_vote(i % 50 + 1, f"agent-{i % 300}", 1 if i % 3 else -1, 1.0)
+    else:
+        for first in range(0, votes, batch):
+            await ledger.append_votes(
+                [(i % 50 + 1, f"agent-{i % 300}", 1 if i % 3 else -1, 1.0)
+                 for i in range(first, min(first + batch, votes))]
+            )
+    await ledger.drain()
+    elapsed = time.perf_counter() - start
+    report = await ledger.verify_chain_integrity("full")
+    await pool.close()
+    return votes / elapsed, report["valid"], report["checkpoints_checked"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--votes", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  CORTEX BENCHMARK — Vote Ledger Batching")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        rates = []
+        for batch in (1, args.batch):
+            db = os.path.join(tmp, f"votes_{batch}.db")
+            rate, valid, checkpoints = asyncio.run(_run(db, args.votes, batch))
+            if not valid:
+                raise SystemExit(f"vote ledger verification failed (batch={batch})")
+            rates.append(rate)
+            print(f"  batch={batch:<5} {rate:>10.0f} votes/s   {checkpoints} checkpoints")
+        print(f"  speedup: {rates[1] / rates[0]:.1f}x")
+    print()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
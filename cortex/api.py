@@ -6,6 +6,7 @@ Main entry point for initialization and routing.
 """
 
 
+import asyncio
 import logging
 import sqlite3
 import time
@@ -60,6 +61,19 @@ async def lifespan(app: FastAPI):
     pool = CortexConnectionPool(db_path)
     await pool.initialize()
     async_engine = AsyncCortexEngine(pool, db_path)
+    # One model for both engines, loaded before the first request needs it.
+    async_engine._embedder = engine._get_embedder()
+    async_engine._ann = engine._get_ann()
+    # fact_embeddings layout as found by init_db (legacy, int8-migrated, ...)
+    async_engine._vec_available = engine._vec_available
+    async_engine._vector_format = engine._vector_format
+    async_engine._vector_partitioned = engine._vector_partitioned
+    warmup_task = (
+        asyncio.create_task(engine.warmup_embedder()) if config.EMBEDDING_WARMUP else None
+    )
+    if config.DEFERRED_EMBEDDINGS:
+        # Both engines queue into embedding_outbox; one worker drains it.
+        async_engine._embedding_worker = engine.start_embedding_worker()
 
     # Sync to cortex.auth so dependencies use the same instance
     import cortex.auth
@@ -76,6 +90,7 @@ async def lifespan(app: FastAPI):
     app.state.engine = engine  # Kept as 'engine' for legacy routes
     app.state.auth_manager = auth_manager
     app.state.tracker = tracker
+    app.state.embedding_warmup = warmup_task
 
     # Backward compatibility for api_state
     api_state.engine = engine
@@ -85,6 +100,7 @@ async def lifespan(app: FastAPI):
     try:
         yield
     finally:
+        await async_engine.close()
         await pool.close()
         await engine.close()
         timing_conn.close()
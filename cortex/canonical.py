@@ -7,6 +7,9 @@ preimage and collision attacks on the hash chain.
 Hash Scheme Versions:
     v1: colon-delimited   f"{prev}:{project}:{action}:{detail}:{ts}"
     v2: null-byte canon   f"{prev}\\x00{project}\\x00{action}\\x00{canonical_detail}\\x00{ts}"
+
+The vote ledger follows the same versions, over
+``prev, fact_id, agent_id, vote, weight, ts``.
 """
 
 from __future__ import annotations
@@ -84,3 +87,43 @@ def compute_tx_hash_v1(
     """
     h_input = f"{prev_hash}:{project}:{action}:{detail_json}:{timestamp}"
     return hashlib.sha256(h_input.encode()).hexdigest()
+
+
+# ─── Vote Hash ───────────────────────────────────────────────────
+
+
+def compute_vote_hash(
+    prev_hash: str,
+    fact_id: int,
+    agent_id: str,
+    vote: int,
+    weight: float,
+    timestamp: str,
+) -> str:
+    """Compute a vote ledger hash using null-byte separated canonical form.
+
+    The weight is normalized to ``float`` before formatting, so ``10`` and
+    the ``10.0`` SQLite returns from the REAL column hash the same.
+
+    Returns:
+        SHA-256 hex digest of the canonical input.
+    """
+    fields = (prev_hash, str(int(fact_id)), agent_id, str(int(vote)), repr(float(weight)), timestamp)
+    h_input = "\x00".join(fields)
+    return hashlib.sha256(h_input.encode("utf-8")).hexdigest()
+
+
+def compute_vote_hash_v1(
+    prev_hash: str,
+    fact_id: int,
+    agent_id: str,
+    vote: int,
+    weight: float,
+    timestamp: str,
+) -> str:
+    """Legacy v1 vote hash: colon-delimited concatenation.
+
+    Kept for verifying votes appended before the canonical vote hash.
+    """
+    h_input = f"{prev_hash}:{fact_id}:{agent_id}:{vote}:{weight}:{timestamp}"
+    return hashlib.sha256(h_input.encode("utf-8")).hexdigest()
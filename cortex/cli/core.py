@@ -257,3 +257,24 @@ def migrate_graph(db) -> None:
         )
     finally:
         _run_async(engine.close())
+
+
+@cli.command("embed-serve")
+@click.option("--socket", "socket_path", default=None, help="Unix socket path")
+@click.option("--window-ms", type=float, default=None, help="Micro-batching window (ms)")
+@click.option("--max-batch", type=int, default=None, help="Max texts per model call")
+def embed_serve(socket_path, window_ms, max_batch) -> None:
+    """Run the shared embedding service (use with CORTEX_EMBEDDINGS=service)."""
+    from cortex import config
+    from cortex.embeddings.service import EmbeddingService
+
+    service = EmbeddingService(
+        socket_path=socket_path or config.EMBEDDING_SOCKET,
+        window_ms=window_ms if window_ms is not None else config.EMBEDDING_BATCH_WINDOW_MS,
+        max_batch=max_batch or config.EMBEDDING_MAX_BATCH,
+    )
+    console.print(f"[bold blue]Embedding service on {service.socket_path}[/]")
+    try:
+        _run_async(service.serve_forever())
+    except KeyboardInterrupt:
+        console.print("[dim]Embedding service stopped.[/]")
@@ -1,4 +1,7 @@
-"""Comandos de CLI: vote, ledger verify, ledger checkpoint."""
+"""Comandos de CLI: vote y ledger.
+
+Subcomandos de ledger: status, checkpoint, verify, proof, reconcile, reputation, export, import.
+"""
 
 from __future__ import annotations
 
@@ -9,9 +12,11 @@ import click
 from rich.panel import Panel
 
 from cortex.cli import DEFAULT_DB, cli, console, get_engine
+from cortex.config import LEDGER_SEGMENT_SIZE, REPUTATION_DAMPING, REPUTATION_HALF_LIFE_DAYS
 
 # Importe actualizado para Wave 5 Fase 2
 from cortex.consensus.vote_ledger import ImmutableVoteLedger
+from cortex.engine.ledger_archive import export_segments, import_segments, verify_segments
 
 
 @cli.command()
@@ -114,7 +119,8 @@ def ledger_checkpoint(db):
 
 @ledger.command("verify")
 @click.option("--db", default=DEFAULT_DB, help="Ruta de la base de datos")
-def ledger_verify(db):
+@click.option("--full", is_flag=True, help="Verificar desde el génesis, no desde la marca de agua")
+def ledger_verify(db, full):
     """Verifica la integridad criptográfica del registro de votos."""
 
     async def _ledger_verify_async():
@@ -123,42 +129,198 @@ def ledger_verify(db):
             async with engine.session() as conn:
                 ledger = ImmutableVoteLedger(engine._pool if hasattr(engine, "_pool") else conn)
                 with console.status(
-                    "[bold blue]Verificando la cadena de hashes del registro...[/]"
+                    "[bold blue]Verificando la cadena de hashes y las raíces de Merkle...[/]"
                 ):
-                    report = await ledger.verify_chain_integrity()
-
-                with console.status("[bold magenta]Verificando raíces de Merkle...[/]"):
-                    merkle_report = await ledger.verify_merkle_roots()
-
-                chain_valid = report["valid"]
-                merkle_valid = all(r["valid"] for r in merkle_report)
+                    report = await ledger.verify_chain_integrity("full" if full else "incremental")
 
-                if chain_valid:
+                if report["valid"]:
                     console.print(
                         f"[green]✅ Integridad de Cadena de Hashes: OK[/] ({report['votes_checked']} votos)"
                     )
-                else:
-                    console.print("[red]❌ Integridad de Cadena de Hashes: FALLIDA[/]")
-                    for v in report["violations"]:
+                    console.print(
+                        f"[green]✅ Integridad de Raíz Merkle: OK[/] "
+                        f"({report['checkpoints_checked']} puntos de control, "
+                        f"verificado hasta el voto #{report['verified_to']})"
+                    )
+                    return
+
+                console.print("[red]❌ Integridad del Registro de Votos: FALLIDA[/]")
+                for v in report["violations"]:
+                    if "checkpoint_id" in v:
+                        console.print(
+                            f"  [red]✗[/] {v['type']} en el Punto de Control {v['checkpoint_id']}"
+                        )
+                    else:
                         console.print(
                             f"  [red]✗[/] {v['type']} en el Voto #{v.get('vote_id', 'N/A')}"
                         )
-
-                if merkle_valid:
-                    console.print(
-                        f"[green]✅ Integridad de Raíz Merkle: OK[/] ({len(merkle_report)} puntos de control)"
-                    )
-                else:
-                    console.print("[red]❌ Integridad de Raíz Merkle: FALLIDA[/]")
-                    for r in merkle_report:
-                        if not r["valid"]:
-                            console.print(
-                                f"  [red]✗[/] ¡Desajuste en Punto de Control {r['checkpoint_id']}! Esperado {r['expected'][:16]}... vs Actual {r['actual'][:16]}..."
-                            )
-
-                if not (chain_valid and merkle_valid):
-                    sys.exit(1)
+                sys.exit(1)
         finally:
             await engine.close()
 
     asyncio.run(_ledger_verify_async())
+
+
+@ledger.command("proof")
+@click.argument("tx_id", type=int)
+@click.option("--db", default=DEFAULT_DB, help="Ruta de la base de datos")
+def ledger_proof(tx_id, db):
+    """Prueba de inclusión Merkle de una transacción en su punto de control."""
+
+    async def _ledger_proof_async():
+        engine = get_engine(db)
+        try:
+            proof = await engine.ledger_proof(tx_id)
+        finally:
+            await engine.close()
+
+        if proof is None:
+            console.print(
+                f"[yellow]⚠ La transacción #{tx_id} no existe o aún no tiene punto de control.[/]"
+            )
+            sys.exit(1)
+
+        steps = "\n".join(
+            f"  {i}. [{step['position']}] {step['hash']}" for i, step in enumerate(proof["proof"], 1)
+        )
+        status = "[green]✅ Válida[/]" if proof["valid"] else "[red]❌ Inválida[/]"
+        console.print(
+            Panel(
+                f"[bold cyan]Transacción:[/] #{proof['tx_id']} {proof['tx_hash']}\n"
+                f"[bold cyan]Punto de Control:[/] #{proof['checkpoint_id']} "
+                f"(hoja {proof['index']})\n"
+                f"[bold cyan]Raíz Merkle:[/] {proof['root_hash']}\n"
+                f"[bold cyan]Ruta:[/]\n{steps or '  (hoja única)'}\n"
+                f"[bold cyan]Resultado:[/] {status}",
+                title="🌳 Prueba de Inclusión Merkle",
+                border_style="cyan",
+            )
+        )
+        if not proof["valid"]:
+            sys.exit(1)
+
+    asyncio.run(_ledger_proof_async())
+
+
+@ledger.command("reconcile")
+@click.option("--db", default=DEFAULT_DB, help="Ruta de la base de datos")
+@click.option("--dry-run", is_flag=True, help="Solo auditar, sin reparar los agregados")
+def ledger_reconcile(db, dry_run):
+    """Recalcula los agregados de consenso desde los votos y los compara."""
+
+    async def _ledger_reconcile_async():
+        engine = get_engine(db)
+        try:
+            report = await engine.consensus.reconcile_consensus(repair=not dry_run)
+        finally:
+            await engine.close()
+
+        drifted = report["drifted"]
+        if not drifted:
+            console.print(
+                f"[green]✅ Agregados de consenso: OK[/] ({report['facts_checked']} hechos)"
+            )
+            return
+        ids = ", ".join(f"#{fid}" for fid in drifted[:20])
+        more = f" (+{len(drifted) - 20})" if len(drifted) > 20 else ""
+        if dry_run:
+            console.print(f"[red]❌ {len(drifted)} agregados desviados:[/] {ids}{more}")
+            sys.exit(1)
+        console.print(f"[yellow]⚠ {report['repaired']} agregados reparados:[/] {ids}{more}")
+
+    asyncio.run(_ledger_reconcile_async())
+
+
+@ledger.command("reputation")
+@click.option("--db", default=DEFAULT_DB, help="Ruta de la base de datos")
+@click.option(
+    "--half-life",
+    default=REPUTATION_HALF_LIFE_DAYS,
+    show_default=True,
+    help="Días en que un voto pierde la mitad de su peso",
+)
+@click.option(
+    "--damping",
+    default=REPUTATION_DAMPING,
+    show_default=True,
+    help="Parte de la reputación que proviene de los agentes que confían en él",
+)
+@click.option("--dry-run", is_flag=True, help="Solo calcular, sin escribir nada")
+def ledger_reputation(db, half_life, damping, dry_run):
+    """Recalcula la reputación de todos los agentes desde el historial de votos."""
+    from cortex.consensus.reputation import recompute_reputation
+
+    with console.status("[bold yellow]Recalculando reputaciones...[/]"):
+        report = recompute_reputation(
+            db, half_life_days=half_life, damping=damping, dry_run=dry_run
+        )
+
+    seconds = report["load_seconds"] + report["compute_seconds"] + report["write_seconds"]
+    console.print(
+        Panel(
+            f"[bold cyan]Agentes:[/] {report['agents']:,} "
+            f"({report['changed']:,} con reputación distinta)\n"
+            f"[bold cyan]Votos:[/] {report['votes']:,} "
+            f"({report['resolved_votes']:,} sobre hechos resueltos)\n"
+            f"[bold cyan]Aristas de confianza:[/] {report['edges']:,} "
+            f"({report['iterations']} iteraciones)\n"
+            f"[bold cyan]Hechos recalculados:[/] {report['facts_rescored']:,}\n"
+            f"[bold cyan]Tiempo:[/] {seconds:.2f} s",
+            title="🧮 Reputación" + (" (simulación)" if dry_run else ""),
+            border_style="cyan",
+        )
+    )
+    if not report["converged"]:
+        console.print("[yellow]⚠ La propagación de confianza no convergió.[/]")
+
+
+@ledger.command("export")
+@click.argument("out_dir", type=click.Path(file_okay=False))
+@click.option("--db", default=DEFAULT_DB, help="Ruta de la base de datos")
+@click.option(
+    "--segment-size",
+    default=LEDGER_SEGMENT_SIZE,
+    show_default=True,
+    help="Transacciones por segmento (se redondea a puntos de control completos)",
+)
+@click.option("--by", "exported_by", default="cli", help="Autor registrado en audit_exports")
+def ledger_export(out_dir, db, segment_size, exported_by):
+    """Exporta el registro a segmentos binarios comprimidos (solo añade lo nuevo)."""
+    with console.status("[bold yellow]Escribiendo segmentos del registro...[/]"):
+        written = export_segments(db, out_dir, segment_size=segment_size, exported_by=exported_by)
+
+    if not written:
+        console.print("[yellow]⚠ No hay puntos de control nuevos para exportar.[/]")
+        return
+    for seg in written:
+        console.print(
+            f"[green]✓[/] {seg['path']}  tx #{seg['first_tx']}–#{seg['last_tx']}  "
+            f"[dim]{seg['bytes']:,} bytes · raíz {seg['root'][:16]}...[/]"
+        )
+    console.print(f"[green]✅ {len(written)} segmento(s) exportado(s).[/]")
+
+
+@ledger.command("import")
+@click.argument("segments", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--db", default=DEFAULT_DB, help="Ruta de la base de datos")
+@click.option("--verify-only", is_flag=True, help="Solo verificar, sin tocar la base de datos")
+def ledger_import(segments, db, verify_only):
+    """Verifica (e importa) segmentos de registro en streaming."""
+    with console.status("[bold blue]Verificando segmentos...[/]"):
+        report = verify_segments(segments) if verify_only else import_segments(db, segments)
+
+    for name in report.get("skipped", []):
+        console.print(f"[dim]• {name} ya estaba importado[/]")
+    for name in report.get("imported", []):
+        console.print(f"[green]✓[/] {name} importado")
+    if report["valid"]:
+        console.print(
+            f"[green]✅ Segmentos íntegros:[/] {report['segments']} segmento(s), "
+            f"{report['tx_checked']} transacciones, {report['roots_checked']} raíces Merkle"
+        )
+        return
+    console.print("[red]❌ Verificación de segmentos FALLIDA[/]")
+    for v in report["violations"]:
+        where = v.get("segment") or f"tx #{v.get('tx_id', v.get('merkle_id', 'N/A'))}"
+        console.print(f"  [red]✗[/] {v['type']} en {where}")
+    sys.exit(1)
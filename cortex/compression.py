@@ -6,6 +6,9 @@ normalized embeddings from all-MiniLM-L6-v2.
 
 Storage format: [4 bytes float32 scale] + [384 bytes int8 values] = 388 bytes
 vs original: [384 × 4 bytes float32] = 1,536 bytes (JSON is even larger)
+
+Also provides the raw float32 packing used to bind vectors to sqlite-vec
+without a JSON round-trip.
 """
 
 from __future__ import annotations
@@ -65,6 +68,37 @@ def dequantize_int8(data: bytes) -> list[float]:
     return (quantized.astype(np.float32) * scale / 127.0).tolist()
 
 
+def pack_float32(embedding: list[float]) -> bytes:
+    """Pack an embedding as little-endian float32 (sqlite-vec's native blob).
+
+    Args:
+        embedding: List of floats.
+
+    Returns:
+        ``4 × N`` bytes, bindable directly to a ``FLOAT[N]`` vec0 column.
+    """
+    if _NP_AVAILABLE:
+        return np.asarray(embedding, dtype="<f4").tobytes()
+    return struct.pack(f"<{len(embedding)}f", *embedding)
+
+
+def unpack_float32(data: bytes) -> list[float]:
+    """Inverse of pack_float32()."""
+    if _NP_AVAILABLE:
+        return np.frombuffer(data, dtype="<f4").tolist()
+    return list(struct.unpack(f"<{len(data) // 4}f", data))
+
+
+def int8_values(data: bytes) -> bytes:
+    """Strip the scale header from quantize_int8() output.
+
+    sqlite-vec ``INT8[N]`` columns hold the bare int8 values; the scale is
+    not needed for ranking because every vector is mapped onto the same
+    [-127, 127] range.
+    """
+    return data[4:]
+
+
 def compression_ratio(dim: int = 384) -> dict:
     """Report compression statistics for a given embedding dimension.
 
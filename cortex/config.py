@@ -37,6 +37,21 @@ Path(AGENT_DIR / "memory").mkdir(parents=True, exist_ok=True)
 CHECKPOINT_BATCH_SIZE = int(os.environ.get("CORTEX_CHECKPOINT_BATCH", "1000"))
 CHECKPOINT_MIN = int(os.environ.get("CORTEX_CHECKPOINT_MIN", "100"))
 CHECKPOINT_MAX = int(os.environ.get("CORTEX_CHECKPOINT_MAX", "1000"))
+# Rows fetched per page when streaming the ledger for verification
+LEDGER_VERIFY_BATCH = int(os.environ.get("CORTEX_LEDGER_VERIFY_BATCH", "5000"))
+# Processes verifying checkpoint ranges in parallel (1 = stream on the event loop)
+LEDGER_VERIFY_WORKERS = int(os.environ.get("CORTEX_LEDGER_VERIFY_WORKERS", "1"))
+# Group commit: concurrent store/vote/deprecate share one transaction and commit.
+# Window 0 groups whatever queued while the previous group was committing.
+LEDGER_GROUP_COMMIT = os.environ.get("CORTEX_LEDGER_GROUP_COMMIT", "0").lower() in ("1", "true", "yes")
+LEDGER_GROUP_WINDOW_MS = float(os.environ.get("CORTEX_LEDGER_GROUP_WINDOW_MS", "0"))
+LEDGER_GROUP_MAX = int(os.environ.get("CORTEX_LEDGER_GROUP_MAX", "256"))
+# Target transactions per exported ledger segment (rounded up to whole checkpoints)
+LEDGER_SEGMENT_SIZE = int(os.environ.get("CORTEX_LEDGER_SEGMENT_SIZE", "50000"))
+# Reputation recomputation: vote evidence halves every HALF_LIFE_DAYS, and
+# DAMPING is the share of an agent's score drawn from the agents that trust it.
+REPUTATION_HALF_LIFE_DAYS = float(os.environ.get("CORTEX_REPUTATION_HALF_LIFE_DAYS", "90"))
+REPUTATION_DAMPING = float(os.environ.get("CORTEX_REPUTATION_DAMPING", "0.5"))
 CONNECTION_POOL_SIZE = int(os.environ.get("CORTEX_POOL_SIZE", "5"))
 
 # Federation Configuration
@@ -56,9 +71,58 @@ TURSO_AUTH_TOKEN = os.environ.get("TURSO_AUTH_TOKEN", "")
 
 # ─── Embeddings Mode ─────────────────────────────────────────────────
 # CORTEX_EMBEDDINGS: "local" (default, ONNX) | "api" (Gemini/OpenAI)
+#                   | "service" (shared model behind `cortex embed-serve`)
 EMBEDDINGS_MODE = os.environ.get("CORTEX_EMBEDDINGS", "local")
 EMBEDDINGS_PROVIDER = os.environ.get("CORTEX_EMBEDDINGS_PROVIDER", "gemini")
 EMBEDDINGS_DIMENSION = int(os.environ.get("CORTEX_EMBEDDINGS_DIM", "384"))
+# LocalEmbedder inference backend: "torch" | "onnx" | "onnx-int8".
+EMBEDDING_BACKEND = os.environ.get("CORTEX_EMBEDDING_BACKEND", "torch")
+ONNX_THREADS = int(os.environ.get("CORTEX_ONNX_THREADS", "0"))  # 0 = ONNX Runtime default
+# Load the model and run one dummy encode when the API starts, so the first
+# search doesn't pay for it.
+EMBEDDING_WARMUP = os.environ.get("CORTEX_EMBEDDING_WARMUP", "1").lower() in ("1", "true", "yes")
+# Persistent content-hash embedding cache shared by all processes.
+# CORTEX_EMBEDDING_CACHE_SIZE bounds it in entries (~1.6 KB each); 0 disables.
+EMBEDDING_CACHE_PATH = Path(
+    os.environ.get("CORTEX_EMBEDDING_CACHE_PATH", str(CORTEX_DIR / "embedding_cache.db"))
+)
+EMBEDDING_CACHE_SIZE = int(os.environ.get("CORTEX_EMBEDDING_CACHE_SIZE", "50000"))
+# CORTEX_VECTOR_FORMAT: "float32" (default, 1,536 B/row) | "int8" (384 B/row)
+# Applies to new databases; existing ones keep their format until
+# scripts/migrate_vector_format.py rewrites them.
+VECTOR_FORMAT = os.environ.get("CORTEX_VECTOR_FORMAT", "float32")
+# Facts per store_many chunk: one embed_batch call and one executemany per
+# chunk. With commit_chunks=True each chunk also commits (bounded WAL).
+INGEST_CHUNK_SIZE = int(os.environ.get("CORTEX_INGEST_CHUNK_SIZE", "256"))
+# CORTEX_DEFERRED_EMBEDDINGS=1: store() commits the fact and queues it in
+# embedding_outbox; a background worker embeds it (FTS covers it meanwhile).
+DEFERRED_EMBEDDINGS = os.environ.get("CORTEX_DEFERRED_EMBEDDINGS", "0").lower() in ("1", "true", "yes")
+EMBEDDING_WORKER_BATCH = int(os.environ.get("CORTEX_EMBEDDING_WORKER_BATCH", "64"))
+EMBEDDING_WORKER_INTERVAL = float(os.environ.get("CORTEX_EMBEDDING_WORKER_INTERVAL", "0.5"))
+EMBEDDING_WORKER_MAX_RETRIES = int(os.environ.get("CORTEX_EMBEDDING_WORKER_RETRIES", "5"))
+# Optional per-project ANN (IVF) index in front of sqlite-vec; projects
+# smaller than ANN_MIN_ROWS active embeddings keep using exact search.
+ANN_INDEX = os.environ.get("CORTEX_ANN_INDEX", "0").lower() in ("1", "true", "yes")
+ANN_DIR = Path(os.environ.get("CORTEX_ANN_DIR", str(CORTEX_DIR / "ann")))
+ANN_MIN_ROWS = int(os.environ.get("CORTEX_ANN_MIN_ROWS", "20000"))
+ANN_NPROBE = int(os.environ.get("CORTEX_ANN_NPROBE", "8"))
+ANN_REFRESH_SECONDS = float(os.environ.get("CORTEX_ANN_REFRESH_SECONDS", "60"))
+# Embedding service sidecar: one model per host, micro-batched across
+# callers. Requests wait at most BATCH_WINDOW_MS for company.
+EMBEDDING_SOCKET = Path(
+    os.environ.get("CORTEX_EMBEDDING_SOCKET", str(CORTEX_DIR / "embed.sock"))
+)
+EMBEDDING_BATCH_WINDOW_MS = float(os.environ.get("CORTEX_EMBEDDING_BATCH_WINDOW_MS", "2"))
+EMBEDDING_MAX_BATCH = int(os.environ.get("CORTEX_EMBEDDING_MAX_BATCH", "64"))
+# Engine-level search result cache, invalidated per project by ledger head.
+# CORTEX_SEARCH_CACHE_SIZE bounds result sets (and query embeddings); 0 disables.
+SEARCH_CACHE_SIZE = int(os.environ.get("CORTEX_SEARCH_CACHE_SIZE", "1000"))
+SEARCH_CACHE_TTL = float(os.environ.get("CORTEX_SEARCH_CACHE_TTL", "300"))
+# Graph traversals: after GRAPH_SNAPSHOT_HOT_CALLS traversals at the same
+# ledger head, keep an in-memory CSR snapshot of the graph (0 disables);
+# graphs with more than GRAPH_SNAPSHOT_MAX_EDGES relations stay on SQL.
+GRAPH_SNAPSHOT_HOT_CALLS = int(os.environ.get("CORTEX_GRAPH_SNAPSHOT_HOT_CALLS", "3"))
+GRAPH_SNAPSHOT_MAX_EDGES = int(os.environ.get("CORTEX_GRAPH_SNAPSHOT_MAX_EDGES", "1000000"))
 
 # ─── LLM Provider ────────────────────────────────────────────────────
 # CORTEX_LLM_PROVIDER: "" (disabled) | "qwen" | "openrouter" | "ollama" |
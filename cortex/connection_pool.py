@@ -148,6 +148,19 @@ class CortexConnectionPool:
                 # Return to pool
                 await self._pool.put(conn)
 
+    @asynccontextmanager
+    async def try_acquire(self) -> AsyncGenerator[aiosqlite.Connection | None, None]:
+        """Acquire a connection only if one is free right now, else yield None.
+
+        Lets a caller that already holds a connection fan out without
+        waiting on the pool, so it can never deadlock against its peers.
+        """
+        if self._semaphore.locked():
+            yield None
+            return
+        async with self.acquire() as conn:
+            yield conn
+
     async def _is_healthy(self, conn: aiosqlite.Connection) -> bool:
         """Check if connection is alive."""
         try:
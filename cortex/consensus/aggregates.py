@@ -0,0 +1,228 @@
+"""Consensus aggregates — running reputation-weighted sums per fact.
+
+``consensus_aggregates`` keeps, for every fact, the sums the v2 score is
+computed from: ``weighted_sum`` (Σ vote·w), ``total_weight`` (Σ w) and the
+vote counts, where ``w = max(vote_weight, reputation_score)`` over active
+agents. ``record_vote`` writes a vote and applies the difference between the
+agent's old and new contribution, so a vote costs O(1) however many votes the
+fact already has.
+
+The sums are only exact while reputations and ``is_active`` stay as they were
+when the votes were applied. Whoever changes them must call
+``reconcile_aggregates`` for the affected facts; the same function audits
+(and repairs) drift against ``consensus_votes_v2`` for the whole table.
+
+Votes are logged to the ledger under the voted fact's project
+(``vote_project``), and facts rescored outside a vote with
+``rescore_entries``, one transaction per project. Readers keyed on a
+project's ledger head (the search cache) thus see every score change of
+that project and nothing else.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from collections.abc import Iterable
+from typing import Any
+
+logger = logging.getLogger("cortex.consensus")
+
+AGGREGATE_SQL = (
+    "SELECT v.fact_id, "
+    "SUM(v.vote * MAX(v.vote_weight, a.reputation_score)), "
+    "SUM(MAX(v.vote_weight, a.reputation_score)), "
+    "COUNT(*), SUM(v.vote > 0), SUM(v.vote < 0) "
+    "FROM consensus_votes_v2 v JOIN agents a ON a.id = v.agent_id "
+    "WHERE a.is_active = 1{where} GROUP BY v.fact_id"
+)
+_FACT_FILTER = " AND v.fact_id IN (SELECT value FROM json_each(?))"
+
+_APPLY_SQL = (
+    "INSERT INTO consensus_aggregates "
+    "(fact_id, weighted_sum, total_weight, vote_count, verify_count, dispute_count) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(fact_id) DO UPDATE SET "
+    "weighted_sum = CASE WHEN vote_count + excluded.vote_count = 0 THEN 0.0 "
+    "ELSE weighted_sum + excluded.weighted_sum END, "
+    "total_weight = CASE WHEN vote_count + excluded.vote_count = 0 THEN 0.0 "
+    "ELSE total_weight + excluded.total_weight END, "
+    "vote_count = vote_count + excluded.vote_count, "
+    "verify_count = verify_count + excluded.verify_count, "
+    "dispute_count = dispute_count + excluded.dispute_count, "
+    "updated_at = datetime('now') "
+    "RETURNING weighted_sum, total_weight, vote_count"
+)
+VOTE_PROJECT = "consensus"  # ledger project of votes on unknown facts
+_PROJECTS_SQL = (
+    "SELECT project, json_group_array(id) FROM facts "
+    "WHERE id IN (SELECT value FROM json_each(?)) GROUP BY project"
+)
+_SET_SQL = (
+    "INSERT OR REPLACE INTO consensus_aggregates "
+    "(fact_id, weighted_sum, total_weight, vote_count, verify_count, dispute_count) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+def consensus_score(weighted_sum: float, total_weight: float) -> float:
+    """v2 consensus score: 1 plus the weighted mean vote."""
+    return 1.0 + (weighted_sum / total_weight) if total_weight > 0 else 1.0
+
+
+def _contribution(vote: int, weight: float) -> tuple[float, float, int, int, int]:
+    return vote * weight, weight, 1, int(vote > 0), int(vote < 0)
+
+
+async def record_vote(
+    conn,
+    fact_id: int,
+    agent_id: str,
+    value: int,
+    rep: float,
+    active: bool = True,
+    reason: str | None = None,
+) -> tuple[float, float, int]:
+    """Write (or remove, for ``value == 0``) a v2 vote and update the fact's sums.
+
+    ``rep`` and ``active`` are the agent's current ``reputation_score`` and
+    ``is_active``. Runs inside the caller's transaction.
+
+    Returns:
+        The fact's new ``(weighted_sum, total_weight, vote_count)``.
+    """
+    cursor = await conn.execute(
+        "SELECT vote, vote_weight FROM consensus_votes_v2 WHERE fact_id = ? AND agent_id = ?",
+        (fact_id, agent_id),
+    )
+    old = await cursor.fetchone()
+
+    if value == 0:
+        await conn.execute(
+            "DELETE FROM consensus_votes_v2 WHERE fact_id = ? AND agent_id = ?",
+            (fact_id, agent_id),
+        )
+    else:
+        await conn.execute(
+            "INSERT OR REPLACE INTO consensus_votes_v2 "
+            "(fact_id, agent_id, vote, vote_weight, agent_rep_at_vote, vote_reason) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (fact_id, agent_id, value, rep, rep, reason),
+        )
+
+    delta = [0.0, 0.0, 0, 0, 0]
+    if active:
+        if old:
+            for i, part in enumerate(_contribution(old[0], max(old[1], rep))):
+                delta[i] -= part
+        if value:
+            for i, part in enumerate(_contribution(value, rep)):
+                delta[i] += part
+
+    cursor = await conn.execute(_APPLY_SQL, (fact_id, *delta))
+    row = await cursor.fetchone()
+    await cursor.close()
+    return row[0], row[1], row[2]
+
+
+async def load_aggregate(conn, fact_id: int) -> tuple[float, float, int] | None:
+    """Return ``(weighted_sum, total_weight, vote_count)`` for a fact, if tracked."""
+    cursor = await conn.execute(
+        "SELECT weighted_sum, total_weight, vote_count FROM consensus_aggregates "
+        "WHERE fact_id = ?",
+        (fact_id,),
+    )
+    row = await cursor.fetchone()
+    return (row[0], row[1], row[2]) if row else None
+
+
+def _drifted(stored, expected, tolerance: float) -> bool:
+    if stored is None or tuple(stored[2:]) != tuple(expected[2:]):
+        return True
+    return any(
+        abs(s - e) > tolerance * max(1.0, abs(e))
+        for s, e in zip(stored[:2], expected[:2], strict=True)
+    )
+
+
+async def reconcile_aggregates(
+    conn,
+    fact_ids: Iterable[int] | None = None,
+    repair: bool = True,
+    tolerance: float = 1e-9,
+) -> dict[str, Any]:
+    """Recompute aggregates from ``consensus_votes_v2`` and compare with the stored ones.
+
+    Args:
+        conn: Open connection; the caller commits.
+        fact_ids: Facts to check. ``None`` audits every fact with votes or aggregates.
+        repair: Overwrite drifted aggregates with the recomputed values.
+        tolerance: Relative tolerance for the float sums.
+
+    Returns:
+        ``facts_checked``, ``drifted`` (fact ids) and ``repaired`` (count).
+    """
+    params: tuple = ()
+    where = stored_where = ""
+    if fact_ids is not None:
+        params = (json.dumps(sorted({int(f) for f in fact_ids})),)
+        where = _FACT_FILTER
+        stored_where = " WHERE fact_id IN (SELECT value FROM json_each(?))"
+
+    cursor = await conn.execute(AGGREGATE_SQL.format(where=where), params)
+    expected = {r[0]: tuple(r[1:]) for r in await cursor.fetchall()}
+    cursor = await conn.execute(
+        "SELECT fact_id, weighted_sum, total_weight, vote_count, verify_count, dispute_count "
+        f"FROM consensus_aggregates{stored_where}",
+        params,
+    )
+    stored = {r[0]: tuple(r[1:]) for r in await cursor.fetchall()}
+
+    zero = (0.0, 0.0, 0, 0, 0)
+    drifted = sorted(
+        fid
+        for fid in expected.keys() | stored.keys()
+        if _drifted(stored.get(fid), expected.get(fid, zero), tolerance)
+    )
+    if drifted and repair:
+        await conn.executemany(_SET_SQL, [(fid, *expected.get(fid, zero)) for fid in drifted])
+    if drifted:
+        logger.warning("Consensus aggregates drifted for %d fact(s)", len(drifted))
+    return {
+        "facts_checked": len(expected.keys() | stored.keys()),
+        "drifted": drifted,
+        "repaired": len(drifted) if repair else 0,
+    }
+
+
+async def vote_project(conn, fact_id: int) -> str:
+    """Ledger project of a vote on ``fact_id``: the fact's own project."""
+    cursor = await conn.execute("SELECT project FROM facts WHERE id = ?", (fact_id,))
+    row = await cursor.fetchone()
+    return row[0] if row else VOTE_PROJECT
+
+
+async def rescore_entries(
+    conn, fact_ids: Iterable[int], action: str
+) -> list[tuple[str, str, dict[str, Any]]]:
+    """Ledger entries for facts rescored outside a vote, one per project."""
+    fact_ids = sorted({int(f) for f in fact_ids})
+    if not fact_ids:
+        return []
+    cursor = await conn.execute(_PROJECTS_SQL, (json.dumps(fact_ids),))
+    return [
+        (project, action, {"fact_ids": json.loads(ids)})
+        for project, ids in await cursor.fetchall()
+    ]
+
+
+def rebuild_aggregates_sync(conn: sqlite3.Connection) -> int:
+    """Rebuild the whole ``consensus_aggregates`` table. Returns the number of facts."""
+    conn.execute("DELETE FROM consensus_aggregates")
+    cursor = conn.execute(
+        "INSERT INTO consensus_aggregates "
+        "(fact_id, weighted_sum, total_weight, vote_count, verify_count, dispute_count) "
+        + AGGREGATE_SQL.format(where="")
+    )
+    return cursor.rowcount
@@ -2,9 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import uuid
 
+from cortex.consensus.aggregates import (
+    consensus_score,
+    load_aggregate,
+    reconcile_aggregates,
+    record_vote,
+    rescore_entries,
+    vote_project,
+)
 from cortex.metrics import metrics
 
 logger = logging.getLogger("cortex.consensus")
@@ -46,7 +55,7 @@ class ConsensusManager:
 
         await self.engine._log_transaction(
             conn,
-            "consensus",
+            await vote_project(conn, fact_id),
             action,
             {"fact_id": fact_id, "agent": agent, "vote": value},
         )
@@ -97,25 +106,12 @@ class ConsensusManager:
             raise ValueError(f"Agent {agent_id} not found")
 
         rep = agent[0]
-
-        if value == 0:
-            await conn.execute(
-                "DELETE FROM consensus_votes_v2 WHERE fact_id = ? AND agent_id = ?",
-                (fact_id, agent_id),
-            )
-            action = "unvote_v2"
-        else:
-            await conn.execute(
-                "INSERT OR REPLACE INTO consensus_votes_v2 "
-                "(fact_id, agent_id, vote, vote_weight, agent_rep_at_vote, vote_reason) "
-                "VALUES (?, ?, ?, ?, ?, ?)",
-                (fact_id, agent_id, value, rep, rep, reason),
-            )
-            action = "vote_v2"
+        aggregate = await record_vote(conn, fact_id, agent_id, value, rep, reason=reason)
+        action = "vote_v2" if value else "unvote_v2"
 
         await self.engine._log_transaction(
             conn,
-            "consensus",
+            await vote_project(conn, fact_id),
             action,
             {
                 "fact_id": fact_id,
@@ -125,25 +121,38 @@ class ConsensusManager:
                 "reason": reason,
             },
         )
-        score = await self._recalculate_consensus_v2(fact_id, conn)
+        score = await self._recalculate_consensus_v2(fact_id, conn, aggregate)
         await conn.commit()
         return score
 
-    async def _recalculate_consensus_v2(self, fact_id: int, conn) -> float:
-        cursor = await conn.execute(
-            "SELECT v.vote, v.vote_weight, a.reputation_score "
-            "FROM consensus_votes_v2 v "
-            "JOIN agents a ON v.agent_id = a.id "
-            "WHERE v.fact_id = ? AND a.is_active = 1",
-            (fact_id,),
-        )
-        votes = await cursor.fetchall()
-        if not votes:
+    async def reconcile_consensus(
+        self, fact_ids: list[int] | None = None, repair: bool = True
+    ) -> dict:
+        conn = await self.engine.get_conn()
+        report = await reconcile_aggregates(conn, fact_ids, repair=repair)
+        if repair:
+            for fact_id in report["drifted"]:
+                await self._recalculate_consensus_v2(fact_id, conn)
+            entries = await rescore_entries(conn, report["drifted"], "reconcile_consensus")
+            if entries:
+                await self.engine._log_transactions(conn, entries)
+        await conn.commit()
+        return report
+
+    async def recompute_reputation(self, **kwargs) -> dict:
+        from cortex.consensus.reputation import recompute_reputation
+
+        return await asyncio.to_thread(recompute_reputation, self.engine._db_path, **kwargs)
+
+    async def _recalculate_consensus_v2(
+        self, fact_id: int, conn, aggregate: tuple[float, float, int] | None = None
+    ) -> float:
+        if aggregate is None:
+            aggregate = await load_aggregate(conn, fact_id)
+        if not aggregate or not aggregate[2]:
             return await self._recalculate_consensus(fact_id, conn)
 
-        weighted_sum = sum(v[0] * max(v[1], v[2]) for v in votes)
-        total_weight = sum(max(v[1], v[2]) for v in votes)
-        score = 1.0 + (weighted_sum / total_weight) if total_weight > 0 else 1.0
+        score = consensus_score(aggregate[0], aggregate[1])
         await self._update_fact_score(fact_id, score, conn)
         return score
 
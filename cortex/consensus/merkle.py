@@ -2,9 +2,11 @@
 CORTEX v4.0 — Merkle Tree Utilities.
 
 Provides Merkle tree computation and verification for ledger checkpoints.
+The hashing lives in ``cortex.merkle``; this module keeps the vote ledger's
+string-returning API on top of it.
 """
 
-import hashlib
+from cortex import merkle
 
 
 def compute_merkle_root(hashes: list[str]) -> str:
@@ -17,24 +19,7 @@ def compute_merkle_root(hashes: list[str]) -> str:
     Returns:
         Hex string of the Merkle root.
     """
-    if not hashes:
-        return ""
-
-    current_level = hashes
-
-    while len(current_level) > 1:
-        next_level = []
-        for i in range(0, len(current_level), 2):
-            left = current_level[i]
-            # Handle odd number of elements by duplicating the last one
-            right = current_level[i + 1] if i + 1 < len(current_level) else left
-
-            combined = f"{left}{right}"
-            next_hash = hashlib.sha256(combined.encode()).hexdigest()
-            next_level.append(next_hash)
-        current_level = next_level
-
-    return current_level[0]
+    return merkle.merkle_root(hashes) or ""
 
 
 def verify_merkle_proof(leaf_hash: str, proof: list[tuple[str, str]], root_hash: str) -> bool:
@@ -49,17 +34,7 @@ def verify_merkle_proof(leaf_hash: str, proof: list[tuple[str, str]], root_hash:
     Returns:
         True if the proof is valid.
     """
-    current_hash = leaf_hash
-
-    for sibling, position in proof:
-        if position == "L":
-            combined = f"{sibling}{current_hash}"
-        else:
-            combined = f"{current_hash}{sibling}"
-
-        current_hash = hashlib.sha256(combined.encode()).hexdigest()
-
-    return current_hash == root_hash
+    return merkle.verify_proof(leaf_hash, proof, root_hash)
 
 
 class MerkleTree:
@@ -69,33 +44,28 @@ class MerkleTree:
 
     def __init__(self, items: list[str]):
         self.leaves = items
-        self.tree = self._build_tree(items)
-
-    def _build_tree(self, hashes: list[str]) -> list[list[str]]:
-        if not hashes:
-            return [[""]]
-
-        tree = [hashes]
-        current_level = hashes
-
-        while len(current_level) > 1:
-            next_level = []
-            for i in range(0, len(current_level), 2):
-                left = current_level[i]
-                right = current_level[i + 1] if i + 1 < len(current_level) else left
-
-                combined = f"{left}{right}"
-                next_hash = hashlib.sha256(combined.encode()).hexdigest()
-                next_level.append(next_hash)
-            tree.append(next_level)
-            current_level = next_level
-
-        return tree
+        self._tree = merkle.MerkleTree(items)
 
     @property
     def root(self) -> str:
         """Return the root hash of the tree."""
-        return self.tree[-1][0] if self.tree and self.tree[-1] else ""
+        return self._tree.get_root() or ""
+
+    @property
+    def tree(self) -> list[list[str]]:
+        """All levels as hex strings, leaves first (unpacked on demand)."""
+        if not self.leaves:
+            return [[""]]
+        levels = [list(self.leaves)]
+        packed = self._tree._packed
+        offset = 0
+        for size in merkle.level_sizes(len(self.leaves)):
+            end = offset + size * merkle.DIGEST_SIZE
+            levels.append(
+                [packed[i : i + merkle.DIGEST_SIZE].hex() for i in range(offset, end, merkle.DIGEST_SIZE)]
+            )
+            offset = end
+        return levels
 
     def get_proof(self, index: int) -> list[tuple[str, str]]:
         """
@@ -104,27 +74,4 @@ class MerkleTree:
         Returns:
             List of (sibling_hash, position) tuples.
         """
-        if index < 0 or index >= len(self.leaves):
-            return []
-
-        proof = []
-        current_index = index
-
-        for level in self.tree[:-1]:
-            # Sibling is at current_index ^ 1 (bitwise XOR)
-            sibling_index = current_index ^ 1
-
-            if sibling_index < len(level):
-                sibling_hash = level[sibling_index]
-                position = "R" if current_index % 2 == 0 else "L"
-                proof.append((sibling_hash, position))
-            else:
-                # If no sibling (odd element at end), it duplicates itself for the hash
-                # but the proof needs the self-hash to combine.
-                # In this implementation, the parent is H(left, left).
-                # So the sibling is effectively the left node itself.
-                proof.append((level[current_index], "R"))
-
-            current_index //= 2
-
-        return proof
+        return self._tree.get_proof(index)
@@ -0,0 +1,340 @@
+"""Bulk agent reputation recomputation (NumPy).
+
+Reputation is rebuilt from scratch from the vote and outcome history:
+
+1. Evidence: every v2 vote on a fact with a resolved ``consensus_outcomes``
+   row (latest per fact; ``verified`` counts as +1, ``disputed`` as -1) is a
+   success when it agrees with the outcome and a failure otherwise. Each
+   vote weighs ``decay_factor · 0.5 ** (age_days / half_life_days)``.
+2. Accuracy: ``(successes + 1) / (successes + failures + 2)`` on the decayed
+   weights, so an agent without evidence sits at 0.5.
+3. Trust propagation: a damped power iteration over ``trust_edges``, in the
+   style of personalized PageRank with accuracy as the teleport vector.
+   ``x = (1 - d) · accuracy + d · T x``, where ``T`` averages the scores of
+   the agents that trust each agent, weighted by ``trust_weight``. Agents
+   without incoming trust keep their accuracy. Scores stay in [0, 1].
+
+``consensus_votes_v2`` is scanned once, in its own read snapshot, into NumPy
+arrays that feed both the evidence and the new ``consensus_aggregates``.
+All reductions are ``np.bincount`` calls and one propagation step is
+O(edges). Reputations and the ``total_votes``/``successful_votes``/
+``disputed_votes`` counters are then written with one ``executemany`` in a
+single transaction that also replaces the aggregates and rescores facts,
+since vote weights depend on reputation. Agents with no votes and no
+incoming trust keep their stored row. The rescore is logged to the ledger
+as one ``rescore_reputation`` transaction per project with voted facts.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from cortex.config import REPUTATION_DAMPING, REPUTATION_HALF_LIFE_DAYS
+
+logger = logging.getLogger("cortex.consensus")
+
+_CHUNK = 250_000
+_MAX_ITERATIONS = 100
+_TOLERANCE = 1e-9
+_UNIX_EPOCH_JULIAN = 2440587.5
+
+_OUTCOMES_SQL = """
+INSERT INTO _rep_outcomes
+SELECT fact_id,
+       CASE final_state WHEN 'verified' THEN 1 WHEN 'disputed' THEN -1 ELSE 0 END
+FROM consensus_outcomes
+WHERE id IN (SELECT MAX(id) FROM consensus_outcomes GROUP BY fact_id)
+"""
+# Agent, fact, vote and outcome sign share one integer column when they fit
+# in 63 bits: Python objects per row are most of the cost of streaming votes.
+_VOTES_SQL = (
+    "SELECT {agent}(v.fact_id << 4) | ((v.vote + 1) << 2) | (COALESCE(o.sign, 0) + 1), "
+    "v.vote_weight, julianday(v.created_at), NULLIF(v.decay_factor, 1.0) "
+    "FROM consensus_votes_v2 v "
+    "JOIN agents a ON a.id = v.agent_id "
+    "LEFT JOIN _rep_outcomes o ON o.fact_id = v.fact_id"
+)
+_VOTES_VERSION_SQL = "SELECT COUNT(*), MAX(id) FROM consensus_votes_v2"
+_EDGES_SQL = (
+    "SELECT s.rowid, t.rowid, e.trust_weight FROM trust_edges e "
+    "JOIN agents s ON s.id = e.source_agent "
+    "JOIN agents t ON t.id = e.target_agent "
+    "WHERE e.trust_weight > 0 AND e.source_agent != e.target_agent"
+)
+_UPDATE_SQL = (
+    "UPDATE agents SET reputation_score = ?, total_votes = ?, successful_votes = ?, "
+    "disputed_votes = ? WHERE rowid = ?"
+)
+_AGGREGATE_INSERT_SQL = (
+    "INSERT INTO consensus_aggregates "
+    "(fact_id, weighted_sum, total_weight, vote_count, verify_count, dispute_count) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_RESCORE_SQL = """
+UPDATE facts SET
+    consensus_score = 1.0 + ca.weighted_sum / ca.total_weight,
+    confidence = CASE
+        WHEN 1.0 + ca.weighted_sum / ca.total_weight >= 1.5 THEN 'verified'
+        WHEN 1.0 + ca.weighted_sum / ca.total_weight <= 0.5 THEN 'disputed'
+        ELSE facts.confidence END
+FROM consensus_aggregates ca
+WHERE ca.fact_id = facts.id AND ca.vote_count > 0 AND ca.total_weight > 0
+"""
+_RESCORED_PROJECTS_SQL = (
+    "SELECT f.project, COUNT(*) FROM facts f "
+    "JOIN consensus_aggregates ca ON ca.fact_id = f.id "
+    "WHERE ca.vote_count > 0 AND ca.total_weight > 0 GROUP BY f.project"
+)
+
+
+def _index(rowids: np.ndarray, column) -> np.ndarray:
+    return np.searchsorted(rowids, np.asarray(column, dtype=np.int64))
+
+
+def load_votes(conn: sqlite3.Connection, rowids: np.ndarray) -> dict[str, np.ndarray]:
+    """Stream every v2 vote into column arrays.
+
+    Returns:
+        ``agent`` (index into ``rowids``), ``fact``, ``vote``, ``sign`` (latest
+        outcome of the fact, 0 if unresolved), ``weight`` (``vote_weight``),
+        ``julian`` (``created_at``) and ``decay`` (``decay_factor``).
+    """
+    conn.execute("DROP TABLE IF EXISTS _rep_outcomes")
+    conn.execute(
+        "CREATE TEMP TABLE _rep_outcomes (fact_id INTEGER PRIMARY KEY, sign INTEGER NOT NULL)"
+    )
+    conn.execute(_OUTCOMES_SQL)
+    max_fact = conn.execute("SELECT MAX(fact_id) FROM consensus_votes_v2").fetchone()[0] or 0
+    shift = max(max_fact, 0).bit_length() + 4
+    packed_agent = len(rowids) == 0 or int(rowids[-1]).bit_length() + shift <= 63
+    sql = _VOTES_SQL.format(agent=f"(a.rowid << {shift}) | " if packed_agent else "a.rowid, ")
+
+    keys = ("packed", "weight", "julian", "decay")
+    dtypes = {"agent": np.int64, "packed": np.int64}
+    parts: dict[str, list[np.ndarray]] = {k: [] for k in ("agent",) + keys}
+    cursor = conn.execute(sql)
+    while rows := cursor.fetchmany(_CHUNK):
+        columns = list(zip(*rows, strict=True))
+        if not packed_agent:
+            parts["agent"].append(np.array(columns.pop(0), dtype=np.int64))
+        # decay_factor = 1.0 arrives as None and becomes nan
+        for key, column in zip(keys, columns, strict=True):
+            parts[key].append(np.array(column, dtype=dtypes.get(key, np.float64)))
+    conn.execute("DROP TABLE _rep_outcomes")
+
+    cols = {
+        k: np.concatenate(v) if v else np.zeros(0, dtype=dtypes.get(k, np.float64))
+        for k, v in parts.items()
+    }
+    packed = cols.pop("packed")
+    agent_rowid = packed >> shift if packed_agent else cols["agent"]
+    cols["agent"] = _index(rowids, agent_rowid).astype(np.int32)
+    cols["fact"] = (packed & ((1 << shift) - 1)) >> 4
+    cols["vote"] = ((packed >> 2) & 3).astype(np.int8) - 1
+    cols["sign"] = (packed & 3).astype(np.int8) - 1
+    cols["decay"] = np.where(np.isnan(cols["decay"]), 1.0, cols["decay"])
+    return cols
+
+
+def propagate_trust(
+    base: np.ndarray,
+    src: np.ndarray,
+    dst: np.ndarray,
+    weight: np.ndarray,
+    damping: float,
+    max_iterations: int = _MAX_ITERATIONS,
+    tolerance: float = _TOLERANCE,
+) -> tuple[np.ndarray, int, bool]:
+    """Damped power iteration of ``base`` over trust edges ``src -> dst``.
+
+    Returns:
+        ``(scores, iterations, converged)``.
+    """
+    n = len(base)
+    incoming = np.bincount(dst, weight, n)
+    trusted = incoming > 0
+    if not trusted.any() or damping <= 0:
+        return base.copy(), 0, True
+    share = weight / incoming[dst]
+    anchor = (1.0 - damping) * base
+    scores = base.copy()
+    for iteration in range(1, max_iterations + 1):
+        pulled = np.bincount(dst, share * scores[src], n)
+        updated = np.where(trusted, anchor + damping * pulled, base)
+        delta = float(np.max(np.abs(updated - scores)))
+        scores = updated
+        if delta < tolerance:
+            return scores, iteration, True
+    return scores, max_iterations, False
+
+
+def _aggregate_rows(votes: dict[str, np.ndarray], rep: np.ndarray, active: np.ndarray) -> list:
+    """Per-fact rows for ``consensus_aggregates``, as ``AGGREGATE_SQL`` would compute them."""
+    keep = active[votes["agent"]]
+    fact = votes["fact"][keep]
+    if not len(fact):
+        return []
+    vote = votes["vote"][keep].astype(np.float64)
+    weight = np.maximum(votes["weight"][keep], rep[votes["agent"][keep]])
+    facts, inv = np.unique(fact, return_inverse=True)
+    m = len(facts)
+    return list(
+        zip(
+            facts.tolist(),
+            np.bincount(inv, vote * weight, m).tolist(),
+            np.bincount(inv, weight, m).tolist(),
+            np.bincount(inv, minlength=m).tolist(),
+            np.bincount(inv[vote > 0], minlength=m).tolist(),
+            np.bincount(inv[vote < 0], minlength=m).tolist(),
+            strict=True,
+        )
+    )
+
+
+def recompute_reputation(
+    db_path: str | Path,
+    now: datetime | None = None,
+    half_life_days: float = REPUTATION_HALF_LIFE_DAYS,
+    damping: float = REPUTATION_DAMPING,
+    dry_run: bool = False,
+) -> dict[str, Any]:
+    """Recompute every agent's reputation and write it back in one transaction.
+
+    History is read in its own snapshot, so writers are only blocked while
+    the results are written. If votes changed in between, the aggregates
+    are rebuilt in SQL inside the write transaction instead.
+
+    Returns:
+        Counts (``agents``, ``votes``, ``resolved_votes``, ``edges``,
+        ``updated``, ``changed``, ``facts_rescored``), ``iterations``,
+        ``converged`` and per-phase timings.
+    """
+    from cortex.consensus.aggregates import rebuild_aggregates_sync
+    from cortex.engine.bulk import log_transactions_sync
+
+    if half_life_days <= 0:
+        raise ValueError(f"half_life_days must be positive, got {half_life_days}")
+    if not 0 <= damping < 1:
+        raise ValueError(f"damping must be in [0, 1), got {damping}")
+    now = now or datetime.now(timezone.utc)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    now_julian = now.timestamp() / 86400.0 + _UNIX_EPOCH_JULIAN
+    start = time.perf_counter()
+
+    conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None)
+    try:
+        conn.execute("BEGIN")
+        agents = conn.execute(
+            "SELECT rowid, reputation_score, COALESCE(total_votes, 0), is_active = 1 "
+            "FROM agents ORDER BY rowid"
+        ).fetchall()
+        rowids, current, stored_total, active = (
+            np.array(col, dtype=dtype)
+            for col, dtype in zip(
+                zip(*agents, strict=True) if agents else ((), (), (), ()),
+                (np.int64, np.float64, np.int64, bool),
+                strict=True,
+            )
+        )
+        n = len(rowids)
+        version = conn.execute(_VOTES_VERSION_SQL).fetchone()
+        votes = load_votes(conn, rowids)
+        edges = conn.execute(_EDGES_SQL).fetchall()
+        conn.execute("COMMIT")
+        loaded = time.perf_counter()
+
+        # Evidence: decayed agreement with resolved outcomes
+        resolved = votes["sign"] != 0
+        agent = votes["agent"][resolved]
+        age = np.maximum(now_julian - votes["julian"][resolved], 0.0)
+        weight = votes["decay"][resolved] * np.exp2(-age / half_life_days)
+        agree = votes["vote"][resolved] * votes["sign"][resolved] > 0
+        success = np.bincount(agent[agree], weight[agree], n)
+        failure = np.bincount(agent[~agree], weight[~agree], n)
+        successful = np.bincount(agent[agree], minlength=n)
+        disputed = np.bincount(agent[~agree], minlength=n)
+        total = np.bincount(votes["agent"], minlength=n)
+        accuracy = (success + 1.0) / (success + failure + 2.0)
+
+        # Trust propagation
+        if edges:
+            src, dst, trust = zip(*edges, strict=True)
+            src, dst = _index(rowids, src), _index(rowids, dst)
+            trust = np.array(trust, dtype=np.float64)
+        else:
+            src = dst = np.zeros(0, dtype=np.int64)
+            trust = np.zeros(0)
+        scores, iterations, converged = propagate_trust(accuracy, src, dst, trust, damping)
+        if not converged:
+            logger.warning("Reputation propagation did not converge in %d steps", iterations)
+
+        evidence = (successful + disputed) > 0
+        trusted = np.bincount(dst, minlength=n) > 0
+        scores = np.where(evidence | trusted, scores, current)
+        touched = evidence | trusted | (total > 0) | (stored_total > 0)
+        changed = int(np.count_nonzero(np.abs(scores - current)[touched] > _TOLERANCE))
+        aggregates = _aggregate_rows(votes, scores, active)
+        computed = time.perf_counter()
+
+        facts_rescored = 0
+        if not dry_run:
+            pick = np.flatnonzero(touched)
+            rows = zip(
+                scores[pick].tolist(),
+                total[pick].tolist(),
+                successful[pick].tolist(),
+                disputed[pick].tolist(),
+                rowids[pick].tolist(),
+                strict=True,
+            )
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(_UPDATE_SQL, rows)
+                if conn.execute(_VOTES_VERSION_SQL).fetchone() == version:
+                    conn.execute("DELETE FROM consensus_aggregates")
+                    conn.executemany(_AGGREGATE_INSERT_SQL, aggregates)
+                else:
+                    logger.info("Votes changed during reputation recompute; rebuilding in SQL")
+                    rebuild_aggregates_sync(conn)
+                facts_rescored = conn.execute(_RESCORE_SQL).rowcount
+                # Move each project's ledger head: cached searches carry confidence
+                entries = [
+                    (project, "rescore_reputation", {"facts": count})
+                    for project, count in conn.execute(_RESCORED_PROJECTS_SQL)
+                ]
+                if entries:
+                    log_transactions_sync(conn, entries)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+    finally:
+        conn.close()
+
+    done = time.perf_counter()
+    logger.info(
+        "Reputation recomputed for %d agents from %d resolved votes (%d changed)",
+        n, int(resolved.sum()), changed,
+    )
+    return {
+        "agents": n,
+        "votes": len(votes["agent"]),
+        "resolved_votes": int(resolved.sum()),
+        "edges": len(edges),
+        "updated": 0 if dry_run else int(touched.sum()),
+        "changed": changed,
+        "facts_rescored": facts_rescored,
+        "iterations": iterations,
+        "converged": converged,
+        "load_seconds": round(loaded - start, 3),
+        "compute_seconds": round(computed - loaded, 3),
+        "write_seconds": round(done - computed, 3),
+    }
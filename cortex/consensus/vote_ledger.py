@@ -3,20 +3,50 @@ CORTEX v4.0 — Registro Inmutable de Votos.
 
 Almacenamiento de votos a prueba de manipulaciones criptográficas mediante encadenamiento de hashes y árboles de Merkle.
 Parte de la Arquitectura de Soberanía Wave 5.
+
+Los votos se encadenan por lotes: ``append_votes`` lee la cabeza de la cadena
+una vez, encadena N votos en memoria y los inserta en una sola transacción.
+Los puntos de control Merkle de ``MERKLE_BATCH_SIZE`` votos se crean en
+segundo plano, y la verificación recorre la cadena por páginas desde una
+marca de agua en ``cortex_meta``, como el registro de transacciones.
 """
 
-import hashlib
+import asyncio
+import json
 import logging
+from collections.abc import Iterable
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any
 
 import aiosqlite
 
+from cortex.canonical import compute_vote_hash, compute_vote_hash_v1
+from cortex.config import LEDGER_VERIFY_BATCH
 from cortex.consensus.merkle import MerkleTree, compute_merkle_root
 
 logger = logging.getLogger("cortex.consensus.ledger")
 
+VERIFY_MODES = ("incremental", "full")
+
+_WATERMARK_KEY = "vote_ledger_verified"
+_FULL_CURSOR_KEY = "vote_ledger_verify_full"
+
+_INSERT_SQL = (
+    "INSERT INTO vote_ledger "
+    "(fact_id, agent_id, vote, vote_weight, prev_hash, hash, timestamp, signature) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_PAGE_SQL = (
+    "SELECT id, prev_hash, hash, fact_id, agent_id, vote, vote_weight, timestamp "
+    "FROM vote_ledger WHERE id > ? ORDER BY id LIMIT ?"
+)
+_PENDING_SQL = (
+    "SELECT COUNT(*) FROM vote_ledger "
+    "WHERE id > (SELECT COALESCE(MAX(vote_end_id), 0) FROM vote_merkle_roots)"
+)
+
 
 @dataclass
 class VoteEntry:
@@ -43,25 +73,21 @@ class ImmutableVoteLedger:
 
     def __init__(self, pool_or_conn):
         self._db = pool_or_conn
-
-    def _compute_hash(self, prev_hash: str, fact_id: int, agent_id: str, vote: int, weight: float, ts: str) -> str:
-        """Cálculo determinista del hash del bloque/voto."""
-        payload = f"{prev_hash}:{fact_id}:{agent_id}:{vote}:{weight}:{ts}"
-        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
-
-    async def _get_conn(self):
-        """Helper para obtener una conexión ya sea desde un pool o una conexión existente."""
-        if hasattr(self._db, "acquire"):
-             return await self._db.acquire().__aenter__()
-        return self._db
-
-    async def _release_conn(self, conn):
-        """Libera la conexión si proviene de un pool."""
-        if hasattr(self._db, "release"):
-            await self._db.release(conn)
-        elif hasattr(self._db, "acquire"):
-            # Si entramos con __aenter__, salimos con __aexit__ (cerrado por caller o manual)
-            pass
+        self._pending: int | None = None  # votos sin punto de control (None = desconocido)
+        self._checkpoint_task: asyncio.Task | None = None
+
+    @property
+    def _pooled(self) -> bool:
+        return hasattr(self._db, "acquire")
+
+    @asynccontextmanager
+    async def _connection(self):
+        """Conexión propia del pool, o la del llamador (dentro de su transacción)."""
+        if self._pooled:
+            async with self._db.acquire() as conn:
+                yield conn
+        else:
+            yield self._db
 
     async def append_vote(
         self,
@@ -69,134 +95,155 @@ class ImmutableVoteLedger:
         agent_id: str,
         vote: int,
         vote_weight: float = 1.0,
-        signature: str | None = None
+        signature: str | None = None,
+        checkpoint: bool = True,
     ) -> VoteEntry:
         """
         Añade un voto de forma segura y sellada.
         """
-        timestamp = datetime.now(timezone.utc).isoformat()
-        conn = await self._get_conn()
-
-        should_commit = hasattr(self._db, "acquire")
-        if should_commit:
-            await conn.execute("BEGIN IMMEDIATE")
-
-        try:
-            cursor = await conn.execute(
-                "SELECT hash FROM vote_ledger ORDER BY id DESC LIMIT 1"
-            )
-            row = await cursor.fetchone()
-            prev_hash = row[0] if row else self.GENESIS_HASH
-
-            entry_hash = self._compute_hash(prev_hash, fact_id, agent_id, vote, vote_weight, timestamp)
-
-            cursor = await conn.execute(
-                """
-                INSERT INTO vote_ledger 
-                (fact_id, agent_id, vote, vote_weight, prev_hash, hash, timestamp, signature)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (fact_id, agent_id, vote, vote_weight, prev_hash, entry_hash, timestamp, signature)
-            )
+        entries = await self.append_votes(
+            [(fact_id, agent_id, vote, vote_weight, signature)], checkpoint=checkpoint
+        )
+        return entries[0]
 
-            vote_id = cursor.lastrowid
+    async def append_votes(
+        self, votes: Iterable[tuple], checkpoint: bool = True
+    ) -> list[VoteEntry]:
+        """
+        Encadena varios votos en una sola transacción.
 
-            if should_commit:
-                await conn.commit()
+        Cada voto es ``(fact_id, agent_id, vote[, vote_weight[, signature]])``.
+        Con un pool, el lote se escribe en ``BEGIN IMMEDIATE`` y se confirma una
+        vez; con una conexión, se escribe dentro de la transacción del llamador.
+        ``checkpoint=False`` deja los puntos de control Merkle a quien llame a
+        ``schedule_checkpoint`` tras confirmar.
+        """
+        batch = [_vote_row(v) for v in votes]
+        if not batch:
+            return []
+        timestamp = datetime.now(timezone.utc).isoformat()
 
-            logger.info(f"Voto inmutable sellado: Fact {fact_id} | Agent {agent_id} | Hash {entry_hash[:8]}...")
-            await self._maybe_create_checkpoint(conn)
+        async with self._connection() as conn:
+            if self._pooled:
+                await conn.execute("BEGIN IMMEDIATE")
+            try:
+                async with conn.execute(
+                    "SELECT id, hash FROM vote_ledger ORDER BY id DESC LIMIT 1"
+                ) as cursor:
+                    row = await cursor.fetchone()
+                last_id, prev_hash = row if row else (0, self.GENESIS_HASH)
+
+                rows = []
+                for fact_id, agent_id, vote, weight, signature in batch:
+                    entry_hash = compute_vote_hash(
+                        prev_hash, fact_id, agent_id, vote, weight, timestamp
+                    )
+                    rows.append((
+                        fact_id, agent_id, vote, weight, prev_hash, entry_hash, timestamp,
+                        signature,
+                    ))
+                    prev_hash = entry_hash
+                await conn.executemany(_INSERT_SQL, rows)
 
-            return VoteEntry(
-                id=vote_id, fact_id=fact_id, agent_id=agent_id,
-                vote=vote, vote_weight=vote_weight, prev_hash=prev_hash,
-                hash=entry_hash, timestamp=timestamp, signature=signature
+                async with conn.execute(
+                    "SELECT hash, id FROM vote_ledger WHERE id > ?", (last_id,)
+                ) as cursor:
+                    ids = dict(await cursor.fetchall())
+
+                if self._pooled:
+                    await conn.commit()
+                elif checkpoint:
+                    await self._maybe_create_checkpoint(conn)
+            except Exception as e:
+                if self._pooled:
+                    await conn.rollback()
+                logger.error(f"Fallo al registrar voto inmutable: {e}")
+                raise
+
+        logger.info(f"{len(rows)} voto(s) inmutable(s) sellado(s) | Hash {prev_hash[:8]}...")
+        if self._pooled and checkpoint:
+            self.schedule_checkpoint(len(rows))
+
+        return [
+            VoteEntry(
+                id=ids[r[5]], fact_id=r[0], agent_id=r[1], vote=r[2], vote_weight=r[3],
+                prev_hash=r[4], hash=r[5], timestamp=r[6], signature=r[7],
             )
-        except Exception as e:
-            if should_commit:
-                await conn.rollback()
-            logger.error(f"Fallo al registrar voto inmutable: {e}")
-            raise
-        finally:
-            await self._release_conn(conn)
-
-    async def verify_chain_integrity(self) -> dict[str, Any]:
-        """
-        Audita toda la cadena de votos.
-        """
-        violations = []
-        conn = await self._get_conn()
+            for r in rows
+        ]
+
+    # ─── Puntos de control Merkle ─────────────────────────────────────
+
+    def schedule_checkpoint(self, appended: int = 0) -> None:
+        """Cuenta ``appended`` votos nuevos y, al llenarse un lote, crea los
+        puntos de control pendientes en segundo plano (solo con pool)."""
+        if not self._pooled:
+            return
+        if self._pending is not None:
+            self._pending += appended
+            if self._pending < self.MERKLE_BATCH_SIZE:
+                return
+        if self._checkpoint_task is None or self._checkpoint_task.done():
+            self._checkpoint_task = asyncio.create_task(self._checkpoint_loop())
+
+    async def drain(self) -> None:
+        """Espera al punto de control en segundo plano en curso, si lo hay."""
+        if self._checkpoint_task is not None:
+            await asyncio.shield(self._checkpoint_task)
+
+    async def _checkpoint_loop(self) -> None:
+        """Crea un punto de control por cada lote completo y recuenta los pendientes."""
         try:
-            cursor = await conn.execute(
-                "SELECT id, prev_hash, hash, fact_id, agent_id, vote, vote_weight, timestamp "
-                "FROM vote_ledger ORDER BY id ASC"
-            )
-            rows = await cursor.fetchall()
-
-            expected_prev = self.GENESIS_HASH
-            for row in rows:
-                v_id, p_hash, c_hash, f_id, a_id, v_val, weight, ts = row
-                if p_hash != expected_prev:
-                    violations.append({
-                        "vote_id": v_id,
-                        "type": "CHAIN_BREAK",
-                        "expected_prev": expected_prev,
-                        "actual_prev": p_hash
-                    })
-
-                actual_hash = self._compute_hash(p_hash, f_id, a_id, v_val, weight, ts)
-                if actual_hash != c_hash:
-                    violations.append({
-                        "vote_id": v_id,
-                        "type": "DATA_TAMPERING",
-                        "expected_hash": c_hash,
-                        "actual_hash": actual_hash
-                    })
-
-                expected_prev = c_hash
-
-            return {
-                "valid": len(violations) == 0,
-                "violations": violations,
-                "votes_checked": len(rows)
-            }
-        finally:
-            await self._release_conn(conn)
+            async with self._db.acquire() as conn:
+                while True:
+                    await conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        root = await self._create_checkpoint_internal(
+                            conn, min_votes=self.MERKLE_BATCH_SIZE
+                        )
+                        await conn.commit()
+                    except Exception:
+                        await conn.rollback()
+                        raise
+                    if root is None:
+                        break
+                async with conn.execute(_PENDING_SQL) as cursor:
+                    self._pending = (await cursor.fetchone())[0]
+        except Exception:
+            self._pending = None
+            logger.exception("Fallo al crear el punto de control Merkle en segundo plano")
 
     async def _maybe_create_checkpoint(self, conn: aiosqlite.Connection):
         """Verifica si es necesario crear un punto de control de Merkle."""
-        async with conn.execute(
-            "SELECT COUNT(v.id) FROM vote_ledger v "
-            "LEFT JOIN vote_merkle_roots r ON v.id >= r.vote_start_id AND v.id <= r.vote_end_id "
-            "WHERE r.id IS NULL"
-        ) as cursor:
+        async with conn.execute(_PENDING_SQL) as cursor:
             count = (await cursor.fetchone())[0]
 
-        if count >= self.MERKLE_BATCH_SIZE:
+        while count >= self.MERKLE_BATCH_SIZE:
             await self._create_checkpoint_internal(conn)
+            count -= self.MERKLE_BATCH_SIZE
 
     async def create_checkpoint(self) -> str | None:
         """Dispara manualmente un punto de control."""
-        conn = await self._get_conn()
-        try:
-            should_commit = hasattr(self._db, "acquire")
-            if should_commit:
+        async with self._connection() as conn:
+            if self._pooled:
                 await conn.execute("BEGIN IMMEDIATE")
-
-            root = await self._create_checkpoint_internal(conn)
-
-            if should_commit:
-                await conn.commit()
-            return root
-        except Exception as e:
-            if should_commit:
-                await conn.rollback()
-            raise e
-        finally:
-            await self._release_conn(conn)
-
-    async def _create_checkpoint_internal(self, conn: aiosqlite.Connection) -> str | None:
-        """Lógica interna de creación de punto de control."""
+            try:
+                root = await self._create_checkpoint_internal(conn)
+                if self._pooled:
+                    await conn.commit()
+                return root
+            except Exception:
+                if self._pooled:
+                    await conn.rollback()
+                raise
+
+    async def _create_checkpoint_internal(
+        self, conn: aiosqlite.Connection, min_votes: int = 1
+    ) -> str | None:
+        """Lógica interna de creación de punto de control.
+
+        No crea nada si hay menos de ``min_votes`` votos sin punto de control.
+        """
         async with conn.execute("SELECT MAX(vote_end_id) FROM vote_merkle_roots") as cursor:
             row = await cursor.fetchone()
             start_id = (row[0] + 1) if row and row[0] is not None else 1
@@ -207,7 +254,7 @@ class ImmutableVoteLedger:
         ) as cursor:
             rows = await cursor.fetchall()
 
-        if not rows:
+        if not rows or len(rows) < min_votes:
             return None
 
         hashes = [r[0] for r in rows]
@@ -225,11 +272,162 @@ class ImmutableVoteLedger:
         logger.info(f"Punto de control Merkle creado: {start_id}-{end_id} -> {root_hash}")
         return root_hash
 
+    # ─── Verificación ─────────────────────────────────────────────────
+
+    async def verify_chain_integrity(
+        self, mode: str = "incremental", batch_size: int = LEDGER_VERIFY_BATCH
+    ) -> dict[str, Any]:
+        """
+        Audita la cadena de votos y sus puntos de control Merkle.
+
+        Los votos se leen por páginas de ``batch_size``; solo se guardan en
+        memoria los hashes del punto de control que se está reconstruyendo.
+        ``incremental`` parte de la marca de agua del último punto de control
+        verificado sin fallos; ``full`` vuelve a verificar desde el génesis y,
+        si se interrumpe, la siguiente ejecución ``full`` sigue desde su cursor.
+        """
+        if mode not in VERIFY_MODES:
+            raise ValueError(f"Modo de verificación desconocido: {mode!r}")
+
+        key = _FULL_CURSOR_KEY if mode == "full" else _WATERMARK_KEY
+        violations: list[dict] = []
+        async with self._connection() as conn:
+            anchor = await self._load_anchor(conn, key, violations)
+            anchor, checked, roots = await self._verify_stream(
+                conn, key, anchor, violations, batch_size
+            )
+            if mode == "full":
+                await self._clear_anchor(conn, _FULL_CURSOR_KEY)
+                if anchor:
+                    await self._save_anchor(conn, _WATERMARK_KEY, anchor)
+                else:
+                    await self._clear_anchor(conn, _WATERMARK_KEY)
+
+        return {
+            "valid": len(violations) == 0,
+            "violations": violations,
+            "votes_checked": checked,
+            "checkpoints_checked": roots,
+            "mode": mode,
+            "verified_to": anchor["vote_id"] if anchor else 0,
+        }
+
+    async def _verify_stream(
+        self, conn, key: str, anchor: dict | None, violations: list[dict], batch_size: int
+    ) -> tuple[dict | None, int, int]:
+        """Recorre la cadena desde ``anchor``; devuelve (anchor, votos, puntos de control)."""
+        baseline = len(violations)
+        checked = 0
+        roots_checked = 0
+        expected_prev = anchor["hash"] if anchor else self.GENESIS_HASH
+        last_id = anchor["vote_id"] if anchor else 0
+        root = await self._next_root(conn, last_id)
+        leaves: list[str] = []
+
+        async def close_root():
+            nonlocal anchor, roots_checked
+            cp_id, stored_root, _start, end = root
+            roots_checked += 1
+            recomputed = compute_merkle_root(leaves)
+            if recomputed != stored_root:
+                violations.append({
+                    "checkpoint_id": cp_id,
+                    "type": "MERKLE_MISMATCH",
+                    "expected": stored_root,
+                    "actual": recomputed
+                })
+            leaves.clear()
+            if len(violations) == baseline:
+                anchor = {"root_id": cp_id, "vote_id": end, "hash": expected_prev}
+                await self._save_anchor(conn, key, anchor)
+            return await self._next_root(conn, end)
+
+        while True:
+            async with conn.execute(_PAGE_SQL, (last_id, batch_size)) as cursor:
+                rows = await cursor.fetchall()
+            if not rows:
+                break
+
+            for v_id, p_hash, c_hash, f_id, a_id, v_val, weight, ts in rows:
+                while root and v_id > root[3]:
+                    root = await close_root()
+
+                if p_hash != expected_prev:
+                    violations.append({
+                        "vote_id": v_id,
+                        "type": "CHAIN_BREAK",
+                        "expected_prev": expected_prev,
+                        "actual_prev": p_hash
+                    })
+                mismatch = _vote_hash_violation(v_id, p_hash, c_hash, f_id, a_id, v_val, weight, ts)
+                if mismatch:
+                    violations.append(mismatch)
+                expected_prev = c_hash
+                checked += 1
+
+                if root and v_id >= root[2]:
+                    leaves.append(c_hash)
+                    if v_id == root[3]:
+                        root = await close_root()
+
+            last_id = rows[-1][0]
+
+        # Puntos de control cuyos últimos votos ya no existen
+        while root:
+            root = await close_root()
+
+        return anchor, checked, roots_checked
+
+    async def _next_root(self, conn, after_vote: int) -> tuple | None:
+        async with conn.execute(
+            "SELECT id, root_hash, vote_start_id, vote_end_id FROM vote_merkle_roots "
+            "WHERE vote_start_id > ? ORDER BY vote_start_id LIMIT 1",
+            (after_vote,),
+        ) as cursor:
+            return await cursor.fetchone()
+
+    async def _load_anchor(self, conn, key: str, violations: list[dict]) -> dict | None:
+        """Lee una marca de agua y la descarta si su punto de control cambió."""
+        async with conn.execute("SELECT value FROM cortex_meta WHERE key = ?", (key,)) as cursor:
+            row = await cursor.fetchone()
+        if not row:
+            return None
+
+        anchor = json.loads(row[0])
+        async with conn.execute(
+            "SELECT v.hash FROM vote_merkle_roots m JOIN vote_ledger v ON v.id = m.vote_end_id "
+            "WHERE m.id = ? AND m.vote_end_id = ?",
+            (anchor["root_id"], anchor["vote_id"]),
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row and row[0] == anchor["hash"]:
+            return anchor
+
+        # La cadena cambió bajo un tramo ya verificado: se empieza desde el génesis
+        violations.append({
+            "checkpoint_id": anchor["root_id"],
+            "type": "WATERMARK_MISMATCH",
+            "expected": anchor["hash"],
+            "actual": row[0] if row else None
+        })
+        await self._clear_anchor(conn, key)
+        return None
+
+    async def _save_anchor(self, conn, key: str, anchor: dict) -> None:
+        await conn.execute(
+            "INSERT OR REPLACE INTO cortex_meta (key, value) VALUES (?, ?)",
+            (key, json.dumps(anchor)),
+        )
+        await conn.commit()
+
+    async def _clear_anchor(self, conn, key: str) -> None:
+        await conn.execute("DELETE FROM cortex_meta WHERE key = ?", (key,))
+        await conn.commit()
+
     async def verify_merkle_roots(self) -> list[dict[str, Any]]:
         """Verifica todas las raíces Merkle almacenadas."""
         results = []
-        conn = await self._get_conn()
-        try:
+        async with self._connection() as conn:
             async with conn.execute("SELECT id, vote_start_id, vote_end_id, root_hash FROM vote_merkle_roots ORDER BY id") as cursor:
                 checkpoints = await cursor.fetchall()
 
@@ -251,6 +449,25 @@ class ImmutableVoteLedger:
                     "actual": recomputed
                 })
 
-            return results
-        finally:
-            await self._release_conn(conn)
+        return results
+
+
+def _vote_row(vote: tuple) -> tuple:
+    """``(fact_id, agent_id, vote[, vote_weight[, signature]])`` con valores por defecto."""
+    fact_id, agent_id, value, *rest = vote
+    weight = rest[0] if rest else 1.0
+    signature = rest[1] if len(rest) > 1 else None
+    return fact_id, agent_id, value, weight, signature
+
+
+def _vote_hash_violation(v_id, p_hash, c_hash, f_id, a_id, v_val, weight, ts) -> dict | None:
+    # Hash canónico (v2) primero; los votos anteriores usan el formato con ':' (v1)
+    computed = compute_vote_hash(p_hash, f_id, a_id, v_val, weight, ts)
+    if computed == c_hash or compute_vote_hash_v1(p_hash, f_id, a_id, v_val, weight, ts) == c_hash:
+        return None
+    return {
+        "vote_id": v_id,
+        "type": "DATA_TAMPERING",
+        "expected_hash": c_hash,
+        "actual_hash": computed
+    }
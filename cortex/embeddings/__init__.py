@@ -1,8 +1,10 @@
 """
 CORTEX v4.0 — Local Embedding Engine.
 
-Uses sentence-transformers with ONNX Runtime for zero-network-dependency
-semantic embeddings. Model auto-downloads on first use (~80MB).
+Uses sentence-transformers (PyTorch) or the model's ONNX export on ONNX
+Runtime, fp32 or int8 (see ``cortex.embeddings.backends``), for
+zero-network-dependency semantic embeddings. Model auto-downloads on first
+use (~80MB).
 
 Produces 384-dimensional vectors using all-MiniLM-L6-v2.
 """
@@ -15,6 +17,9 @@ from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
+from cortex.config import EMBEDDING_BACKEND, EMBEDDING_CACHE_SIZE
+from cortex.embeddings.cache import EmbeddingCache
+
 logger = logging.getLogger("cortex.embeddings")
 
 # Default model — compact, fast, good quality
@@ -37,37 +42,62 @@ class LocalEmbedder:
         self,
         model_name: str = DEFAULT_MODEL,
         cache_dir: Path | None = None,
+        disk_cache: EmbeddingCache | None | bool = True,
+        backend: str = EMBEDDING_BACKEND,
     ):
+        """
+        Args:
+            disk_cache: Persistent embedding cache shared across processes.
+                ``True`` uses the default ``EmbeddingCache`` (unless
+                ``CORTEX_EMBEDDING_CACHE_SIZE=0``); ``False``/``None`` disables it.
+            backend: ``torch``, ``onnx`` or ``onnx-int8``
+                (see ``cortex.embeddings.backends``).
+        """
         self._model_name = model_name
+        self._backend = backend
+        # int8 vectors drift slightly from fp32 ones, so they get their own
+        # cache namespace; torch and ONNX fp32 agree to ~1e-6 and share one.
+        self._cache_model = f"{model_name}#int8" if backend == "onnx-int8" else model_name
         self._cache_dir = cache_dir or DEFAULT_CACHE_DIR
         self._model = None
+        if disk_cache is True:
+            disk_cache = EmbeddingCache() if EMBEDDING_CACHE_SIZE > 0 else None
+        elif disk_cache is False:
+            disk_cache = None
+        self._disk_cache: EmbeddingCache | None = disk_cache
 
     def _ensure_model(self):
         """Lazy-load model on first use."""
         if self._model is not None:
             return
 
-        try:
-            from sentence_transformers import SentenceTransformer
+        from cortex.embeddings.backends import load_backend
 
-            logger.info("Loading embedding model: %s", self._model_name)
-            self._model = SentenceTransformer(
-                self._model_name,
-                cache_folder=str(self._cache_dir),
-            )
-            logger.info("Model loaded. Dimension: %d", EMBEDDING_DIM)
-        except ImportError as exc:
-            raise RuntimeError(
-                "sentence-transformers not installed. "
-                "Run: pip install sentence-transformers onnxruntime"
-            ) from exc
+        logger.info("Loading embedding model: %s (%s)", self._model_name, self._backend)
+        self._model = load_backend(self._backend, self._model_name, self._cache_dir)
+        logger.info("Model loaded. Dimension: %d", EMBEDDING_DIM)
+
+    def warmup(self) -> None:
+        """Load the model and run one encode so the first real call is fast.
+
+        Bypasses both caches: the point is to pay model load, graph
+        optimization and allocator warm-up now rather than on the first search.
+        """
+        self._ensure_model()
+        self._model.encode("warmup", normalize_embeddings=True)
 
     @lru_cache(maxsize=_CACHE_SIZE)  # noqa: B019
     def _embed_cached(self, text: str) -> list[float]:
-        """Internal cached embedding for single strings."""
+        """Internal cached embedding for single strings (L1 lru, L2 disk)."""
+        if self._disk_cache is not None:
+            cached = self._disk_cache.get(self._cache_model, text)
+            if cached is not None:
+                return cached
         self._ensure_model()
-        embedding = self._model.encode(text, normalize_embeddings=True)
-        return embedding.tolist()
+        embedding = self._model.encode(text, normalize_embeddings=True).tolist()
+        if self._disk_cache is not None:
+            self._disk_cache.put(self._cache_model, text, embedding)
+        return embedding
 
     def embed(self, text: str | list[str]) -> list[float] | list[list[float]]:
         """Generate embedding for a single text or delegate list to batch."""
@@ -88,6 +118,20 @@ class LocalEmbedder:
             if not t or not str(t).strip():
                 raise ValueError("embedded text cannot be empty")
 
+        if self._disk_cache is None:
+            return self._encode_batch(texts, batch_size)
+
+        results = self._disk_cache.get_many(self._cache_model, texts)
+        missing = [i for i, vec in enumerate(results) if vec is None]
+        if missing:
+            miss_texts = [texts[i] for i in missing]
+            fresh = self._encode_batch(miss_texts, batch_size)
+            self._disk_cache.put_many(self._cache_model, miss_texts, fresh)
+            for i, vec in zip(missing, fresh, strict=True):
+                results[i] = vec
+        return results
+
+    def _encode_batch(self, texts: list[str], batch_size: int) -> list[list[float]]:
         self._ensure_model()
         embeddings = self._model.encode(
             texts,
@@ -141,3 +185,19 @@ class LocalEmbedder:
     def dimension(self) -> int:
         """Embedding dimension (384 for all-MiniLM-L6-v2)."""
         return EMBEDDING_DIM
+
+
+def create_embedder():
+    """Build the embedder selected by ``CORTEX_EMBEDDINGS``.
+
+    ``service`` returns an ``EmbeddingServiceClient`` so every engine in the
+    process (and on the host) shares the sidecar's model; anything else
+    loads a ``LocalEmbedder`` in-process.
+    """
+    from cortex.config import EMBEDDINGS_MODE
+
+    if EMBEDDINGS_MODE == "service":
+        from cortex.embeddings.service import EmbeddingServiceClient
+
+        return EmbeddingServiceClient()
+    return LocalEmbedder()
@@ -0,0 +1,134 @@
+"""Inference backends for ``LocalEmbedder``.
+
+``CORTEX_EMBEDDING_BACKEND`` selects one:
+
+    torch      SentenceTransformer on PyTorch (reference; default)
+    onnx       the model's exported ONNX graph on ONNX Runtime, fp32
+    onnx-int8  the same graph with dynamically quantized int8 weights
+
+Every backend exposes the subset of ``SentenceTransformer.encode`` that
+``LocalEmbedder`` uses, so it can sit in ``LocalEmbedder._model`` unchanged.
+ONNX backends do mean pooling and L2 normalization themselves. They match
+``all-MiniLM-L6-v2``'s pooling head. ``CORTEX_ONNX_THREADS`` sets
+intra-op threads; 0 lets ONNX Runtime pick.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from cortex.config import ONNX_THREADS
+
+logger = logging.getLogger("cortex.embeddings.backends")
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# all-MiniLM-L6-v2 was trained with 256-token windows.
+MAX_SEQ_LENGTH = 256
+_ONNX_FILE = "onnx/model.onnx"
+_INT8_FILE = "model_int8.onnx"
+
+
+class OnnxEncoder:
+    """Sentence encoder over an ONNX Runtime session (fp32 or int8)."""
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: Path,
+        quantized: bool = False,
+        threads: int = ONNX_THREADS,
+    ):
+        try:
+            import onnxruntime as ort
+            from huggingface_hub import hf_hub_download
+            from tokenizers import Tokenizer
+        except ImportError as exc:
+            raise RuntimeError(
+                "ONNX backend needs onnxruntime and tokenizers. "
+                "Run: pip install sentence-transformers onnxruntime"
+            ) from exc
+
+        cache_dir = Path(cache_dir)
+        model_path = Path(hf_hub_download(model_name, _ONNX_FILE, cache_dir=str(cache_dir)))
+        if quantized:
+            model_path = self._quantize(model_path, cache_dir / model_name.replace("/", "--"))
+
+        self._tokenizer = Tokenizer.from_file(
+            hf_hub_download(model_name, "tokenizer.json", cache_dir=str(cache_dir))
+        )
+        self._tokenizer.enable_truncation(MAX_SEQ_LENGTH)
+        self._tokenizer.enable_padding()
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        opts.intra_op_num_threads = threads
+        opts.inter_op_num_threads = 1
+        self._session = ort.InferenceSession(
+            str(model_path), opts, providers=["CPUExecutionProvider"]
+        )
+        self._inputs = {i.name for i in self._session.get_inputs()}
+        logger.info("ONNX session ready: %s (threads=%s)", model_path.name, threads or "auto")
+
+    @staticmethod
+    def _quantize(fp32_path: Path, out_dir: Path) -> Path:
+        """Quantize weights to int8 once and keep the result next to the model."""
+        out = out_dir / _INT8_FILE
+        if not out.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            out_dir.mkdir(parents=True, exist_ok=True)
+            logger.info("Quantizing %s to int8", fp32_path)
+            quantize_dynamic(str(fp32_path), str(out), weight_type=QuantType.QInt8)
+        return out
+
+    def encode(
+        self,
+        sentences,
+        normalize_embeddings: bool = True,
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+    ):
+        import numpy as np
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        out = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self._tokenizer.encode_batch(texts[start : start + batch_size])
+            ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": ids, "attention_mask": mask}
+            if "token_type_ids" in self._inputs:
+                feeds["token_type_ids"] = np.zeros_like(ids)
+            hidden = self._session.run(None, feeds)[0]
+
+            # Mean pooling over real (non-padding) tokens
+            weights = mask[..., None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+            if normalize_embeddings:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            out.append(pooled.astype(np.float32))
+
+        embeddings = np.concatenate(out) if out else np.zeros((0, 0), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
+
+def load_backend(name: str, model_name: str, cache_dir: Path):
+    """Instantiate the backend called ``name`` for ``model_name``."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{name}'. Supported: {list(BACKENDS)}")
+
+    if name == "torch":
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as exc:
+            raise RuntimeError(
+                "sentence-transformers not installed. "
+                "Run: pip install sentence-transformers onnxruntime"
+            ) from exc
+        return SentenceTransformer(model_name, cache_folder=str(cache_dir))
+
+    return OnnxEncoder(model_name, cache_dir, quantized=name == "onnx-int8")
@@ -0,0 +1,210 @@
+"""Persistent content-addressed embedding cache.
+
+``LocalEmbedder``'s ``lru_cache`` dies with the process, so every API
+worker and CLI run starts cold and re-stores, ``update()`` copies and
+compactor rewrites pay for the model again. This cache keys each vector by
+SHA-256 of the model name plus normalized text and keeps it in a small
+SQLite side database (``~/.cortex/embedding_cache.db`` by default) that
+all processes share through WAL.
+
+Eviction is LRU by ``last_used``, bounded by ``CORTEX_EMBEDDING_CACHE_SIZE``
+entries. Each process keeps a running (upper-bound) row count and only
+recounts and evicts when it crosses the bound, down to ``_EVICT_TO`` of it.
+Reads do not write: ``last_used`` touches are buffered and written with the
+next ``put_many`` (or once ``_TOUCH_FLUSH`` are pending). Hits and misses are
+reported through ``cortex.metrics``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections.abc import Sequence
+from pathlib import Path
+
+from cortex.compression import pack_float32, unpack_float32
+from cortex.config import EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_SIZE
+from cortex.metrics import metrics
+
+logger = logging.getLogger("cortex.embeddings.cache")
+
+HIT_RATIO_GAUGE = "cortex_embedding_cache_hit_ratio"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    key         TEXT PRIMARY KEY,  -- sha256(model NUL normalized text)
+    model       TEXT NOT NULL,
+    vector      BLOB NOT NULL,     -- little-endian float32
+    last_used   REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_lru ON embedding_cache(last_used);
+"""
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER is 999 on older builds.
+_IN_CHUNK = 500
+# Buffered LRU touches written on their own once this many are pending.
+_TOUCH_FLUSH = 1024
+# Eviction trims to this fraction of max_entries, so it does not rerun per put.
+_EVICT_TO = 0.9
+_TOUCH = "UPDATE embedding_cache SET last_used = ? WHERE key = ?"
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC, trimmed, with whitespace runs collapsed to one space."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(model: str, text: str) -> str:
+    """Content address for ``text`` embedded by ``model``."""
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed LRU cache of embedding vectors shared across processes."""
+
+    def __init__(
+        self,
+        path: str | Path = EMBEDDING_CACHE_PATH,
+        max_entries: int = EMBEDDING_CACHE_SIZE,
+    ):
+        self.path = Path(path).expanduser()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._count = 0  # rows in the table, over-estimated between recounts
+        self._touched: dict[str, float] = {}  # key -> last_used not yet written
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            conn.commit()
+            (self._count,) = conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()
+            self._conn = conn
+        return self._conn
+
+    def _write_touches(self, conn: sqlite3.Connection) -> None:
+        if self._touched:
+            conn.executemany(_TOUCH, [(ts, k) for k, ts in self._touched.items()])
+            self._touched.clear()
+
+    # ─── Lookup ─────────────────────────────────────────────────
+
+    def get_many(self, model: str, texts: Sequence[str]) -> list[list[float] | None]:
+        """Return cached vectors aligned with ``texts`` (``None`` for misses)."""
+        if not texts:
+            return []
+        keys = [cache_key(model, t) for t in texts]
+        found: dict[str, bytes] = {}
+        try:
+            with self._lock:
+                conn = self._get_conn()
+                unique = list(dict.fromkeys(keys))
+                for start in range(0, len(unique), _IN_CHUNK):
+                    chunk = unique[start : start + _IN_CHUNK]
+                    placeholders = ", ".join("?" for _ in chunk)
+                    found.update(
+                        conn.execute(
+                            f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})",
+                            chunk,
+                        ).fetchall()
+                    )
+                if found:
+                    now = time.time()
+                    self._touched.update(dict.fromkeys(found, now))
+                    if len(self._touched) >= _TOUCH_FLUSH:
+                        self._write_touches(conn)
+                        conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("Embedding cache lookup failed: %s", e)
+
+        out = [unpack_float32(found[k]) if k in found else None for k in keys]
+        hits = sum(1 for v in out if v is not None)
+        self._record(hits, len(out) - hits)
+        return out
+
+    def get(self, model: str, text: str) -> list[float] | None:
+        return self.get_many(model, [text])[0]
+
+    # ─── Store ──────────────────────────────────────────────────
+
+    def put_many(
+        self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]
+    ) -> None:
+        """Cache freshly computed vectors and evict the least recently used."""
+        if not texts or self.max_entries <= 0:
+            return
+        now = time.time()
+        rows = [
+            (cache_key(model, t), model, pack_float32(v), now)
+            for t, v in zip(texts, vectors, strict=True)
+        ]
+        try:
+            with self._lock:
+                conn = self._get_conn()
+                self._write_touches(conn)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (key, model, vector, last_used) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                # Replaced keys count too, so this only errs towards recounting.
+                self._count += len(rows)
+                if self._count > self.max_entries:
+                    (self._count,) = conn.execute(
+                        "SELECT COUNT(*) FROM embedding_cache"
+                    ).fetchone()
+                    if self._count > self.max_entries:
+                        excess = self._count - int(self.max_entries * _EVICT_TO)
+                        conn.execute(
+                            "DELETE FROM embedding_cache WHERE key IN ("
+                            "SELECT key FROM embedding_cache ORDER BY last_used LIMIT ?)",
+                            (excess,),
+                        )
+                        self._count -= excess
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("Embedding cache write failed: %s", e)
+
+    def put(self, model: str, text: str, vector: Sequence[float]) -> None:
+        self.put_many(model, [text], [vector])
+
+    # ─── Stats ──────────────────────────────────────────────────
+
+    def _record(self, hits: int, misses: int) -> None:
+        self.hits += hits
+        self.misses += misses
+        if hits:
+            metrics.inc("cortex_embedding_cache_hits_total", value=hits)
+        if misses:
+            metrics.inc("cortex_embedding_cache_misses_total", value=misses)
+        metrics.set_gauge(HIT_RATIO_GAUGE, self.hit_ratio)
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._get_conn().execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._write_touches(self._conn)
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning("Embedding cache touch flush failed: %s", e)
+                self._conn.close()
+                self._conn = None
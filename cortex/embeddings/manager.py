@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import logging
 
-from cortex.embeddings import LocalEmbedder
+from cortex.embeddings import LocalEmbedder, create_embedder
 
 logger = logging.getLogger("cortex.embeddings.manager")
 
@@ -18,9 +18,17 @@ class EmbeddingManager:
 
     def _get_embedder(self) -> LocalEmbedder:
         if self._embedder is None:
-            self._embedder = LocalEmbedder()
+            # Share the engine's model so its sync and async paths load it once.
+            get_engine_embedder = getattr(self.engine, "_get_embedder", None)
+            self._embedder = get_engine_embedder() if get_engine_embedder else create_embedder()
         return self._embedder
 
+    def warmup(self) -> None:
+        """Load the model ahead of the first store/search."""
+        warmup = getattr(self._get_embedder(), "warmup", None)
+        if warmup is not None:
+            warmup()
+
     def embed(self, text: str | list[str]) -> list[float] | list[list[float]]:
         """Generate embedding for a single text or batch."""
         return self._get_embedder().embed(text)
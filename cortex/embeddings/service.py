@@ -0,0 +1,323 @@
+"""Embedding service — one shared model per host behind a Unix socket.
+
+Every ``CortexEngine``, ``AsyncCortexEngine`` and ``EmbeddingManager`` used
+to load its own SentenceTransformer, so N uvicorn workers paid N × ~80 MB
+and ran inference on their request loops. In service mode
+(``CORTEX_EMBEDDINGS=service``) they use ``EmbeddingServiceClient``
+instead, which talks to a single ``EmbeddingService`` sidecar
+(``cortex embed-serve``).
+
+The service micro-batches concurrent callers. It collects requests for up
+to ``CORTEX_EMBEDDING_BATCH_WINDOW_MS`` (2 ms by default) or until
+``CORTEX_EMBEDDING_MAX_BATCH`` texts are queued, removes duplicate texts
+across callers, and runs the model once per batch.
+
+Wire format, both directions: 4-byte big-endian length + payload.
+    request:  JSON ``{"texts": [...]}``
+    response: ``b"\\x00"`` + little-endian float32 vectors, or
+              ``b"\\x01"`` + UTF-8 error message
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from cortex.compression import pack_float32, unpack_float32
+from cortex.config import EMBEDDING_BATCH_WINDOW_MS, EMBEDDING_MAX_BATCH, EMBEDDING_SOCKET
+from cortex.metrics import metrics
+
+logger = logging.getLogger("cortex.embeddings.service")
+
+_HEADER = struct.Struct(">I")
+_OK = b"\x00"
+_ERR = b"\x01"
+EMBEDDING_DIM = 384
+
+
+@dataclass
+class _Request:
+    texts: list[str]
+    future: asyncio.Future = field(repr=False)
+
+
+class EmbeddingService:
+    """Unix-socket sidecar that owns the only embedding model on the host."""
+
+    def __init__(
+        self,
+        socket_path: str | Path = EMBEDDING_SOCKET,
+        embedder=None,
+        window_ms: float = EMBEDDING_BATCH_WINDOW_MS,
+        max_batch: int = EMBEDDING_MAX_BATCH,
+    ):
+        if embedder is None:
+            from cortex.embeddings import LocalEmbedder
+
+            embedder = LocalEmbedder()
+        self.socket_path = Path(socket_path).expanduser()
+        self.embedder = embedder
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue[_Request] | None = None
+        self._arrived: asyncio.Event | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._batcher: asyncio.Task | None = None
+        self._handlers: set[asyncio.Task] = set()
+        # One dedicated inference thread: batches run serially anyway, and
+        # the default executor may be saturated by blocking callers.
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="cortex-embed")
+
+    # ─── Lifecycle ──────────────────────────────────────────────
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._arrived = asyncio.Event()
+        warmup = getattr(self.embedder, "warmup", None)
+        if warmup is not None:
+            await asyncio.get_running_loop().run_in_executor(self._executor, warmup)
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            self.socket_path.unlink()  # Stale socket from a previous run
+        self._server = await asyncio.start_unix_server(self._handle, path=str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+        self._batcher = asyncio.create_task(self._batch_loop())
+        logger.info(
+            "Embedding service listening on %s (window=%.1fms, max_batch=%d)",
+            self.socket_path,
+            self.window * 1000,
+            self.max_batch,
+        )
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Idle clients would otherwise keep their handlers (and, on
+            # Python 3.12+, wait_closed()) blocked in readexactly forever.
+            handlers = list(self._handlers)
+            for task in handlers:
+                task.cancel()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        if self._batcher is not None:
+            self._batcher.cancel()
+            self._batcher = None
+        self._executor.shutdown(wait=False)
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+    # ─── Batching ───────────────────────────────────────────────
+
+    async def submit(self, texts: list[str]) -> list[list[float]]:
+        """Queue ``texts`` for the next micro-batch and wait for the vectors."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Request(texts, future))
+        self._arrived.set()
+        return await future
+
+    async def _collect(self) -> list[_Request]:
+        """Take one request, then keep taking until the window or batch fills."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = loop.time() + self.window
+        while size < self.max_batch:
+            try:
+                req = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                # Wait on an event rather than queue.get(): cancelling a
+                # timed-out get() can drop a request that just arrived.
+                self._arrived.clear()
+                try:
+                    await asyncio.wait_for(self._arrived.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            batch.append(req)
+            size += len(req.texts)
+        return batch
+
+    async def _embed(self, batch: list[_Request]) -> int:
+        """Run the model once for ``batch`` and resolve its futures.
+
+        Returns the number of distinct texts embedded; raises on model errors.
+        """
+        # Coalesce identical texts across callers
+        unique = list(dict.fromkeys(t for req in batch for t in req.texts))
+        vectors = await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.embedder.embed_batch, unique
+        )
+        by_text = dict(zip(unique, vectors, strict=True))
+        for req in batch:
+            if not req.future.done():
+                req.future.set_result([by_text[t] for t in req.texts])
+        return len(unique)
+
+    async def _batch_loop(self) -> None:
+        while True:
+            batch = await self._collect()
+            start = time.perf_counter()
+            try:
+                texts = await self._embed(batch)
+            except Exception as e:
+                logger.warning("Embedding batch of %d requests failed: %s", len(batch), e)
+                # Retry one request at a time so a single bad request only
+                # fails its own caller, not everyone batched with it.
+                for req in batch:
+                    error = e
+                    if len(batch) > 1:
+                        try:
+                            await self._embed([req])
+                            continue
+                        except Exception as req_error:
+                            error = req_error
+                    if not req.future.done():
+                        req.future.set_exception(error)
+                continue
+
+            metrics.observe("cortex_embedding_service_batch_texts", texts)
+            metrics.observe("cortex_embedding_service_batch_requests", len(batch))
+            metrics.observe(
+                "cortex_embedding_service_batch_seconds", time.perf_counter() - start
+            )
+
+    # ─── Connection handling ────────────────────────────────────
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                payload = await reader.readexactly(_HEADER.unpack(header)[0])
+                try:
+                    texts = json.loads(payload)["texts"]
+                    vectors = await self.submit(texts) if texts else []
+                    body = _OK + b"".join(pack_float32(v) for v in vectors)
+                except Exception as e:
+                    body = _ERR + str(e).encode()
+                writer.write(_HEADER.pack(len(body)) + body)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            # CancelledError propagates: swallowing it would keep close() and
+            # loop shutdown waiting on this handler.
+            self._handlers.discard(task)
+            writer.close()
+
+
+class EmbeddingServiceClient:
+    """Drop-in ``LocalEmbedder`` replacement backed by ``EmbeddingService``.
+
+    Keeps one socket per thread, so calls stay blocking like
+    ``LocalEmbedder`` without sharing a stream between threads.
+    """
+
+    def __init__(self, socket_path: str | Path = EMBEDDING_SOCKET, timeout: float = 30.0):
+        self.socket_path = str(Path(socket_path).expanduser())
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _drop(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _recv_exactly(self, sock: socket.socket, n: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = sock.recv(n - len(buf))
+            if not chunk:
+                raise ConnectionError("embedding service closed the connection")
+            buf.extend(chunk)
+        return bytes(buf)
+
+    def _roundtrip(self, payload: bytes) -> bytes:
+        for attempt in (1, 2):
+            try:
+                sock = self._connect()
+                sock.sendall(_HEADER.pack(len(payload)) + payload)
+                (length,) = _HEADER.unpack(self._recv_exactly(sock, _HEADER.size))
+                return self._recv_exactly(sock, length)
+            except (ConnectionError, OSError):
+                self._drop()
+                if attempt == 2:
+                    raise
+        raise AssertionError("unreachable")
+
+    def embed_batch(self, texts: list[str], batch_size: int = 32) -> list[list[float]]:
+        """Embed ``texts`` via the service (``batch_size`` is decided server-side)."""
+        if not texts:
+            return []
+        for t in texts:
+            if not t or not str(t).strip():
+                raise ValueError("embedded text cannot be empty")
+
+        body = self._roundtrip(json.dumps({"texts": [str(t) for t in texts]}).encode())
+        if body[:1] == _ERR:
+            raise RuntimeError(f"embedding service error: {body[1:].decode()}")
+        flat = unpack_float32(body[1:])
+        dim = len(flat) // len(texts)
+        return [flat[i * dim : (i + 1) * dim] for i in range(len(texts))]
+
+    def embed(self, text: str | list[str]) -> list[float] | list[list[float]]:
+        if isinstance(text, list):
+            return self.embed_batch(text)
+        if not text or not str(text).strip():
+            raise ValueError("text cannot be empty")
+        return self.embed_batch([text])[0]
+
+    @property
+    def dimension(self) -> int:
+        return EMBEDDING_DIM
+
+    def warmup(self) -> None:
+        """Open this thread's connection and make sure the service answers."""
+        self.embed("warmup")
+
+    def close(self) -> None:
+        self._drop()
+
+
+def main() -> None:
+    """Run the embedding sidecar in the foreground (``cortex embed-serve``)."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    asyncio.run(EmbeddingService().serve_forever())
+
+
+if __name__ == "__main__":
+    main()
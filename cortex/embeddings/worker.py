@@ -0,0 +1,233 @@
+"""Deferred embedding — durable outbox and background worker.
+
+With ``CORTEX_DEFERRED_EMBEDDINGS=1`` the store path no longer calls the
+embedder. It commits the fact and queues its id in ``embedding_outbox``
+(mirroring ``graph_outbox``). An ``EmbeddingWorker`` thread drains the
+queue in batches on its own sqlite3 connection, so the model call never
+blocks the event loop. Until a row is embedded, search falls back to FTS
+for it (see ``cortex.search.hybrid.merge_unembedded``). Each drained batch
+is added to the ANN index straight away when the worker is given one.
+
+The API lifespan starts one worker for both engines; elsewhere (CLI, MCP)
+``CortexEngine`` starts its own on the first deferred store and drains the
+queue when it is closed.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+
+from cortex.config import (
+    EMBEDDING_WORKER_BATCH,
+    EMBEDDING_WORKER_INTERVAL,
+    EMBEDDING_WORKER_MAX_RETRIES,
+    VECTOR_FORMAT,
+)
+from cortex.metrics import metrics
+from cortex.search.vector import encode_vector, insert_embedding_sql
+from cortex.temporal import now_iso
+
+logger = logging.getLogger("cortex.embeddings.worker")
+
+QUEUE_DEPTH_GAUGE = "cortex_embedding_outbox_depth"
+
+_ENQUEUE = "INSERT INTO embedding_outbox (fact_id, status) VALUES (?, 'pending')"
+_DEPTH = "SELECT COUNT(*) FROM embedding_outbox WHERE status = 'pending'"
+_CLAIM = """
+    SELECT o.id, o.fact_id, f.content, f.project
+    FROM embedding_outbox o LEFT JOIN facts f ON f.id = o.fact_id
+    WHERE o.status = 'pending'
+    ORDER BY o.id
+    LIMIT ?
+"""
+
+
+async def enqueue_embeddings_async(conn, fact_ids: Sequence[int]) -> None:
+    """Queue facts for the embedding worker (same transaction as the store)."""
+    await conn.executemany(_ENQUEUE, [(fid,) for fid in fact_ids])
+
+
+def enqueue_embeddings_sync(conn: sqlite3.Connection, fact_ids: Sequence[int]) -> None:
+    """Queue facts for the embedding worker (sync)."""
+    conn.executemany(_ENQUEUE, [(fid,) for fid in fact_ids])
+
+
+def queue_depth(conn: sqlite3.Connection) -> int:
+    """Number of facts still waiting for an embedding."""
+    return conn.execute(_DEPTH).fetchone()[0]
+
+
+class EmbeddingWorker:
+    """Drains ``embedding_outbox`` into ``fact_embeddings`` in batches.
+
+    Runs on a daemon thread with its own connection. ONNX/torch release the
+    GIL during inference, so a thread is enough to keep the model call off
+    the event loop without the start-up cost of a process pool.
+
+    Usage:
+        worker = EmbeddingWorker(db_path, embedder, ann=engine._get_ann())
+        worker.start()
+        ...
+        worker.stop()
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        embedder,
+        batch_size: int = EMBEDDING_WORKER_BATCH,
+        interval: float = EMBEDDING_WORKER_INTERVAL,
+        vector_format: str = VECTOR_FORMAT,
+        partitioned: bool = True,
+        ann=None,
+    ):
+        self._db_path = str(db_path)
+        self._embedder = embedder
+        self._ann = ann  # AnnIndexManager, or None when ANN is disabled
+        self.batch_size = batch_size
+        self.interval = interval
+        self.vector_format = vector_format
+        self.partitioned = partitioned
+        self._conn: sqlite3.Connection | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    # ─── Connection ─────────────────────────────────────────────
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            import sqlite_vec
+
+            conn = sqlite3.connect(self._db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.enable_load_extension(True)
+            sqlite_vec.load(conn)
+            conn.enable_load_extension(False)
+            self._conn = conn
+        return self._conn
+
+    # ─── Draining ───────────────────────────────────────────────
+
+    def drain_once(self, limit: int | None = None) -> int:
+        """Embed one batch of pending facts. Returns how many were embedded."""
+        with self._lock:
+            conn = self._get_conn()
+            rows = conn.execute(_CLAIM, (limit or self.batch_size,)).fetchall()
+            if not rows:
+                metrics.set_gauge(QUEUE_DEPTH_GAUGE, 0)
+                return 0
+
+            ts = now_iso()
+            # Facts deleted since they were queued have nothing to embed.
+            orphans = [(ts, oid) for oid, _, content, _ in rows if content is None]
+            rows = [r for r in rows if r[2] is not None]
+
+            embedded = 0
+            try:
+                if rows:
+                    vectors = self._embedder.embed_batch([r[2] for r in rows])
+                    fact_ids = [(r[1],) for r in rows]
+                    # Idempotent if a previous run embedded but failed to mark.
+                    conn.executemany("DELETE FROM fact_embeddings WHERE fact_id = ?", fact_ids)
+                    conn.executemany(
+                        insert_embedding_sql(self.vector_format, self.partitioned),
+                        [
+                            (r[1], encode_vector(vec, self.vector_format))
+                            for r, vec in zip(rows, vectors, strict=True)
+                        ],
+                    )
+                    embedded = len(rows)
+                conn.executemany(
+                    "UPDATE embedding_outbox SET status = 'processed', processed_at = ? WHERE id = ?",
+                    orphans + [(ts, r[0]) for r in rows],
+                )
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.warning("Embedding worker batch of %d failed: %s", len(rows), e)
+                conn.executemany(
+                    "UPDATE embedding_outbox SET retry_count = retry_count + 1, "
+                    "status = CASE WHEN retry_count + 1 >= ? THEN 'failed' ELSE 'pending' END "
+                    "WHERE id = ?",
+                    [(EMBEDDING_WORKER_MAX_RETRIES, r[0]) for r in rows],
+                )
+                conn.commit()
+                metrics.inc("cortex_embedding_worker_failures_total")
+
+            if embedded:
+                metrics.inc("cortex_embeddings_deferred_total", value=embedded)
+                self._index_embedded(rows)
+            metrics.set_gauge(QUEUE_DEPTH_GAUGE, queue_depth(conn))
+            return embedded
+
+    def _index_embedded(self, rows: list[tuple]) -> None:
+        """Add a committed batch to the ANN index instead of waiting for reconcile."""
+        if self._ann is None:
+            return
+        by_project: dict[str, list[int]] = {}
+        for _, fid, _, project in rows:
+            by_project.setdefault(project, []).append(fid)
+        for project, fact_ids in by_project.items():
+            try:
+                self._ann.add_committed(project, fact_ids)
+            except Exception as e:
+                # The periodic reconcile still picks these facts up.
+                logger.warning("ANN update for %d embedded facts failed: %s", len(fact_ids), e)
+
+    def drain(self) -> int:
+        """Drain the queue completely (tests, CLI, shutdown)."""
+        total = 0
+        while True:
+            n = self.drain_once()
+            total += n
+            if n < self.batch_size:
+                return total
+
+    def notify(self) -> None:
+        """Wake the worker early, e.g. right after a store."""
+        self._wake.set()
+
+    # ─── Lifecycle ──────────────────────────────────────────────
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                n = self.drain_once()
+            except Exception as e:
+                logger.error("Embedding worker error: %s", e)
+                n = 0
+            if n < self.batch_size:
+                self._wake.wait(self.interval)
+                self._wake.clear()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="cortex-embedding-worker", daemon=True
+        )
+        self._thread.start()
+        logger.info("Embedding worker started (batch=%d)", self.batch_size)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
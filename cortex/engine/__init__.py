@@ -17,9 +17,10 @@ if TYPE_CHECKING:
 import aiosqlite
 import sqlite_vec
 
-from cortex.config import DEFAULT_DB_PATH
-from cortex.embeddings import LocalEmbedder
+from cortex.config import ANN_INDEX, DEFAULT_DB_PATH, DEFERRED_EMBEDDINGS, VECTOR_FORMAT
+from cortex.embeddings import LocalEmbedder, create_embedder
 from cortex.engine.consensus_mixin import ConsensusMixin
+from cortex.engine.ledger_writer import LedgerWriter
 from cortex.engine.models import Fact, row_to_fact
 from cortex.engine.query_mixin import QueryMixin
 from cortex.engine.store_mixin import StoreMixin
@@ -27,6 +28,7 @@ from cortex.engine.sync_compat import SyncCompatMixin
 from cortex.metrics import metrics
 from cortex.migrations.core import run_migrations, run_migrations_async
 from cortex.schema import get_init_meta
+from cortex.search.cache import create_search_cache
 from cortex.temporal import now_iso
 
 logger = logging.getLogger("cortex")
@@ -44,15 +46,25 @@ class CortexEngine(SyncCompatMixin):
         self,
         db_path: str | Path = DEFAULT_DB_PATH,
         auto_embed: bool = True,
+        deferred_embed: bool = DEFERRED_EMBEDDINGS,
+        ann_index: bool = ANN_INDEX,
     ):
         self._db_path = Path(db_path).expanduser()
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
         self._auto_embed = auto_embed
+        self._deferred_embed = deferred_embed
+        self._embedding_worker = None
+        self._ann_enabled = ann_index
+        self._ann = None  # AnnIndexManager, created lazily by _get_ann()
         self._conn: aiosqlite.Connection | None = None
         self._vec_available = False
+        self._vector_format = VECTOR_FORMAT
+        self._vector_partitioned = True  # project-partitioned fact_embeddings
         self._conn_lock = asyncio.Lock()
         self._ledger = None  # Wave 5: ImmutableLedger (lazy init)
+        self._ledger_writer = LedgerWriter()  # rebound to the ledger by init_db()
         self._embedder: LocalEmbedder | None = None
+        self._search_cache = create_search_cache()
 
         # Composition layers
         self.facts = FactManager(self)
@@ -68,9 +80,16 @@ class CortexEngine(SyncCompatMixin):
     def _get_embedder(self) -> LocalEmbedder:
         """Protocol requirement for SearchMixin (Sync/Async)."""
         if self._embedder is None:
-            self._embedder = LocalEmbedder()
+            self._embedder = create_embedder()
         return self._embedder
 
+    async def warmup_embedder(self) -> None:
+        """Load the embedding model off the event loop before traffic arrives."""
+        try:
+            await asyncio.to_thread(self.embeddings.warmup)
+        except Exception as e:  # Search still works; it just pays the load later
+            logger.warning("Embedding warm-up failed: %s", e)
+
     def _get_sync_conn(self) -> sqlite3.Connection:
         """Protocol requirement for SyncCompatMixin (Sync)."""
         # This engine legacy wrapper actually uses asyncio for everything,
@@ -129,12 +148,18 @@ class CortexEngine(SyncCompatMixin):
     async def store(self, *args, **kwargs):
         return await self.facts.store(*args, **kwargs)
 
+    async def store_many(self, *args, **kwargs):
+        return await self.facts.store_many(*args, **kwargs)
+
     async def search(self, *args, **kwargs):
         return await self.facts.search(*args, **kwargs)
 
     async def recall(self, *args, **kwargs):
         return await self.facts.recall(*args, **kwargs)
 
+    async def recall_entity(self, *args, **kwargs):
+        return await self.facts.recall_entity(*args, **kwargs)
+
     async def update(self, *args, **kwargs):
         return await self.facts.update(*args, **kwargs)
 
@@ -160,7 +185,6 @@ class CortexEngine(SyncCompatMixin):
 
     async def init_db(self) -> None:
         """Initialize database schema. Safe to call multiple times."""
-        from cortex.engine.ledger import ImmutableLedger
         from cortex.schema import ALL_SCHEMA
 
         conn = await self.get_conn()
@@ -174,6 +198,12 @@ class CortexEngine(SyncCompatMixin):
 
         await run_migrations_async(conn)
 
+        if self._vec_available:
+            from cortex.search.vector import detect_vector_format, detect_vector_partitioned
+
+            self._vector_format = await detect_vector_format(conn)
+            self._vector_partitioned = await detect_vector_partitioned(conn)
+
         for k, v in get_init_meta():
             await conn.execute(
                 "INSERT OR IGNORE INTO cortex_meta (key, value) VALUES (?, ?)",
@@ -181,49 +211,48 @@ class CortexEngine(SyncCompatMixin):
             )
         await conn.commit()
 
-        self._ledger = ImmutableLedger(conn)
+        self._ledger = self._create_ledger()
+        self._ledger_writer = LedgerWriter(self._ledger)
         metrics.set_engine(self)
         logger.info("CORTEX database initialized (async) at %s", self._db_path)
 
     # ─── Transaction Ledger ───────────────────────────────────────
 
+    def _create_ledger(self):
+        """Ledger on its own pooled connection, so a background checkpoint
+        never commits a transaction that is still open on ``self._conn``.
+        In-memory databases are not visible to a second connection."""
+        from cortex.connection_pool import CortexConnectionPool
+        from cortex.engine.ledger import ImmutableLedger
+
+        if str(self._db_path) == ":memory:":
+            return None
+        pool = CortexConnectionPool(str(self._db_path), min_connections=1, max_connections=1)
+        return ImmutableLedger(pool)
+
     async def _log_transaction(self, conn, project, action, detail) -> int:
-        from cortex.canonical import canonical_json, compute_tx_hash
-
-        dj = canonical_json(detail)
-        ts = now_iso()
-        cursor = await conn.execute("SELECT hash FROM transactions ORDER BY id DESC LIMIT 1")
-        prev = await cursor.fetchone()
-        ph = prev[0] if prev else "GENESIS"
-        th = compute_tx_hash(ph, project, action, dj, ts)
-
-        c = await conn.execute(
-            "INSERT INTO transactions "
-            "(project, action, detail, prev_hash, hash, timestamp) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            (project, action, dj, ph, th, ts),
-        )
-        tx_id = c.lastrowid
+        return await self._ledger_writer.append(conn, project, action, detail)
 
-        if self._ledger:
-            try:
-                self._ledger.record_write()
-                await self._ledger.create_checkpoint_async()
-            except Exception as e:
-                logger.warning("Auto-checkpoint failed: %s", e)
-                metrics.inc(
-                    "cortex_ledger_checkpoint_failures_total",
-                    meta={"error": str(e)},
-                )
+    async def _log_transactions(self, conn, entries) -> list[int]:
+        """Append ``(project, action, detail)`` entries in one executemany."""
+        return await self._ledger_writer.append_many(conn, entries)
 
-        return tx_id
+    async def _auto_checkpoint(self) -> None:
+        self._ledger_writer.schedule_checkpoint()
 
-    async def verify_ledger(self) -> dict:
+    async def verify_ledger(self, mode: str = "incremental") -> dict:
         if not self._ledger:
-            from cortex.engine.ledger import ImmutableLedger
+            self._ledger = self._create_ledger()
+        if not self._ledger:
+            raise RuntimeError("Ledger verification needs a file-backed database")
+        return await self._ledger.verify_integrity_async(mode)
 
-            self._ledger = ImmutableLedger(await self.get_conn())
-        return await self._ledger.verify_integrity_async()
+    async def ledger_proof(self, tx_id: int) -> dict | None:
+        if not self._ledger:
+            self._ledger = self._create_ledger()
+        if not self._ledger:
+            raise RuntimeError("Ledger proofs need a file-backed database")
+        return await self._ledger.inclusion_proof_async(tx_id)
 
     async def process_graph_outbox_async(self, limit: int = 10) -> int:
         from cortex.graph.backends.neo4j import Neo4jBackend
@@ -268,6 +297,68 @@ class CortexEngine(SyncCompatMixin):
         await conn.commit()
         return processed_count
 
+    # ─── Deferred Embeddings ──────────────────────────────────────
+
+    def _get_embedding_worker(self):
+        from cortex.embeddings.worker import EmbeddingWorker
+
+        if self._embedding_worker is None:
+            self._embedding_worker = EmbeddingWorker(
+                self._db_path,
+                self.embeddings._get_embedder(),
+                vector_format=self._vector_format,
+                partitioned=self._vector_partitioned,
+                ann=self._get_ann(),
+            )
+        return self._embedding_worker
+
+    def start_embedding_worker(self):
+        """Start the background thread that drains ``embedding_outbox``."""
+        worker = self._get_embedding_worker()
+        worker.start()
+        return worker
+
+    async def process_embedding_outbox_async(self, limit: int | None = None) -> int:
+        """Embed one batch of queued facts off the event loop."""
+        return await asyncio.to_thread(self._get_embedding_worker().drain_once, limit)
+
+    def _notify_embedding_worker(self) -> None:
+        if self._embedding_worker is None:
+            # Nobody else drains the outbox outside the API (CLI, MCP, scripts).
+            if self._deferred_embed:
+                self.start_embedding_worker()
+            return
+        self._embedding_worker.notify()
+
+    async def _stop_embedding_worker(self) -> None:
+        """Drain what is still queued, then stop the worker.
+
+        Short-lived processes (a CLI ``store``) exit right after the write;
+        without the drain their facts would stay unembedded until the next
+        process that happens to run a worker.
+        """
+        worker, self._embedding_worker = self._embedding_worker, None
+        if worker is None:
+            return
+        if self._deferred_embed:
+            try:
+                await asyncio.to_thread(worker.drain)
+            except Exception as e:
+                logger.warning("Embedding outbox drain on close failed: %s", e)
+        worker.stop()
+
+    # ─── ANN index ────────────────────────────────────────────────
+
+    def _get_ann(self):
+        """Per-project ANN index manager, or ``None`` when disabled."""
+        if not self._ann_enabled or not self._vec_available:
+            return None
+        if self._ann is None:
+            from cortex.search.ann import AnnIndexManager
+
+            self._ann = AnnIndexManager(self._db_path, vector_format=self._vector_format)
+        return self._ann
+
     # ─── Helpers ──────────────────────────────────────────────────
 
     def export_snapshot(self, out_path: str | Path) -> str:
@@ -282,6 +373,13 @@ class CortexEngine(SyncCompatMixin):
     # ─── Lifecycle ────────────────────────────────────────────────
 
     async def close(self):
+        await self._stop_embedding_worker()
+        if self._ann is not None:
+            self._ann.close()
+            self._ann = None
+        await self._ledger_writer.drain()
+        if self._ledger:
+            await self._ledger.pool.close()
         if self._conn:
             await self._conn.close()
             self._conn = None
@@ -0,0 +1,279 @@
+"""Bulk ingest — batched fact, embedding and ledger writes.
+
+``store_many`` and the importers (``cortex.migrate``, ``cortex.sync.read``)
+write facts a chunk at a time instead of one by one:
+
+  1. All facts are validated up front, so a bad row aborts before any write.
+  2. Each chunk's contents are embedded with a single ``embed_batch`` call.
+  3. Facts, embeddings and ledger entries go in with ``executemany``.
+  4. Each chunk commits on its own, keeping the WAL bounded by
+     ``INGEST_CHUNK_SIZE`` rows instead of by the size of the import.
+
+Fact and transaction ids for the rest of a chunk are reserved in one
+statement by bumping ``sqlite_sequence`` after the first row is inserted.
+Both tables use AUTOINCREMENT, so any write interleaved on the same shared
+connection (e.g. a metrics fact) is numbered after the reserved block.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any
+
+from cortex.canonical import canonical_json, compute_tx_hash
+from cortex.search.vector import encode_vector, insert_embedding_sql
+from cortex.temporal import now_iso
+
+logger = logging.getLogger("cortex.engine.bulk")
+
+FACT_FIELDS = frozenset(
+    {"project", "content", "fact_type", "tags", "confidence", "source", "meta", "valid_from"}
+)
+# store() keywords that only steer the single-fact call. They are accepted so
+# store() kwargs can be batched as-is: the batch decides when to commit and,
+# like store(), links each fact to its own "store" transaction.
+STORE_CALL_FIELDS = frozenset({"commit", "tx_id", "conn"})
+
+_FACT_COLUMNS = (
+    "project, content, fact_type, tags, confidence, "
+    "valid_from, source, meta, created_at, updated_at"
+)
+_INSERT_FACT = f"INSERT INTO facts ({_FACT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_INSERT_FACT_WITH_ID = (
+    f"INSERT INTO facts (id, {_FACT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_TX_COLUMNS = "project, action, detail, prev_hash, hash, timestamp"
+_INSERT_TX = f"INSERT INTO transactions ({_TX_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)"
+_INSERT_TX_WITH_ID = f"INSERT INTO transactions (id, {_TX_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+_RESERVE_IDS = "UPDATE sqlite_sequence SET seq = seq + ? WHERE name = ? RETURNING seq"
+_LAST_HASH = "SELECT hash FROM transactions ORDER BY id DESC LIMIT 1"
+_SET_TX_ID = "UPDATE facts SET tx_id = ? WHERE id = ?"
+
+
+def prepare_facts(facts: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Validate and normalize a batch of fact dicts before anything is written.
+
+    Raises:
+        ValueError: If the batch is empty, a fact lacks project/content,
+            or a fact carries fields ``store()`` does not accept.
+    """
+    if not facts:
+        raise ValueError("facts list cannot be empty")
+
+    prepared = []
+    for i, fact in enumerate(facts):
+        unknown = set(fact) - FACT_FIELDS - STORE_CALL_FIELDS
+        if unknown:
+            raise ValueError(f"fact {i} has unknown fields: {', '.join(sorted(unknown))}")
+        project = fact.get("project")
+        content = fact.get("content")
+        if not project or not str(project).strip():
+            raise ValueError(f"project cannot be empty (fact {i})")
+        if not content or not str(content).strip():
+            raise ValueError(f"content cannot be empty (fact {i})")
+
+        ts = fact.get("valid_from") or now_iso()
+        prepared.append(
+            {
+                "project": project,
+                "content": content,
+                "fact_type": fact.get("fact_type") or "knowledge",
+                "tags": fact.get("tags") or [],
+                "confidence": fact.get("confidence") or "stated",
+                "source": fact.get("source"),
+                "meta": fact.get("meta") or {},
+                "ts": ts,
+            }
+        )
+    return prepared
+
+
+def iter_chunks(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    """Yield consecutive slices of ``items`` with at most ``size`` elements."""
+    size = max(1, size)
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _fact_row(fact: dict[str, Any]) -> tuple:
+    ts = fact["ts"]
+    return (
+        fact["project"],
+        fact["content"],
+        fact["fact_type"],
+        json.dumps(fact["tags"]),
+        fact["confidence"],
+        ts,
+        fact["source"],
+        json.dumps(fact["meta"]),
+        ts,
+        ts,
+    )
+
+
+def _numbered(first_id: int, rows: Sequence[tuple]) -> list[tuple]:
+    """Prefix ``rows`` with consecutive ids starting at ``first_id``."""
+    return [(first_id + i, *row) for i, row in enumerate(rows)]
+
+
+def chain_transactions(
+    prev_hash: str, entries: Sequence[tuple[str, str, dict[str, Any]]]
+) -> list[tuple]:
+    """Hash-chain ``(project, action, detail)`` entries onto ``prev_hash``.
+
+    Returns rows ready for the ``transactions`` table, each linked to the
+    previous one exactly as ``_log_transaction`` would have linked them.
+    """
+    rows = []
+    ph = prev_hash
+    for project, action, detail in entries:
+        dj = canonical_json(detail)
+        ts = now_iso()
+        th = compute_tx_hash(ph, project, action, dj, ts)
+        rows.append((project, action, dj, ph, th, ts))
+        ph = th
+    return rows
+
+
+def _embedding_rows(
+    fact_ids: Sequence[int],
+    contents: Sequence[str],
+    embed_batch: Callable[[list[str]], list[list[float]]],
+    vector_format: str,
+) -> list[tuple]:
+    """Embed all ``contents`` in one call; an embedder failure skips the chunk."""
+    try:
+        vectors = embed_batch(list(contents))
+    except Exception as e:
+        logger.warning("Batch embedding failed for %d facts: %s", len(contents), e)
+        return []
+    return [
+        (fid, encode_vector(vec, vector_format)) for fid, vec in zip(fact_ids, vectors, strict=True)
+    ]
+
+
+# ─── Async (aiosqlite) ────────────────────────────────────────────────
+
+
+async def _insert_rows_async(
+    conn, table: str, insert_sql: str, insert_with_id_sql: str, rows: Sequence[tuple]
+) -> list[int]:
+    cursor = await conn.execute(insert_sql, rows[0])
+    ids = [cursor.lastrowid]
+    if len(rows) > 1:
+        cursor = await conn.execute(_RESERVE_IDS, (len(rows) - 1, table))
+        (last_id,) = await cursor.fetchone()
+        first_id = last_id - len(rows) + 2
+        await conn.executemany(insert_with_id_sql, _numbered(first_id, rows[1:]))
+        ids.extend(range(first_id, last_id + 1))
+    return ids
+
+
+async def insert_facts_async(conn, facts: Sequence[dict[str, Any]]) -> list[int]:
+    """Insert prepared facts and return their ids, in input order."""
+    rows = [_fact_row(f) for f in facts]
+    return await _insert_rows_async(conn, "facts", _INSERT_FACT, _INSERT_FACT_WITH_ID, rows)
+
+
+async def insert_embeddings_async(
+    conn,
+    fact_ids: Sequence[int],
+    contents: Sequence[str],
+    embed_batch: Callable[[list[str]], list[list[float]]],
+    vector_format: str,
+    partitioned: bool = False,
+) -> int:
+    """Embed ``contents`` in one batch and write them to ``fact_embeddings``."""
+    rows = _embedding_rows(fact_ids, contents, embed_batch, vector_format)
+    if rows:
+        await conn.executemany(insert_embedding_sql(vector_format, partitioned), rows)
+    return len(rows)
+
+
+async def append_chain_async(
+    conn, prev_hash: str, entries: Sequence[tuple[str, str, dict[str, Any]]]
+) -> tuple[list[int], list[str]]:
+    """Chain ``entries`` onto ``prev_hash`` and insert them.
+
+    Returns the new transaction ids and their hashes; the last hash is the
+    new chain head.
+    """
+    rows = chain_transactions(prev_hash, entries)
+    ids = await _insert_rows_async(conn, "transactions", _INSERT_TX, _INSERT_TX_WITH_ID, rows)
+    return ids, [row[4] for row in rows]
+
+
+async def log_transactions_async(
+    conn, entries: Sequence[tuple[str, str, dict[str, Any]]]
+) -> list[int]:
+    """Append a run of ledger entries and return their transaction ids."""
+    cursor = await conn.execute(_LAST_HASH)
+    prev = await cursor.fetchone()
+    ids, _hashes = await append_chain_async(conn, prev[0] if prev else "GENESIS", entries)
+    return ids
+
+
+async def link_transactions_async(
+    conn, fact_ids: Sequence[int], tx_ids: Sequence[int]
+) -> None:
+    """Point each fact at the ledger entry that recorded it."""
+    await conn.executemany(_SET_TX_ID, list(zip(tx_ids, fact_ids, strict=True)))
+
+
+# ─── Sync (sqlite3) ───────────────────────────────────────────────────
+
+
+def _insert_rows_sync(
+    conn, table: str, insert_sql: str, insert_with_id_sql: str, rows: Sequence[tuple]
+) -> list[int]:
+    ids = [conn.execute(insert_sql, rows[0]).lastrowid]
+    if len(rows) > 1:
+        (last_id,) = conn.execute(_RESERVE_IDS, (len(rows) - 1, table)).fetchone()
+        first_id = last_id - len(rows) + 2
+        conn.executemany(insert_with_id_sql, _numbered(first_id, rows[1:]))
+        ids.extend(range(first_id, last_id + 1))
+    return ids
+
+
+def insert_facts_sync(conn, facts: Sequence[dict[str, Any]]) -> list[int]:
+    """Insert prepared facts and return their ids, in input order (sync)."""
+    rows = [_fact_row(f) for f in facts]
+    return _insert_rows_sync(conn, "facts", _INSERT_FACT, _INSERT_FACT_WITH_ID, rows)
+
+
+def insert_embeddings_sync(
+    conn,
+    fact_ids: Sequence[int],
+    contents: Sequence[str],
+    embed_batch: Callable[[list[str]], list[list[float]]],
+    vector_format: str,
+    partitioned: bool = False,
+) -> int:
+    """Embed ``contents`` in one batch and write them to ``fact_embeddings`` (sync)."""
+    rows = _embedding_rows(fact_ids, contents, embed_batch, vector_format)
+    if rows:
+        conn.executemany(insert_embedding_sql(vector_format, partitioned), rows)
+    return len(rows)
+
+
+def append_chain_sync(
+    conn, prev_hash: str, entries: Sequence[tuple[str, str, dict[str, Any]]]
+) -> tuple[list[int], list[str]]:
+    """Chain ``entries`` onto ``prev_hash`` and insert them (sync)."""
+    rows = chain_transactions(prev_hash, entries)
+    ids = _insert_rows_sync(conn, "transactions", _INSERT_TX, _INSERT_TX_WITH_ID, rows)
+    return ids, [row[4] for row in rows]
+
+
+def log_transactions_sync(conn, entries: Sequence[tuple[str, str, dict[str, Any]]]) -> list[int]:
+    """Append a run of ledger entries and return their transaction ids (sync)."""
+    prev = conn.execute(_LAST_HASH).fetchone()
+    ids, _hashes = append_chain_sync(conn, prev[0] if prev else "GENESIS", entries)
+    return ids
+
+
+def link_transactions_sync(conn, fact_ids: Sequence[int], tx_ids: Sequence[int]) -> None:
+    """Point each fact at the ledger entry that recorded it (sync)."""
+    conn.executemany(_SET_TX_ID, list(zip(tx_ids, fact_ids, strict=True)))
@@ -10,22 +10,44 @@ Adaptive checkpointing: reduces batch size during high write-rate periods
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import multiprocessing
+import sqlite3
 import time
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from cortex.connection_pool import CortexConnectionPool
 
 from cortex.canonical import compute_tx_hash, compute_tx_hash_v1
-from cortex.config import CHECKPOINT_MAX, CHECKPOINT_MIN
-from cortex.merkle import MerkleTree
+from cortex.config import (
+    CHECKPOINT_MAX,
+    CHECKPOINT_MIN,
+    LEDGER_VERIFY_BATCH,
+    LEDGER_VERIFY_WORKERS,
+)
+from cortex.merkle import MerkleTree, merkle_root, pack_levels, proof_from_levels, verify_proof
 
 logger = logging.getLogger("cortex")
 
+VERIFY_MODES = ("incremental", "full")
+
+# cortex_meta keys holding verification watermarks, anchored to merkle_roots
+_WATERMARK_KEY = "ledger_verified"
+_FULL_CURSOR_KEY = "ledger_verify_full"
+
+_TX_PAGE_SQL = (
+    "SELECT id, prev_hash, hash, project, action, detail, timestamp FROM transactions "
+    "WHERE id > ? ORDER BY id LIMIT ?"
+)
+_RANGE_HASHES_SQL = "SELECT hash FROM transactions WHERE id >= ? AND id <= ? ORDER BY id"
+
 
 class ImmutableLedger:
     """
@@ -61,17 +83,112 @@ class ImmutableLedger:
     async def compute_merkle_root_async(self, start_id: int, end_id: int) -> str | None:
         """Compute Merkle root for a range of transactions (async)."""
         async with self.pool.acquire() as conn:
+            return await self._merkle_root(conn, start_id, end_id)
+
+    async def _merkle_root(self, conn, start_id: int, end_id: int) -> str | None:
+        cursor = await conn.execute(_RANGE_HASHES_SQL, (start_id, end_id))
+        return merkle_root([row[0] for row in await cursor.fetchall()])
+
+    async def last_checkpoint_async(self) -> int:
+        """Last transaction id covered by a Merkle checkpoint (0 if none)."""
+        async with self.pool.acquire() as conn:
+            cursor = await conn.execute("SELECT MAX(tx_end_id) FROM merkle_roots")
+            row = await cursor.fetchone()
+            return (row[0] or 0) if row else 0
+
+    async def insert_checkpoint_async(
+        self, start_id: int, end_id: int, last_hash: str, root_hash: str, levels: bytes
+    ) -> int | None:
+        """Store a checkpoint whose tree was built while its transactions were appended.
+
+        Returns the checkpoint id, or ``None`` while ``end_id`` is not
+        committed yet. Raises ``ValueError`` if the range no longer follows
+        the last checkpoint or ``end_id`` holds a different hash; the caller
+        then falls back to ``create_checkpoint_async``.
+        """
+        async with self.pool.acquire() as conn:
+            cursor = await conn.execute("SELECT COALESCE(MAX(tx_end_id), 0) FROM merkle_roots")
+            last_tx = (await cursor.fetchone())[0]
+            if last_tx != start_id - 1:
+                raise ValueError(f"Checkpoint range starts at {start_id}, last ends at {last_tx}")
+            cursor = await conn.execute("SELECT hash FROM transactions WHERE id = ?", (end_id,))
+            row = await cursor.fetchone()
+            if row is None:
+                return None
+            # end_id's hash chains over every earlier row, so it pins the whole range
+            if row[0] != last_hash:
+                raise ValueError(f"Transaction {end_id} changed since its checkpoint was built")
+
             cursor = await conn.execute(
-                "SELECT hash FROM transactions WHERE id >= ? AND id <= ? ORDER BY id",
-                (start_id, end_id),
+                """
+                INSERT INTO merkle_roots (root_hash, tx_start_id, tx_end_id, tx_count, tree_levels)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (root_hash, start_id, end_id, end_id - start_id + 1, levels),
             )
-            rows = await cursor.fetchall()
-            hashes = [row[0] for row in rows]
-            if not hashes:
+            await conn.commit()
+            logger.info(
+                "Created Merkle checkpoint #%d (TX %d-%d) [incremental]",
+                cursor.lastrowid,
+                start_id,
+                end_id,
+            )
+            return cursor.lastrowid
+
+    async def inclusion_proof_async(self, tx_id: int) -> dict | None:
+        """Merkle inclusion proof for ``tx_id`` against its checkpoint root.
+
+        Reads the transaction, its sibling leaf and one node per level from
+        the checkpoint's persisted ``tree_levels``, so the cost is O(log n)
+        regardless of the checkpoint size. Checkpoints created before the
+        levels were stored are rebuilt from their transactions instead.
+        Returns ``None`` if the transaction does not exist or is not
+        covered by a checkpoint yet.
+        """
+        async with self.pool.acquire() as conn:
+            cursor = await conn.execute("SELECT hash FROM transactions WHERE id = ?", (tx_id,))
+            tx = await cursor.fetchone()
+            cursor = await conn.execute(
+                "SELECT id, root_hash, tx_start_id, tx_end_id, tx_count, tree_levels "
+                "FROM merkle_roots WHERE tx_start_id <= ? AND tx_end_id >= ? "
+                "ORDER BY id LIMIT 1",
+                (tx_id, tx_id),
+            )
+            checkpoint = await cursor.fetchone()
+            if not tx or not checkpoint:
                 return None
 
-            tree = MerkleTree(hashes)
-            return tree.get_root()
+            root_id, root_hash, start_id, end_id, count, levels = checkpoint
+            if levels is not None and end_id - start_id + 1 == count:
+                index = tx_id - start_id
+                sibling_id = start_id + (index ^ 1 if (index ^ 1) < count else index)
+                cursor = await conn.execute(
+                    "SELECT hash FROM transactions WHERE id = ?", (sibling_id,)
+                )
+                sibling = await cursor.fetchone()
+                proof = proof_from_levels(levels, count, index, sibling[0] if sibling else "")
+                source = "stored"
+            else:
+                cursor = await conn.execute(_RANGE_HASHES_SQL, (start_id, end_id))
+                hashes = [row[0] for row in await cursor.fetchall()]
+                cursor = await conn.execute(
+                    "SELECT COUNT(*) FROM transactions WHERE id >= ? AND id < ?",
+                    (start_id, tx_id),
+                )
+                index = (await cursor.fetchone())[0]
+                proof = MerkleTree(hashes).get_proof(index)
+                source = "rebuilt"
+
+        return {
+            "tx_id": tx_id,
+            "tx_hash": tx[0],
+            "checkpoint_id": root_id,
+            "root_hash": root_hash,
+            "index": index,
+            "proof": [{"hash": h, "position": pos} for h, pos in proof],
+            "valid": verify_proof(tx[0], proof, root_hash),
+            "source": source,
+        }
 
     async def create_checkpoint_async(self) -> int | None:
         """Create a Merkle tree checkpoint for recent transactions (async)."""
@@ -106,20 +223,19 @@ class ImmutableLedger:
 
             end_id = end_row[0]
 
-            # Compute Merkle Root (uses its own acquisition, but we are inside one here)
-            # Actually, compute_merkle_root_async should probably take a conn to avoid deadlocks/extra overhead
-            # But since pool is async, it's fine.
-            root_hash = await self.compute_merkle_root_async(start_id, end_id)
-
-            if not root_hash:
+            # Same connection: a nested acquire deadlocks a single-connection pool
+            cursor = await conn.execute(_RANGE_HASHES_SQL, (start_id, end_id))
+            hashes = [row[0] for row in await cursor.fetchall()]
+            if not hashes:
                 return None
+            root_hash, levels = pack_levels(hashes)
 
             cursor = await conn.execute(
                 """
-                INSERT INTO merkle_roots (root_hash, tx_start_id, tx_end_id, tx_count)
-                VALUES (?, ?, ?, ?)
+                INSERT INTO merkle_roots (root_hash, tx_start_id, tx_end_id, tx_count, tree_levels)
+                VALUES (?, ?, ?, ?, ?)
                 """,
-                (root_hash, start_id, end_id, batch_size),
+                (root_hash, start_id, end_id, len(hashes), levels),
             )
             await conn.commit()
             logger.info(
@@ -129,15 +245,8 @@ class ImmutableLedger:
 
     def compute_merkle_root_sync(self, conn, start_id: int, end_id: int) -> str | None:
         """Compute Merkle root for a range of transactions synchronously."""
-        cursor = conn.execute(
-            "SELECT hash FROM transactions WHERE id >= ? AND id <= ? ORDER BY id ASC",
-            (start_id, end_id),
-        )
-        hashes = [row[0] for row in cursor.fetchall()]
-        if not hashes:
-            return None
-        tree = MerkleTree(hashes)
-        return tree.get_root()
+        cursor = conn.execute(_RANGE_HASHES_SQL, (start_id, end_id))
+        return merkle_root([row[0] for row in cursor.fetchall()])
 
     def create_checkpoint_sync(self, conn=None) -> int | None:
         """Create a Merkle tree checkpoint for recent transactions synchronously."""
@@ -180,17 +289,17 @@ class ImmutableLedger:
             return None
 
         end_id = end_row[0]
-        root_hash = self.compute_merkle_root_sync(conn, start_id, end_id)
-
-        if not root_hash:
+        hashes = [row[0] for row in conn.execute(_RANGE_HASHES_SQL, (start_id, end_id))]
+        if not hashes:
             return None
+        root_hash, levels = pack_levels(hashes)
 
         cursor = conn.execute(
             """
-            INSERT INTO merkle_roots (root_hash, tx_start_id, tx_end_id, tx_count)
-            VALUES (?, ?, ?, ?)
+            INSERT INTO merkle_roots (root_hash, tx_start_id, tx_end_id, tx_count, tree_levels)
+            VALUES (?, ?, ?, ?, ?)
             """,
-            (root_hash, start_id, end_id, batch_size),
+            (root_hash, start_id, end_id, len(hashes), levels),
         )
         conn.commit()
         logger.info(
@@ -198,77 +307,75 @@ class ImmutableLedger:
         )
         return cursor.lastrowid
 
-    async def verify_integrity_async(self) -> dict:
-        """Verify hash chain continuity and Merkle checkpoints (async)."""
-        violations = []
+    async def verify_integrity_async(
+        self,
+        mode: str = "incremental",
+        batch_size: int = LEDGER_VERIFY_BATCH,
+        workers: int = LEDGER_VERIFY_WORKERS,
+    ) -> dict:
+        """Verify hash chain continuity and Merkle checkpoints (async).
+
+        Transactions are streamed in id order, ``batch_size`` rows per page;
+        only the leaf hashes of the checkpoint being rebuilt are held in
+        memory, so a run costs O(checkpoint size) RAM at any ledger length.
+
+        ``incremental`` resumes from the watermark left by earlier runs: the
+        ``tx_end_id`` of the last ``merkle_roots`` checkpoint that verified
+        with nothing wrong before it. ``full`` re-verifies from genesis; an
+        interrupted full run is resumed from its own cursor by the next one.
+        Rows past the newest checkpoint are checked on every run but never
+        move the watermark.
+
+        With ``workers > 1`` and a file-backed database, checkpoint ranges
+        are verified in a process pool and their ``prev_hash`` boundaries
+        stitched together afterwards.
+        """
+        if mode not in VERIFY_MODES:
+            raise ValueError(f"Unknown verification mode: {mode!r}")
+
+        key = _FULL_CURSOR_KEY if mode == "full" else _WATERMARK_KEY
+        started_at = datetime.now().isoformat()
+        started = time.monotonic()
+        violations: list[dict] = []
 
         async with self.pool.acquire() as conn:
-            # 1. Verify Hash Chain
-            cursor = await conn.execute(
-                "SELECT id, prev_hash, hash, project, action, detail, timestamp FROM transactions ORDER BY id"
-            )
-            txs = await cursor.fetchall()
-
-            current_prev = "GENESIS"
-            for tx_id, p_hash, c_hash, proj, act, detail, ts in txs:
-                if p_hash != current_prev:
-                    violations.append(
-                        {
-                            "tx_id": tx_id,
-                            "type": "chain_break",
-                            "expected": current_prev,
-                            "actual": p_hash,
-                        }
-                    )
-
-                # Recompute hash — try v2 (canonical) first, fallback to v1 (legacy)
-                computed_v2 = compute_tx_hash(p_hash, proj, act, detail, ts)
-                computed_v1 = compute_tx_hash_v1(p_hash, proj, act, detail, ts)
-                if computed_v2 != c_hash and computed_v1 != c_hash:
-                    violations.append(
-                        {
-                            "tx_id": tx_id,
-                            "type": "hash_mismatch",
-                            "computed_v2": computed_v2,
-                            "computed_v1": computed_v1,
-                            "stored": c_hash,
-                        }
-                    )
-                current_prev = c_hash
+            anchor = await self._load_anchor(conn, key, violations)
+            db_file = await _database_file(conn) if workers > 1 else None
+            if db_file:
+                anchor, tx_checked, roots_checked = await self._verify_parallel(
+                    conn, key, anchor, violations, db_file, workers
+                )
+            else:
+                anchor, tx_checked, roots_checked = await self._verify_serial(
+                    conn, key, anchor, violations, batch_size
+                )
 
-            # 2. Verify Merkle Checkpoints
-            cursor = await conn.execute(
-                "SELECT id, root_hash, tx_start_id, tx_end_id FROM merkle_roots ORDER BY id"
-            )
-            roots = await cursor.fetchall()
-
-            for m_id, r_hash, start, end in roots:
-                # We reuse the same compute method
-                computed_r = await self.compute_merkle_root_async(start, end)
-                if computed_r != r_hash:
-                    violations.append(
-                        {
-                            "merkle_id": m_id,
-                            "type": "merkle_mismatch",
-                            "expected": r_hash,
-                            "actual": computed_r,
-                        }
-                    )
+            if mode == "full":
+                await self._clear_anchor(conn, _FULL_CURSOR_KEY)
+                if anchor:
+                    await self._save_anchor(conn, _WATERMARK_KEY, anchor)
+                else:
+                    await self._clear_anchor(conn, _WATERMARK_KEY)
 
             status = "ok" if not violations else "violation"
+            elapsed = time.monotonic() - started
+            tx_per_sec = round(tx_checked / elapsed, 1) if elapsed > 0 else 0.0
 
             if violations:
                 logger.error(f"Integrity check failed: {len(violations)} violations found")
 
             # Record check
             await conn.execute(
-                "INSERT INTO integrity_checks (check_type, status, details, started_at, completed_at) VALUES (?, ?, ?, ?, ?)",
+                "INSERT INTO integrity_checks (check_type, status, details, started_at, "
+                "completed_at, tx_checked, tx_per_sec) VALUES (?, ?, ?, ?, ?, ?, ?)",
                 (
-                    "full",
+                    mode,
                     status,
                     json.dumps(violations),
+                    started_at,
                     datetime.now().isoformat(),
-                    datetime.now().isoformat(),
+                    tx_checked,
+                    tx_per_sec,
                 ),
             )
             await conn.commit()
@@ -276,6 +383,264 @@ class ImmutableLedger:
             return {
                 "valid": not violations,
                 "violations": violations,
-                "tx_checked": len(txs),
-                "roots_checked": len(roots),
+                "tx_checked": tx_checked,
+                "roots_checked": roots_checked,
+                "mode": mode,
+                "verified_to": anchor["tx_id"] if anchor else 0,
+                "tx_per_sec": tx_per_sec,
+            }
+
+    async def _verify_serial(
+        self, conn, key: str, anchor: dict | None, violations: list[dict], batch_size: int
+    ) -> tuple[dict | None, int, int]:
+        """Stream the chain on ``conn``; returns (anchor, tx_checked, roots_checked)."""
+        baseline = len(violations)
+        tx_checked = 0
+        roots_checked = 0
+        current_prev = anchor["hash"] if anchor else "GENESIS"
+        last_id = anchor["tx_id"] if anchor else 0
+        root = await self._next_root(conn, last_id)
+        leaves: list[str] = []
+
+        async def close_root():
+            nonlocal anchor, roots_checked
+            m_id, r_hash, _start, end = root
+            roots_checked += 1
+            mismatch = _merkle_violation(m_id, r_hash, leaves)
+            if mismatch:
+                violations.append(mismatch)
+            leaves.clear()
+            if len(violations) == baseline:
+                anchor = {"root_id": m_id, "tx_id": end, "hash": current_prev}
+                await self._save_anchor(conn, key, anchor)
+            return await self._next_root(conn, end)
+
+        while True:
+            cursor = await conn.execute(_TX_PAGE_SQL, (last_id, batch_size))
+            rows = await cursor.fetchall()
+            if not rows:
+                break
+
+            for tx_id, p_hash, c_hash, proj, act, detail, ts in rows:
+                while root and tx_id > root[3]:
+                    root = await close_root()
+
+                if p_hash != current_prev:
+                    violations.append(_chain_violation(tx_id, current_prev, p_hash))
+                mismatch = _hash_violation(tx_id, p_hash, c_hash, proj, act, detail, ts)
+                if mismatch:
+                    violations.append(mismatch)
+                current_prev = c_hash
+                tx_checked += 1
+
+                if root and tx_id >= root[2]:
+                    leaves.append(c_hash)
+                    if tx_id == root[3]:
+                        root = await close_root()
+
+            last_id = rows[-1][0]
+
+        # Checkpoints whose last transactions are gone
+        while root:
+            root = await close_root()
+
+        return anchor, tx_checked, roots_checked
+
+    async def _verify_parallel(
+        self,
+        conn,
+        key: str,
+        anchor: dict | None,
+        violations: list[dict],
+        db_file: str,
+        workers: int,
+    ) -> tuple[dict | None, int, int]:
+        """Verify checkpoint ranges in a process pool and stitch their boundaries.
+
+        Each worker opens the database read-only and checks one range on its
+        own; results are consumed in chain order, so the watermark advances
+        over the clean prefix exactly as in the serial path.
+        """
+        baseline = len(violations)
+        after = anchor["tx_id"] if anchor else 0
+        current_prev = anchor["hash"] if anchor else "GENESIS"
+
+        cursor = await conn.execute("SELECT MAX(id) FROM transactions")
+        row = await cursor.fetchone()
+        head = (row[0] or 0) if row else 0
+        cursor = await conn.execute(
+            "SELECT id, root_hash, tx_start_id, tx_end_id FROM merkle_roots "
+            "WHERE tx_start_id > ? ORDER BY tx_start_id",
+            (after,),
+        )
+        segments = []
+        for m_id, r_hash, start, end in await cursor.fetchall():
+            segments.append((after, start, end, m_id, r_hash))
+            after = end
+        if head > after:
+            segments.append((after, None, head, None, None))
+
+        tx_checked = 0
+        roots_checked = 0
+        loop = asyncio.get_running_loop()
+        # spawn: forking a process that runs aiosqlite threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = [
+                loop.run_in_executor(executor, _verify_segment, db_file, *segment)
+                for segment in segments
+            ]
+            for (_after, _start, end, m_id, _r_hash), future in zip(segments, futures, strict=True):
+                result = await future
+                first = result["first"]
+                if first and first[1] != current_prev:
+                    violations.append(_chain_violation(first[0], current_prev, first[1]))
+                violations.extend(result["violations"])
+                if result["last_hash"] is not None:
+                    current_prev = result["last_hash"]
+                tx_checked += result["count"]
+
+                if m_id is None:
+                    continue
+                roots_checked += 1
+                if len(violations) == baseline:
+                    anchor = {"root_id": m_id, "tx_id": end, "hash": current_prev}
+                    await self._save_anchor(conn, key, anchor)
+
+        return anchor, tx_checked, roots_checked
+
+    async def _load_anchor(self, conn, key: str, violations: list[dict]) -> dict | None:
+        """Read a verification watermark, dropping it if its checkpoint moved."""
+        cursor = await conn.execute("SELECT value FROM cortex_meta WHERE key = ?", (key,))
+        row = await cursor.fetchone()
+        if not row:
+            return None
+
+        anchor = json.loads(row[0])
+        cursor = await conn.execute(
+            "SELECT t.hash FROM merkle_roots m JOIN transactions t ON t.id = m.tx_end_id "
+            "WHERE m.id = ? AND m.tx_end_id = ?",
+            (anchor["root_id"], anchor["tx_id"]),
+        )
+        row = await cursor.fetchone()
+        if row and row[0] == anchor["hash"]:
+            return anchor
+
+        # The ledger changed under a verified range: start over from genesis.
+        violations.append(
+            {
+                "merkle_id": anchor["root_id"],
+                "type": "watermark_mismatch",
+                "expected": anchor["hash"],
+                "actual": row[0] if row else None,
             }
+        )
+        await self._clear_anchor(conn, key)
+        return None
+
+    async def _save_anchor(self, conn, key: str, anchor: dict) -> None:
+        await conn.execute(
+            "INSERT OR REPLACE INTO cortex_meta (key, value) VALUES (?, ?)",
+            (key, json.dumps(anchor)),
+        )
+        await conn.commit()
+
+    async def _clear_anchor(self, conn, key: str) -> None:
+        await conn.execute("DELETE FROM cortex_meta WHERE key = ?", (key,))
+        await conn.commit()
+
+    async def _next_root(self, conn, after_tx: int) -> tuple | None:
+        cursor = await conn.execute(
+            "SELECT id, root_hash, tx_start_id, tx_end_id FROM merkle_roots "
+            "WHERE tx_start_id > ? ORDER BY tx_start_id LIMIT 1",
+            (after_tx,),
+        )
+        return await cursor.fetchone()
+
+
+# ─── Verification helpers (module level so process pool workers can use them) ──
+
+
+def _chain_violation(tx_id: int, expected: str, actual: str) -> dict:
+    return {"tx_id": tx_id, "type": "chain_break", "expected": expected, "actual": actual}
+
+
+def _hash_violation(tx_id, p_hash, c_hash, proj, act, detail, ts) -> dict | None:
+    # Recompute hash — try v2 (canonical) first, fallback to v1 (legacy)
+    computed_v2 = compute_tx_hash(p_hash, proj, act, detail, ts)
+    if computed_v2 == c_hash:
+        return None
+    computed_v1 = compute_tx_hash_v1(p_hash, proj, act, detail, ts)
+    if computed_v1 == c_hash:
+        return None
+    return {
+        "tx_id": tx_id,
+        "type": "hash_mismatch",
+        "computed_v2": computed_v2,
+        "computed_v1": computed_v1,
+        "stored": c_hash,
+    }
+
+
+def _merkle_violation(m_id: int, r_hash: str, leaves: list[str]) -> dict | None:
+    computed_r = merkle_root(leaves)
+    if computed_r == r_hash:
+        return None
+    return {"merkle_id": m_id, "type": "merkle_mismatch", "expected": r_hash, "actual": computed_r}
+
+
+def _verify_segment(
+    db_file: str,
+    after_id: int,
+    start_id: int | None,
+    end_id: int,
+    root_id: int | None,
+    root_hash: str | None,
+) -> dict:
+    """Check transactions ``after_id < id <= end_id`` in a worker process.
+
+    The first row's ``prev_hash`` is returned unchecked for the caller to
+    stitch against the previous range. ``start_id``/``root_id`` are ``None``
+    for the tail past the newest checkpoint.
+    """
+    conn = sqlite3.connect(f"{Path(db_file).resolve().as_uri()}?mode=ro", uri=True)
+    violations: list[dict] = []
+    leaves: list[str] = []
+    first = None
+    prev = None
+    count = 0
+    try:
+        rows = conn.execute(
+            "SELECT id, prev_hash, hash, project, action, detail, timestamp FROM transactions "
+            "WHERE id > ? AND id <= ? ORDER BY id",
+            (after_id, end_id),
+        )
+        for tx_id, p_hash, c_hash, proj, act, detail, ts in rows:
+            if first is None:
+                first = (tx_id, p_hash)
+            elif p_hash != prev:
+                violations.append(_chain_violation(tx_id, prev, p_hash))
+            mismatch = _hash_violation(tx_id, p_hash, c_hash, proj, act, detail, ts)
+            if mismatch:
+                violations.append(mismatch)
+            if start_id is not None and tx_id >= start_id:
+                leaves.append(c_hash)
+            prev = c_hash
+            count += 1
+    finally:
+        conn.close()
+
+    if root_id is not None:
+        mismatch = _merkle_violation(root_id, root_hash, leaves)
+        if mismatch:
+            violations.append(mismatch)
+    return {"first": first, "last_hash": prev, "count": count, "violations": violations}
+
+
+async def _database_file(conn) -> str | None:
+    """Path of the main database file, or ``None`` for in-memory databases."""
+    cursor = await conn.execute("PRAGMA database_list")
+    for _seq, name, file in await cursor.fetchall():
+        if name == "main":
+            return file or None
+    return None
@@ -0,0 +1,672 @@
+"""
+CORTEX v4.1 — Ledger Segment Archives.
+
+Archives ``transactions`` and ``merkle_roots`` into append-only segment files
+so ledgers can be shipped between nodes without JSON or SQL dumps. Each
+segment covers whole checkpoints, about ``LEDGER_SEGMENT_SIZE`` transactions,
+and is laid out as::
+
+    header  "CXLS" | version u8 | 0 u8 | 0 u16 | first_tx u64 | last_tx u64 | prev_hash
+    body    one zlib stream of records, each u32 length + payload:
+              T  id u64, hash, prev_hash, 4 x u32 lengths, project|action|detail|timestamp
+              M  id u64, start u64, end u64, count u64, root_hash, created_at,
+                 signature, external_proof, tree_levels   (after its last T)
+    footer  Merkle root of the segment's tx hashes | tx_count u64 | crc32 u32 | "CXLE"
+
+Hashes are raw 32-byte digests, or length-prefixed text when a legacy value
+is not one (``GENESIS``). Text and blobs are u32 length-prefixed, with
+``0xFFFFFFFF`` for NULL. ``SegmentReader`` decodes the body chunk by chunk,
+so ``verify_segments`` and ``import_segments`` check every hash, the chain
+across segments and every checkpoint root without holding a segment, or the
+database, in memory.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sqlite3
+import struct
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+
+from cortex.config import LEDGER_SEGMENT_SIZE
+from cortex.engine.ledger import _chain_violation, _hash_violation
+from cortex.exceptions import LedgerArchiveError
+from cortex.merkle import merkle_root, pack_levels
+
+MAGIC = b"CXLS"
+END_MAGIC = b"CXLE"
+VERSION = 1
+SUFFIX = ".cxl"
+EXPORT_TYPE = "ledger_segment"
+
+_HEADER = struct.Struct("<4sBBHQQ")
+_FOOTER = struct.Struct("<QI4s")
+_LEN = struct.Struct("<I")
+_TX = struct.Struct("<cQ")
+_TX_TEXT = struct.Struct("<IIII")
+_ROOT = struct.Struct("<cQQQQ")
+_HASH_RAW, _HASH_TEXT, _HASH_NULL = 0, 1, 2
+_NULL_LEN = 0xFFFFFFFF
+_DIGEST_SIZE = 32
+_CHUNK = 1 << 16  # bytes compressed or read at a time
+_INSERT_BATCH = 1000
+_COMPRESS_LEVEL = 1  # nightly exports: speed over the last few percent of size
+_NAME_RE = re.compile(r"^ledger-(\d+)-(\d+)\.cxl$")
+
+_TX_SQL = (
+    "SELECT id, hash, prev_hash, project, action, detail, timestamp FROM transactions "
+    "WHERE id >= ? AND id <= ? ORDER BY id"
+)
+_ROOTS_SQL = (
+    "SELECT id, tx_start_id, tx_end_id, tx_count, root_hash, created_at, signature, "
+    "external_proof, {levels} FROM merkle_roots "
+    "WHERE tx_start_id >= ? AND tx_end_id <= ? ORDER BY tx_end_id"
+)
+
+
+def segment_name(first_tx: int, last_tx: int) -> str:
+    """File name of the segment for ``first_tx..last_tx`` (sorts in ledger order)."""
+    return f"ledger-{first_tx:012d}-{last_tx:012d}{SUFFIX}"
+
+
+def archived_through(out_dir: str | Path) -> int:
+    """Last transaction id already archived in ``out_dir`` (0 when there is none)."""
+    last = 0
+    for path in Path(out_dir).glob(f"*{SUFFIX}"):
+        match = _NAME_RE.match(path.name)
+        if match:
+            last = max(last, int(match.group(2)))
+    return last
+
+
+# ─── Encoding ─────────────────────────────────────────────────────────
+
+
+def _pack_hash(value: str | None) -> bytes:
+    if value is None:
+        return bytes((_HASH_NULL,))
+    if len(value) == 2 * _DIGEST_SIZE:
+        try:
+            raw = bytes.fromhex(value)
+        except ValueError:
+            raw = None
+        # Uppercase hex would not round-trip to the stored string
+        if raw is not None and raw.hex() == value:
+            return bytes((_HASH_RAW,)) + raw
+    return bytes((_HASH_TEXT,)) + _pack_text(value)
+
+
+def _pack_text(value: str | None) -> bytes:
+    return _pack_blob(None if value is None else value.encode())
+
+
+def _pack_blob(value: bytes | None) -> bytes:
+    if value is None:
+        return _LEN.pack(_NULL_LEN)
+    return _LEN.pack(len(value)) + value
+
+
+def _tx_record(row: tuple) -> bytes:
+    tx_id, c_hash, p_hash, *texts = row
+    data = [b"" if t is None else t.encode() for t in texts]
+    payload = b"".join(
+        (
+            _TX.pack(b"T", tx_id),
+            _pack_hash(c_hash),
+            _pack_hash(p_hash),
+            _TX_TEXT.pack(
+                *(_NULL_LEN if t is None else len(d) for t, d in zip(texts, data, strict=True))
+            ),
+            *data,
+        )
+    )
+    return _LEN.pack(len(payload)) + payload
+
+
+def _root_record(row: tuple) -> bytes:
+    m_id, start, end, count, r_hash, created, signature, proof, levels = row
+    payload = b"".join(
+        (
+            _ROOT.pack(b"M", m_id, start, end, count),
+            _pack_hash(r_hash),
+            _pack_text(created),
+            _pack_text(signature),
+            _pack_text(proof),
+            _pack_blob(levels),
+        )
+    )
+    return _LEN.pack(len(payload)) + payload
+
+
+# ─── Decoding ─────────────────────────────────────────────────────────
+
+
+def _read_blob(buf: bytes, off: int) -> tuple[bytes | None, int]:
+    (size,) = _LEN.unpack_from(buf, off)
+    off += _LEN.size
+    if size == _NULL_LEN:
+        return None, off
+    return buf[off : off + size], off + size
+
+
+def _read_text(buf: bytes, off: int) -> tuple[str | None, int]:
+    value, off = _read_blob(buf, off)
+    return (None if value is None else value.decode()), off
+
+
+def _read_hash(buf: bytes, off: int) -> tuple[str | None, int]:
+    tag = buf[off]
+    off += 1
+    if tag == _HASH_RAW:
+        return buf[off : off + _DIGEST_SIZE].hex(), off + _DIGEST_SIZE
+    if tag == _HASH_TEXT:
+        return _read_text(buf, off)
+    if tag == _HASH_NULL:
+        return None, off
+    raise LedgerArchiveError(f"Unknown hash encoding {tag}")
+
+
+def _decode(buf: bytes, off: int) -> tuple:
+    """Record at ``buf[off:]`` as ``("T", id, prev_hash, hash, project, action, detail, ts)``
+    or ``("M", id, start, end, count, root_hash, created_at, signature, proof, levels)``."""
+    kind = buf[off : off + 1]
+    if kind == b"T":
+        _, tx_id = _TX.unpack_from(buf, off)
+        c_hash, off = _read_hash(buf, off + _TX.size)
+        p_hash, off = _read_hash(buf, off)
+        texts = []
+        off += _TX_TEXT.size
+        for size in _TX_TEXT.unpack_from(buf, off - _TX_TEXT.size):
+            if size == _NULL_LEN:
+                texts.append(None)
+            else:
+                texts.append(buf[off : off + size].decode())
+                off += size
+        return ("T", tx_id, p_hash, c_hash, *texts)
+    if kind == b"M":
+        _, m_id, start, end, count = _ROOT.unpack_from(buf, off)
+        r_hash, off = _read_hash(buf, off + _ROOT.size)
+        created, off = _read_text(buf, off)
+        signature, off = _read_text(buf, off)
+        proof, off = _read_text(buf, off)
+        levels, off = _read_blob(buf, off)
+        return ("M", m_id, start, end, count, r_hash, created, signature, proof, levels)
+    raise LedgerArchiveError(f"Unknown record type {kind!r}")
+
+
+class SegmentReader:
+    """Streaming reader for one segment file.
+
+    The header is read on open. ``records()`` yields records in file order
+    and, once exhausted, fills in ``root``, ``tx_count`` and ``crc_ok`` from
+    the footer.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.root: str | None = None
+        self.tx_count: int | None = None
+        self.crc_ok: bool | None = None
+        self._fh = open(self.path, "rb")
+        try:
+            self._read_header()
+        except BaseException:
+            self._fh.close()
+            raise
+
+    def __enter__(self) -> SegmentReader:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def _read_exact(self, size: int) -> bytes:
+        data = self._fh.read(size)
+        if len(data) != size:
+            raise LedgerArchiveError(f"{self.path.name}: truncated header")
+        return data
+
+    def _read_header(self) -> None:
+        magic, version, _, _, self.first_tx, self.last_tx = _HEADER.unpack(
+            self._read_exact(_HEADER.size)
+        )
+        if magic != MAGIC:
+            raise LedgerArchiveError(f"{self.path.name}: not a ledger segment")
+        if version != VERSION:
+            raise LedgerArchiveError(f"{self.path.name}: unsupported segment version {version}")
+        tag = self._read_exact(1)
+        if tag[0] == _HASH_RAW:
+            rest = self._read_exact(_DIGEST_SIZE)
+        elif tag[0] == _HASH_TEXT:
+            size = self._read_exact(_LEN.size)
+            rest = size + self._read_exact(_LEN.unpack(size)[0])
+        else:
+            rest = b""
+        self.prev_hash = _read_hash(tag + rest, 0)[0]
+
+    def records(self) -> Iterator[tuple]:
+        """Yield the body's records, decompressing ``_CHUNK`` bytes at a time."""
+        decomp = zlib.decompressobj()
+        crc = 0
+        buf = b""
+        while not decomp.eof:
+            chunk = self._fh.read(_CHUNK)
+            if not chunk:
+                raise LedgerArchiveError(f"{self.path.name}: truncated body")
+            try:
+                data = decomp.decompress(chunk)
+            except zlib.error as exc:
+                raise LedgerArchiveError(f"{self.path.name}: corrupt body ({exc})") from exc
+            crc = zlib.crc32(data, crc)
+            buf = buf + data if buf else data
+            off, end = 0, len(buf)
+            while end - off >= _LEN.size:
+                (size,) = _LEN.unpack_from(buf, off)
+                if end - off - _LEN.size < size:
+                    break
+                try:
+                    yield _decode(buf, off + _LEN.size)
+                except (struct.error, IndexError, UnicodeDecodeError) as exc:
+                    raise LedgerArchiveError(f"{self.path.name}: corrupt record") from exc
+                off += _LEN.size + size
+            buf = buf[off:]
+        if buf:
+            raise LedgerArchiveError(f"{self.path.name}: truncated record")
+        self._read_footer(decomp.unused_data + self._fh.read(), crc)
+
+    def _read_footer(self, footer: bytes, crc: int) -> None:
+        try:
+            self.root, off = _read_hash(footer, 0)
+            self.tx_count, stored_crc, magic = _FOOTER.unpack_from(footer, off)
+        except (struct.error, IndexError) as exc:
+            raise LedgerArchiveError(f"{self.path.name}: truncated footer") from exc
+        if magic != END_MAGIC or off + _FOOTER.size != len(footer):
+            raise LedgerArchiveError(f"{self.path.name}: corrupt footer")
+        self.crc_ok = stored_crc == crc
+
+
+# ─── Export ───────────────────────────────────────────────────────────
+
+
+def _levels_column(conn: sqlite3.Connection) -> bool:
+    """Whether ``merkle_roots.tree_levels`` exists (migration 016)."""
+    return any(col[1] == "tree_levels" for col in conn.execute("PRAGMA table_info(merkle_roots)"))
+
+
+def _plan_segments(
+    conn: sqlite3.Connection, after_id: int, segment_size: int
+) -> list[tuple[int, int]]:
+    """Split the checkpointed transactions after ``after_id`` into segment ranges."""
+    bounds = conn.execute(
+        "SELECT tx_start_id, tx_end_id FROM merkle_roots WHERE tx_end_id > ? ORDER BY tx_end_id",
+        (after_id,),
+    ).fetchall()
+    ranges = []
+    start = after_id + 1
+    for cp_start, cp_end in bounds:
+        if cp_start < start:
+            raise ValueError(
+                f"Transaction {start} is inside checkpoint {cp_start}-{cp_end}; "
+                "segments must start on a checkpoint boundary"
+            )
+        if cp_end - start + 1 >= segment_size:
+            ranges.append((start, cp_end))
+            start = cp_end + 1
+    if bounds and start <= bounds[-1][1]:
+        ranges.append((start, bounds[-1][1]))
+    return ranges
+
+
+def write_segment(
+    conn: sqlite3.Connection, path: str | Path, first_tx: int, last_tx: int
+) -> dict:
+    """Write transactions ``first_tx..last_tx`` and their checkpoints to ``path``.
+
+    The file is written next to ``path`` and renamed into place, so a
+    segment is either complete or absent.
+    """
+    path = Path(path)
+    roots_sql = _ROOTS_SQL.format(levels="tree_levels" if _levels_column(conn) else "NULL")
+    roots = iter(conn.execute(roots_sql, (first_tx, last_tx)).fetchall())
+    first = conn.execute(
+        "SELECT prev_hash FROM transactions WHERE id >= ? ORDER BY id LIMIT 1", (first_tx,)
+    ).fetchone()
+    if first is None:
+        raise ValueError(f"No transactions from id {first_tx}")
+
+    digest = hashlib.sha256()
+    comp = zlib.compressobj(_COMPRESS_LEVEL)
+    hashes: list[str] = []
+    pending: list[bytes] = []
+    pending_size = 0
+    crc = 0
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as fh:
+
+        def emit(data: bytes) -> None:
+            fh.write(data)
+            digest.update(data)
+
+        def flush() -> None:
+            nonlocal crc, pending_size
+            data = b"".join(pending)
+            pending.clear()
+            pending_size = 0
+            crc = zlib.crc32(data, crc)
+            emit(comp.compress(data))
+
+        emit(_HEADER.pack(MAGIC, VERSION, 0, 0, first_tx, last_tx) + _pack_hash(first[0]))
+        root = next(roots, None)
+        for row in conn.execute(_TX_SQL, (first_tx, last_tx)):
+            record = _tx_record(row)
+            pending.append(record)
+            pending_size += len(record)
+            hashes.append(row[1])
+            while root is not None and root[2] <= row[0]:
+                pending.append(_root_record(root))
+                root = next(roots, None)
+            if pending_size >= _CHUNK:
+                flush()
+        for rest in ([root] if root else []) + list(roots):
+            pending.append(_root_record(rest))
+        flush()
+        emit(comp.flush())
+        segment_root = merkle_root(hashes)
+        emit(_pack_hash(segment_root) + _FOOTER.pack(len(hashes), crc, END_MAGIC))
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+    return {
+        "path": str(path),
+        "first_tx": first_tx,
+        "last_tx": last_tx,
+        "tx_count": len(hashes),
+        "root": segment_root,
+        "file_hash": digest.hexdigest(),
+        "bytes": path.stat().st_size,
+    }
+
+
+def export_segments(
+    db_path: str | Path,
+    out_dir: str | Path,
+    after_id: int | None = None,
+    segment_size: int = LEDGER_SEGMENT_SIZE,
+    exported_by: str = "cortex",
+) -> list[dict]:
+    """Append segments for every checkpointed transaction not yet in ``out_dir``.
+
+    ``after_id`` defaults to ``archived_through(out_dir)``, so a nightly run
+    only writes what was checkpointed since the previous one. Transactions
+    past the newest checkpoint wait for the next run. All segments are read
+    from one snapshot and recorded in ``audit_exports``.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    if after_id is None:
+        after_id = archived_through(out)
+
+    conn = sqlite3.connect(str(db_path), isolation_level=None)
+    try:
+        conn.execute("BEGIN")
+        try:
+            written = [
+                write_segment(conn, out / segment_name(first, last), first, last)
+                for first, last in _plan_segments(conn, after_id, segment_size)
+            ]
+        finally:
+            conn.execute("COMMIT")
+        if written:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO audit_exports "
+                "(export_type, filename, file_hash, tx_start_id, tx_end_id, exported_by) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (EXPORT_TYPE, Path(s["path"]).name, s["file_hash"], s["first_tx"],
+                     s["last_tx"], exported_by)
+                    for s in written
+                ],
+            )
+            conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return written
+
+
+# ─── Verification and import ──────────────────────────────────────────
+
+
+def _segment_paths(paths: Iterable[str | Path]) -> list[Path]:
+    """Segment files in ledger order; directories contribute their segments."""
+    found = []
+    for p in map(Path, paths):
+        found.extend(p.glob(f"*{SUFFIX}") if p.is_dir() else [p])
+    return sorted(found, key=lambda p: p.name)
+
+
+def _check_segment(
+    reader: SegmentReader,
+    expected_prev: str | None,
+    on_record: Callable[[tuple], None] | None = None,
+) -> dict:
+    """Stream one segment through the chain, hash and Merkle checks."""
+    name = reader.path.name
+    violations: list[dict] = []
+    if expected_prev is not None and reader.prev_hash != expected_prev:
+        violations.append(_chain_violation(reader.first_tx, expected_prev, reader.prev_hash))
+    prev = reader.prev_hash
+    last_id = reader.first_tx - 1
+    hashes: list[str] = []
+    pending: list[tuple[int, str]] = []  # (id, hash) since the previous checkpoint
+    roots = 0
+
+    for record in reader.records():
+        if record[0] == "T":
+            _, tx_id, p_hash, c_hash, proj, act, detail, ts = record
+            if not last_id < tx_id <= reader.last_tx:
+                violations.append({"tx_id": tx_id, "type": "out_of_order", "segment": name})
+            if p_hash != prev:
+                violations.append(_chain_violation(tx_id, prev, p_hash))
+            mismatch = _hash_violation(tx_id, p_hash, c_hash, proj, act, detail, ts)
+            if mismatch:
+                violations.append(mismatch)
+            hashes.append(c_hash)
+            pending.append((tx_id, c_hash))
+            prev = c_hash
+            last_id = tx_id
+        else:
+            _, m_id, start, end, _count, r_hash, _created, _sig, _proof, levels = record
+            leaves = [h for i, h in pending if i >= start]
+            if end != last_id or not leaves:
+                violations.append(
+                    {"merkle_id": m_id, "type": "merkle_range", "start": start, "end": end}
+                )
+            else:
+                computed, packed = pack_levels(leaves)
+                if computed != r_hash:
+                    violations.append(
+                        {"merkle_id": m_id, "type": "merkle_mismatch", "expected": r_hash,
+                         "actual": computed}
+                    )
+                elif levels and levels != packed:
+                    violations.append({"merkle_id": m_id, "type": "merkle_levels_mismatch"})
+            pending.clear()
+            roots += 1
+        if on_record is not None:
+            on_record(record)
+
+    if pending:
+        violations.append({"tx_id": pending[0][0], "type": "unanchored_tail", "segment": name})
+    if reader.tx_count != len(hashes):
+        violations.append(
+            {"type": "segment_count", "segment": name, "expected": reader.tx_count,
+             "actual": len(hashes)}
+        )
+    computed = merkle_root(hashes)
+    if computed != reader.root:
+        violations.append(
+            {"type": "segment_root_mismatch", "segment": name, "expected": reader.root,
+             "actual": computed}
+        )
+    if not reader.crc_ok:
+        violations.append({"type": "segment_crc", "segment": name})
+    return {
+        "tx_checked": len(hashes),
+        "roots_checked": roots,
+        "last_tx": last_id,
+        "last_hash": prev,
+        "violations": violations,
+    }
+
+
+def _merge(report: dict, result: dict) -> None:
+    report["segments"] += 1
+    report["tx_checked"] += result["tx_checked"]
+    report["roots_checked"] += result["roots_checked"]
+    report["last_tx"] = result["last_tx"]
+    report["last_hash"] = result["last_hash"]
+    report["violations"].extend(result["violations"])
+
+
+def _new_report(prev_hash: str | None) -> dict:
+    return {
+        "valid": True,
+        "segments": 0,
+        "tx_checked": 0,
+        "roots_checked": 0,
+        "last_tx": None,
+        "last_hash": prev_hash,
+        "violations": [],
+    }
+
+
+def verify_segments(paths: Iterable[str | Path], prev_hash: str | None = None) -> dict:
+    """Verify segment files in order without touching a database.
+
+    Consecutive segments must continue each other's id range and hash chain.
+    The first one is checked against ``prev_hash`` when given, or against
+    ``GENESIS`` when it starts the ledger. Verification stops at the first
+    unreadable segment.
+    """
+    report = _new_report(prev_hash)
+    for path in _segment_paths(paths):
+        try:
+            with SegmentReader(path) as reader:
+                expected = report["last_hash"]
+                if report["last_tx"] is not None and reader.first_tx != report["last_tx"] + 1:
+                    report["violations"].append(
+                        {"type": "segment_gap", "segment": path.name,
+                         "expected": report["last_tx"] + 1, "actual": reader.first_tx}
+                    )
+                elif expected is None and reader.first_tx == 1:
+                    expected = "GENESIS"
+                _merge(report, _check_segment(reader, expected))
+        except LedgerArchiveError as exc:
+            report["violations"].append(
+                {"type": "segment_corrupt", "segment": path.name, "error": str(exc)}
+            )
+            break
+    report["valid"] = not report["violations"]
+    return report
+
+
+class _Inserter:
+    """Buffers decoded records into ``executemany`` batches."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._txs: list[tuple] = []
+        self._roots: list[tuple] = []
+        self._levels = _levels_column(conn)
+        self._roots_sql = (
+            "INSERT INTO merkle_roots (root_hash, tx_start_id, tx_end_id, tx_count, "
+            f"created_at, signature, external_proof{', tree_levels' if self._levels else ''}) "
+            f"VALUES (?, ?, ?, ?, ?, ?, ?{', ?' if self._levels else ''})"
+        )
+
+    def add(self, record: tuple) -> None:
+        if record[0] == "T":
+            _, tx_id, p_hash, c_hash, proj, act, detail, ts = record
+            self._txs.append((tx_id, proj, act, detail, p_hash, c_hash, ts))
+            if len(self._txs) >= _INSERT_BATCH:
+                self.flush()
+        else:
+            _, _m_id, start, end, count, r_hash, created, sig, proof, levels = record
+            row = (r_hash, start, end, count, created, sig, proof)
+            self._roots.append(row + (levels,) if self._levels else row)
+
+    def flush(self) -> None:
+        if self._txs:
+            self._conn.executemany(
+                "INSERT INTO transactions "
+                "(id, project, action, detail, prev_hash, hash, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._txs,
+            )
+            self._txs.clear()
+        if self._roots:
+            self._conn.executemany(self._roots_sql, self._roots)
+            self._roots.clear()
+
+
+def import_segments(db_path: str | Path, paths: Iterable[str | Path]) -> dict:
+    """Verify segments while appending them to the ledger at ``db_path``.
+
+    Each segment must start right after the database's newest transaction
+    and chain from its hash. It is inserted in one transaction that is only
+    committed if the whole segment verifies. Segments the database already
+    holds are skipped, so re-running a nightly import is harmless. The import
+    stops at the first segment that fails.
+    """
+    report = _new_report(None)
+    report["imported"] = []
+    report["skipped"] = []
+    conn = sqlite3.connect(str(db_path), isolation_level=None)
+    try:
+        for path in _segment_paths(paths):
+            head = conn.execute(
+                "SELECT id, hash FROM transactions ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+            head_id, head_hash = head if head else (0, "GENESIS")
+            try:
+                with SegmentReader(path) as reader:
+                    if reader.last_tx <= head_id:
+                        report["skipped"].append(path.name)
+                        continue
+                    if reader.first_tx != head_id + 1:
+                        report["violations"].append(
+                            {"type": "segment_gap", "segment": path.name,
+                             "expected": head_id + 1, "actual": reader.first_tx}
+                        )
+                        break
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        inserter = _Inserter(conn)
+                        result = _check_segment(reader, head_hash, inserter.add)
+                        inserter.flush()
+                    except BaseException:
+                        conn.execute("ROLLBACK")
+                        raise
+            except LedgerArchiveError as exc:
+                report["violations"].append(
+                    {"type": "segment_corrupt", "segment": path.name, "error": str(exc)}
+                )
+                break
+            _merge(report, result)
+            if result["violations"]:
+                conn.execute("ROLLBACK")
+                break
+            conn.execute("COMMIT")
+            report["imported"].append(path.name)
+    finally:
+        conn.close()
+    report["valid"] = not report["violations"]
+    return report
@@ -0,0 +1,361 @@
+"""Ledger writer — appends to the hash chain from an in-memory head.
+
+Appending a transaction needs the hash of the previous one. Instead of
+reading it back with ``SELECT hash ... ORDER BY id DESC LIMIT 1`` on every
+write, ``LedgerWriter`` remembers the head it last wrote, the connection it
+wrote it on, and that connection's ``PRAGMA data_version``. The head is
+re-read only when:
+
+  * the append happens on a different connection (pooled or sync callers),
+  * ``data_version`` moved, i.e. another connection or process committed,
+  * an append failed or the caller rolled back (``invalidate()``).
+
+The same connection always sees its own uncommitted rows, so a cached head
+written inside a still-open transaction is valid for the next append on it.
+
+The number of transactions since the last Merkle checkpoint is tracked the
+same way. Their hashes also feed a ``MerkleAccumulator``: once it holds the
+ledger's adaptive batch size, its tree is sealed, and a background task on
+the ledger's own pool connection stores it as the next checkpoint without
+re-reading or re-hashing the range. When the accumulator cannot be trusted
+(reload after a foreign writer, rollback, backlog), that task falls back to
+``create_checkpoint_async``, which builds checkpoints from the table.
+
+``LedgerGroupCommitter`` is the group-commit mode on top of the writer:
+write operations (``store``, ``vote``, ``deprecate``) from concurrent
+callers run back to back in one transaction on a dedicated connection, so
+their ledger rows are chained and inserted together and the group pays for
+a single commit. Every caller is then woken with its own result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import threading
+from collections.abc import Awaitable, Callable, Sequence
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from cortex.config import LEDGER_GROUP_MAX, LEDGER_GROUP_WINDOW_MS
+from cortex.engine.bulk import append_chain_async, append_chain_sync
+from cortex.merkle import MerkleAccumulator
+from cortex.metrics import metrics
+
+if TYPE_CHECKING:
+    from cortex.connection_pool import CortexConnectionPool
+    from cortex.engine.ledger import ImmutableLedger
+
+logger = logging.getLogger("cortex")
+
+_HEAD = "SELECT id, hash FROM transactions ORDER BY id DESC LIMIT 1"
+_LAST_CHECKPOINT = "SELECT MAX(tx_end_id) FROM merkle_roots"
+_PENDING_HASHES = "SELECT id, hash FROM transactions WHERE id > ? ORDER BY id"
+
+Entry = tuple[str, str, dict[str, Any]]
+T = TypeVar("T")
+Work = Callable[[Any], Awaitable[Any]]
+
+
+class LedgerWriter:
+    """Serializes appends to ``transactions`` around a cached chain head.
+
+    Use one instance per engine and per connection kind: ``append_many`` is
+    guarded by an ``asyncio.Lock``, ``append_many_sync`` by a thread lock.
+    """
+
+    def __init__(self, ledger: ImmutableLedger | None = None):
+        self._ledger = ledger
+        self._lock = asyncio.Lock()
+        self._sync_lock = threading.Lock()
+        self._head_id = 0
+        self._head_hash: str | None = None  # None = unknown, re-read on next append
+        self._owner = None
+        self._data_version: int | None = None
+        self._checkpointed_to: int | None = None
+        self._checkpoint_task: asyncio.Task | None = None
+        self._tree: MerkleAccumulator | None = None  # leaves since the last checkpoint
+        self._tree_start = 0
+        self._sealed: list[tuple[int, int, str, str, bytes]] = []
+        self.reloads = 0
+
+    @property
+    def head(self) -> tuple[int, str | None]:
+        return self._head_id, self._head_hash
+
+    def invalidate(self) -> None:
+        """Forget the cached head, e.g. after rolling back a transaction."""
+        self._head_hash = None
+        self._owner = None
+        self._tree = None
+        self._sealed.clear()
+
+    def _is_current(self, conn, data_version: int) -> bool:
+        return (
+            self._head_hash is not None
+            and self._owner is conn
+            and self._data_version == data_version
+        )
+
+    def _adopt(self, conn, data_version: int, head: tuple | None) -> None:
+        self._head_id, self._head_hash = (head[0], head[1]) if head else (0, "GENESIS")
+        self._owner = conn
+        self._data_version = data_version
+        self._tree = None
+        self.reloads += 1
+
+    # ─── Async ────────────────────────────────────────────────────
+
+    async def append(self, conn, project: str, action: str, detail: dict[str, Any]) -> int:
+        """Append one transaction and return its id."""
+        return (await self.append_many(conn, [(project, action, detail)]))[0]
+
+    async def append_many(self, conn, entries: Sequence[Entry]) -> list[int]:
+        """Chain and insert ``entries`` in order; returns their transaction ids."""
+        async with self._lock:
+            cursor = await conn.execute("PRAGMA data_version")
+            data_version = (await cursor.fetchone())[0]
+            if not self._is_current(conn, data_version):
+                cursor = await conn.execute(_HEAD)
+                self._adopt(conn, data_version, await cursor.fetchone())
+                if self._ledger is not None and self._checkpointed_to is None:
+                    self._checkpointed_to = await _last_checkpoint_async(conn)
+            if self._ledger is not None and self._tree is None:
+                await self._seed_tree(conn)
+            try:
+                ids, hashes = await append_chain_async(conn, self._head_hash, entries)
+            except Exception:
+                self.invalidate()
+                raise
+            self._head_id, self._head_hash = ids[-1], hashes[-1]
+
+            if self._ledger is not None:
+                for _ in ids:
+                    self._ledger.record_write()
+                self._grow_tree(ids, hashes)
+
+        if self._ledger is not None:
+            self.schedule_checkpoint()
+        return ids
+
+    async def _seed_tree(self, conn) -> None:
+        """Rebuild the accumulator from the rows after the last checkpoint.
+
+        Skipped while more than a batch is pending; the fallback path
+        checkpoints that backlog first.
+        """
+        if self._checkpointed_to is None:
+            return
+        pending = self._head_id - self._checkpointed_to
+        if pending < 0 or pending > self._ledger.adaptive_batch_size:
+            return
+        self._tree, self._tree_start = MerkleAccumulator(), self._checkpointed_to + 1
+        if pending:
+            cursor = await conn.execute(_PENDING_HASHES, (self._checkpointed_to,))
+            rows = await cursor.fetchall()
+            self._grow_tree([r[0] for r in rows], [r[1] for r in rows])
+
+    def _grow_tree(self, ids: list[int], hashes: list[str]) -> None:
+        """Add leaves to the accumulator, sealing a checkpoint at the batch size."""
+        if self._tree is None:
+            return
+        batch_size = self._ledger.adaptive_batch_size
+        for tx_id, tx_hash in zip(ids, hashes, strict=True):
+            if tx_id != self._tree_start + self._tree.count:
+                self._tree = None  # gap in the ids: leave this range to the fallback
+                return
+            try:
+                self._tree.append(tx_hash)
+            except ValueError:
+                self._tree = None
+                return
+            if self._tree.count >= batch_size:
+                root_hash, levels = self._tree.pack()
+                self._sealed.append((self._tree_start, tx_id, tx_hash, root_hash, levels))
+                self._tree, self._tree_start = MerkleAccumulator(), tx_id + 1
+
+    def schedule_checkpoint(self) -> None:
+        """Start a background checkpoint if enough transactions are pending."""
+        if self._ledger is None or self._checkpointed_to is None:
+            return
+        if self._checkpoint_task is not None and not self._checkpoint_task.done():
+            return
+        if (
+            not self._sealed
+            and self._head_id - self._checkpointed_to < self._ledger.adaptive_batch_size
+        ):
+            return
+        self._checkpoint_task = asyncio.create_task(self._checkpoint())
+
+    async def _checkpoint(self) -> None:
+        """Store sealed checkpoints, or create due ones from the table as a fallback."""
+        try:
+            while self._sealed:
+                start_id, end_id, last_hash, root_hash, levels = self._sealed[0]
+                try:
+                    stored = await self._ledger.insert_checkpoint_async(
+                        start_id, end_id, last_hash, root_hash, levels
+                    )
+                except ValueError as e:
+                    logger.debug("Sealed checkpoint dropped: %s", e)
+                    self._sealed.clear()
+                    self._tree = None
+                    break
+                if stored is None:
+                    return  # not committed yet; retried after the next append
+                self._sealed.pop(0)
+                self._checkpointed_to = end_id
+            if self._tree is None:
+                while await self._ledger.create_checkpoint_async():
+                    pass
+                self._checkpointed_to = await self._ledger.last_checkpoint_async()
+        except Exception as e:
+            logger.warning("Auto-checkpoint failed: %s", e)
+            metrics.inc(
+                "cortex_ledger_checkpoint_failures_total",
+                meta={"error": str(e)},
+            )
+
+    async def drain(self) -> None:
+        """Wait for a background checkpoint still in flight."""
+        task = self._checkpoint_task
+        if task is not None and not task.done():
+            await task
+
+    # ─── Sync ─────────────────────────────────────────────────────
+
+    def append_sync(self, conn, project: str, action: str, detail: dict[str, Any]) -> int:
+        """Append one transaction and return its id (sync)."""
+        return self.append_many_sync(conn, [(project, action, detail)])[0]
+
+    def append_many_sync(self, conn, entries: Sequence[Entry]) -> list[int]:
+        """Chain and insert ``entries`` in order (sync). Checkpoints are not scheduled."""
+        with self._sync_lock:
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if not self._is_current(conn, data_version):
+                self._adopt(conn, data_version, conn.execute(_HEAD).fetchone())
+            try:
+                ids, hashes = append_chain_sync(conn, self._head_hash, entries)
+            except Exception:
+                self.invalidate()
+                raise
+            self._head_id, self._head_hash = ids[-1], hashes[-1]
+
+        if self._ledger is not None:
+            for _ in ids:
+                self._ledger.record_write()
+        return ids
+
+
+class LedgerGroupCommitter:
+    """Runs concurrent write operations in shared, group-committed transactions.
+
+    ``run(work)`` queues ``work``, an async callable taking a connection,
+    and waits for its group. A group is whatever was queued while the
+    previous one was committing, plus anything arriving within
+    ``window_ms`` (cut short at ``max_batch``). The group runs in one
+    ``BEGIN IMMEDIATE`` transaction on ``pool``, each operation inside its
+    own savepoint, so a failing operation is rolled back alone. Ledger
+    appends inside the operations go through ``writer`` on that single
+    connection, so they chain from its cached head with the same
+    ``compute_tx_hash`` v2 hashes as stand-alone writes. After the commit
+    every caller is woken with its operation's result.
+
+    ``pool`` should be a dedicated single-connection pool: it is the only
+    writer in group mode, so callers never contend for the write lock.
+    """
+
+    def __init__(
+        self,
+        pool: CortexConnectionPool,
+        writer: LedgerWriter,
+        window_ms: float = LEDGER_GROUP_WINDOW_MS,
+        max_batch: int = LEDGER_GROUP_MAX,
+    ):
+        self._pool = pool
+        self._writer = writer
+        self._window = window_ms / 1000
+        self._max_batch = max_batch
+        self._pending: list[tuple[Work, asyncio.Future]] = []
+        self._full = asyncio.Event()
+        self._flusher: asyncio.Task | None = None
+        self.groups = 0
+
+    async def run(self, work: Callable[[Any], Awaitable[T]]) -> T:
+        """Run ``work(conn)`` in the next group and return its result once committed.
+
+        ``work`` must not commit or roll back itself.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((work, future))
+        if len(self._pending) >= self._max_batch:
+            self._full.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush())
+        return await future
+
+    async def _flush(self) -> None:
+        while self._pending:
+            if len(self._pending) < self._max_batch:
+                if self._window > 0:
+                    try:
+                        await asyncio.wait_for(self._full.wait(), self._window)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await asyncio.sleep(0)  # let callers that are ready join
+            self._full.clear()
+            batch = self._pending[: self._max_batch]
+            del self._pending[: self._max_batch]
+            await self._commit(batch)
+
+    async def _commit(self, batch: list[tuple[Work, asyncio.Future]]) -> None:
+        done: list[tuple[asyncio.Future, Any]] = []
+        try:
+            async with self._pool.acquire() as conn:
+                await conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for work, future in batch:
+                        await conn.execute("SAVEPOINT ledger_group")
+                        try:
+                            result = await work(conn)
+                        except Exception as e:
+                            await conn.execute("ROLLBACK TO ledger_group")
+                            await conn.execute("RELEASE ledger_group")
+                            self._writer.invalidate()
+                            future.set_exception(e)
+                            continue
+                        await conn.execute("RELEASE ledger_group")
+                        done.append((future, result))
+                    await conn.commit()
+                except Exception:
+                    await conn.rollback()
+                    self._writer.invalidate()
+                    raise
+        except Exception as e:
+            logger.error("Ledger group commit of %d operations failed: %s", len(batch), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.groups += 1
+        metrics.inc("cortex_ledger_group_commits_total")
+        for future, result in done:
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Let queued operations commit, then close the dedicated pool."""
+        if self._flusher is not None and not self._flusher.done():
+            await self._flusher
+        await self._pool.close()
+
+
+async def _last_checkpoint_async(conn) -> int | None:
+    try:
+        cursor = await conn.execute(_LAST_CHECKPOINT)
+    except sqlite3.OperationalError:  # merkle_roots not migrated yet
+        return None
+    row = await cursor.fetchone()
+    return (row[0] or 0) if row else 0
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 
+from cortex.config import VECTOR_FORMAT
 from cortex.engine.models import Fact
 from cortex.search import SearchResult, semantic_search, text_search
 from cortex.temporal import build_temporal_filter_params, time_travel_filter
@@ -32,7 +33,7 @@ class QueryMixin:
         if not query or not query.strip():
             raise ValueError("query cannot be empty")
 
-        from cortex.graph import extract_entities, get_context_subgraph
+        from cortex.graph import attach_graph_context
 
         async with self.session() as conn:
             results = []
@@ -43,6 +44,8 @@ class QueryMixin:
                     top_k,
                     project,
                     as_of,
+                    vector_format=getattr(self, "_vector_format", VECTOR_FORMAT),
+                    partitioned=self._vector_partitioned,
                 )
             except Exception as e:
                 logger.warning("Semantic search failed: %s", e)
@@ -51,11 +54,7 @@ class QueryMixin:
                 results = await text_search(conn, query, project, limit=top_k, **kwargs)
 
             if results and graph_depth > 0:
-                for res in results:
-                    entities = extract_entities(res.content)
-                    seeds = [e["name"] for e in entities]
-                    if seeds:
-                        res.graph_context = await get_context_subgraph(conn, seeds, depth=graph_depth)
+                await attach_graph_context(conn, results, graph_depth)
 
             return results
 
@@ -2,6 +2,7 @@
 import logging
 from typing import Any
 
+from cortex.config import VECTOR_FORMAT
 from cortex.graph import extract_entities, get_context_subgraph
 from cortex.search import hybrid_search, semantic_search, text_search
 
@@ -22,10 +23,30 @@ class SearchMixin:
     ) -> list[Any]:
         """Perform hybrid search (Vector + Text) with optional Graph-RAG context."""
         async with self.session() as conn:
+            cache = getattr(self, "_search_cache", None)
+            key = None
+            if cache is not None:
+                head = await cache.ledger_head(conn, project)
+                key = cache.result_key(
+                    head,
+                    query,
+                    project,
+                    top_k,
+                    as_of,
+                    graph_depth=graph_depth,
+                    include_graph=include_graph,
+                )
+                cached = await cache.get_results(key)
+                if cached is not None:
+                    return cached
+
             try:
                 # 1. Perform Hybrid Search
                 embedder = self._get_embedder()
-                embedding = embedder.embed(query)
+                if cache is not None:
+                    embedding = await cache.embed(query, embedder.embed)
+                else:
+                    embedding = embedder.embed(query)
                 
                 results = await hybrid_search(
                     conn=conn,
@@ -34,6 +55,10 @@ class SearchMixin:
                     top_k=top_k,
                     project=project,
                     as_of=as_of,
+                    vector_format=getattr(self, "_vector_format", VECTOR_FORMAT),
+                    ann=getattr(self, "_ann", None),
+                    partitioned=self._vector_partitioned,
+                    pool=getattr(self, "_pool", None),
                 )
                 
                 if not results:
@@ -64,6 +89,8 @@ class SearchMixin:
                                 "seeds": seeds
                             }
 
+                if key is not None:
+                    await cache.put_results(key, results)
                 return results
 
             except Exception as e:
@@ -2,18 +2,63 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+from collections.abc import Sequence
 from typing import Any
 
 import aiosqlite
 
+from cortex.config import INGEST_CHUNK_SIZE, VECTOR_FORMAT
+from cortex.embeddings.worker import enqueue_embeddings_async
+from cortex.engine.bulk import (
+    insert_embeddings_async,
+    insert_facts_async,
+    iter_chunks,
+    link_transactions_async,
+    prepare_facts,
+)
+from cortex.search.vector import deactivate_embedding, encode_vector, insert_embedding_sql
 from cortex.temporal import now_iso
 
 logger = logging.getLogger("cortex")
 
 
 class StoreMixin:
+    def _notify_embedding_worker(self) -> None:
+        worker = getattr(self, "_embedding_worker", None)
+        if worker is not None:
+            worker.notify()
+
+    def _embeddings_partitioned(self) -> bool:
+        return self._vector_partitioned
+
+    def _ann_index(self):
+        """Shared ``AnnIndexManager`` when the engine has one (set by the API)."""
+        return getattr(self, "_ann", None)
+
+    async def _index_committed(
+        self, project: str, stored: Sequence[int] = (), deprecated: Sequence[int] = ()
+    ) -> None:
+        """Apply committed stores/deprecations to the ANN index.
+
+        Only ever called after the commit: a rolled-back write or a failed
+        group-commit savepoint must not leave phantom or missing hits. Writes
+        on a caller-owned connection are picked up by the periodic reconcile.
+        """
+        ann = self._ann_index()
+        if ann is None:
+            return
+        if deprecated:
+            await asyncio.to_thread(ann.remove, project, list(deprecated))
+        if stored and not getattr(self, "_deferred_embed", False):
+            await asyncio.to_thread(ann.add_committed, project, list(stored))
+
+    def _group_committer(self):
+        """``LedgerGroupCommitter`` when group commit is enabled on the engine."""
+        return getattr(self, "_ledger_group", None)
+
     async def store(
         self,
         project: str,
@@ -44,6 +89,28 @@ class StoreMixin:
                 tx_id,
             )
 
+        group = self._group_committer()
+        if group is not None and commit:
+            fact_id = await group.run(
+                lambda conn: self._store_impl(
+                    conn,
+                    project,
+                    content,
+                    fact_type,
+                    tags,
+                    confidence,
+                    source,
+                    meta,
+                    valid_from,
+                    False,
+                    tx_id,
+                )
+            )
+            if getattr(self, "_deferred_embed", False):
+                self._notify_embedding_worker()
+            await self._index_committed(project, stored=[fact_id])
+            return fact_id
+
         async with self.session() as conn:
             return await self._store_impl(
                 conn,
@@ -102,12 +169,17 @@ class StoreMixin:
         )
         fact_id = cursor.lastrowid
 
-        if getattr(self, "_auto_embed", False) and getattr(self, "_vec_available", False):
+        embed = getattr(self, "_auto_embed", False) and getattr(self, "_vec_available", False)
+        deferred = embed and getattr(self, "_deferred_embed", False)
+        if deferred:
+            await enqueue_embeddings_async(conn, [fact_id])
+        elif embed:
             try:
                 embedding = self._get_embedder().embed(content)
+                vector_format = getattr(self, "_vector_format", VECTOR_FORMAT)
                 await conn.execute(
-                    "INSERT INTO fact_embeddings (fact_id, embedding) VALUES (?, ?)",
-                    (fact_id, json.dumps(embedding)),
+                    insert_embedding_sql(vector_format, self._embeddings_partitioned()),
+                    (fact_id, encode_vector(embedding, vector_format)),
                 )
             except Exception as e:
                 logger.warning("Embedding failed for fact %d: %s", fact_id, e)
@@ -126,27 +198,104 @@ class StoreMixin:
 
         if commit:
             await conn.commit()
+            if deferred:
+                self._notify_embedding_worker()
+            await self._index_committed(project, stored=[fact_id])
 
         return fact_id
 
-    async def store_many(self, facts: list[dict[str, Any]]) -> list[int]:
-        if not facts:
-            raise ValueError("facts list cannot be empty")
+    async def store_many(
+        self,
+        facts: list[dict[str, Any]],
+        chunk_size: int | None = None,
+        commit_chunks: bool = False,
+    ) -> list[int]:
+        """Store a batch of facts: one embed_batch and executemany per chunk.
+
+        The batch is one transaction unless ``commit_chunks=True``, which
+        commits after every chunk (bulk imports that need a bounded WAL).
+        """
+        prepared = prepare_facts(facts)
 
         async with self.session() as conn:
-            ids = []
-            try:
-                for fact in facts:
-                    if "project" not in fact:
-                        raise ValueError("project cannot be empty")
-                    if "content" not in fact:
-                        raise ValueError("content cannot be empty")
-                    ids.append(await self.store(commit=False, conn=conn, **fact))
-                await conn.commit()
-                return ids
-            except Exception:
-                await conn.rollback()
-                raise
+            ids: list[int] = []
+            written: list[tuple[list[int], list[dict[str, Any]]]] = []
+            for chunk in iter_chunks(prepared, chunk_size or INGEST_CHUNK_SIZE):
+                try:
+                    chunk_ids = await self._store_chunk(conn, chunk)
+                    if commit_chunks:
+                        await conn.commit()
+                except Exception:
+                    self._ledger_writer.invalidate()
+                    await conn.rollback()
+                    raise
+                ids.extend(chunk_ids)
+                written.append((chunk_ids, chunk))
+                if commit_chunks:
+                    await self._chunks_committed(written)
+                    written = []
+            if written:
+                try:
+                    await conn.commit()
+                except Exception:
+                    self._ledger_writer.invalidate()
+                    await conn.rollback()
+                    raise
+                await self._chunks_committed(written)
+            return ids
+
+    async def _chunks_committed(self, written: list[tuple[list[int], list[dict]]]) -> None:
+        """Post-commit work for stored chunks: embedding worker or ANN index."""
+        if getattr(self, "_deferred_embed", False):
+            self._notify_embedding_worker()
+            return
+        ann = self._ann_index()
+        if ann is None:
+            return
+        by_project: dict[str, list[int]] = {}
+        for chunk_ids, chunk in written:
+            for fid, fact in zip(chunk_ids, chunk, strict=True):
+                by_project.setdefault(fact["project"], []).append(fid)
+        for proj, proj_ids in by_project.items():
+            await asyncio.to_thread(ann.add_committed, proj, proj_ids)
+
+    async def _store_chunk(
+        self, conn: aiosqlite.Connection, chunk: list[dict[str, Any]]
+    ) -> list[int]:
+        fact_ids = await insert_facts_async(conn, chunk)
+
+        if getattr(self, "_auto_embed", False) and getattr(self, "_vec_available", False):
+            if getattr(self, "_deferred_embed", False):
+                await enqueue_embeddings_async(conn, fact_ids)
+            else:
+                await insert_embeddings_async(
+                    conn,
+                    fact_ids,
+                    [f["content"] for f in chunk],
+                    self._get_embedder().embed_batch,
+                    getattr(self, "_vector_format", VECTOR_FORMAT),
+                    partitioned=self._embeddings_partitioned(),
+                )
+
+        from cortex.graph import process_facts_graph
+
+        await process_facts_graph(
+            conn,
+            [
+                (fid, f["content"], f["project"], f["ts"])
+                for fid, f in zip(fact_ids, chunk, strict=True)
+            ],
+        )
+
+        tx_ids = await self._log_transactions(
+            conn,
+            [
+                (f["project"], "store", {"fact_id": fid, "fact_type": f["fact_type"]})
+                for fid, f in zip(fact_ids, chunk, strict=True)
+            ],
+        )
+        await link_transactions_async(conn, fact_ids, tx_ids)
+        return fact_ids
 
     async def update(
         self,
@@ -195,6 +344,7 @@ class StoreMixin:
             )
             await self.deprecate(fact_id, reason=f"updated_by_{new_id}", conn=conn)
             await conn.commit()
+            await self._index_committed(project, stored=[new_id], deprecated=[fact_id])
             return new_id
 
     async def deprecate(
@@ -207,16 +357,24 @@ class StoreMixin:
             raise ValueError("Invalid fact_id")
 
         if conn:
-            return await self._deprecate_impl(conn, fact_id, reason)
-
-        async with self.session() as conn:
-            res = await self._deprecate_impl(conn, fact_id, reason)
-            await conn.commit()
-            return res
+            return await self._deprecate_impl(conn, fact_id, reason) is not None
+
+        group = self._group_committer()
+        if group is not None:
+            project = await group.run(lambda conn: self._deprecate_impl(conn, fact_id, reason))
+        else:
+            async with self.session() as conn:
+                project = await self._deprecate_impl(conn, fact_id, reason)
+                await conn.commit()
+        if project is None:
+            return False
+        await self._index_committed(project, deprecated=[fact_id])
+        return True
 
     async def _deprecate_impl(
         self, conn: aiosqlite.Connection, fact_id: int, reason: str | None
-    ) -> bool:
+    ) -> str | None:
+        """Deprecate without committing; the fact's project, or None if it was not active."""
         ts = now_iso()
         cursor = await conn.execute(
             "UPDATE facts SET valid_until = ?, updated_at = ?, "
@@ -228,19 +386,25 @@ class StoreMixin:
         if cursor.rowcount > 0:
             cursor = await conn.execute("SELECT project FROM facts WHERE id = ?", (fact_id,))
             row = await cursor.fetchone()
+            if getattr(self, "_vec_available", False):
+                await deactivate_embedding(conn, fact_id, self._embeddings_partitioned())
+            project = row[0] if row else "unknown"
             await self._log_transaction(
                 conn,
-                row[0] if row else "unknown",
+                project,
                 "deprecate",
                 {"fact_id": fact_id, "reason": reason},
             )
+            from cortex.graph import release_fact_mentions
+
+            await release_fact_mentions(conn, fact_id)
             # CDC: Enqueue for Neo4j sync
             await conn.execute(
                 "INSERT INTO graph_outbox (fact_id, action, status) VALUES (?, ?, ?)",
                 (fact_id, "deprecate_fact", "pending"),
             )
-            return True
-        return False
+            return project
+        return None
 
     async def register_ghost(
         self,
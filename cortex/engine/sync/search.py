@@ -33,6 +33,8 @@ class SyncSearchMixin:
                     embedding,
                     top_k=top_k,
                     project=project,
+                    vector_format=self._vector_format,
+                    partitioned=self._vector_partitioned,
                 )
                 if results:
                     return results
@@ -69,4 +71,6 @@ class SyncSearchMixin:
             project=project,
             vector_weight=vector_weight,
             text_weight=text_weight,
+            vector_format=self._vector_format,
+            partitioned=self._vector_partitioned,
         )
@@ -6,6 +6,7 @@ import json
 import logging
 
 from cortex.engine.models import Fact
+from cortex.search.vector import deactivate_embedding_sync, encode_vector, insert_embedding_sql
 from cortex.temporal import build_temporal_filter_params, now_iso
 
 logger = logging.getLogger("cortex.engine.sync.store")
@@ -39,8 +40,8 @@ class SyncStoreMixin:
             try:
                 embedding = self.embeddings._get_embedder().embed(content)
                 conn.execute(
-                    "INSERT INTO fact_embeddings (fact_id, embedding) VALUES (?, ?)",
-                    (fact_id, json.dumps(embedding)),
+                    insert_embedding_sql(self._vector_format, self._vector_partitioned),
+                    (fact_id, encode_vector(embedding, self._vector_format)),
                 )
             except Exception as e:
                 logger.warning("Embedding failed for fact %d: %s", fact_id, e)
@@ -132,12 +133,17 @@ class SyncStoreMixin:
         if cursor.rowcount > 0:
             cursor = conn.execute("SELECT project FROM facts WHERE id = ?", (fact_id,))
             row = cursor.fetchone()
+            if self._vec_available:
+                deactivate_embedding_sync(conn, fact_id, self._vector_partitioned)
             self._log_transaction_sync(
                 conn,
                 row[0] if row else "unknown",
                 "deprecate",
                 {"fact_id": fact_id, "reason": reason},
             )
+            from cortex.graph import release_fact_mentions_sync
+
+            release_fact_mentions_sync(conn, fact_id)
             # CDC: Encole for Neo4j sync (table graph_outbox)
             conn.execute(
                 "INSERT INTO graph_outbox (fact_id, action, status) VALUES (?, ?, ?)",
@@ -12,7 +12,9 @@ import sqlite3 as _sqlite3
 
 import sqlite_vec
 
+from cortex.engine.ledger_writer import LedgerWriter
 from cortex.engine.models import Fact
+from cortex.search.vector import deactivate_embedding_sync, encode_vector, insert_embedding_sql
 from cortex.temporal import now_iso
 
 logger = logging.getLogger("cortex")
@@ -64,6 +66,14 @@ class SyncCompatMixin:
             conn.executescript(stmt)
         conn.commit()
         run_migrations(conn)
+        if self._vec_available:
+            from cortex.search.vector import (
+                detect_vector_format_sync,
+                detect_vector_partitioned_sync,
+            )
+
+            self._vector_format = detect_vector_format_sync(conn)
+            self._vector_partitioned = detect_vector_partitioned_sync(conn)
         from cortex.engine import get_init_meta
 
         for k, v in get_init_meta():
@@ -99,16 +109,22 @@ class SyncCompatMixin:
             (project, content, fact_type, tags_json, confidence, ts, source, meta_json, ts, ts),
         )
         fact_id = cursor.lastrowid
-        if self._auto_embed and self._vec_available:
+        if self._auto_embed and self._vec_available and self._deferred_embed:
+            from cortex.embeddings.worker import enqueue_embeddings_sync
+
+            enqueue_embeddings_sync(conn, [fact_id])
+        elif self._auto_embed and self._vec_available:
             try:
                 embedding = self._get_embedder().embed(content)
                 conn.execute(
-                    "INSERT INTO fact_embeddings (fact_id, embedding) VALUES (?, ?)",
-                    (fact_id, json.dumps(embedding)),
+                    insert_embedding_sql(self._vector_format, self._vector_partitioned),
+                    (fact_id, encode_vector(embedding, self._vector_format)),
                 )
             except Exception as e:
                 logger.warning("Embedding failed for fact %d: %s", fact_id, e)
         conn.commit()
+        if self._auto_embed and self._vec_available and self._deferred_embed:
+            self._notify_embedding_worker()
 
         # Log to ledger (sync)
         import hashlib
@@ -135,6 +151,89 @@ class SyncCompatMixin:
 
         return fact_id
 
+    def store_many_sync(
+        self, facts: list[dict], chunk_size: int | None = None, commit_chunks: bool = False
+    ) -> list[int]:
+        """Store a batch of facts synchronously through the bulk ingest path.
+
+        Same contract as ``store_many``: everything is validated first, then
+        each chunk gets one ``embed_batch`` call and ``executemany`` writes,
+        all in one transaction unless ``commit_chunks=True``.
+        """
+        import hashlib
+
+        from cortex.config import INGEST_CHUNK_SIZE
+        from cortex.embeddings.worker import enqueue_embeddings_sync
+        from cortex.engine.bulk import (
+            insert_embeddings_sync,
+            insert_facts_sync,
+            iter_chunks,
+            link_transactions_sync,
+            prepare_facts,
+        )
+        from cortex.graph import process_facts_graph_sync
+
+        prepared = prepare_facts(facts)
+        conn = self._get_sync_conn()
+        ids: list[int] = []
+        for chunk in iter_chunks(prepared, chunk_size or INGEST_CHUNK_SIZE):
+            try:
+                fact_ids = insert_facts_sync(conn, chunk)
+                if self._auto_embed and self._vec_available and self._deferred_embed:
+                    enqueue_embeddings_sync(conn, fact_ids)
+                elif self._auto_embed and self._vec_available:
+                    insert_embeddings_sync(
+                        conn,
+                        fact_ids,
+                        [f["content"] for f in chunk],
+                        self._get_embedder().embed_batch,
+                        self._vector_format,
+                        partitioned=self._vector_partitioned,
+                    )
+                tx_ids = self._sync_ledger_writer().append_many_sync(
+                    conn,
+                    [
+                        (
+                            f["project"],
+                            "store",
+                            {
+                                "fact_id": fid,
+                                "content_hash": hashlib.sha256(f["content"].encode()).hexdigest(),
+                            },
+                        )
+                        for fid, f in zip(fact_ids, chunk, strict=True)
+                    ],
+                )
+                link_transactions_sync(conn, fact_ids, tx_ids)
+                # CDC: Encole for Neo4j sync
+                conn.executemany(
+                    "INSERT INTO graph_outbox (fact_id, action, status) VALUES (?, ?, ?)",
+                    [(fid, "store_fact", "pending") for fid in fact_ids],
+                )
+                process_facts_graph_sync(
+                    conn,
+                    [
+                        (fid, f["content"], f["project"], f["ts"])
+                        for fid, f in zip(fact_ids, chunk, strict=True)
+                    ],
+                )
+                if commit_chunks:
+                    conn.commit()
+            except Exception:
+                self._sync_ledger_writer().invalidate()
+                conn.rollback()
+                raise
+            ids.extend(fact_ids)
+        try:
+            conn.commit()
+        except Exception:
+            self._sync_ledger_writer().invalidate()
+            conn.rollback()
+            raise
+        if ids and self._auto_embed and self._vec_available and self._deferred_embed:
+            self._notify_embedding_worker()
+        return ids
+
     # ─── Search ─────────────────────────────────────────────────
 
     def search_sync(
@@ -162,6 +261,8 @@ class SyncCompatMixin:
                     embedding,
                     top_k=top_k,
                     project=project,
+                    vector_format=self._vector_format,
+                    partitioned=self._vector_partitioned,
                 )
                 if results:
                     return results
@@ -198,6 +299,8 @@ class SyncCompatMixin:
             project=project,
             vector_weight=vector_weight,
             text_weight=text_weight,
+            vector_format=self._vector_format,
+            partitioned=self._vector_partitioned,
         )
 
     # ─── Graph ──────────────────────────────────────────────────
@@ -269,27 +372,17 @@ class SyncCompatMixin:
 
     # ─── Ledger (Sync) ──────────────────────────────────────────
 
+    def _sync_ledger_writer(self) -> LedgerWriter:
+        """Chain-head cache for the sync connection (separate from the async one)."""
+        writer = getattr(self, "_sync_writer", None)
+        if writer is None:
+            writer = self._sync_writer = LedgerWriter(getattr(self, "_ledger", None))
+        return writer
+
     def _log_transaction_sync(self, conn, project, action, detail) -> int:
         """Synchronous version of _log_transaction."""
-        from cortex.canonical import canonical_json, compute_tx_hash
-
-        dj = canonical_json(detail)
-        ts = now_iso()
-        cursor = conn.execute("SELECT hash FROM transactions ORDER BY id DESC LIMIT 1")
-        prev = cursor.fetchone()
-        ph = prev[0] if prev else "GENESIS"
-        th = compute_tx_hash(ph, project, action, dj, ts)
-
-        c = conn.execute(
-            "INSERT INTO transactions "
-            "(project, action, detail, prev_hash, hash, timestamp) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            (project, action, dj, ph, th, ts),
-        )
-        tx_id = c.lastrowid
-
         # Note: Auto-checkpoint is skipped in sync mode for now to avoid complexity
-        return tx_id
+        return self._sync_ledger_writer().append_sync(conn, project, action, detail)
 
     def deprecate_sync(self, fact_id: int, reason: str | None = None) -> bool:
         """Synchronous version of deprecate."""
@@ -308,12 +401,17 @@ class SyncCompatMixin:
         if cursor.rowcount > 0:
             cursor = conn.execute("SELECT project FROM facts WHERE id = ?", (fact_id,))
             row = cursor.fetchone()
+            if self._vec_available:
+                deactivate_embedding_sync(conn, fact_id, self._vector_partitioned)
             self._log_transaction_sync(
                 conn,
                 row[0] if row else "unknown",
                 "deprecate",
                 {"fact_id": fact_id, "reason": reason},
             )
+            from cortex.graph import release_fact_mentions_sync
+
+            release_fact_mentions_sync(conn, fact_id)
             # CDC: Encole for Neo4j sync (table graph_outbox)
             conn.execute(
                 "INSERT INTO graph_outbox (fact_id, action, status) VALUES (?, ?, ?)",
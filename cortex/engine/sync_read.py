@@ -42,6 +42,8 @@ class SyncReadMixin:
                     embedding,
                     top_k=top_k,
                     project=project,
+                    vector_format=self._vector_format,
+                    partitioned=self._vector_partitioned,
                 )
                 if results:
                     return results
@@ -78,6 +80,8 @@ class SyncReadMixin:
             project=project,
             vector_weight=vector_weight,
             text_weight=text_weight,
+            vector_format=self._vector_format,
+            partitioned=self._vector_partitioned,
         )
 
     def graph_sync(self, project: str | None = None, limit: int = 50) -> dict:
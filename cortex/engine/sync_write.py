@@ -10,6 +10,8 @@ import logging
 import hashlib
 from typing import Any
 
+from cortex.engine.ledger_writer import LedgerWriter
+from cortex.search.vector import deactivate_embedding_sync, encode_vector, insert_embedding_sql
 from cortex.temporal import now_iso
 from cortex.sync.gitops import sync_fact_to_repo
 
@@ -32,6 +34,14 @@ class SyncWriteMixin:
             conn.executescript(stmt)
         conn.commit()
         run_migrations(conn)
+        if self._vec_available:
+            from cortex.search.vector import (
+                detect_vector_format_sync,
+                detect_vector_partitioned_sync,
+            )
+
+            self._vector_format = detect_vector_format_sync(conn)
+            self._vector_partitioned = detect_vector_partitioned_sync(conn)
 
         for k, v in get_init_meta():
             conn.execute(
@@ -73,8 +83,8 @@ class SyncWriteMixin:
             try:
                 embedding = self._get_embedder().embed(content)
                 conn.execute(
-                    "INSERT INTO fact_embeddings (fact_id, embedding) VALUES (?, ?)",
-                    (fact_id, json.dumps(embedding)),
+                    insert_embedding_sql(self._vector_format, self._vector_partitioned),
+                    (fact_id, encode_vector(embedding, self._vector_format)),
                 )
             except Exception as e:
                 logger.warning("Embedding failed for fact %d: %s", fact_id, e)
@@ -161,25 +171,16 @@ class SyncWriteMixin:
         conn.commit()
         return score
 
+    def _sync_ledger_writer(self) -> LedgerWriter:
+        """Chain-head cache for the sync connection (separate from the async one)."""
+        writer = getattr(self, "_sync_writer", None)
+        if writer is None:
+            writer = self._sync_writer = LedgerWriter(getattr(self, "_ledger", None))
+        return writer
+
     def _log_transaction_sync(self, conn, project, action, detail) -> int:
         """Synchronous version of _log_transaction."""
-        from cortex.canonical import canonical_json, compute_tx_hash
-
-        dj = canonical_json(detail)
-        ts = now_iso()
-        cursor = conn.execute("SELECT hash FROM transactions ORDER BY id DESC LIMIT 1")
-        prev = cursor.fetchone()
-        ph = prev[0] if prev else "GENESIS"
-        th = compute_tx_hash(ph, project, action, dj, ts)
-
-        c = conn.execute(
-            "INSERT INTO transactions "
-            "(project, action, detail, prev_hash, hash, timestamp) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            (project, action, dj, ph, th, ts),
-        )
-        tx_id = c.lastrowid
-        return tx_id
+        return self._sync_ledger_writer().append_sync(conn, project, action, detail)
 
     def deprecate_sync(self, fact_id: int, reason: str | None = None) -> bool:
         """Synchronous version of deprecate."""
@@ -198,6 +199,8 @@ class SyncWriteMixin:
         if cursor.rowcount > 0:
             cursor = conn.execute("SELECT project FROM facts WHERE id = ?", (fact_id,))
             row = cursor.fetchone()
+            if self._vec_available:
+                deactivate_embedding_sync(conn, fact_id, self._vector_partitioned)
             self._log_transaction_sync(
                 conn,
                 row[0] if row else "unknown",
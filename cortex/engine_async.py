@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 from collections.abc import AsyncIterator
@@ -7,18 +8,27 @@ from typing import Any
 
 import aiosqlite
 
-from cortex.canonical import canonical_json, compute_tx_hash
+from cortex.config import DEFERRED_EMBEDDINGS, LEDGER_GROUP_COMMIT, VECTOR_FORMAT
 from cortex.connection_pool import CortexConnectionPool
+from cortex.consensus.aggregates import (
+    consensus_score,
+    load_aggregate,
+    reconcile_aggregates,
+    record_vote,
+    rescore_entries,
+    vote_project,
+)
 from cortex.consensus.vote_ledger import ImmutableVoteLedger
-from cortex.embeddings import LocalEmbedder
+from cortex.embeddings import LocalEmbedder, create_embedder
 from cortex.engine.agent_mixin import AgentMixin
 from cortex.engine.ledger import ImmutableLedger
+from cortex.engine.ledger_writer import LedgerGroupCommitter, LedgerWriter
 from cortex.engine.search_mixin import SearchMixin
 
 # Mixins
 from cortex.engine.store_mixin import StoreMixin
 from cortex.graph import get_graph as _get_graph
-from cortex.temporal import now_iso
+from cortex.search.cache import create_search_cache
 
 logger = logging.getLogger("cortex.engine.async")
 
@@ -42,10 +52,27 @@ class AsyncCortexEngine(StoreMixin, SearchMixin, AgentMixin):
         self._db_path = Path(db_path)
         self._embedder: LocalEmbedder | None = None
         self._ledger: ImmutableLedger | None = None
+        self._ledger_writer = LedgerWriter(self._get_ledger())
+        self._ledger_group: LedgerGroupCommitter | None = None
+        if LEDGER_GROUP_COMMIT:
+            # Dedicated connection, so callers holding pooled ones cannot starve it
+            self._ledger_group = LedgerGroupCommitter(
+                CortexConnectionPool(str(db_path), min_connections=1, max_connections=1),
+                self._ledger_writer,
+            )
+        # Background vote checkpoints and streaming vote verification
+        self._vote_ledger = ImmutableVoteLedger(pool)
 
         # Mixin configuration
         self._auto_embed = True
+        # Fresh-schema defaults; the API lifespan copies what init_db detected
         self._vec_available = True  # Assuming local vector availability
+        self._vector_format = VECTOR_FORMAT
+        self._vector_partitioned = True  # project-partitioned fact_embeddings
+        self._deferred_embed = DEFERRED_EMBEDDINGS
+        self._embedding_worker = None  # Shared EmbeddingWorker, set by the API lifespan
+        self._ann = None  # Shared AnnIndexManager, set by the API lifespan
+        self._search_cache = create_search_cache()
 
     @asynccontextmanager
     async def session(self) -> AsyncIterator[aiosqlite.Connection]:
@@ -53,9 +80,16 @@ class AsyncCortexEngine(StoreMixin, SearchMixin, AgentMixin):
         async with self._pool.acquire() as conn:
             yield conn
 
+    async def close(self) -> None:
+        """Commit queued group-commit entries and release the committer's connection."""
+        if self._ledger_group is not None:
+            await self._ledger_group.close()
+            self._ledger_group = None
+        await self._vote_ledger.drain()
+
     def _get_embedder(self) -> LocalEmbedder:
         if self._embedder is None:
-            self._embedder = LocalEmbedder()
+            self._embedder = create_embedder()
         return self._embedder
 
     def _get_ledger(self) -> ImmutableLedger:
@@ -64,21 +98,10 @@ class AsyncCortexEngine(StoreMixin, SearchMixin, AgentMixin):
         return self._ledger
 
     async def _log_transaction(self, conn: aiosqlite.Connection, project: str, action: str, detail: dict[str, Any]) -> int:
-        dj = canonical_json(detail)
-        ts = now_iso()
-        async with conn.execute("SELECT hash FROM transactions ORDER BY id DESC LIMIT 1") as cursor:
-            prev = await cursor.fetchone()
-            ph = prev[0] if prev else "GENESIS"
-
-        th = compute_tx_hash(ph, project, action, dj, ts)
+        return await self._ledger_writer.append(conn, project, action, detail)
 
-        cursor = await conn.execute(
-            "INSERT INTO transactions (project, action, detail, prev_hash, hash, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
-            (project, action, dj, ph, th, ts)
-        )
-        tx_id = cursor.lastrowid
-        self._get_ledger().record_write()
-        return tx_id
+    async def _log_transactions(self, conn: aiosqlite.Connection, entries: list[tuple[str, str, dict[str, Any]]]) -> list[int]:
+        return await self._ledger_writer.append_many(conn, entries)
 
     # store() and deprecate() are now provided by StoreMixin
     # register_agent(), get_agent(), list_agents() are now provided by AgentMixin
@@ -128,80 +151,78 @@ class AsyncCortexEngine(StoreMixin, SearchMixin, AgentMixin):
         if value not in (-1, 0, 1):
              raise ValueError("Vote must be -1, 0, or 1")
 
+        if self._ledger_group is not None:
+            score = await self._ledger_group.run(
+                lambda conn: self._vote_impl(conn, fact_id, agent, value, signature)
+            )
+            self._vote_ledger.schedule_checkpoint(1)
+            return score
+
         async with self.session() as conn:
             await conn.execute(TX_BEGIN_IMMEDIATE)
             try:
-                # 1. Resolve agent_id (agent parameter is the identifier)
-                target_agent_id = agent
-
-                async with conn.execute("SELECT reputation_score FROM agents WHERE id = ?", (target_agent_id,)) as cursor:
-                    row = await cursor.fetchone()
-                    if not row:
-                        if target_agent_id in ("human", "api_agent", "system"):
-                            await conn.execute(
-                                "INSERT INTO agents (id, name, agent_type, reputation_score) VALUES (?, ?, ?, ?)",
-                                (target_agent_id, target_agent_id.capitalize(), "system" if target_agent_id != "human" else "human", 1.0 if target_agent_id == "human" else 0.5)
-                            )
-                            rep = 1.0 if target_agent_id == "human" else 0.5
-                        else:
-                            await conn.rollback()
-                            raise ValueError(f"Agent {target_agent_id} not registered")
-                    else:
-                        rep = row[0]
-
-                # 2. Append to Immutable Vote Ledger
-                ledger = ImmutableVoteLedger(conn)
-
-                # Record in consensus table for fast score calculation
-                if value == 0:
-                     await conn.execute("DELETE FROM consensus_votes_v2 WHERE fact_id = ? AND agent_id = ?", (fact_id, target_agent_id))
-                else:
-                     await conn.execute(
-                         "INSERT OR REPLACE INTO consensus_votes_v2 (fact_id, agent_id, vote, vote_weight, agent_rep_at_vote) VALUES (?, ?, ?, ?, ?)",
-                         (fact_id, target_agent_id, value, rep, rep)
-                     )
-
-                # Log transaction
-                tx_id = await self._log_transaction(conn, "consensus", "vote_v2", {"fact_id": fact_id, "agent_id": target_agent_id, "vote": value})
-
-                # Record in permanent immutable ledger
-                await ledger.append_vote(fact_id, target_agent_id, value, rep, signature, tx_id)
-
-                # Recalculate score
-                async with conn.execute(
-                    "SELECT v.vote, v.vote_weight, a.reputation_score "
-                    "FROM consensus_votes_v2 v "
-                    "JOIN agents a ON v.agent_id = a.id "
-                    "WHERE v.fact_id = ? AND a.is_active = 1",
-                    (fact_id,)
-                ) as cursor:
-                    votes = await cursor.fetchall()
-
-                if not votes:
-                    score = 1.0
-                else:
-                    weighted_sum = sum(v[0] * max(v[1], v[2]) for v in votes)
-                    total_weight = sum(max(v[1], v[2]) for v in votes)
-                    score = 1.0 + (weighted_sum / total_weight) if total_weight > 0 else 1.0
-
-                # Update fact
-                if score >= 1.5:
-                    conf = "verified"
-                elif score <= 0.5:
-                    conf = "disputed"
-                else:
-                    conf = "stated"
-
-                await conn.execute(
-                    "UPDATE facts SET consensus_score = ?, confidence = ? WHERE id = ?",
-                    (score, conf, fact_id)
-                )
-
+                score = await self._vote_impl(conn, fact_id, agent, value, signature)
                 await conn.commit()
-                return score
             except Exception as e:
                 await conn.rollback()
+                self._ledger_writer.invalidate()
                 raise e
+        self._vote_ledger.schedule_checkpoint(1)
+        return score
+
+    async def _vote_impl(
+        self, conn: aiosqlite.Connection, fact_id: int, agent: str, value: int, signature: str | None
+    ) -> float:
+        # 1. Resolve agent_id (agent parameter is the identifier)
+        target_agent_id = agent
+
+        async with conn.execute("SELECT reputation_score, is_active FROM agents WHERE id = ?", (target_agent_id,)) as cursor:
+            row = await cursor.fetchone()
+            if not row:
+                if target_agent_id in ("human", "api_agent", "system"):
+                    await conn.execute(
+                        "INSERT INTO agents (id, name, agent_type, reputation_score) VALUES (?, ?, ?, ?)",
+                        (target_agent_id, target_agent_id.capitalize(), "system" if target_agent_id != "human" else "human", 1.0 if target_agent_id == "human" else 0.5)
+                    )
+                    rep, active = (1.0 if target_agent_id == "human" else 0.5), True
+                else:
+                    raise ValueError(f"Agent {target_agent_id} not registered")
+            else:
+                rep, active = row[0], bool(row[1])
+
+        # 2. Append to Immutable Vote Ledger (checkpointed in the background after commit)
+        ledger = ImmutableVoteLedger(conn)
+
+        # Record in consensus table and update the fact's running aggregate
+        aggregate = await record_vote(conn, fact_id, target_agent_id, value, rep, active)
+
+        # Log transaction
+        await self._log_transaction(conn, await vote_project(conn, fact_id), "vote_v2", {"fact_id": fact_id, "agent_id": target_agent_id, "vote": value})
+
+        # Record in permanent immutable ledger
+        await ledger.append_vote(fact_id, target_agent_id, value, rep, signature, checkpoint=False)
+
+        return await self._apply_consensus_score(conn, fact_id, aggregate)
+
+    async def _apply_consensus_score(
+        self, conn: aiosqlite.Connection, fact_id: int, aggregate: tuple[float, float, int] | None
+    ) -> float:
+        # Score from the aggregate, O(1) in the number of votes
+        score = consensus_score(aggregate[0], aggregate[1]) if aggregate and aggregate[2] else 1.0
+
+        if score >= 1.5:
+            conf = "verified"
+        elif score <= 0.5:
+            conf = "disputed"
+        else:
+            conf = "stated"
+
+        await conn.execute(
+            "UPDATE facts SET consensus_score = ?, confidence = ? WHERE id = ?",
+            (score, conf, fact_id)
+        )
+
+        return score
 
     async def get_votes(self, fact_id: int) -> list[dict[str, Any]]:
         async with self.session() as conn:
@@ -251,16 +272,46 @@ class AsyncCortexEngine(StoreMixin, SearchMixin, AgentMixin):
                 "db_size_mb": round(db_size, 2),
             }
 
-    async def verify_ledger(self) -> dict[str, Any]:
-        return await self._get_ledger().verify_integrity_async()
+    async def verify_ledger(self, mode: str = "incremental") -> dict[str, Any]:
+        return await self._get_ledger().verify_integrity_async(mode)
 
     async def create_checkpoint(self) -> int | None:
         return await self._get_ledger().create_checkpoint_async()
 
-    async def verify_vote_ledger(self) -> dict[str, Any]:
+    async def ledger_proof(self, tx_id: int) -> dict[str, Any] | None:
+        return await self._get_ledger().inclusion_proof_async(tx_id)
+
+    async def verify_vote_ledger(self, mode: str = "incremental") -> dict[str, Any]:
+        return await self._vote_ledger.verify_chain_integrity(mode)
+
+    async def reconcile_consensus(
+        self, fact_ids: list[int] | None = None, repair: bool = True
+    ) -> dict[str, Any]:
+        """Audit consensus aggregates against the votes; rescore repaired facts."""
         async with self.session() as conn:
-            ledger = ImmutableVoteLedger(conn)
-            return await ledger.verify_chain_integrity()
+            await conn.execute(TX_BEGIN_IMMEDIATE)
+            try:
+                report = await reconcile_aggregates(conn, fact_ids, repair=repair)
+                if repair:
+                    for fact_id in report["drifted"]:
+                        await self._apply_consensus_score(
+                            conn, fact_id, await load_aggregate(conn, fact_id)
+                        )
+                    entries = await rescore_entries(conn, report["drifted"], "reconcile_consensus")
+                    if entries:
+                        await self._log_transactions(conn, entries)
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                self._ledger_writer.invalidate()
+                raise
+        return report
+
+    async def recompute_reputation(self, **kwargs) -> dict[str, Any]:
+        """Recompute all agent reputations in a worker thread (bulk, NumPy)."""
+        from cortex.consensus.reputation import recompute_reputation
+
+        return await asyncio.to_thread(recompute_reputation, self._db_path, **kwargs)
 
     async def get_graph(self, project: str | None = None, limit: int = 50) -> dict[str, Any]:
         async with self.session() as conn:
@@ -26,5 +26,9 @@ class ProjectNotFound(CortexError):
     """Raised when a project is not found."""
 
 
+class LedgerArchiveError(CortexError):
+    """Raised when a ledger segment file is truncated or not a segment at all."""
+
+
 class ThreadPoolExhausted(CortexError):
     """Raised when thread pool is saturated."""
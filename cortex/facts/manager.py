@@ -2,12 +2,24 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 from typing import Any
 
+from cortex.config import INGEST_CHUNK_SIZE
+from cortex.embeddings.worker import enqueue_embeddings_async
+from cortex.engine.bulk import (
+    insert_embeddings_async,
+    insert_facts_async,
+    iter_chunks,
+    link_transactions_async,
+    prepare_facts,
+)
 from cortex.engine.models import Fact, row_to_fact
 from cortex.search import SearchResult, semantic_search, text_search
+from cortex.search.hybrid import merge_unembedded
+from cortex.search.vector import deactivate_embedding, encode_vector, insert_embedding_sql
 from cortex.temporal import build_temporal_filter_params, now_iso
 
 logger = logging.getLogger("cortex.facts")
@@ -70,14 +82,20 @@ class FactManager:
         fact_id = cursor.lastrowid
 
         # Embedding integration via engine's embedding component
-        if self.engine._auto_embed and self.engine._vec_available:
+        deferred = self.engine._auto_embed and self.engine._vec_available and self.engine._deferred_embed
+        embedding = None
+        if deferred:
+            await enqueue_embeddings_async(conn, [fact_id])
+        elif self.engine._auto_embed and self.engine._vec_available:
             try:
                 embedding = self.engine.embeddings.embed(content)
+                vector_format = self.engine._vector_format
                 await conn.execute(
-                    "INSERT INTO fact_embeddings (fact_id, embedding) VALUES (?, ?)",
-                    (fact_id, json.dumps(embedding)),
+                    insert_embedding_sql(vector_format, self.engine._vector_partitioned),
+                    (fact_id, encode_vector(embedding, vector_format)),
                 )
             except Exception as e:
+                embedding = None
                 logger.warning("Embedding failed for fact %d: %s", fact_id, e)
 
         from cortex.graph import process_fact_graph
@@ -94,9 +112,112 @@ class FactManager:
 
         if commit:
             await conn.commit()
+            if deferred:
+                self.engine._notify_embedding_worker()
+            # Only committed facts go into the ANN index; with commit=False the
+            # caller commits and the periodic reconcile picks the fact up.
+            ann = self.engine._get_ann()
+            if ann is not None and embedding is not None:
+                await asyncio.to_thread(ann.add, project, [fact_id], [embedding])
 
         return fact_id
 
+    async def store_many(
+        self,
+        facts: list[dict[str, Any]],
+        chunk_size: int | None = None,
+        commit_chunks: bool = False,
+    ) -> list[int]:
+        """Store a batch of facts through the bulk ingest path.
+
+        Every fact is validated before anything is written. Facts are then
+        written ``chunk_size`` at a time (default ``INGEST_CHUNK_SIZE``), with
+        one ``embed_batch`` call per chunk, in a single transaction: if any
+        chunk fails, nothing is stored. Bulk imports that need a bounded WAL
+        can pass ``commit_chunks=True`` to commit after every chunk instead;
+        chunks committed before a failing one then stay.
+        """
+        prepared = prepare_facts(facts)
+        conn = await self.engine.get_conn()
+
+        ids: list[int] = []
+        written: list[tuple[list[int], list[dict[str, Any]]]] = []
+        for chunk in iter_chunks(prepared, chunk_size or INGEST_CHUNK_SIZE):
+            try:
+                chunk_ids = await self._store_chunk(conn, chunk)
+                if commit_chunks:
+                    await conn.commit()
+            except Exception:
+                self.engine._ledger_writer.invalidate()
+                await conn.rollback()
+                raise
+            ids.extend(chunk_ids)
+            written.append((chunk_ids, chunk))
+            if commit_chunks:
+                await self._chunks_committed(written)
+                written = []
+        if written:
+            try:
+                await conn.commit()
+            except Exception:
+                self.engine._ledger_writer.invalidate()
+                await conn.rollback()
+                raise
+            await self._chunks_committed(written)
+        return ids
+
+    async def _chunks_committed(self, written: list[tuple[list[int], list[dict]]]) -> None:
+        """Post-commit work for stored chunks: checkpoint, embedding worker, ANN."""
+        await self.engine._auto_checkpoint()
+        if self.engine._deferred_embed:
+            self.engine._notify_embedding_worker()
+            return
+        ann = self.engine._get_ann()
+        if ann is None:
+            return
+        by_project: dict[str, list[int]] = {}
+        for chunk_ids, chunk in written:
+            for fid, fact in zip(chunk_ids, chunk, strict=True):
+                by_project.setdefault(fact["project"], []).append(fid)
+        for proj, proj_ids in by_project.items():
+            await asyncio.to_thread(ann.add_committed, proj, proj_ids)
+
+    async def _store_chunk(self, conn, chunk: list[dict[str, Any]]) -> list[int]:
+        fact_ids = await insert_facts_async(conn, chunk)
+
+        if self.engine._auto_embed and self.engine._vec_available:
+            if self.engine._deferred_embed:
+                await enqueue_embeddings_async(conn, fact_ids)
+            else:
+                await insert_embeddings_async(
+                    conn,
+                    fact_ids,
+                    [f["content"] for f in chunk],
+                    self.engine.embeddings.embed_batch,
+                    self.engine._vector_format,
+                    partitioned=self.engine._vector_partitioned,
+                )
+
+        from cortex.graph import process_facts_graph
+
+        await process_facts_graph(
+            conn,
+            [
+                (fid, f["content"], f["project"], f["ts"])
+                for fid, f in zip(fact_ids, chunk, strict=True)
+            ],
+        )
+
+        tx_ids = await self.engine._log_transactions(
+            conn,
+            [
+                (f["project"], "store", {"fact_id": fid, "fact_type": f["fact_type"]})
+                for fid, f in zip(fact_ids, chunk, strict=True)
+            ],
+        )
+        await link_transactions_async(conn, fact_ids, tx_ids)
+        return fact_ids
+
     async def search(
         self,
         query: str,
@@ -108,27 +229,49 @@ class FactManager:
         if not query or not query.strip():
             raise ValueError("query cannot be empty")
         conn = await self.engine.get_conn()
+        graph_depth = kwargs.get("graph_depth", 0)
+
+        cache = self.engine._search_cache
+        key = None
+        if cache is not None:
+            head = await cache.ledger_head(conn, project)
+            key = cache.result_key(head, query, project, top_k, as_of, graph_depth=graph_depth)
+            cached = await cache.get_results(key)
+            if cached is not None:
+                return cached
+
+        results: list[SearchResult] = []
         try:
+            if cache is not None:
+                embedding = await cache.embed(query, self.engine.embeddings.embed)
+            else:
+                embedding = self.engine.embeddings.embed(query)
             results = await semantic_search(
-                conn, self.engine.embeddings.embed(query), top_k, project, as_of
+                conn,
+                embedding,
+                top_k,
+                project,
+                as_of,
+                vector_format=self.engine._vector_format,
+                ann=self.engine._get_ann(),
+                partitioned=self.engine._vector_partitioned,
             )
-            if results:
-                pass # Continue to graph resolution below
+            if results and self.engine._deferred_embed:
+                # Facts still queued for embedding are only reachable via FTS
+                results = await merge_unembedded(conn, query, results, top_k, project, as_of)
         except Exception as e:
             logger.warning("Semantic search failed: %s", e)
-        
+
         if not results:
             results = await text_search(conn, query, project, limit=top_k)
 
-        graph_depth = kwargs.get("graph_depth", 0)
         if results and graph_depth > 0:
-            from cortex.graph import extract_entities, get_context_subgraph
-            for res in results:
-                entities = extract_entities(res.content)
-                seeds = [e["name"] for e in entities]
-                if seeds:
-                    res.graph_context = await get_context_subgraph(conn, seeds, depth=graph_depth)
+            from cortex.graph import attach_graph_context
+
+            await attach_graph_context(conn, results, graph_depth)
 
+        if key is not None:
+            await cache.put_results(key, results)
         return results
 
     async def recall(
@@ -147,6 +290,34 @@ class FactManager:
         rows = await cursor.fetchall()
         return [row_to_fact(row) for row in rows]
 
+    async def recall_entity(
+        self, name: str, project: str | None = None, limit: int | None = None
+    ) -> list[Fact]:
+        """Active facts that mention an entity, newest first.
+
+        Answered from the ``fact_entities`` index; ``project`` restricts both
+        the entity and its facts, as entities are scoped per project.
+        """
+        conn = await self.engine.get_conn()
+        query = (
+            f"SELECT {_FACT_COLUMNS} FROM entities e "
+            "JOIN fact_entities fe ON fe.entity_id = e.id "
+            "JOIN facts f ON f.id = fe.fact_id "
+            "LEFT JOIN transactions t ON f.tx_id = t.id "
+            "WHERE e.name = ? AND f.valid_until IS NULL"
+        )
+        params: list = [name]
+        if project:
+            query += " AND e.project = ?"
+            params.append(project)
+        query += " ORDER BY f.created_at DESC, f.id DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        cursor = await conn.execute(query, params)
+        rows = await cursor.fetchall()
+        return [row_to_fact(row) for row in rows]
+
     async def update(
         self,
         fact_id: int,
@@ -198,18 +369,26 @@ class FactManager:
         if cursor.rowcount > 0:
             cursor = await conn.execute("SELECT project FROM facts WHERE id = ?", (fact_id,))
             row = await cursor.fetchone()
+            if self.engine._vec_available:
+                await deactivate_embedding(conn, fact_id, self.engine._vector_partitioned)
             await self.engine._log_transaction(
                 conn,
                 row[0] if row else "unknown",
                 "deprecate",
                 {"fact_id": fact_id, "reason": reason},
             )
+            from cortex.graph import release_fact_mentions
+
+            await release_fact_mentions(conn, fact_id)
             # CDC: Encole for Neo4j sync
             await conn.execute(
                 "INSERT INTO graph_outbox (fact_id, action, status) VALUES (?, ?, ?)",
                 (fact_id, "deprecate_fact", "pending"),
             )
             await conn.commit()
+            ann = self.engine._get_ann()
+            if ann is not None and row:
+                await asyncio.to_thread(ann.remove, row[0], [fact_id])
             return True
         return False
 
@@ -5,17 +5,24 @@ Entities, Relationships, and Graph Processing.
 
 from cortex.graph.backends import GraphBackend, Neo4jBackend, SQLiteBackend
 from cortex.graph.engine import (
+    attach_graph_context,
     detect_relationships,
     extract_entities,
+    fact_seeds,
     find_path,
     get_backend,
     get_context_subgraph,
+    get_context_subgraphs,
     get_graph,
     get_graph_sync,
     process_fact_graph,
     process_fact_graph_sync,
+    process_facts_graph,
+    process_facts_graph_sync,
     query_entity,
     query_entity_sync,
+    release_fact_mentions,
+    release_fact_mentions_sync,
 )
 from cortex.graph.types import Entity, Ghost, Relationship
 
@@ -30,11 +37,18 @@ __all__ = [
     "detect_relationships",
     "process_fact_graph",
     "process_fact_graph_sync",
+    "process_facts_graph",
+    "process_facts_graph_sync",
     "get_graph",
     "get_graph_sync",
     "query_entity",
     "query_entity_sync",
     "find_path",
     "get_context_subgraph",
+    "get_context_subgraphs",
+    "attach_graph_context",
+    "fact_seeds",
+    "release_fact_mentions",
+    "release_fact_mentions_sync",
     "get_backend",
 ]
@@ -57,3 +57,11 @@ class GraphBackend(ABC):
     ) -> dict:
         """Retrieve a subgraph centered around seed entities for RAG context."""
         pass
+
+    async def find_context_subgraphs(
+        self, seed_sets: list[list[str]], depth: int = 2, max_nodes: int = 50
+    ) -> list[dict]:
+        """One ``find_context_subgraph`` result per seed set, in order."""
+        return [
+            await self.find_context_subgraph(seeds, depth, max_nodes) for seeds in seed_sets
+        ]
@@ -1,54 +1,44 @@
 """SQLite Graph Algorithms Mixin."""
+import json
+import sqlite3
+
+from cortex.graph import traversal
+
 
 class SQLiteAlgorithmsMixin:
     """Mixin for graph algorithm operations."""
 
-    async def find_path(self, source: str, target: str, max_depth: int = 3) -> list:
-        """Find paths between entities using BFS."""
-        q_ids = "SELECT id, name FROM entities WHERE name IN (?, ?)"
+    async def _fetchall(self, sql: str, params=()) -> list:
         if self._is_async:
-            async with self.conn.execute(q_ids, (source, target)) as cursor:
-                id_map = {row[1]: row[0] for row in await cursor.fetchall()}
-        else:
-            id_map = {
-                row[1]: row[0] for row in self.conn.execute(q_ids, (source, target)).fetchall()
-            }
-
-        if source not in id_map or target not in id_map:
-            return []
-
-        start_id = id_map[source]
-        end_id = id_map[target]
-        queue = [(start_id, [])]
-        visited = {start_id}
-
-        while queue:
-            curr_id, path = queue.pop(0)
-            if len(path) >= max_depth:
-                continue
+            async with self.conn.execute(sql, params) as cursor:
+                return await cursor.fetchall()
+        return self.conn.execute(sql, params).fetchall()
 
-            q_neighbors = """SELECT e.id, e.name, er.relation_type, er.weight FROM entity_relations er
-                             JOIN entities e ON (CASE WHEN er.source_entity_id = ? THEN er.target_entity_id ELSE er.source_entity_id END = e.id)
-                             WHERE er.source_entity_id = ? OR er.target_entity_id = ?"""
-            if self._is_async:
-                async with self.conn.execute(q_neighbors, (curr_id, curr_id, curr_id)) as cursor:
-                    neighbors = await cursor.fetchall()
-            else:
-                neighbors = self.conn.execute(q_neighbors, (curr_id, curr_id, curr_id)).fetchall()
+    async def _snapshot(self) -> "traversal.GraphSnapshot | None":
+        """CSR snapshot of this database's graph, built once the graph is hot."""
+        try:
+            rows = await self._fetchall(traversal.HEAD_SQL)
+        except sqlite3.OperationalError:  # no ledger in this database
+            return None
+        db, head, max_edge_id = rows[0]
+        if not db or head is None:  # in-memory databases are not shared
+            return None
+        snapshot = traversal.get_snapshot(db, head)
+        if snapshot is None and traversal.wants_snapshot(db, head, max_edge_id):
+            entities = await self._fetchall(traversal.SNAPSHOT_ENTITIES_SQL)
+            relations = await self._fetchall(traversal.SNAPSHOT_RELATIONS_SQL)
+            snapshot = traversal.GraphSnapshot(head, entities, relations)
+            traversal.put_snapshot(db, snapshot)
+        return snapshot
 
-            for nid, nname, rtype, weight in neighbors:
-                new_step = {
-                    "source": source if curr_id == start_id else "intermediate",
-                    "target": nname,
-                    "type": rtype,
-                    "weight": weight,
-                }
-                if nid == end_id:
-                    return path + [new_step]
-                if nid not in visited:
-                    visited.add(nid)
-                    queue.append((nid, path + [new_step]))
-        return []
+    async def find_path(self, source: str, target: str, max_depth: int = 3) -> list:
+        """Find a shortest path between entities with a bidirectional recursive BFS."""
+        snapshot = await self._snapshot()
+        if snapshot is not None:
+            return snapshot.find_path(source, target, max_depth)
+        params = (source, target, (max_depth + 1) // 2, max_depth // 2)
+        rows = await self._fetchall(traversal.PATH_SQL, params)
+        return traversal.path_steps(source, rows)
 
     async def find_context_subgraph(
         self, seed_entities: list, depth: int = 2, max_nodes: int = 50
@@ -56,57 +46,54 @@ class SQLiteAlgorithmsMixin:
         """Retrieve a subgraph around seed entities."""
         if not seed_entities:
             return {"nodes": [], "edges": []}
-        nodes = {}
-        edges = []
-        visited_ids = set()
+        snapshot = await self._snapshot()
+        if snapshot is not None:
+            return snapshot.find_context_subgraph(seed_entities, depth, max_nodes)
 
-        placeholders = ",".join(["?"] * len(seed_entities))
-        q_init = f"SELECT id, name, entity_type FROM entities WHERE name IN ({placeholders})"
-        if self._is_async:
-            async with self.conn.execute(q_init, seed_entities) as cursor:
-                rows = await cursor.fetchall()
-        else:
-            rows = self.conn.execute(q_init, seed_entities).fetchall()
-
-        current_layer_ids = []
-        for row in rows:
-            eid, name, etype = row
-            nodes[name] = {"id": eid, "type": etype}
-            current_layer_ids.append(eid)
-            visited_ids.add(eid)
+        # Deepen one level at a time so a spent node budget skips the hubs
+        # of the next level.
+        seeds = json.dumps(seed_entities)
+        level = min(depth, 1)
+        rows = await self._fetchall(traversal.REACH_SQL, (seeds, level))
+        nodes, expanded = traversal.cut_layers(rows, level, max_nodes)
+        while level < depth and len(nodes) < max_nodes and rows and rows[-1][1] == level:
+            level += 1
+            rows = await self._fetchall(traversal.REACH_SQL, (seeds, level))
+            nodes, expanded = traversal.cut_layers(rows, level, max_nodes)
+        edges = []
+        if expanded:
+            edge_rows = await self._fetchall(traversal.EDGES_SQL, (json.dumps(expanded),))
+            edges = traversal.subgraph_edges(edge_rows)
+        return {"nodes": nodes, "edges": edges}
 
-        for _ in range(depth):
-            if not current_layer_ids or len(nodes) >= max_nodes:
-                break
-            phs = ",".join(["?"] * len(current_layer_ids))
-            q_expand = f"""SELECT e1.name, e1.entity_type, e1.id, e2.name, e2.entity_type, e2.id, er.relation_type, er.weight
-                          FROM entity_relations er
-                          JOIN entities e1 ON er.source_entity_id = e1.id
-                          JOIN entities e2 ON er.target_entity_id = e2.id
-                          WHERE er.source_entity_id IN ({phs}) OR er.target_entity_id IN ({phs})"""
-            params = current_layer_ids + current_layer_ids
-            if self._is_async:
-                async with self.conn.execute(q_expand, params) as cursor:
-                    rel_rows = await cursor.fetchall()
-            else:
-                rel_rows = self.conn.execute(q_expand, params).fetchall()
+    async def find_context_subgraphs(
+        self, seed_sets: list[list[str]], depth: int = 2, max_nodes: int = 50
+    ) -> list[dict]:
+        """Subgraphs for several seed sets from one traversal of their union.
 
-            next_layer_ids = []
-            for s_name, s_type, s_id, t_name, t_type, t_id, r_type, weight in rel_rows:
-                if s_name not in nodes:
-                    nodes[s_name] = {"id": s_id, "type": s_type}
-                    if s_id not in visited_ids:
-                        next_layer_ids.append(s_id)
-                        visited_ids.add(s_id)
-                if t_name not in nodes:
-                    nodes[t_name] = {"id": t_id, "type": t_type}
-                    if t_id not in visited_ids:
-                        next_layer_ids.append(t_id)
-                        visited_ids.add(t_id)
-                edge = {"source": s_name, "target": t_name, "type": r_type, "weight": weight}
-                if edge not in edges:
-                    edges.append(edge)
-            current_layer_ids = next_layer_ids
-            if len(nodes) >= max_nodes:
-                break
-        return {"nodes": [{"name": k, **v} for k, v in nodes.items()], "edges": edges}
+        Every seed set's neighbourhood lies inside the union's, so each
+        subgraph is cut from an in-memory adjacency of the union and equals
+        what ``find_context_subgraph`` returns for that set alone.
+        """
+        seeds = list(dict.fromkeys(name for seed_set in seed_sets for name in seed_set))
+        if not seeds:
+            return [{"nodes": [], "edges": []} for _ in seed_sets]
+        snapshot = await self._snapshot()
+        if snapshot is None:
+            # Entities closer than ``depth`` are the ones that get expanded;
+            # their relations bring in the outermost level.
+            inner = await self._fetchall(
+                traversal.REACH_SQL, (json.dumps(seeds), max(depth - 1, 0))
+            )
+            ids = {row[0] for row in inner}
+            relations = []
+            if depth > 0 and ids:
+                relations = await self._fetchall(
+                    traversal.INCIDENT_RELATIONS_SQL, (json.dumps(sorted(ids)),)
+                )
+                ids.update(end for rel in relations for end in rel[1:3])
+            entities = await self._fetchall(traversal.ENTITIES_SQL, (json.dumps(sorted(ids)),))
+            snapshot = traversal.GraphSnapshot(None, entities, relations)
+        return [
+            snapshot.find_context_subgraph(seed_set, depth, max_nodes) for seed_set in seed_sets
+        ]
@@ -3,11 +3,21 @@
 Extraction, relationship detection, and backend orchestration.
 """
 
+import json
 import logging
+import sqlite3
+from collections import OrderedDict
+from collections.abc import Iterable
 
 from cortex.config import GRAPH_BACKEND
 from cortex.graph.backends import GraphBackend, Neo4jBackend, SQLiteBackend
-from cortex.graph.patterns import COMMON_WORDS, ENTITY_PATTERNS, RELATION_SIGNALS
+from cortex.graph.patterns import (
+    COMMON_WORDS,
+    ENTITY_PATTERNS,
+    RELATION_SIGNALS,
+    TOOL_FOLD_UNSAFE,
+    TOOL_PATTERN,
+)
 
 logger = logging.getLogger("cortex.graph")
 
@@ -19,15 +29,36 @@ def get_backend(conn=None) -> GraphBackend:
     return SQLiteBackend(conn)  # type: ignore[arg-type]
 
 
+_PATTERNS = dict(ENTITY_PATTERNS)
+_ENTITY_ORDER = tuple(_PATTERNS)
+_SIGNALS = tuple(RELATION_SIGNALS.items())
+
+
 def extract_entities(content: str) -> list[dict]:
-    """Extract entities from text content using regex patterns."""
+    """Extract entities from text content using regex patterns.
+
+    Finds what ``ENTITY_PATTERNS`` finds type by type, but tools are matched
+    with the precompiled ``TOOL_PATTERN`` and the file, URL and project scans
+    are skipped when the text lacks the dot or hyphen they require.
+    """
     if not content or not content.strip():
         return []
+    dotted = "." in content
+    found = {
+        "file": _PATTERNS["file"].findall(content) if dotted else [],
+        "class": _PATTERNS["class"].findall(content),
+        "tool": (
+            _PATTERNS["tool"] if TOOL_FOLD_UNSAFE.search(content) else TOOL_PATTERN
+        ).findall(content),
+        "url": _PATTERNS["url"].findall(content) if dotted else [],
+        "project": _PATTERNS["project"].findall(content) if "-" in content else [],
+    }
+
     seen: set[str] = set()
     entities: list[dict] = []
-    for entity_type, pattern in ENTITY_PATTERNS:
-        for match in pattern.finditer(content):
-            name = match.group(1).strip()
+    for entity_type in _ENTITY_ORDER:
+        for name in dict.fromkeys(found[entity_type]):
+            name = name.strip()
             name_lower = name.lower()
             if len(name) < 2 or len(name) > 100 or name_lower in seen:
                 continue
@@ -38,109 +69,215 @@ def extract_entities(content: str) -> list[dict]:
     return entities
 
 
+_SEED_CACHE_SIZE = 10_000
+_seed_cache: OrderedDict[int, tuple[int, list[str]]] = OrderedDict()
+
+
+def fact_seeds(fact_id: int, content: str) -> list[str]:
+    """Entity names in a fact, cached per fact id.
+
+    The cache entry also records the content's hash, so an id reused by a
+    different database or for different text is extracted afresh.
+    """
+    key = hash(content)
+    cached = _seed_cache.get(fact_id)
+    if cached is not None and cached[0] == key:
+        _seed_cache.move_to_end(fact_id)
+        return cached[1]
+    seeds = [e["name"] for e in extract_entities(content)]
+    _seed_cache[fact_id] = (key, seeds)
+    if len(_seed_cache) > _SEED_CACHE_SIZE:
+        _seed_cache.popitem(last=False)
+    return seeds
+
+
 def detect_relationships(content: str, entities: list[dict]) -> list[dict]:
     """Detect relationships between extracted entities via signal matching."""
     if len(entities) < 2:
         return []
-    relationships: list[dict] = []
     content_lower = content.lower()
-    detected_relation = "related_to"
-    for relation_type, signals in RELATION_SIGNALS.items():
-        for signal in signals:
-            if signal in content_lower:
-                detected_relation = relation_type
-                break
-        if detected_relation != "related_to":
-            break
-    for i, source in enumerate(entities):
-        for target in entities[i + 1 :]:
-            if source["name"].lower() == target["name"].lower():
+    detected_relation = next(
+        (
+            relation_type
+            for relation_type, signals in _SIGNALS
+            if any(signal in content_lower for signal in signals)
+        ),
+        "related_to",
+    )
+    names = [(ent["name"], ent["name"].lower()) for ent in entities]
+    return [
+        {"source_name": source, "target_name": target, "relation_type": detected_relation}
+        for i, (source, source_lower) in enumerate(names)
+        for target, target_lower in names[i + 1 :]
+        if source_lower != target_lower
+    ]
+
+
+# Graph ingestion is set-based: every fact of a batch is extracted first, then
+# entities and relations are each written with one executemany upsert on their
+# unique keys (migration 018). Repeats within a batch are folded beforehand, so
+# the result matches processing the facts one by one.
+_ENTITY_UPSERT = (
+    "INSERT INTO entities (name, entity_type, project, first_seen, last_seen, mention_count) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(name, project) DO UPDATE SET "
+    "mention_count = mention_count + excluded.mention_count, last_seen = excluded.last_seen"
+)
+_ENTITY_IDS = (
+    "SELECT name, id FROM entities "
+    "WHERE project = ? AND name IN (SELECT value FROM json_each(?))"
+)
+_RELATION_UPSERT = (
+    "INSERT INTO entity_relations "
+    "(source_entity_id, target_entity_id, relation_type, weight, first_seen, source_fact_id) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(source_entity_id, target_entity_id) DO UPDATE SET "
+    "weight = weight + ?, relation_type = excluded.relation_type"
+)
+# Which entities each fact mentions (migration 019), written with the batch so
+# later lookups by fact or by entity never re-run extraction.
+_FACT_ENTITY_INSERT = "INSERT OR IGNORE INTO fact_entities (fact_id, entity_id) VALUES (?, ?)"
+
+# (fact_id, content, project, timestamp)
+FactGraphInput = tuple[int, str, str, str]
+
+
+class _GraphBatch:
+    """Entities and relationships extracted from a batch of facts."""
+
+    def __init__(self, facts: Iterable[FactGraphInput]):
+        self.entities: dict[tuple[str, str], list] = {}
+        self.facts: list[tuple[int, str, str, list[str], list[dict]]] = []
+        self.entity_count = 0
+        self.relation_count = 0
+        for fact_id, content, project, timestamp in facts:
+            entities = extract_entities(content)
+            if not entities:
                 continue
-            relationships.append(
-                {
-                    "source_name": source["name"],
-                    "target_name": target["name"],
-                    "relation_type": detected_relation,
-                }
-            )
-    return relationships
-
-
-async def process_fact_graph(
-    conn, fact_id: int, content: str, project: str, timestamp: str
-) -> tuple[int, int]:
-    """Process a fact for graph extraction (async).
+            relationships = detect_relationships(content, entities)
+            for ent in entities:
+                row = self.entities.get((ent["name"], project))
+                if row is None:
+                    self.entities[(ent["name"], project)] = [
+                        ent["name"], ent["entity_type"], project, timestamp, timestamp, 1,
+                    ]
+                else:
+                    row[4] = timestamp
+                    row[5] += 1
+            names = [ent["name"] for ent in entities]
+            self.facts.append((fact_id, project, timestamp, names, relationships))
+            self.entity_count += len(entities)
+            self.relation_count += len(relationships)
+
+    def entity_rows(self) -> list[tuple]:
+        return [tuple(row) for row in self.entities.values()]
+
+    def names_by_project(self) -> dict[str, str]:
+        """JSON name lists for the ``_ENTITY_IDS`` lookup, one per project."""
+        names: dict[str, list[str]] = {}
+        for name, project in self.entities:
+            names.setdefault(project, []).append(name)
+        return {project: json.dumps(batch) for project, batch in names.items()}
+
+    def relation_rows(self, ids: dict[tuple[str, str], int]) -> list[tuple]:
+        """Upsert rows: a new pair starts at 1.0 and every repeat adds 0.5."""
+        relations: dict[tuple[int, int], list] = {}
+        for fact_id, project, timestamp, _, relationships in self.facts:
+            for rel in relationships:
+                sid = ids.get((rel["source_name"], project))
+                tid = ids.get((rel["target_name"], project))
+                if not sid or not tid:
+                    continue
+                row = relations.get((sid, tid))
+                if row is None:
+                    relations[(sid, tid)] = [
+                        sid, tid, rel["relation_type"], 1.0, timestamp, fact_id, 0.5,
+                    ]
+                else:
+                    row[2] = rel["relation_type"]
+                    row[3] += 0.5
+                    row[6] += 0.5
+        return [tuple(row) for row in relations.values()]
+
+    def fact_entity_rows(self, ids: dict[tuple[str, str], int]) -> list[tuple[int, int]]:
+        return [
+            (fact_id, ids[(name, project)])
+            for fact_id, project, _, names, _ in self.facts
+            for name in names
+            if (name, project) in ids
+        ]
+
+
+async def process_facts_graph(conn, facts: Iterable[FactGraphInput]) -> tuple[int, int]:
+    """Extract and upsert the graph of many facts with one statement per table (async).
 
     Entity extraction and relationship detection are CPU-bound (regex),
     so they run synchronously. Only the DB writes use await.
+
+    Returns:
+        ``(entities, relationships)`` detected over all facts.
     """
-    entities = extract_entities(content)
-    if not entities:
+    batch = _GraphBatch(facts)
+    if not batch.entities:
         return 0, 0
-    relationships = detect_relationships(content, entities)
 
     try:
-        entity_ids: dict[str, int] = {}
-        for ent in entities:
-            cursor = await conn.execute(
-                "SELECT id, mention_count FROM entities WHERE name = ? AND project = ?",
-                (ent["name"], project),
-            )
-            row = await cursor.fetchone()
-            if row:
-                entity_id, count = row
-                await conn.execute(
-                    "UPDATE entities SET mention_count = ?, last_seen = ? WHERE id = ?",
-                    (count + 1, timestamp, entity_id),
-                )
-            else:
-                cursor = await conn.execute(
-                    "INSERT INTO entities "
-                    "(name, entity_type, project, first_seen, last_seen, mention_count) "
-                    "VALUES (?, ?, ?, ?, ?, 1)",
-                    (ent["name"], ent["entity_type"], project, timestamp, timestamp),
-                )
-                entity_id = cursor.lastrowid
-            entity_ids[ent["name"]] = entity_id
-
-        for rel in relationships:
-            sid = entity_ids.get(rel["source_name"])
-            tid = entity_ids.get(rel["target_name"])
-            if not sid or not tid:
-                continue
-            cursor = await conn.execute(
-                "SELECT id, weight FROM entity_relations "
-                "WHERE source_entity_id = ? AND target_entity_id = ?",
-                (sid, tid),
-            )
-            row = await cursor.fetchone()
-            if row:
-                rel_id, weight = row
-                await conn.execute(
-                    "UPDATE entity_relations SET weight = ?, relation_type = ? WHERE id = ?",
-                    (weight + 0.5, rel["relation_type"], rel_id),
-                )
-            else:
-                await conn.execute(
-                    "INSERT INTO entity_relations "
-                    "(source_entity_id, target_entity_id, relation_type, "
-                    "weight, first_seen, source_fact_id) "
-                    "VALUES (?, ?, ?, 1.0, ?, ?)",
-                    (sid, tid, rel["relation_type"], timestamp, fact_id),
-                )
+        await conn.executemany(_ENTITY_UPSERT, batch.entity_rows())
+        ids: dict[tuple[str, str], int] = {}
+        for project, names in batch.names_by_project().items():
+            async with conn.execute(_ENTITY_IDS, (project, names)) as cursor:
+                for name, entity_id in await cursor.fetchall():
+                    ids[(name, project)] = entity_id
+        await conn.executemany(_RELATION_UPSERT, batch.relation_rows(ids))
+        await conn.executemany(_FACT_ENTITY_INSERT, batch.fact_entity_rows(ids))
 
         # Neo4j dual-write (sync, external service)
         if GRAPH_BACKEND == "neo4j":
             try:
                 neo = Neo4jBackend()
-                for ent in entities:
-                    neo.upsert_entity(ent["name"], ent["entity_type"], project, timestamp)
+                for name, entity_type, project, _, timestamp, _ in batch.entity_rows():
+                    neo.upsert_entity(name, entity_type, project, timestamp)
             except Exception as e:
                 logger.warning("Neo4j dual-write failed: %s", e)
 
-        return len(entities), len(relationships)
+        return batch.entity_count, batch.relation_count
     except Exception as e:
-        logger.warning("Graph processing failed for fact %d: %s", fact_id, e)
+        logger.warning("Graph processing failed for %d fact(s): %s", len(batch.facts), e)
+        return 0, 0
+
+
+async def process_fact_graph(
+    conn, fact_id: int, content: str, project: str, timestamp: str
+) -> tuple[int, int]:
+    """Process a fact for graph extraction (async)."""
+    return await process_facts_graph(conn, [(fact_id, content, project, timestamp)])
+
+
+def process_facts_graph_sync(conn, facts: Iterable[FactGraphInput]) -> tuple[int, int]:
+    """Extract and upsert the graph of many facts (sync).
+
+    The SQLite backend gets the same set-based upserts as
+    :func:`process_facts_graph`. Other backends upsert one row at a time.
+    """
+    if GRAPH_BACKEND == "neo4j":
+        totals = [_process_fact_graph_backend(conn, *fact) for fact in facts]
+        return sum(t[0] for t in totals), sum(t[1] for t in totals)
+
+    batch = _GraphBatch(facts)
+    if not batch.entities:
+        return 0, 0
+
+    try:
+        conn.executemany(_ENTITY_UPSERT, batch.entity_rows())
+        ids: dict[tuple[str, str], int] = {}
+        for project, names in batch.names_by_project().items():
+            for name, entity_id in conn.execute(_ENTITY_IDS, (project, names)):
+                ids[(name, project)] = entity_id
+        conn.executemany(_RELATION_UPSERT, batch.relation_rows(ids))
+        conn.executemany(_FACT_ENTITY_INSERT, batch.fact_entity_rows(ids))
+        return batch.entity_count, batch.relation_count
+    except Exception as e:
+        logger.warning("Graph processing sync failed for %d fact(s): %s", len(batch.facts), e)
         return 0, 0
 
 
@@ -148,6 +285,12 @@ def process_fact_graph_sync(
     conn, fact_id: int, content: str, project: str, timestamp: str
 ) -> tuple[int, int]:
     """Process a fact for graph extraction (sync)."""
+    return process_facts_graph_sync(conn, [(fact_id, content, project, timestamp)])
+
+
+def _process_fact_graph_backend(
+    conn, fact_id: int, content: str, project: str, timestamp: str
+) -> tuple[int, int]:
     entities = extract_entities(content)
     if not entities:
         return 0, 0
@@ -173,6 +316,30 @@ def process_fact_graph_sync(
         return 0, 0
 
 
+_RELEASE_MENTIONS = (
+    "UPDATE entities SET mention_count = MAX(mention_count - 1, 0) "
+    "WHERE id IN (SELECT entity_id FROM fact_entities WHERE fact_id = ?)"
+)
+
+
+async def release_fact_mentions(conn, fact_id: int) -> int:
+    """Take a deprecated fact off its entities' ``mention_count`` (async).
+
+    The ``fact_entities`` rows are kept for history and time-travel search;
+    callers run this once, when the fact's ``valid_until`` is first set.
+
+    Returns:
+        Number of entities decremented.
+    """
+    cursor = await conn.execute(_RELEASE_MENTIONS, (fact_id,))
+    return cursor.rowcount
+
+
+def release_fact_mentions_sync(conn, fact_id: int) -> int:
+    """Take a deprecated fact off its entities' ``mention_count`` (sync)."""
+    return conn.execute(_RELEASE_MENTIONS, (fact_id,)).rowcount
+
+
 async def get_graph(conn, project: str | None = None, limit: int = 50) -> dict:
     """Get graph data for a project or all projects.
 
@@ -226,3 +393,58 @@ async def get_context_subgraph(conn, seeds: list[str], depth: int = 2, max_nodes
     """
     backend = get_backend(conn)
     return await backend.find_context_subgraph(seeds, depth, max_nodes)
+
+
+async def get_context_subgraphs(
+    conn, seed_sets: list[list[str]], depth: int = 2, max_nodes: int = 50
+) -> list[dict]:
+    """Retrieve one RAG subgraph per seed set, in order.
+
+    Same results as calling ``get_context_subgraph`` per set, but the SQLite
+    backend answers the whole batch from one traversal of the seeds' union.
+    """
+    backend = get_backend(conn)
+    return await backend.find_context_subgraphs(seed_sets, depth, max_nodes)
+
+
+_FACT_SEEDS = (
+    "SELECT fe.fact_id, e.name FROM fact_entities fe JOIN entities e ON e.id = fe.entity_id "
+    "WHERE fe.fact_id IN (SELECT value FROM json_each(?)) ORDER BY fe.fact_id, e.id"
+)
+
+
+async def indexed_fact_seeds(conn, fact_ids: list[int]) -> dict[int, list[str]]:
+    """Entity names per fact from ``fact_entities``, in one lookup.
+
+    Facts ingested before the table existed (or without entities) are absent.
+    """
+    seeds: dict[int, list[str]] = {}
+    try:
+        async with conn.execute(_FACT_SEEDS, (json.dumps(fact_ids),)) as cursor:
+            for fact_id, name in await cursor.fetchall():
+                seeds.setdefault(fact_id, []).append(name)
+    except sqlite3.OperationalError:  # database not migrated yet
+        return {}
+    return seeds
+
+
+async def attach_graph_context(conn, results: list, depth: int, max_nodes: int = 50) -> None:
+    """Set ``graph_context`` on search results that mention entities.
+
+    Seeds come from ``fact_entities`` (``fact_seeds`` for facts it does not
+    cover) and all subgraphs from one ``get_context_subgraphs`` call; results
+    without entities are left as is.
+    """
+    indexed = await indexed_fact_seeds(conn, [res.fact_id for res in results])
+    pending = [
+        (res, indexed.get(res.fact_id) or fact_seeds(res.fact_id, res.content))
+        for res in results
+    ]
+    pending = [(res, seeds) for res, seeds in pending if seeds]
+    if not pending:
+        return
+    subgraphs = await get_context_subgraphs(
+        conn, [seeds for _, seeds in pending], depth, max_nodes
+    )
+    for (res, _), subgraph in zip(pending, subgraphs, strict=True):
+        res.graph_context = subgraph
@@ -0,0 +1,368 @@
+"""Graph traversal — recursive SQL and in-memory CSR snapshots.
+
+Traversals run as ``WITH RECURSIVE`` queries: ``reach`` expands the seeds one
+hop per level over relations in both directions, up to the depth limit, and
+the minimum level per entity is its BFS distance. Shortest paths expand
+from both ends and meet in the middle, then walk back to each end through
+neighbours one level closer, taking the lowest relation id at each step,
+so every path is deterministic.
+
+A graph that keeps serving traversals while the ledger head (the latest
+``transactions`` id) stays put is *hot*: after ``GRAPH_SNAPSHOT_HOT_CALLS``
+such calls, the whole graph is loaded once into a CSR adjacency snapshot
+and later traversals run in memory until the next write moves the head.
+Snapshot and SQL traversals return identical results. Graph writes that do
+not log a transaction are only picked up by the next ledger write.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from cortex.config import GRAPH_SNAPSHOT_HOT_CALLS, GRAPH_SNAPSHOT_MAX_EDGES
+
+__all__ = [
+    "GraphSnapshot",
+    "clear_snapshots",
+    "get_snapshot",
+    "put_snapshot",
+    "wants_snapshot",
+]
+
+_MAX_SNAPSHOTS = 4
+_MAX_TRACKED = 64
+
+_STEP = """
+    SELECT CASE er.source_entity_id WHEN r.id THEN er.target_entity_id
+                ELSE er.source_entity_id END,
+           r.depth + 1
+    FROM {cte} r
+    JOIN entity_relations er
+      ON er.source_entity_id = r.id OR er.target_entity_id = r.id
+    WHERE r.depth < {limit}"""
+
+# Lowest relation id from ``w.id`` to a neighbour one level closer in ``dist``.
+_CLOSER = """(
+        SELECT x.id FROM entity_relations x
+        JOIN {dist} p ON p.id = CASE x.source_entity_id WHEN w.id THEN x.target_entity_id
+                                     ELSE x.source_entity_id END
+        WHERE (x.source_entity_id = w.id OR x.target_entity_id = w.id)
+          AND p.depth = w.{level} - 1
+        ORDER BY x.id LIMIT 1
+    )"""
+
+_OTHER_END = (
+    "CASE er.source_entity_id WHEN w.id THEN er.target_entity_id ELSE er.source_entity_id END"
+)
+
+# Bidirectional: ?3 levels out from the source, ?4 from the target. The
+# meeting entity with the smallest total distance (then the smallest
+# distance from the source, then the lowest id) splits the path in two.
+PATH_SQL = f"""
+WITH RECURSIVE
+fwd(id, depth) AS (
+    SELECT MIN(id), 0 FROM entities WHERE name = ?1
+    UNION{_STEP.format(cte="fwd", limit="?3")}
+),
+bwd(id, depth) AS (
+    SELECT MIN(id), 0 FROM entities WHERE name = ?2
+    UNION{_STEP.format(cte="bwd", limit="?4")}
+),
+ds(id, depth) AS (SELECT id, MIN(depth) FROM fwd GROUP BY id),
+dt(id, depth) AS (SELECT id, MIN(depth) FROM bwd GROUP BY id),
+meet(id, ds, dt) AS (
+    SELECT ds.id, ds.depth, dt.depth FROM ds JOIN dt ON dt.id = ds.id
+    ORDER BY ds.depth + dt.depth, ds.depth, ds.id LIMIT 1
+),
+back(id, depth, edge) AS (
+    SELECT id, ds, NULL FROM meet
+    UNION ALL
+    SELECT {_OTHER_END}, w.depth - 1, er.id
+    FROM back w
+    JOIN entity_relations er ON er.id = {_CLOSER.format(dist="ds", level="depth")}
+    WHERE w.depth > 0
+),
+ahead(id, depth, togo, edge) AS (
+    SELECT id, ds, dt, NULL FROM meet
+    UNION ALL
+    SELECT {_OTHER_END}, w.depth + 1, w.togo - 1, er.id
+    FROM ahead w
+    JOIN entity_relations er ON er.id = {_CLOSER.format(dist="dt", level="togo")}
+    WHERE w.togo > 0
+)
+SELECT n.depth, e.name, r.relation_type, r.weight
+FROM (
+    SELECT depth, id FROM back
+    UNION ALL SELECT depth, id FROM ahead WHERE edge IS NOT NULL
+) n
+JOIN entities e ON e.id = n.id
+LEFT JOIN (
+    SELECT depth, edge FROM back WHERE edge IS NOT NULL
+    UNION ALL SELECT depth - 1, edge FROM ahead WHERE edge IS NOT NULL
+) s ON s.depth = n.depth
+LEFT JOIN entity_relations r ON r.id = s.edge
+ORDER BY n.depth"""
+
+REACH_SQL = f"""
+WITH RECURSIVE reach(id, depth) AS (
+    SELECT id, 0 FROM entities WHERE name IN (SELECT value FROM json_each(?))
+    UNION{_STEP.format(cte="reach", limit="?")}
+)
+SELECT r.id, MIN(r.depth) AS depth, e.name, e.entity_type
+FROM reach r JOIN entities e ON e.id = r.id
+GROUP BY r.id
+ORDER BY depth, r.id"""
+
+EDGES_SQL = """
+SELECT er.id, s.name, t.name, er.relation_type, er.weight
+FROM entity_relations er
+JOIN entities s ON s.id = er.source_entity_id
+JOIN entities t ON t.id = er.target_entity_id
+WHERE er.source_entity_id IN (SELECT value FROM json_each(?1))
+   OR er.target_entity_id IN (SELECT value FROM json_each(?1))
+ORDER BY er.id"""
+
+# Database file, ledger head and a cheap upper bound on the relation count.
+HEAD_SQL = """
+SELECT (SELECT file FROM pragma_database_list WHERE name = 'main'),
+       (SELECT MAX(id) FROM transactions),
+       (SELECT MAX(id) FROM entity_relations)"""
+
+# Relations incident to the entities in the JSON array ?1.
+INCIDENT_RELATIONS_SQL = """
+SELECT id, source_entity_id, target_entity_id, relation_type, weight
+FROM entity_relations
+WHERE source_entity_id IN (SELECT value FROM json_each(?1))
+   OR target_entity_id IN (SELECT value FROM json_each(?1))
+ORDER BY id"""
+
+ENTITIES_SQL = """
+SELECT id, name, entity_type FROM entities
+WHERE id IN (SELECT value FROM json_each(?))
+ORDER BY id"""
+
+SNAPSHOT_ENTITIES_SQL = "SELECT id, name, entity_type FROM entities ORDER BY id"
+SNAPSHOT_RELATIONS_SQL = (
+    "SELECT id, source_entity_id, target_entity_id, relation_type, weight "
+    "FROM entity_relations ORDER BY id"
+)
+
+
+def path_steps(source: str, rows: list[tuple]) -> list[dict]:
+    """Turn ``(depth, name, relation_type, weight)`` rows of a walk into steps.
+
+    Row ``d`` holds the entity at distance ``d`` and the relation leading to
+    the entity at ``d + 1``.
+    """
+    return [
+        {
+            "source": source if depth == 0 else "intermediate",
+            "target": rows[depth + 1][1],
+            "type": rtype,
+            "weight": weight,
+        }
+        for depth, _, rtype, weight in rows[:-1]
+    ]
+
+
+def cut_layers(rows: list[tuple], depth: int, max_nodes: int) -> tuple[list[dict], list[int]]:
+    """Apply the ``max_nodes`` budget to ``(id, depth, name, type)`` rows.
+
+    Layers are expanded in order while fewer than ``max_nodes`` distinct
+    names have been reached, so the last expanded layer may overshoot the
+    budget. Returns the nodes (first entity per name) and the ids of the
+    expanded entities, whose relations form the subgraph's edges.
+    """
+    names: dict[str, dict] = {}
+    expanded: list[int] = []
+    layers = 0
+    i = 0
+    while layers <= depth:
+        start = i
+        while i < len(rows) and rows[i][1] == layers:
+            eid, _, name, etype = rows[i]
+            if name not in names:
+                names[name] = {"name": name, "id": eid, "type": etype}
+            i += 1
+        if layers == depth or i == start or len(names) >= max_nodes:
+            break
+        expanded.extend(row[0] for row in rows[start:i])
+        layers += 1
+    return list(names.values()), expanded
+
+
+def subgraph_edges(rows: list[tuple]) -> list[dict]:
+    """Edge dicts from ``(id, source, target, type, weight)`` rows, deduplicated."""
+    keys = dict.fromkeys(row[1:] for row in rows)
+    return [
+        {"source": source, "target": target, "type": rtype, "weight": weight}
+        for source, target, rtype, weight in keys
+    ]
+
+
+class GraphSnapshot:
+    """Undirected CSR adjacency of the graph at one ledger head.
+
+    Usually the whole graph; a batch of subgraph lookups also builds one
+    over just the neighbourhood of its seeds (``head`` is then ``None``).
+
+    ``indptr[i]:indptr[i + 1]`` slices ``neighbors`` and ``edges`` for the
+    entity at position ``i``; each entity's slice is ordered by relation id.
+    """
+
+    def __init__(self, head: int | None, entities: list[tuple], relations: list[tuple]):
+        import numpy as np
+
+        self.head = head
+        self.ids = [row[0] for row in entities]
+        self.names = [row[1] for row in entities]
+        self.types = [row[2] for row in entities]
+        self.by_name: dict[str, list[int]] = {}
+        for pos, name in enumerate(self.names):
+            self.by_name.setdefault(name, []).append(pos)
+        self.relations = relations
+
+        ids = np.asarray(self.ids, dtype=np.int64)
+        count = len(relations)
+        src = np.searchsorted(ids, np.fromiter((r[1] for r in relations), np.int64, count))
+        dst = np.searchsorted(ids, np.fromiter((r[2] for r in relations), np.int64, count))
+        ends = np.concatenate([src, dst])
+        others = np.concatenate([dst, src])
+        edges = np.concatenate([np.arange(count), np.arange(count)])
+        order = np.lexsort((edges, ends))
+        self.indptr = np.concatenate(
+            [[0], np.cumsum(np.bincount(ends, minlength=len(ids)))]
+        ).tolist()
+        self.neighbors = others[order]
+        self.edges = edges[order]
+        self.src, self.dst = src, dst
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.relations)
+
+    def _adjacent(self, pos: int) -> tuple[list[int], list[int]]:
+        lo, hi = self.indptr[pos], self.indptr[pos + 1]
+        return self.neighbors[lo:hi].tolist(), self.edges[lo:hi].tolist()
+
+    def _distances(self, seeds: list[int], depth: int, max_names: int = 0) -> dict[int, int]:
+        """BFS levels up to ``depth``; stops deepening at ``max_names`` names."""
+        dist = dict.fromkeys(seeds, 0)
+        names = {self.names[pos] for pos in dist} if max_names else set()
+        frontier = list(dist)
+        for level in range(1, depth + 1):
+            if not frontier or (max_names and len(names) >= max_names):
+                break
+            nxt = []
+            for pos in frontier:
+                for other in self._adjacent(pos)[0]:
+                    if other not in dist:
+                        dist[other] = level
+                        nxt.append(other)
+            if max_names:
+                names.update(self.names[pos] for pos in nxt)
+            frontier = nxt
+        return dist
+
+    def _closer(self, pos: int, dist: dict[int, int]) -> list[tuple[int, int]]:
+        """Steps ``(relation, entity)`` from ``pos`` down to level 0 of ``dist``."""
+        steps = []
+        while dist[pos] > 0:
+            for other, edge in zip(*self._adjacent(pos), strict=True):
+                if dist.get(other) == dist[pos] - 1:
+                    steps.append((edge, other))
+                    pos = other
+                    break
+        return steps
+
+    def find_path(self, source: str, target: str, max_depth: int) -> list[dict]:
+        if source not in self.by_name or target not in self.by_name:
+            return []
+        ds = self._distances(self.by_name[source][:1], (max_depth + 1) // 2)
+        dt = self._distances(self.by_name[target][:1], max_depth // 2)
+        common = [(ds[pos] + dt[pos], ds[pos], self.ids[pos], pos) for pos in ds.keys() & dt.keys()]
+        if not common:
+            return []
+        meet = min(common)[3]
+        back = self._closer(meet, ds)
+        nodes = [pos for _, pos in reversed(back)] + [meet]
+        edges = [edge for edge, _ in reversed(back)]
+        for edge, pos in self._closer(meet, dt):
+            edges.append(edge)
+            nodes.append(pos)
+        rows = [
+            (depth, self.names[pos], *self.relations[edges[depth]][3:])
+            for depth, pos in enumerate(nodes[:-1])
+        ]
+        return path_steps(source, rows + [(len(edges), self.names[nodes[-1]], None, None)])
+
+    def find_context_subgraph(self, seeds: list[str], depth: int, max_nodes: int) -> dict:
+        starts = [pos for name in dict.fromkeys(seeds) for pos in self.by_name.get(name, ())]
+        dist = self._distances(starts, depth, max_names=max_nodes)
+        rows = sorted(
+            ((self.ids[pos], level, self.names[pos], self.types[pos])
+             for pos, level in dist.items()),
+            key=lambda row: (row[1], row[0]),
+        )
+        nodes, expanded = cut_layers(rows, depth, max_nodes)
+        if not expanded:
+            return {"nodes": nodes, "edges": []}
+
+        import numpy as np
+
+        position = {self.ids[pos]: pos for pos in dist}
+        indptr = self.indptr
+        touched = np.unique(np.concatenate([
+            self.edges[indptr[pos]:indptr[pos + 1]]
+            for pos in map(position.__getitem__, expanded)
+        ])).tolist()
+        names = self.names
+        edge_rows = [
+            (rel[0], names[src], names[dst], rel[3], rel[4])
+            for rel, src, dst in zip(
+                map(self.relations.__getitem__, touched),
+                self.src[touched].tolist(),
+                self.dst[touched].tolist(),
+                strict=True,
+            )
+        ]
+        return {"nodes": nodes, "edges": subgraph_edges(edge_rows)}
+
+
+_SNAPSHOTS: OrderedDict[str, GraphSnapshot] = OrderedDict()
+_CALLS: OrderedDict[str, tuple[int, int]] = OrderedDict()
+
+
+def get_snapshot(db: str, head: int) -> GraphSnapshot | None:
+    """Snapshot of ``db`` taken at ``head``, if one is held."""
+    snapshot = _SNAPSHOTS.get(db)
+    if snapshot is None or snapshot.head != head:
+        return None
+    _SNAPSHOTS.move_to_end(db)
+    return snapshot
+
+
+def wants_snapshot(db: str, head: int, max_edge_id: int | None) -> bool:
+    """Count a traversal of ``db`` at ``head``; True once the graph is hot."""
+    if GRAPH_SNAPSHOT_HOT_CALLS <= 0 or (max_edge_id or 0) > GRAPH_SNAPSHOT_MAX_EDGES:
+        return False
+    seen_head, calls = _CALLS.pop(db, (head, 0))
+    calls = calls + 1 if seen_head == head else 1
+    _CALLS[db] = (head, calls)
+    if len(_CALLS) > _MAX_TRACKED:
+        _CALLS.popitem(last=False)
+    return calls >= GRAPH_SNAPSHOT_HOT_CALLS
+
+
+def put_snapshot(db: str, snapshot: GraphSnapshot) -> None:
+    _SNAPSHOTS[db] = snapshot
+    _SNAPSHOTS.move_to_end(db)
+    if len(_SNAPSHOTS) > _MAX_SNAPSHOTS:
+        _SNAPSHOTS.popitem(last=False)
+
+
+def clear_snapshots() -> None:
+    """Drop every snapshot and hotness counter."""
+    _SNAPSHOTS.clear()
+    _CALLS.clear()
+
@@ -4,6 +4,7 @@ CORTEX v4.0 — Neural Hive API.
 Endpoints for visualizing the memory graph in 3D.
 """
 
+import json
 import sqlite3
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -40,7 +41,7 @@ def get_hive_graph(
 ):
     """
     Get the knowledge graph for 3D visualization.
-    Nodes are facts, links are semantic similarities.
+    Nodes are facts, links join facts that mention the same entities.
     """
     from cortex.config import DB_PATH
 
@@ -87,11 +88,27 @@ def get_hive_graph(
                 )
             )
 
-        # 2. Fetch edges (semantic connections)
-        # using vec_distance if available, or just random/temporal for now if no embeddings
-        # For this MVP, we will try to get connections from embeddings if possible.
-
+        # 2. Fetch edges: facts that mention the same entities (fact_entities),
+        # weighted by how many they share.
         links = []
+        try:
+            ids_json = json.dumps(sorted(node_ids))
+            link_rows = conn.execute(
+                """
+                SELECT a.fact_id, b.fact_id, COUNT(*) AS shared
+                FROM fact_entities a
+                JOIN fact_entities b ON b.entity_id = a.entity_id AND b.fact_id > a.fact_id
+                WHERE a.fact_id IN (SELECT value FROM json_each(?))
+                  AND b.fact_id IN (SELECT value FROM json_each(?))
+                GROUP BY a.fact_id, b.fact_id
+                ORDER BY shared DESC, a.fact_id, b.fact_id
+                LIMIT ?
+                """,
+                (ids_json, ids_json, limit * 4),
+            ).fetchall()
+            links = [GraphLink(source=a, target=b, value=float(n)) for a, b, n in link_rows]
+        except sqlite3.Error:
+            links = []
 
         # Check if vectors exist
         try:
@@ -100,12 +117,8 @@ def get_hive_graph(
         except sqlite3.Error:
             has_vecs = False
 
-        if has_vecs:
-            # Slow O(N^2) approach for MVP or use sqlite-vec knn on a subset
-            # Let's just link sequential items for now to ensure visualization works
-            # Real implementation needs optimized KNN query
-
-            # Simple temporal links for MVP 1.0
+        if has_vecs and not links:
+            # Simple temporal links for MVP 1.0 when no facts share entities
             prev_id = None
             for node in nodes:
                 if prev_id:
@@ -4,8 +4,5 @@ The canonical implementation lives in ``cortex.engine.ledger``.
 This module re-exports for backward compatibility.
 """
 
-from cortex.engine.ledger import (  # noqa: F401
-    ImmutableLedger,
-    MerkleNode,
-    MerkleTree,
-)
+from cortex.engine.ledger import ImmutableLedger  # noqa: F401
+from cortex.merkle import MerkleNode, MerkleTree  # noqa: F401
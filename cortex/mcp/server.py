@@ -15,8 +15,8 @@ from cortex.mcp.utils import (
     AsyncConnectionPool,
     MCPMetrics,
     MCPServerConfig,
-    SimpleAsyncCache,
 )
+from cortex.search.cache import SearchCache
 
 logger = logging.getLogger("cortex.mcp.server")
 
@@ -47,7 +47,8 @@ class _MCPContext:
         self.metrics = MCPMetrics()
         self.executor = ThreadPoolExecutor(max_workers=cfg.max_workers)
         self.pool = AsyncConnectionPool(cfg.db_path, max_connections=cfg.max_workers)
-        self.search_cache = SimpleAsyncCache(maxsize=cfg.query_cache_size)
+        # Shared by the per-call engines; invalidated per project by ledger head.
+        self.search_cache = SearchCache(size=cfg.query_cache_size)
         self._initialized = False
 
     async def ensure_ready(self) -> None:
@@ -99,7 +100,6 @@ def _register_store_tool(mcp: "FastMCP", ctx: _MCPContext) -> None:
             )
 
         ctx.metrics.record_request()
-        ctx.search_cache.clear()
         return f"✓ Stored fact #{fact_id} in project '{project}'"
 
 
@@ -122,36 +122,29 @@ def _register_search_tool(mcp: "FastMCP", ctx: _MCPContext) -> None:
             logger.warning("MCP Guard rejected search: %s", e)
             return f"❌ Rejected: {e}"
 
-        cache_key = f"{query}:{project}:{top_k}"
-        cached_result = ctx.search_cache.get(cache_key)
-        if cached_result:
-            ctx.metrics.record_request(cached=True)
-            return cached_result
-
+        hits = ctx.search_cache.hits
         async with ctx.pool.acquire() as conn:
             engine = CortexEngine(ctx.cfg.db_path, auto_embed=False)
             engine._conn = conn
+            engine._search_cache = ctx.search_cache
 
             results = await engine.search(
                 query,
                 project or None,
                 min(max(top_k, 1), 20),
             )
+        ctx.metrics.record_request(cached=ctx.search_cache.hits > hits)
 
         if not results:
-            ctx.search_cache.set(cache_key, "No results found.")
             return "No results found."
 
-        ctx.metrics.record_request()
         lines = [f"Found {len(results)} results:\n"]
         for r in results:
             lines.append(
                 f"[#{r.fact_id}] (score: {r.score:.3f}) [{r.project}/{r.fact_type}]\n{r.content}\n"
             )
 
-        output = "\n".join(lines)
-        ctx.search_cache.set(cache_key, output)
-        return output
+        return "\n".join(lines)
 
 
 def _register_status_tool(mcp: "FastMCP", ctx: _MCPContext) -> None:
@@ -183,19 +176,24 @@ def _register_ledger_tool(mcp: "FastMCP", ctx: _MCPContext) -> None:
     """Register the ``cortex_ledger_verify`` tool on *mcp*."""
 
     @mcp.tool()
-    async def cortex_ledger_verify() -> str:
-        """Perform a full integrity check on the CORTEX ledger."""
+    async def cortex_ledger_verify(full: bool = False) -> str:
+        """Check the CORTEX ledger's integrity.
+
+        Only transactions added since the last verified checkpoint are
+        checked unless ``full`` is set, which re-verifies from genesis.
+        """
         await ctx.ensure_ready()
 
         # ImmutableLedger expects a pool, not a single connection
         ledger = ImmutableLedger(ctx.pool)
-        report = await ledger.verify_integrity_async()
+        report = await ledger.verify_integrity_async("full" if full else "incremental")
 
         if report["valid"]:
             return (
-                f"✅ Ledger Integrity: OK\n"
+                f"✅ Ledger Integrity: OK ({report['mode']})\n"
                 f"Transactions verified: {report['tx_checked']}\n"
-                f"Roots checked: {report['roots_checked']}"
+                f"Roots checked: {report['roots_checked']}\n"
+                f"Verified up to TX: {report['verified_to']}"
             )
         return (
             f"❌ Ledger Integrity: VIOLATION\n"
@@ -1,13 +1,201 @@
 """
 CORTEX v4.1 — Merkle Tree Implementation.
-Standard Merkle Tree for cryptographic verification of transactions.
+
+The one Merkle engine behind the transaction ledger, the vote ledger and
+checkpoint inclusion proofs. The scheme is unchanged since v4.0: a parent
+is ``sha256(left_hex + right_hex)`` over the lowercase hex digests of its
+children, an odd last node is paired with itself, and the root of a single
+leaf is the leaf.
+
+Nodes are raw 32-byte digests in preallocated ``bytearray`` buffers, and
+levels are built iteratively. Two sibling digests sit next to each other,
+so one ``hexlify`` of the 64-byte slice yields exactly the ASCII bytes the
+string scheme hashed, and roots are byte-identical without building a hex
+string per node. ``MerkleAccumulator`` appends leaves one at a time and
+keeps every completed node, so a checkpoint over the leaves it has seen is
+finished in O(log n) instead of rebuilt from the transactions.
 """
 
 from __future__ import annotations
 
 import hashlib
+from binascii import hexlify
 from dataclasses import dataclass
 
+DIGEST_SIZE = 32  # bytes per SHA-256 node in a packed level blob
+_PAIR = 2 * DIGEST_SIZE
+_HEX_SIZE = 2 * DIGEST_SIZE
+
+_sha256 = hashlib.sha256
+
+
+def hash_pair(left: str, right: str) -> str:
+    """Hash two child hashes together (hex concatenation, as in every checkpoint)."""
+    return _sha256((left + right).encode()).hexdigest()
+
+
+def level_sizes(leaf_count: int) -> list[int]:
+    """Node count of each level above the leaves, bottom-up; the last is the root."""
+    sizes = []
+    while leaf_count > 1:
+        leaf_count = (leaf_count + 1) // 2
+        sizes.append(leaf_count)
+    return sizes
+
+
+def _leaf_digests(leaves: list[str]) -> bytes | None:
+    """Leaves as one buffer of raw digests, or None if any is not lowercase SHA-256 hex."""
+    if any(len(leaf) != _HEX_SIZE for leaf in leaves):
+        return None
+    joined = "".join(leaves)
+    try:
+        raw = bytes.fromhex(joined)
+    except ValueError:
+        return None
+    # Uppercase hex would hash differently once re-encoded
+    return raw if raw.hex() == joined else None
+
+
+def _hash_level(src, src_off: int, count: int, dst: bytearray, dst_off: int) -> None:
+    """Hash ``count`` digests at ``src[src_off:]`` pairwise into ``dst[dst_off:]``."""
+    view = memoryview(src)
+    end = src_off + (count // 2) * _PAIR
+    for off in range(src_off, end, _PAIR):
+        dst[dst_off : dst_off + DIGEST_SIZE] = _sha256(hexlify(view[off : off + _PAIR])).digest()
+        dst_off += DIGEST_SIZE
+    if count % 2:
+        last = hexlify(view[end : end + DIGEST_SIZE])
+        dst[dst_off : dst_off + DIGEST_SIZE] = _sha256(last + last).digest()
+
+
+def _hash_leaves(leaves: list[str], dst: bytearray) -> None:
+    """First level above ``leaves`` into the start of ``dst``."""
+    raw = _leaf_digests(leaves)
+    if raw is not None:
+        _hash_level(raw, 0, len(leaves), dst, 0)
+        return
+    # Legacy or forged leaves that are not digests: hash the strings as stored
+    for pos, i in enumerate(range(0, len(leaves), 2)):
+        right = leaves[i + 1] if i + 1 < len(leaves) else leaves[i]
+        start = pos * DIGEST_SIZE
+        dst[start : start + DIGEST_SIZE] = _sha256((leaves[i] + right).encode()).digest()
+
+
+def pack_levels(leaves: list[str]) -> tuple[str, bytes]:
+    """Build the tree over ``leaves``; return its root and packed internal levels.
+
+    The blob holds every node above the leaves as a raw 32-byte digest,
+    level by level from the bottom, so the root is its last digest. Node
+    ``i`` of level ``k`` sits at ``sum(level_sizes(n)[:k]) + i``.
+    """
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+    sizes = level_sizes(len(leaves))
+    if not sizes:
+        return leaves[0], b""
+
+    packed = bytearray(sum(sizes) * DIGEST_SIZE)
+    _hash_leaves(leaves, packed)
+    src = 0
+    for below in sizes[:-1]:
+        dst = src + below * DIGEST_SIZE
+        _hash_level(packed, src, below, packed, dst)
+        src = dst
+    return packed[-DIGEST_SIZE:].hex(), bytes(packed)
+
+
+def merkle_root(leaves: list[str]) -> str | None:
+    """Root of the tree over ``leaves`` (``None`` when there are none)."""
+    if not leaves:
+        return None
+    return pack_levels(leaves)[0]
+
+
+def proof_from_levels(
+    packed: bytes, leaf_count: int, index: int, sibling_leaf: str
+) -> list[tuple[str, str]]:
+    """Inclusion proof for leaf ``index`` from a ``pack_levels`` blob.
+
+    ``sibling_leaf`` is the hash of leaf ``index ^ 1`` (the leaf itself when
+    it is the odd one out). Only one digest per level is read.
+    """
+    if leaf_count <= 1:
+        return []
+    proof = [(sibling_leaf, "L" if index % 2 else "R")]
+    offset = 0
+    index //= 2
+    for size in level_sizes(leaf_count)[:-1]:
+        sibling = index ^ 1 if (index ^ 1) < size else index
+        start = (offset + sibling) * DIGEST_SIZE
+        proof.append((packed[start : start + DIGEST_SIZE].hex(), "L" if index % 2 else "R"))
+        offset += size
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf_hash: str, proof: list[tuple[str, str]], root: str) -> bool:
+    """Verify a Merkle proof against a root hash."""
+    current = leaf_hash
+    for sibling, direction in proof:
+        current = hash_pair(sibling, current) if direction == "L" else hash_pair(current, sibling)
+    return current == root
+
+
+class MerkleAccumulator:
+    """Merkle tree over leaves appended one at a time.
+
+    Every completed node is kept per level, so ``pack()`` only has to hash
+    the O(log n) nodes on the right edge, which are still waiting for their
+    sibling. The result equals ``pack_levels`` over the same leaves. Leaves
+    must be lowercase SHA-256 hex digests.
+    """
+
+    def __init__(self):
+        self._levels: list[bytearray] = [bytearray()]
+        self.count = 0
+        self.last_leaf: str | None = None
+
+    def append(self, leaf: str) -> None:
+        """Add the next leaf, completing parents bottom-up as pairs close."""
+        if len(leaf) != _HEX_SIZE:
+            raise ValueError(f"Not a SHA-256 hex digest: {leaf!r}")
+        self._levels[0] += bytes.fromhex(leaf)
+        self.count += 1
+        self.last_leaf = leaf
+        level = 0
+        while len(self._levels[level]) % _PAIR == 0:
+            if level + 1 == len(self._levels):
+                self._levels.append(bytearray())
+            pair = memoryview(self._levels[level])[-_PAIR:]
+            self._levels[level + 1] += _sha256(hexlify(pair)).digest()
+            level += 1
+
+    def pack(self) -> tuple[str, bytes]:
+        """Root and packed internal levels of the tree so far (see ``pack_levels``)."""
+        if not self.count:
+            raise ValueError("Cannot build a Merkle tree without leaves")
+        sizes = level_sizes(self.count)
+        if not sizes:
+            return self.last_leaf, b""
+
+        packed = bytearray(sum(sizes) * DIGEST_SIZE)
+        offset = 0
+        carry = b""  # right-edge node of the level below that has no completed parent
+        for level, size in enumerate(sizes):
+            below = self._levels[level]
+            done = self._levels[level + 1] if level + 1 < len(self._levels) else b""
+            packed[offset : offset + len(done)] = done
+            tail = bytes(below[len(done) * 2 :]) + carry
+            if tail:
+                node = hexlify(tail) if len(tail) == _PAIR else hexlify(tail) * 2
+                carry = _sha256(node).digest()
+                start = offset + len(done)
+                packed[start : start + DIGEST_SIZE] = carry
+            else:
+                carry = b""
+            offset += size * DIGEST_SIZE
+        return packed[-DIGEST_SIZE:].hex(), bytes(packed)
+
 
 @dataclass
 class MerkleNode:
@@ -22,48 +210,23 @@ class MerkleNode:
 class MerkleTree:
     """
     Merkle tree for batch transaction verification.
+
+    Only the root is materialized as a ``MerkleNode``; internal levels stay
+    packed, and proofs are read from them.
     """
 
     def __init__(self, leaves: list[str]):
         """
         Build a Merkle tree from leaf hashes.
         """
+        self.leaves = list(leaves)
         if not leaves:
-            self.leaves = []
             self.root = None
+            self._packed = b""
             return
 
-        self.leaves = leaves
-        self.root = self._build_tree([MerkleNode(h, is_leaf=True) for h in leaves])
-
-    def _hash_pair(self, left: str, right: str) -> str:
-        """Hash two child hashes together."""
-        combined = left + right
-        return hashlib.sha256(combined.encode()).hexdigest()
-
-    def _build_tree(self, nodes: list[MerkleNode]) -> MerkleNode:
-        """Recursively build the tree bottom-up."""
-        if not nodes:
-            raise ValueError("Nodes list cannot be empty")
-        if len(nodes) == 1:
-            return nodes[0]
-
-        next_level = []
-        # Process in pairs
-        for i in range(0, len(nodes), 2):
-            left = nodes[i]
-            # Use same node if odd count (duplicate right sibling)
-            right = nodes[i + 1] if i + 1 < len(nodes) else left
-            
-            next_level.append(
-                MerkleNode(
-                    hash=self._hash_pair(left.hash, right.hash),
-                    left=left,
-                    right=right
-                )
-            )
-
-        return self._build_tree(next_level)
+        root, self._packed = pack_levels(self.leaves)
+        self.root = MerkleNode(root, is_leaf=len(self.leaves) == 1)
 
     def get_root(self) -> str | None:
         """Get the root hash of the tree."""
@@ -73,43 +236,10 @@ class MerkleTree:
         """Get a Merkle proof for a leaf at the given index."""
         if not self.root or index < 0 or index >= len(self.leaves):
             return []
-
-        proof: list[tuple[str, str]] = []
-        current_level = [MerkleNode(h, is_leaf=True) for h in self.leaves]
-        curr_idx = index
-
-        while len(current_level) > 1:
-            # Determine sibling
-            is_right_child = curr_idx % 2 == 1
-            sibling_idx = curr_idx - 1 if is_right_child else curr_idx + 1
-
-            if sibling_idx < len(current_level):
-                sibling_hash = current_level[sibling_idx].hash
-                proof.append((sibling_hash, "L" if is_right_child else "R"))
-            else:
-                # Odd node count, sibling is itself (right=left)
-                proof.append((current_level[curr_idx].hash, "R"))
-
-            # Move to next level
-            next_level = []
-            for i in range(0, len(current_level), 2):
-                l = current_level[i]
-                r = current_level[i + 1] if i + 1 < len(current_level) else l
-                next_level.append(MerkleNode(hash=self._hash_pair(l.hash, r.hash), left=l, right=r))
-            
-            current_level = next_level
-            curr_idx //= 2
-
-        return proof
+        sibling = index ^ 1 if (index ^ 1) < len(self.leaves) else index
+        return proof_from_levels(self._packed, len(self.leaves), index, self.leaves[sibling])
 
     @staticmethod
     def verify_proof(leaf_hash: str, proof: list[tuple[str, str]], root: str) -> bool:
         """Verify a Merkle proof against a root hash."""
-        current = leaf_hash
-        for sibling, direction in proof:
-            if direction == "L":
-                combined = sibling + current
-            else:
-                combined = current + sibling
-            current = hashlib.sha256(combined.encode()).hexdigest()
-        return current == root
+        return verify_proof(leaf_hash, proof, root)
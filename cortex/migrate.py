@@ -79,62 +79,73 @@ def _migrate_system(engine: CortexEngine, path: Path, stats: dict) -> None:
         return
 
     project = "__system__"
+    facts: list[dict] = []
 
     # Preferences
     prefs = data.get("preferences", {})
     if prefs:
-        engine.store(
-            project=project,
-            content=json.dumps(prefs, ensure_ascii=False),
-            fact_type="preference",
-            tags=["system", "preferences"],
-            confidence="verified",
-            source="migration-v3.1",
+        facts.append(
+            dict(
+                project=project,
+                content=json.dumps(prefs, ensure_ascii=False),
+                fact_type="preference",
+                tags=["system", "preferences"],
+                confidence="verified",
+                source="migration-v3.1",
+            )
         )
         stats["facts_imported"] += 1
 
     # Operator info
     operator = data.get("operator", {})
     if operator:
-        engine.store(
-            project=project,
-            content=json.dumps(operator, ensure_ascii=False),
-            fact_type="identity",
-            tags=["system", "operator"],
-            confidence="verified",
-            source="migration-v3.1",
+        facts.append(
+            dict(
+                project=project,
+                content=json.dumps(operator, ensure_ascii=False),
+                fact_type="identity",
+                tags=["system", "operator"],
+                confidence="verified",
+                source="migration-v3.1",
+            )
         )
         stats["facts_imported"] += 1
 
     # Global decisions
     for decision in data.get("global_decisions", []):
-        engine.store(
-            project=project,
-            content=decision.get("decision", str(decision)),
-            fact_type="decision",
-            tags=["system", "global"],
-            confidence="verified",
-            source="migration-v3.1",
-            meta=decision,
+        facts.append(
+            dict(
+                project=project,
+                content=decision.get("decision", str(decision)),
+                fact_type="decision",
+                tags=["system", "global"],
+                confidence="verified",
+                source="migration-v3.1",
+                meta=decision,
+            )
         )
         stats["facts_imported"] += 1
 
     # Knowledge items
     for ki in data.get("knowledge", []):
-        engine.store(
-            project=project,
-            content=ki.get("content", str(ki)),
-            fact_type="knowledge",
-            tags=["system", ki.get("topic", "general")],
-            confidence=ki.get("confidence", "stated"),
-            source="migration-v3.1",
-            valid_from=ki.get("added", None),
-            meta=ki,
+        facts.append(
+            dict(
+                project=project,
+                content=ki.get("content", str(ki)),
+                fact_type="knowledge",
+                tags=["system", ki.get("topic", "general")],
+                confidence=ki.get("confidence", "stated"),
+                source="migration-v3.1",
+                valid_from=ki.get("added", None),
+                meta=ki,
+            )
         )
         stats["facts_imported"] += 1
 
+    _store_batch(engine, facts, stats, "facts_imported")
+
     # Sessions
-    conn = engine._get_conn()
+    conn = engine._get_sync_conn()
     for session in data.get("sessions_log", []):
         try:
             conn.execute(
@@ -166,57 +177,68 @@ def _migrate_project(engine: CortexEngine, path: Path, stats: dict) -> None:
         return
 
     project = data.get("meta", {}).get("id", path.stem)
+    facts: list[dict] = []
 
     # Decisions
     for decision in data.get("decisions", []):
-        engine.store(
-            project=project,
-            content=decision.get("decision", str(decision)),
-            fact_type="decision",
-            tags=decision.get("tags", []),
-            confidence="verified",
-            source="migration-v3.1",
-            meta=decision,
+        facts.append(
+            dict(
+                project=project,
+                content=decision.get("decision", str(decision)),
+                fact_type="decision",
+                tags=decision.get("tags", []),
+                confidence="verified",
+                source="migration-v3.1",
+                meta=decision,
+            )
         )
         stats["facts_imported"] += 1
 
     # Knowledge
     for ki in data.get("knowledge", []):
-        engine.store(
-            project=project,
-            content=ki.get("content", str(ki)),
-            fact_type="knowledge",
-            tags=[ki.get("type", "factual")],
-            confidence=ki.get("confidence", "stated"),
-            source="migration-v3.1",
-            meta=ki,
+        facts.append(
+            dict(
+                project=project,
+                content=ki.get("content", str(ki)),
+                fact_type="knowledge",
+                tags=[ki.get("type", "factual")],
+                confidence=ki.get("confidence", "stated"),
+                source="migration-v3.1",
+                meta=ki,
+            )
         )
         stats["facts_imported"] += 1
 
     # Known issues
     for issue in data.get("known_issues", []):
-        engine.store(
-            project=project,
-            content=issue if isinstance(issue, str) else str(issue),
-            fact_type="issue",
-            tags=["known-issue"],
-            source="migration-v3.1",
+        facts.append(
+            dict(
+                project=project,
+                content=issue if isinstance(issue, str) else str(issue),
+                fact_type="issue",
+                tags=["known-issue"],
+                source="migration-v3.1",
+            )
         )
         stats["facts_imported"] += 1
 
     # Ghost (last state)
     ghost = data.get("ghost", {})
     if ghost:
-        engine.store(
-            project=project,
-            content=json.dumps(ghost, ensure_ascii=False),
-            fact_type="ghost",
-            tags=["context", "last-state"],
-            source="migration-v3.1",
-            meta=ghost,
+        facts.append(
+            dict(
+                project=project,
+                content=json.dumps(ghost, ensure_ascii=False),
+                fact_type="ghost",
+                tags=["context", "last-state"],
+                source="migration-v3.1",
+                meta=ghost,
+            )
         )
         stats["facts_imported"] += 1
 
+    _store_batch(engine, facts, stats, "facts_imported")
+
 
 def _migrate_mistakes(engine: CortexEngine, path: Path, stats: dict) -> None:
     """Migrate mistakes.jsonl — error memory."""
@@ -226,6 +248,7 @@ def _migrate_mistakes(engine: CortexEngine, path: Path, stats: dict) -> None:
         stats["errors"].append(f"Failed to read mistakes.jsonl: {e}")
         return
 
+    facts: list[dict] = []
     for line in content.strip().splitlines():
         try:
             mistake = json.loads(line)
@@ -237,20 +260,24 @@ def _migrate_mistakes(engine: CortexEngine, path: Path, stats: dict) -> None:
                 f"FIX: {mistake.get('fix', 'unknown')}"
             )
 
-            engine.store(
-                project=project,
-                content=content,
-                fact_type="error",
-                tags=mistake.get("tags", []),
-                confidence="verified",
-                source="migration-v3.1",
-                valid_from=mistake.get("date", None),
-                meta=mistake,
+            facts.append(
+                dict(
+                    project=project,
+                    content=content,
+                    fact_type="error",
+                    tags=mistake.get("tags", []),
+                    confidence="verified",
+                    source="migration-v3.1",
+                    valid_from=mistake.get("date", None),
+                    meta=mistake,
+                )
             )
             stats["errors_imported"] += 1
         except (json.JSONDecodeError, sqlite3.Error) as e:
             stats["errors"].append(f"Mistake import failed: {e}")
 
+    _store_batch(engine, facts, stats, "errors_imported")
+
 
 def _migrate_bridges(engine: CortexEngine, path: Path, stats: dict) -> None:
     """Migrate bridges.jsonl — cross-project connections."""
@@ -260,6 +287,7 @@ def _migrate_bridges(engine: CortexEngine, path: Path, stats: dict) -> None:
         stats["errors"].append(f"Failed to read bridges.jsonl: {e}")
         return
 
+    facts: list[dict] = []
     for line in content.strip().splitlines():
         try:
             bridge = json.loads(line)
@@ -270,16 +298,31 @@ def _migrate_bridges(engine: CortexEngine, path: Path, stats: dict) -> None:
                 f"Note: {bridge.get('note', '')}"
             )
 
-            engine.store(
-                project="__bridges__",
-                content=content,
-                fact_type="bridge",
-                tags=[bridge.get("from", ""), bridge.get("to", ""), bridge.get("pattern", "")],
-                confidence="verified",
-                source="migration-v3.1",
-                valid_from=bridge.get("date", None),
-                meta=bridge,
+            facts.append(
+                dict(
+                    project="__bridges__",
+                    content=content,
+                    fact_type="bridge",
+                    tags=[bridge.get("from", ""), bridge.get("to", ""), bridge.get("pattern", "")],
+                    confidence="verified",
+                    source="migration-v3.1",
+                    valid_from=bridge.get("date", None),
+                    meta=bridge,
+                )
             )
             stats["bridges_imported"] += 1
         except (json.JSONDecodeError, sqlite3.Error) as e:
             stats["errors"].append(f"Bridge import failed: {e}")
+
+    _store_batch(engine, facts, stats, "bridges_imported")
+
+
+def _store_batch(engine: CortexEngine, facts: list[dict], stats: dict, counter: str) -> None:
+    """Write one file's facts through the bulk ingest path (batched embeddings)."""
+    if not facts:
+        return
+    try:
+        engine.store_many_sync(facts)
+    except (sqlite3.Error, ValueError) as e:
+        stats[counter] -= len(facts)
+        stats["errors"].append(f"Batch import of {len(facts)} facts failed: {e}")
@@ -85,3 +85,13 @@ def _migration_009_reputation_consensus(conn: sqlite3.Connection):
         );
     """)
     logger.info("Migration 009: Initialized RWC (agents, votes_v2, outcomes)")
+
+
+def _migration_017_consensus_aggregates(conn: sqlite3.Connection):
+    """Materialize per-fact v2 consensus sums and backfill them from existing votes."""
+    from cortex.consensus.aggregates import rebuild_aggregates_sync
+    from cortex.schema import CREATE_CONSENSUS_AGGREGATES
+
+    conn.executescript(CREATE_CONSENSUS_AGGREGATES)
+    facts = rebuild_aggregates_sync(conn)
+    logger.info("Migration 017: Built consensus aggregates for %d fact(s)", facts)
@@ -41,3 +41,98 @@ def _migration_006_graph_memory(conn: sqlite3.Connection):
             ON entity_relations(target_entity_id);
     """)
     logger.info("Migration 006: Created Graph Memory tables (entities + entity_relations)")
+
+
+def _migration_018_graph_unique_keys(conn: sqlite3.Connection):
+    """Merge duplicate graph rows and make (name, project) and (source, target) unique keys.
+
+    Graph ingestion upserts with ``ON CONFLICT`` on these keys. Duplicates left
+    by concurrent select-then-insert writers are folded into the oldest row:
+    mention counts add up, and every extra relation occurrence is worth the
+    0.5 a repeat would have added.
+    """
+    conn.executescript("""
+        CREATE TEMP TABLE _entity_merge AS
+            SELECT e.id AS old_id, k.id AS new_id
+            FROM entities e
+            JOIN (SELECT MIN(id) AS id, name, project FROM entities GROUP BY name, project) k
+                ON k.name = e.name AND k.project = e.project
+            WHERE e.id != k.id;
+
+        UPDATE entities SET
+            mention_count = d.mentions, first_seen = d.first_seen, last_seen = d.last_seen
+        FROM (
+            SELECT MIN(id) AS id, SUM(mention_count) AS mentions,
+                   MIN(first_seen) AS first_seen, MAX(last_seen) AS last_seen
+            FROM entities GROUP BY name, project HAVING COUNT(*) > 1
+        ) d
+        WHERE entities.id = d.id;
+
+        UPDATE entity_relations SET source_entity_id = m.new_id
+        FROM _entity_merge m WHERE entity_relations.source_entity_id = m.old_id;
+        UPDATE entity_relations SET target_entity_id = m.new_id
+        FROM _entity_merge m WHERE entity_relations.target_entity_id = m.old_id;
+        DELETE FROM entities WHERE id IN (SELECT old_id FROM _entity_merge);
+        DROP TABLE _entity_merge;
+
+        UPDATE entity_relations SET weight = d.weight
+        FROM (
+            SELECT MIN(id) AS id, SUM(weight) - 0.5 * (COUNT(*) - 1) AS weight
+            FROM entity_relations
+            GROUP BY source_entity_id, target_entity_id HAVING COUNT(*) > 1
+        ) d
+        WHERE entity_relations.id = d.id;
+        DELETE FROM entity_relations WHERE id NOT IN (
+            SELECT MIN(id) FROM entity_relations GROUP BY source_entity_id, target_entity_id
+        );
+
+        DROP INDEX IF EXISTS idx_entities_name_project;
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_entities_name_project
+            ON entities(name, project);
+        DROP INDEX IF EXISTS idx_relations_source;
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_relations_pair
+            ON entity_relations(source_entity_id, target_entity_id);
+    """)
+    logger.info("Migration 018: Unique graph keys for set-based upserts")
+
+
+def _migration_019_fact_entities(conn: sqlite3.Connection):
+    """Record which entities each fact mentions, backfilled for active facts.
+
+    Ingestion fills the table from then on. The backfill re-extracts each
+    active fact and links only entities already in the graph; deprecated
+    facts are skipped because their mentions are never released again.
+    """
+    from cortex.graph.engine import extract_entities
+
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS fact_entities (
+            fact_id INTEGER NOT NULL REFERENCES facts(id),
+            entity_id INTEGER NOT NULL REFERENCES entities(id),
+            PRIMARY KEY (fact_id, entity_id)
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS idx_fact_entities_entity
+            ON fact_entities(entity_id, fact_id);
+    """)
+    last_id, linked = 0, 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, content, project FROM facts "
+            "WHERE id > ? AND valid_until IS NULL ORDER BY id LIMIT 1000",
+            (last_id,),
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        cursor = conn.executemany(
+            "INSERT OR IGNORE INTO fact_entities (fact_id, entity_id) "
+            "SELECT ?, id FROM entities WHERE name = ? AND project = ?",
+            [
+                (fact_id, ent["name"], project)
+                for fact_id, content, project in rows
+                for ent in extract_entities(content)
+            ],
+        )
+        linked += max(cursor.rowcount, 0)
+    logger.info("Migration 019: Created fact_entities (%d mentions backfilled)", linked)
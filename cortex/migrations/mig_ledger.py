@@ -148,3 +148,21 @@ def _migration_014_vote_ledger_refinement(conn: sqlite3.Connection):
         )
     """)
     logger.info("Migration 014: Refined Immutable Ledger (vote_ledger + vote_merkle_roots)")
+
+
+def _migration_015_integrity_throughput(conn: sqlite3.Connection):
+    """Record rows checked and throughput on each integrity check."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(integrity_checks)").fetchall()}
+    if "tx_checked" not in columns:
+        conn.execute("ALTER TABLE integrity_checks ADD COLUMN tx_checked INTEGER")
+    if "tx_per_sec" not in columns:
+        conn.execute("ALTER TABLE integrity_checks ADD COLUMN tx_per_sec REAL")
+    logger.info("Migration 015: Added throughput columns to integrity_checks")
+
+
+def _migration_016_merkle_tree_levels(conn: sqlite3.Connection):
+    """Persist each checkpoint's internal Merkle nodes for inclusion proofs."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(merkle_roots)").fetchall()}
+    if "tree_levels" not in columns:
+        conn.execute("ALTER TABLE merkle_roots ADD COLUMN tree_levels BLOB")
+    logger.info("Migration 016: Added tree_levels to merkle_roots")
@@ -9,14 +9,21 @@ from cortex.migrations.mig_consensus import (
     _migration_007_consensus_layer,
     _migration_008_consensus_refinement,
     _migration_009_reputation_consensus,
+    _migration_017_consensus_aggregates,
+)
+from cortex.migrations.mig_graph import (
+    _migration_006_graph_memory,
+    _migration_018_graph_unique_keys,
+    _migration_019_fact_entities,
 )
-from cortex.migrations.mig_graph import _migration_006_graph_memory
 from cortex.migrations.mig_ha import _migration_013_cluster_nodes
 from cortex.migrations.mig_ledger import (
     _migration_010_immutable_ledger,
     _migration_011_link_facts_to_tx,
     _migration_012_ghosts_table,
     _migration_014_vote_ledger_refinement,
+    _migration_015_integrity_throughput,
+    _migration_016_merkle_tree_levels,
 )
 
 MIGRATIONS = [
@@ -34,4 +41,9 @@ MIGRATIONS = [
     (12, "Add ghosts table", _migration_012_ghosts_table),
     (13, "HA Cluster Nodes", _migration_013_cluster_nodes),
     (14, "Wave 5 Immutable Ledger Refinement", _migration_014_vote_ledger_refinement),
+    (15, "Integrity check throughput", _migration_015_integrity_throughput),
+    (16, "Merkle tree levels", _migration_016_merkle_tree_levels),
+    (17, "Consensus aggregates", _migration_017_consensus_aggregates),
+    (18, "Unique graph keys", _migration_018_graph_unique_keys),
+    (19, "Fact entities", _migration_019_fact_entities),
 ]
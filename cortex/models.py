@@ -180,6 +180,24 @@ class LedgerReportResponse(BaseModel):
     roots_checked: int = 0
     votes_checked: int = 0
     vote_checkpoints_checked: int = 0
+    mode: str = "incremental"
+    verified_to: int = 0
+
+
+class LedgerProofStep(BaseModel):
+    hash: str
+    position: str  # "L" or "R": side the sibling is hashed on
+
+
+class LedgerProofResponse(BaseModel):
+    tx_id: int
+    tx_hash: str
+    checkpoint_id: int
+    root_hash: str
+    index: int
+    proof: list[LedgerProofStep]
+    valid: bool
+    source: str  # "stored" tree levels or "rebuilt" from transactions
 
 
 class CheckpointResponse(BaseModel):
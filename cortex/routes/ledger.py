@@ -5,12 +5,12 @@ Cryptographic integrity verification and checkpointing.
 
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from cortex.api_deps import get_async_engine
 from cortex.auth import AuthResult, require_permission
 from cortex.engine_async import AsyncCortexEngine
-from cortex.models import CheckpointResponse, LedgerReportResponse
+from cortex.models import CheckpointResponse, LedgerProofResponse, LedgerReportResponse
 
 
 class LedgerError(Exception):
@@ -29,14 +29,15 @@ router = APIRouter(prefix="/v1/ledger", tags=["ledger"])
 async def get_ledger_status(
     auth: AuthResult = Depends(require_permission("admin")),
     engine: AsyncCortexEngine = Depends(get_async_engine),
+    mode: str = Query("incremental", pattern="^(incremental|full)$"),
 ) -> LedgerReportResponse:
     """Check the cryptographic integrity of all ledgers (Tx and Votes)."""
     try:
         # 1. Verify Transaction Ledger
-        tx_report = await engine.verify_ledger()
+        tx_report = await engine.verify_ledger(mode)
 
         # 2. Verify Vote Ledger
-        vote_report = await engine.verify_vote_ledger()
+        vote_report = await engine.verify_vote_ledger(mode)
 
         # Merge reports
         combined_valid = tx_report["valid"] and vote_report["valid"]
@@ -50,6 +51,8 @@ async def get_ledger_status(
             violations=combined_violations,
             tx_checked=tx_report["tx_checked"],
             roots_checked=tx_report["roots_checked"],
+            mode=tx_report["mode"],
+            verified_to=tx_report["verified_to"],
             votes_checked=vote_report["votes_checked"],
             vote_checkpoints_checked=vote_report["checkpoints_checked"],
         )
@@ -86,6 +89,22 @@ async def create_checkpoint(
 async def verify_ledger(
     auth: AuthResult = Depends(require_permission("admin")),
     engine: AsyncCortexEngine = Depends(get_async_engine),
+    mode: str = Query("incremental", pattern="^(incremental|full)$"),
 ) -> LedgerReportResponse:
-    """Alias for /status - performs full integrity verification."""
-    return await get_ledger_status(auth, engine)
+    """Alias for /status - performs integrity verification."""
+    return await get_ledger_status(auth, engine, mode)
+
+
+@router.get("/proof/{tx_id}", response_model=LedgerProofResponse)
+async def get_inclusion_proof(
+    tx_id: int,
+    auth: AuthResult = Depends(require_permission("read")),
+    engine: AsyncCortexEngine = Depends(get_async_engine),
+) -> LedgerProofResponse:
+    """Merkle inclusion proof of a transaction in its checkpoint."""
+    proof = await engine.ledger_proof(tx_id)
+    if proof is None:
+        raise HTTPException(
+            status_code=404, detail=f"Transaction {tx_id} not found or not checkpointed yet"
+        )
+    return LedgerProofResponse(**proof)
@@ -4,6 +4,8 @@ CORTEX v4.0 — SQLite Schema Definitions.
 All tables, indexes, and virtual tables for the sovereign memory engine.
 """
 
+from cortex.config import VECTOR_FORMAT
+
 SCHEMA_VERSION = "4.0.0"
 
 # ─── Core Facts Table ────────────────────────────────────────────────
@@ -35,13 +37,32 @@ CREATE INDEX IF NOT EXISTS idx_facts_confidence ON facts(confidence);
 """
 
 # ─── Vector Embeddings (sqlite-vec) ──────────────────────────────────
-CREATE_EMBEDDINGS = """
+# project is a partition key and active a metadata column, so KNN queries
+# filter on them before ranking (see cortex.search.vector.knn_filters).
+CREATE_EMBEDDINGS_FLOAT32 = """
 CREATE VIRTUAL TABLE IF NOT EXISTS fact_embeddings USING vec0(
     fact_id INTEGER PRIMARY KEY,
+    project TEXT partition key,
+    active INTEGER,
     embedding FLOAT[384]
 );
 """
 
+# int8 storage: bare quantized values (see cortex.compression.quantize_int8).
+# Cosine distance keeps scores in the same [0, 1] range as float32 rows.
+CREATE_EMBEDDINGS_INT8 = """
+CREATE VIRTUAL TABLE IF NOT EXISTS fact_embeddings USING vec0(
+    fact_id INTEGER PRIMARY KEY,
+    project TEXT partition key,
+    active INTEGER,
+    embedding INT8[384] distance_metric=cosine
+);
+"""
+
+CREATE_EMBEDDINGS = (
+    CREATE_EMBEDDINGS_INT8 if VECTOR_FORMAT == "int8" else CREATE_EMBEDDINGS_FLOAT32
+)
+
 # ─── Sessions Log ────────────────────────────────────────────────────
 CREATE_SESSIONS = """
 CREATE TABLE IF NOT EXISTS sessions (
@@ -206,6 +227,18 @@ CREATE INDEX IF NOT EXISTS idx_trust_source ON trust_edges(source_agent);
 CREATE INDEX IF NOT EXISTS idx_trust_target ON trust_edges(target_agent);
 """
 
+CREATE_CONSENSUS_AGGREGATES = """
+CREATE TABLE IF NOT EXISTS consensus_aggregates (
+    fact_id         INTEGER PRIMARY KEY REFERENCES facts(id),
+    weighted_sum    REAL NOT NULL DEFAULT 0.0,
+    total_weight    REAL NOT NULL DEFAULT 0.0,
+    vote_count      INTEGER NOT NULL DEFAULT 0,
+    verify_count    INTEGER NOT NULL DEFAULT 0,
+    dispute_count   INTEGER NOT NULL DEFAULT 0,
+    updated_at      TEXT NOT NULL DEFAULT (datetime('now'))
+);
+"""
+
 # ─── Ghosts (Unresolved Entities) ────────────────────────────────────
 CREATE_GHOSTS = """
 CREATE TABLE IF NOT EXISTS ghosts (
@@ -245,6 +278,23 @@ CREATE INDEX IF NOT EXISTS idx_graph_outbox_status ON graph_outbox(status);
 CREATE INDEX IF NOT EXISTS idx_graph_outbox_fact ON graph_outbox(fact_id);
 """
 
+# ─── Deferred Embedding Outbox ───────────────────────────────────────
+CREATE_EMBEDDING_OUTBOX = """
+CREATE TABLE IF NOT EXISTS embedding_outbox (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    fact_id     INTEGER NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'pending', -- pending, processed, failed
+    retry_count INTEGER DEFAULT 0,
+    created_at  TEXT NOT NULL DEFAULT (datetime('now')),
+    processed_at TEXT
+);
+"""
+
+CREATE_EMBEDDING_OUTBOX_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_embedding_outbox_status ON embedding_outbox(status);
+CREATE INDEX IF NOT EXISTS idx_embedding_outbox_fact ON embedding_outbox(fact_id);
+"""
+
 # ─── All statements in order ─────────────────────────────────────────
 ALL_SCHEMA = [
     CREATE_FACTS,
@@ -264,10 +314,13 @@ ALL_SCHEMA = [
     CREATE_TRUST_EDGES,
     CREATE_OUTCOMES,
     CREATE_RWC_INDEXES,
+    CREATE_CONSENSUS_AGGREGATES,
     CREATE_GHOSTS,
     CREATE_GHOSTS_INDEX,
     CREATE_GRAPH_OUTBOX,
     CREATE_GRAPH_OUTBOX_INDEXES,
+    CREATE_EMBEDDING_OUTBOX,
+    CREATE_EMBEDDING_OUTBOX_INDEXES,
 ]
 
 
@@ -5,7 +5,7 @@
 
 """CORTEX Search Package."""
 
-from cortex.search.hybrid import hybrid_search, hybrid_search_sync
+from cortex.search.hybrid import hybrid_search, hybrid_search_stream, hybrid_search_sync
 from cortex.search.models import SearchResult
 from cortex.search.text import text_search, text_search_sync
 from cortex.search.vector import semantic_search, semantic_search_sync
@@ -17,5 +17,6 @@ __all__ = [
     "text_search",
     "text_search_sync",
     "hybrid_search",
+    "hybrid_search_stream",
     "hybrid_search_sync",
 ]
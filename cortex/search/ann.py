@@ -0,0 +1,376 @@
+# This file is part of CORTEX.
+# Licensed under the Business Source License 1.1 (BSL 1.1).
+# See top-level LICENSE file for details.
+# Change Date: 2030-01-01 (Transitions to Apache 2.0)
+
+"""Per-project approximate nearest-neighbour index (IVF-Flat on NumPy).
+
+Past a few hundred thousand facts, sqlite-vec's brute-force ``MATCH`` with
+``k = top_k * 3`` gets slow. It also loses results, because rows from
+other projects and deprecated rows use up the ``k`` budget before the
+``WHERE`` filters apply. With ``CORTEX_ANN_INDEX=1``, each project with at
+least ``CORTEX_ANN_MIN_ROWS`` active embeddings gets its own inverted-file
+index over active facts only. The index:
+
+- is trained with k-means (``√n`` lists) and probes ``CORTEX_ANN_NPROBE``
+  lists per query;
+- is updated in place on store/deprecate by the owning engine and
+  reconciled against the database on load and every
+  ``CORTEX_ANN_REFRESH_SECONDS``. That covers writes from other processes
+  and the deferred embedding worker;
+- is persisted to ``<CORTEX_ANN_DIR>/<db>/<project>.npz``.
+
+Distances use the same metric as ``fact_embeddings`` (L2 for float32,
+cosine for int8), so scores line up with exact search. Searches that the
+index cannot answer return ``None`` and callers fall back to exact
+sqlite-vec search. That covers no project, ``as_of`` queries and projects
+too small for an index.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from cortex.config import (
+    ANN_DIR,
+    ANN_MIN_ROWS,
+    ANN_NPROBE,
+    ANN_REFRESH_SECONDS,
+    VECTOR_FORMAT,
+)
+
+logger = logging.getLogger("cortex.search.ann")
+
+DIM = 384
+_KMEANS_ITERS = 10
+_KMEANS_SAMPLE = 20_000
+_MAX_LISTS = 1024
+# Retrain centroids once the index has grown this much past its training set.
+_RETRAIN_GROWTH = 4.0
+# Compact away deleted rows on save once they exceed this share.
+_COMPACT_RATIO = 0.2
+
+_ACTIVE_IDS = "SELECT id FROM facts WHERE project = ? AND valid_until IS NULL"
+_EMBEDDINGS = "SELECT fact_id, embedding FROM fact_embeddings WHERE fact_id IN ({})"
+_IN_CHUNK = 500
+_MIN_CAPACITY = 64
+
+
+def decode_matrix(blobs: list[bytes], vector_format: str) -> np.ndarray:
+    """Decode ``fact_embeddings`` blobs into an (n, DIM) float32 unit-row matrix."""
+    if not blobs:
+        return np.zeros((0, DIM), dtype=np.float32)
+    dtype = np.int8 if vector_format == "int8" else np.float32
+    mat = np.frombuffer(b"".join(blobs), dtype=dtype).reshape(len(blobs), -1)
+    mat = mat.astype(np.float32)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    return mat / np.clip(norms, 1e-12, None)
+
+
+def _grow(arr: np.ndarray, capacity: int) -> np.ndarray:
+    out = np.zeros((capacity, *arr.shape[1:]), dtype=arr.dtype)
+    out[: len(arr)] = arr
+    return out
+
+
+class IVFIndex:
+    """Inverted-file index with exact re-scoring inside the probed lists.
+
+    Rows live in buffers that double in capacity, so adding a fact is
+    amortized O(1) instead of copying the whole matrix; ``_n`` rows are in
+    use and ``compact()`` shrinks the buffers back to the live rows.
+    """
+
+    def __init__(self, centroids: np.ndarray):
+        self.centroids = centroids.astype(np.float32)
+        self.trained_on = 0
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._vecs = np.zeros((0, centroids.shape[1]), dtype=np.float32)
+        self._lists = np.zeros(0, dtype=np.int32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._n = 0
+        self._pos: dict[int, int] = {}
+
+    # ─── Construction ───────────────────────────────────────────
+
+    @classmethod
+    def train(cls, ids: np.ndarray, vecs: np.ndarray, seed: int = 0) -> IVFIndex:
+        """k-means over (a sample of) ``vecs``, then add every row."""
+        n = len(vecs)
+        n_lists = max(1, min(_MAX_LISTS, int(np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        sample = vecs[rng.choice(n, min(n, _KMEANS_SAMPLE), replace=False)]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(_KMEANS_ITERS):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids /= np.clip(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12, None)
+
+        index = cls(centroids)
+        index.add(ids, vecs)
+        index.trained_on = n
+        return index
+
+    def add(self, ids: np.ndarray, vecs: np.ndarray) -> None:
+        if not len(ids):
+            return
+        self.remove(ids)  # Re-adding an id replaces its vector
+        start, end = self._n, self._n + len(ids)
+        if end > len(self._ids):
+            capacity = max(end, 2 * len(self._ids), _MIN_CAPACITY)
+            self._ids = _grow(self._ids, capacity)
+            self._vecs = _grow(self._vecs, capacity)
+            self._lists = _grow(self._lists, capacity)
+            self._alive = _grow(self._alive, capacity)
+        self._ids[start:end] = ids
+        self._vecs[start:end] = vecs
+        self._lists[start:end] = np.argmax(vecs @ self.centroids.T, axis=1)
+        self._alive[start:end] = True
+        self._n = end
+        for offset, fid in enumerate(ids.tolist()):
+            self._pos[fid] = start + offset
+
+    def remove(self, ids) -> None:
+        for fid in np.asarray(ids).tolist():
+            pos = self._pos.pop(int(fid), None)
+            if pos is not None:
+                self._alive[pos] = False
+
+    def compact(self) -> None:
+        keep = self._alive[: self._n]
+        self._ids = self._ids[: self._n][keep]
+        self._vecs = self._vecs[: self._n][keep]
+        self._lists = self._lists[: self._n][keep]
+        self._n = len(self._ids)
+        self._alive = np.ones(self._n, dtype=bool)
+        self._pos = {fid: i for i, fid in enumerate(self._ids.tolist())}
+
+    # ─── Query ──────────────────────────────────────────────────
+
+    def search(self, query: np.ndarray, k: int, nprobe: int) -> list[tuple[int, float]]:
+        """Return up to ``k`` ``(fact_id, cosine_similarity)`` pairs, best first."""
+        probe = np.argpartition(-(self.centroids @ query), min(nprobe, len(self.centroids)) - 1)
+        probe = probe[: min(nprobe, len(self.centroids))]
+        n = self._n
+        candidates = np.flatnonzero(np.isin(self._lists[:n], probe) & self._alive[:n])
+        if not len(candidates):
+            return []
+        sims = self._vecs[candidates] @ query
+        if len(candidates) > k:
+            top = np.argpartition(-sims, k - 1)[:k]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-sims[top])]
+        return [(int(self._ids[candidates[i]]), float(sims[i])) for i in top]
+
+    @property
+    def ids(self) -> set[int]:
+        return set(self._pos)
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    # ─── Persistence ────────────────────────────────────────────
+
+    def save(self, path: Path) -> None:
+        if self._n and len(self) < self._n * (1 - _COMPACT_RATIO):
+            self.compact()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        live = self._alive[: self._n]
+        np.savez(
+            tmp,
+            centroids=self.centroids,
+            ids=self._ids[: self._n][live],
+            vecs=self._vecs[: self._n][live],
+            lists=self._lists[: self._n][live],
+            trained_on=np.array(self.trained_on),
+        )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> IVFIndex:
+        with np.load(path) as data:
+            index = cls(data["centroids"])
+            index._ids = data["ids"]
+            index._vecs = data["vecs"]
+            index._lists = data["lists"]
+            index.trained_on = int(data["trained_on"])
+        index._n = len(index._ids)
+        index._alive = np.ones(index._n, dtype=bool)
+        index._pos = {fid: i for i, fid in enumerate(index._ids.tolist())}
+        return index
+
+
+class AnnIndexManager:
+    """Owns the per-project ``IVFIndex`` instances for one database."""
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        index_dir: str | Path | None = None,
+        vector_format: str = VECTOR_FORMAT,
+        min_rows: int = ANN_MIN_ROWS,
+        nprobe: int = ANN_NPROBE,
+        refresh_seconds: float = ANN_REFRESH_SECONDS,
+    ):
+        self._db_path = str(db_path)
+        db_key = hashlib.sha256(str(Path(db_path).expanduser().resolve()).encode()).hexdigest()
+        self.index_dir = Path(index_dir or ANN_DIR) / db_key[:16]
+        self.vector_format = vector_format
+        self.min_rows = min_rows
+        self.nprobe = nprobe
+        self.refresh_seconds = refresh_seconds
+        self._indexes: dict[str, IVFIndex | None] = {}
+        self._refreshed: dict[str, float] = {}
+        self._dirty: set[str] = set()
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            import sqlite_vec
+
+            conn = sqlite3.connect(self._db_path, timeout=30, check_same_thread=False)
+            conn.enable_load_extension(True)
+            sqlite_vec.load(conn)
+            conn.enable_load_extension(False)
+            self._conn = conn
+        return self._conn
+
+    def _path(self, project: str) -> Path:
+        return self.index_dir / (hashlib.sha256(project.encode()).hexdigest()[:24] + ".npz")
+
+    def _fetch(self, fact_ids: list[int]) -> tuple[np.ndarray, np.ndarray]:
+        conn = self._get_conn()
+        rows: list[tuple[int, bytes]] = []
+        for start in range(0, len(fact_ids), _IN_CHUNK):
+            chunk = fact_ids[start : start + _IN_CHUNK]
+            sql = _EMBEDDINGS.format(", ".join("?" for _ in chunk))
+            rows.extend(conn.execute(sql, chunk).fetchall())
+        ids = np.array([r[0] for r in rows], dtype=np.int64)
+        return ids, decode_matrix([r[1] for r in rows], self.vector_format)
+
+    # ─── Build & reconcile ──────────────────────────────────────
+
+    def _reconcile(self, project: str) -> IVFIndex | None:
+        """Bring the project's index in line with the database."""
+        active = [r[0] for r in self._get_conn().execute(_ACTIVE_IDS, (project,))]
+        index = self._indexes.get(project)
+        if index is None and self._path(project).exists():
+            try:
+                index = IVFIndex.load(self._path(project))
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("Discarding unreadable ANN index for %s: %s", project, e)
+
+        if len(active) < self.min_rows:
+            index = None
+        elif index is None or len(active) > index.trained_on * _RETRAIN_GROWTH:
+            ids, vecs = self._fetch(active)
+            if len(ids) < self.min_rows:
+                index = None  # Most facts still wait for the embedding worker
+            else:
+                index = IVFIndex.train(ids, vecs)
+                self._dirty.add(project)
+                logger.info("Trained ANN index for %s: %d vectors", project, len(ids))
+        else:
+            current = index.ids
+            wanted = set(active)
+            stale = current - wanted
+            missing = sorted(wanted - current)
+            if stale:
+                index.remove(list(stale))
+            if missing:
+                index.add(*self._fetch(missing))
+            if stale or missing:
+                self._dirty.add(project)
+
+        self._indexes[project] = index
+        self._refreshed[project] = time.monotonic()
+        return index
+
+    def get(self, project: str) -> IVFIndex | None:
+        with self._lock:
+            last = self._refreshed.get(project)
+            if last is None or time.monotonic() - last > self.refresh_seconds:
+                return self._reconcile(project)
+            return self._indexes.get(project)
+
+    # ─── Incremental maintenance ────────────────────────────────
+
+    def add(self, project: str, fact_ids: list[int], embeddings: list[list[float]]) -> None:
+        """Index freshly stored facts (no-op until the project has an index)."""
+        with self._lock:
+            index = self._indexes.get(project)
+            if index is None or not fact_ids:
+                return
+            vecs = np.asarray(embeddings, dtype=np.float32)
+            # Divide into a new array: the caller's float32 ndarray is not ours.
+            vecs = vecs / np.clip(np.linalg.norm(vecs, axis=1, keepdims=True), 1e-12, None)
+            index.add(np.asarray(fact_ids, dtype=np.int64), vecs)
+            self._dirty.add(project)
+
+    def add_committed(self, project: str, fact_ids: list[int]) -> None:
+        """Index committed facts by reading their vectors back (bulk ingest)."""
+        with self._lock:
+            index = self._indexes.get(project)
+            if index is None or not fact_ids:
+                return
+            index.add(*self._fetch(list(fact_ids)))
+            self._dirty.add(project)
+
+    def remove(self, project: str, fact_ids: list[int]) -> None:
+        """Drop deprecated facts from the project's index."""
+        with self._lock:
+            index = self._indexes.get(project)
+            if index is not None:
+                index.remove(fact_ids)
+                self._dirty.add(project)
+
+    # ─── Query ──────────────────────────────────────────────────
+
+    def search(
+        self, project: str, query_embedding: list[float], k: int
+    ) -> list[tuple[int, float]] | None:
+        """Top-``k`` ``(fact_id, distance)`` pairs, or ``None`` for "use exact"."""
+        index = self.get(project)
+        if index is None:
+            return None
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        with self._lock:
+            hits = index.search(query, k, self.nprobe)
+        if self.vector_format == "int8":
+            return [(fid, 1.0 - sim) for fid, sim in hits]
+        return [(fid, float(np.sqrt(max(0.0, 2.0 - 2.0 * sim)))) for fid, sim in hits]
+
+    # ─── Lifecycle ──────────────────────────────────────────────
+
+    def flush(self) -> None:
+        """Persist every index modified since the last flush."""
+        with self._lock:
+            for project in list(self._dirty):
+                index = self._indexes.get(project)
+                path = self._path(project)
+                if index is not None:
+                    index.save(path)
+                elif path.exists():
+                    path.unlink()
+            self._dirty.clear()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
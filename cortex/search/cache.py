@@ -0,0 +1,109 @@
+# This file is part of CORTEX.
+# Licensed under the Business Source License 1.1 (BSL 1.1).
+# See top-level LICENSE file for details.
+# Change Date: 2030-01-01 (Transitions to Apache 2.0)
+
+"""Engine-level search result cache with write-aware invalidation.
+
+Result sets are keyed by normalized query, project, ``top_k``, ``as_of``
+and the project's ledger head: the id of the latest ``transactions`` row
+for that project (or of any row, for unscoped searches). Every write logs
+a transaction, so a write to project A moves A's head and A's old entries
+simply stop matching, while project B's entries keep hitting. Because the
+head is read from the database, writes from other processes invalidate
+too. Stale entries age out through LRU and TTL.
+
+Query embeddings are cached separately, so the same query with a
+different ``top_k`` or project skips the model.
+
+Votes and bulk rescoring are logged under the project of the facts they
+rescore, so a vote on a fact in A only invalidates A's entries.
+
+Writes that do not go through the ledger, such as the deferred embedding
+worker filling in vectors, are only picked up once the TTL expires.
+"""
+
+from __future__ import annotations
+
+import copy
+import logging
+from collections.abc import Callable
+
+import aiosqlite
+
+from cortex.cache import TieredCache
+from cortex.config import SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL
+from cortex.embeddings.cache import normalize_text
+from cortex.metrics import metrics
+from cortex.search.models import SearchResult
+
+logger = logging.getLogger("cortex.search.cache")
+
+_PROJECT_HEAD = "SELECT MAX(id) FROM transactions WHERE project = ?"
+_GLOBAL_HEAD = "SELECT MAX(id) FROM transactions"
+
+
+class SearchCache:
+    """Per-engine cache of search result sets and query embeddings."""
+
+    def __init__(self, size: int = SEARCH_CACHE_SIZE, ttl_seconds: float = SEARCH_CACHE_TTL):
+        self.results: TieredCache[list[SearchResult]] = TieredCache(
+            "search_results", l1_size=size, ttl_seconds=ttl_seconds
+        )
+        self.embeddings: TieredCache[list[float]] = TieredCache(
+            "query_embeddings", l1_size=size, ttl_seconds=ttl_seconds
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    async def ledger_head(conn: aiosqlite.Connection, project: str | None) -> int:
+        """Latest transaction id for ``project`` (any project when ``None``)."""
+        if project:
+            cursor = await conn.execute(_PROJECT_HEAD, (project,))
+        else:
+            cursor = await conn.execute(_GLOBAL_HEAD)
+        row = await cursor.fetchone()
+        return (row[0] or 0) if row else 0
+
+    @staticmethod
+    def result_key(
+        head: int,
+        query: str,
+        project: str | None,
+        top_k: int,
+        as_of: str | None,
+        **options,
+    ) -> str:
+        extra = "\x1f".join(f"{k}={options[k]}" for k in sorted(options))
+        return "\x1f".join(
+            (str(head), project or "*", str(top_k), as_of or "", extra, normalize_text(query))
+        )
+
+    async def get_results(self, key: str) -> list[SearchResult] | None:
+        cached = await self.results.get(key)
+        if cached is None:
+            self.misses += 1
+            metrics.inc("cortex_search_cache_misses_total")
+            return None
+        self.hits += 1
+        metrics.inc("cortex_search_cache_hits_total")
+        # Callers mutate results (score, graph context); hand out copies.
+        return [copy.copy(r) for r in cached]
+
+    async def put_results(self, key: str, results: list[SearchResult]) -> None:
+        await self.results.set(key, [copy.copy(r) for r in results])
+
+    async def embed(self, query: str, embed: Callable[[str], list[float]]) -> list[float]:
+        """Return the embedding of ``query``, computing it only on a miss."""
+        key = normalize_text(query)
+        vector = await self.embeddings.get(key)
+        if vector is None:
+            vector = embed(query)
+            await self.embeddings.set(key, vector)
+        return vector
+
+
+def create_search_cache() -> SearchCache | None:
+    """Default cache for an engine, or ``None`` when ``CORTEX_SEARCH_CACHE_SIZE=0``."""
+    return SearchCache() if SEARCH_CACHE_SIZE > 0 else None
@@ -5,20 +5,198 @@
 
 """Hybrid search with RRF."""
 
+import asyncio
+import copy
 import logging
 import sqlite3
+from collections.abc import AsyncIterator, Awaitable
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
 
 import aiosqlite
 
+from cortex.config import VECTOR_FORMAT
 from cortex.search.models import SearchResult
 from cortex.search.text import text_search, text_search_sync
 from cortex.search.vector import semantic_search, semantic_search_sync
 
+if TYPE_CHECKING:
+    from cortex.connection_pool import CortexConnectionPool
+
 logger = logging.getLogger("cortex.search.hybrid")
 
 RRF_K = 60
 
 
+class _RRFAccumulator:
+    """Reciprocal Rank Fusion state that ranked lists are folded into one by one.
+
+    Semantic results win ties on which ``SearchResult`` object is kept, no
+    matter which leg is folded in first.
+    """
+
+    def __init__(self) -> None:
+        self.scores: dict[int, float] = {}
+        self.results: dict[int, SearchResult] = {}
+
+    def add(self, ranked: list[SearchResult], weight: float, preferred: bool) -> None:
+        for rank, res in enumerate(ranked):
+            self.scores[res.fact_id] = self.scores.get(res.fact_id, 0.0) + weight / (
+                RRF_K + rank + 1
+            )
+            if preferred or res.fact_id not in self.results:
+                self.results[res.fact_id] = res
+
+    def top(self, top_k: int) -> list[SearchResult]:
+        merged = []
+        for fid in sorted(self.scores, key=self.scores.get, reverse=True)[:top_k]:
+            r = self.results[fid]
+            r.score = self.scores[fid]
+            merged.append(r)
+        return merged
+
+
+def rrf_merge(
+    sem_results: list[SearchResult],
+    txt_results: list[SearchResult],
+    top_k: int,
+    vector_weight: float = 0.6,
+    text_weight: float = 0.4,
+) -> list[SearchResult]:
+    """Fuse two ranked lists with Reciprocal Rank Fusion."""
+    acc = _RRFAccumulator()
+    acc.add(sem_results, vector_weight, preferred=True)
+    acc.add(txt_results, text_weight, preferred=False)
+    return acc.top(top_k)
+
+
+async def merge_unembedded(
+    conn: aiosqlite.Connection,
+    query: str,
+    sem_results: list[SearchResult],
+    top_k: int = 10,
+    project: str | None = None,
+    as_of: str | None = None,
+) -> list[SearchResult]:
+    """Blend in FTS hits for facts still waiting in ``embedding_outbox``.
+
+    Deferred-embedding facts are invisible to the vector leg until the
+    worker reaches them; this keeps them searchable in the meantime.
+    """
+    try:
+        cursor = await conn.execute(
+            "SELECT 1 FROM embedding_outbox WHERE status != 'processed' LIMIT 1"
+        )
+        if not await cursor.fetchone():
+            return sem_results
+    except aiosqlite.OperationalError:
+        return sem_results
+
+    txt_results = await text_search(conn, query, project, limit=top_k * 2, as_of=as_of)
+    if not txt_results:
+        return sem_results
+
+    ids = [r.fact_id for r in txt_results]
+    placeholders = ", ".join("?" for _ in ids)
+    cursor = await conn.execute(
+        "SELECT fact_id FROM embedding_outbox "
+        f"WHERE status != 'processed' AND fact_id IN ({placeholders})",
+        ids,
+    )
+    queued = {row[0] for row in await cursor.fetchall()}
+    unembedded = [r for r in txt_results if r.fact_id in queued]
+    if not unembedded:
+        return sem_results
+    return rrf_merge(sem_results, unembedded, top_k)
+
+
+@asynccontextmanager
+async def _leg_connection(
+    conn: aiosqlite.Connection, pool: "CortexConnectionPool | None"
+) -> AsyncIterator[aiosqlite.Connection]:
+    """A second read connection for the text leg, or ``conn`` if none is free.
+
+    The caller already holds ``conn``; waiting on the pool for another one
+    could deadlock once every pooled connection is held by a search, so the
+    pool is only asked for a connection it can hand out immediately.
+    """
+    if pool is None:
+        yield conn
+        return
+    async with pool.try_acquire() as spare:
+        yield spare if spare is not None else conn
+
+
+async def _weighted(leg: Awaitable[list[SearchResult]], weight: float, preferred: bool):
+    return await leg, weight, preferred
+
+
+async def hybrid_search_stream(
+    conn: aiosqlite.Connection,
+    query: str,
+    query_embedding: list[float],
+    top_k: int = 10,
+    project: str | None = None,
+    as_of: str | None = None,
+    vector_weight: float = 0.6,
+    text_weight: float = 0.4,
+    vector_format: str = VECTOR_FORMAT,
+    ann=None,
+    partitioned: bool = False,
+    pool: "CortexConnectionPool | None" = None,
+) -> AsyncIterator[list[SearchResult]]:
+    """Hybrid search that runs both legs concurrently and streams the RRF ranking.
+
+    The semantic leg runs on ``conn`` and the text leg on a spare
+    connection from ``pool`` when there is one. As soon as the faster leg
+    lands, a provisional top-``top_k`` ranked from that leg alone is
+    yielded (as copies, skipped when empty). The final RRF merge of both
+    legs is always yielded last, so latency to the first results tracks
+    the faster leg and to the final ranking the slower one. Legs still
+    running when the consumer stops iterating are cancelled.
+    """
+    async with _leg_connection(conn, pool) as text_conn:
+        legs = [
+            asyncio.ensure_future(
+                _weighted(
+                    semantic_search(
+                        conn,
+                        query_embedding,
+                        top_k * 2,
+                        project,
+                        as_of,
+                        vector_format=vector_format,
+                        ann=ann,
+                        partitioned=partitioned,
+                    ),
+                    vector_weight,
+                    preferred=True,
+                )
+            ),
+            asyncio.ensure_future(
+                _weighted(
+                    text_search(text_conn, query, project, limit=top_k * 2, as_of=as_of),
+                    text_weight,
+                    preferred=False,
+                )
+            ),
+        ]
+        try:
+            acc = _RRFAccumulator()
+            for landed, leg in enumerate(asyncio.as_completed(legs), start=1):
+                acc.add(*await leg)
+                if landed < len(legs):
+                    provisional = [copy.copy(r) for r in acc.top(top_k)]
+                    if provisional:
+                        yield provisional
+        finally:
+            for leg in legs:
+                leg.cancel()
+            await asyncio.gather(*legs, return_exceptions=True)
+
+    yield acc.top(top_k)
+
+
 async def hybrid_search(
     conn: aiosqlite.Connection,
     query: str,
@@ -28,34 +206,29 @@ async def hybrid_search(
     as_of: str | None = None,
     vector_weight: float = 0.6,
     text_weight: float = 0.4,
+    vector_format: str = VECTOR_FORMAT,
+    ann=None,
+    partitioned: bool = False,
+    pool: "CortexConnectionPool | None" = None,
 ) -> list[SearchResult]:
     """Hybrid search combining semantic + text via RRF (async)."""
-    sem_results = await semantic_search(conn, query_embedding, top_k * 2, project, as_of)
-    txt_results = await text_search(conn, query, project, limit=top_k * 2, as_of=as_of)
-
-    rrf_scores: dict[int, float] = {}
-    result_map: dict[int, SearchResult] = {}
-
-    for rank, res in enumerate(sem_results):
-        rrf_scores[res.fact_id] = rrf_scores.get(res.fact_id, 0.0) + vector_weight / (
-            RRF_K + rank + 1
-        )
-        result_map[res.fact_id] = res
-
-    for rank, res in enumerate(txt_results):
-        rrf_scores[res.fact_id] = rrf_scores.get(res.fact_id, 0.0) + text_weight / (
-            RRF_K + rank + 1
-        )
-        if res.fact_id not in result_map:
-            result_map[res.fact_id] = res
-
-    sorted_ids = sorted(rrf_scores, key=rrf_scores.get, reverse=True)[:top_k]
-    merged = []
-    for fid in sorted_ids:
-        r = result_map[fid]
-        r.score = rrf_scores[fid]
-        merged.append(r)
-    return merged
+    final: list[SearchResult] = []
+    async for ranking in hybrid_search_stream(
+        conn,
+        query,
+        query_embedding,
+        top_k,
+        project,
+        as_of,
+        vector_weight,
+        text_weight,
+        vector_format=vector_format,
+        ann=ann,
+        partitioned=partitioned,
+        pool=pool,
+    ):
+        final = ranking
+    return final
 
 
 def hybrid_search_sync(
@@ -66,31 +239,17 @@ def hybrid_search_sync(
     project: str | None = None,
     vector_weight: float = 0.6,
     text_weight: float = 0.4,
+    vector_format: str = VECTOR_FORMAT,
+    partitioned: bool = False,
 ) -> list[SearchResult]:
     """Hybrid search combining semantic + text via RRF (sync)."""
-    sem_results = semantic_search_sync(conn, query_embedding, top_k * 2, project)
+    sem_results = semantic_search_sync(
+        conn,
+        query_embedding,
+        top_k * 2,
+        project,
+        vector_format=vector_format,
+        partitioned=partitioned,
+    )
     txt_results = text_search_sync(conn, query, project, limit=top_k * 2)
-
-    rrf_scores: dict[int, float] = {}
-    result_map: dict[int, SearchResult] = {}
-
-    for rank, res in enumerate(sem_results):
-        rrf_scores[res.fact_id] = rrf_scores.get(res.fact_id, 0.0) + vector_weight / (
-            RRF_K + rank + 1
-        )
-        result_map[res.fact_id] = res
-
-    for rank, res in enumerate(txt_results):
-        rrf_scores[res.fact_id] = rrf_scores.get(res.fact_id, 0.0) + text_weight / (
-            RRF_K + rank + 1
-        )
-        if res.fact_id not in result_map:
-            result_map[res.fact_id] = res
-
-    sorted_ids = sorted(rrf_scores, key=rrf_scores.get, reverse=True)[:top_k]
-    merged = []
-    for fid in sorted_ids:
-        r = result_map[fid]
-        r.score = rrf_scores[fid]
-        merged.append(r)
-    return merged
+    return rrf_merge(sem_results, txt_results, top_k, vector_weight, text_weight)
@@ -7,21 +7,31 @@
 
 import json
 import sqlite3
+import weakref
 
 import aiosqlite
 
 from cortex.search.models import SearchResult
 
+# Connections known to have facts_fts. Only positive probes are kept: the
+# table may be created after a connection first looks, but it is never dropped.
+_FTS5_CONNECTIONS: "weakref.WeakSet[aiosqlite.Connection]" = weakref.WeakSet()
+
 
 async def _has_fts5(conn: aiosqlite.Connection) -> bool:
-    """Check if facts_fts virtual table exists."""
+    """Check if facts_fts virtual table exists (cached per connection)."""
+    if conn in _FTS5_CONNECTIONS:
+        return True
     try:
         cursor = await conn.execute(
             "SELECT 1 FROM sqlite_master WHERE type='table' AND name='facts_fts'"
         )
-        return (await cursor.fetchone()) is not None
+        found = (await cursor.fetchone()) is not None
     except (aiosqlite.Error, sqlite3.Error):
         return False
+    if found:
+        _FTS5_CONNECTIONS.add(conn)
+    return found
 
 
 def _has_fts5_sync(conn: sqlite3.Connection) -> bool:
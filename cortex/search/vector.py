@@ -5,20 +5,228 @@
 
 """Vector search implementation."""
 
+import asyncio
 import json
 import logging
+import math
 import sqlite3
+import struct
+from typing import TYPE_CHECKING
 
 import aiosqlite
 
+from cortex.compression import int8_values, pack_float32, quantize_int8, unpack_float32
+from cortex.config import VECTOR_FORMAT
 from cortex.search.models import SearchResult
 from cortex.temporal import build_temporal_filter_params
 
+if TYPE_CHECKING:
+    from cortex.search.ann import AnnIndexManager
+
 logger = logging.getLogger("cortex.search.vector")
 
 # ─── SQL fragment constants ────────────────────────────────
 _FILTER_PROJECT = " AND f.project = ?"
 _FILTER_ACTIVE = " AND f.valid_until IS NULL"
+_EMBEDDINGS_DDL = "SELECT sql FROM sqlite_master WHERE name = 'fact_embeddings'"
+
+VECTOR_FORMATS = ("float32", "int8")
+
+
+# ─── Binary vector codec ───────────────────────────────────
+
+
+def encode_vector(embedding: list[float], vector_format: str = VECTOR_FORMAT) -> bytes:
+    """Encode an embedding as the blob stored in ``fact_embeddings``."""
+    if vector_format == "int8":
+        return int8_values(quantize_int8(embedding))
+    return pack_float32(embedding)
+
+
+def vector_param(vector_format: str = VECTOR_FORMAT) -> str:
+    """SQL placeholder for an encoded vector (int8 blobs need a type tag)."""
+    return "vec_int8(?)" if vector_format == "int8" else "?"
+
+
+def parse_vector_format(ddl: str | None) -> str:
+    """Infer the storage format from the ``fact_embeddings`` DDL."""
+    if ddl and "int8[" in ddl.lower():
+        return "int8"
+    return "float32"
+
+
+async def detect_vector_format(conn: aiosqlite.Connection) -> str:
+    """Return the storage format of an existing ``fact_embeddings`` table."""
+    cursor = await conn.execute(_EMBEDDINGS_DDL)
+    row = await cursor.fetchone()
+    return parse_vector_format(row[0]) if row else VECTOR_FORMAT
+
+
+def detect_vector_format_sync(conn: sqlite3.Connection) -> str:
+    """Return the storage format of an existing ``fact_embeddings`` table (sync)."""
+    row = conn.execute(_EMBEDDINGS_DDL).fetchone()
+    return parse_vector_format(row[0]) if row else VECTOR_FORMAT
+
+
+def parse_vector_partitioned(ddl: str | None) -> bool:
+    """True when ``fact_embeddings`` carries the project partition + active flag."""
+    return bool(ddl) and "partition key" in ddl.lower()
+
+
+async def detect_vector_partitioned(conn: aiosqlite.Connection) -> bool:
+    """Return whether an existing ``fact_embeddings`` table is partitioned.
+
+    ``False`` when there is no table (sqlite-vec unavailable).
+    """
+    cursor = await conn.execute(_EMBEDDINGS_DDL)
+    row = await cursor.fetchone()
+    return parse_vector_partitioned(row[0]) if row else False
+
+
+def detect_vector_partitioned_sync(conn: sqlite3.Connection) -> bool:
+    """Return whether an existing ``fact_embeddings`` table is partitioned (sync)."""
+    row = conn.execute(_EMBEDDINGS_DDL).fetchone()
+    return parse_vector_partitioned(row[0]) if row else False
+
+
+def insert_embedding_sql(vector_format: str = VECTOR_FORMAT, partitioned: bool = False) -> str:
+    """INSERT statement for one ``fact_embeddings`` row.
+
+    Parameters are always ``(fact_id, encoded_vector)``. On partitioned
+    tables, the project and active flag are copied from the ``facts`` row,
+    which must already exist in the same transaction.
+    """
+    if partitioned:
+        param = "vec_int8(?2)" if vector_format == "int8" else "?2"
+        return (
+            "INSERT INTO fact_embeddings (fact_id, project, active, embedding) "
+            f"SELECT ?1, f.project, f.valid_until IS NULL, {param} FROM facts f WHERE f.id = ?1"
+        )
+    return (
+        "INSERT INTO fact_embeddings (fact_id, embedding) "
+        f"VALUES (?, {vector_param(vector_format)})"
+    )
+
+
+# Deprecation moves a vector out of the active set without touching it.
+DEACTIVATE_EMBEDDING_SQL = "UPDATE fact_embeddings SET active = 0 WHERE fact_id = ?"
+
+
+async def deactivate_embedding(conn: aiosqlite.Connection, fact_id: int, partitioned: bool) -> None:
+    """Clear the ``active`` flag of a deprecated fact's vector.
+
+    Best-effort, like the embedding insert: a missing vector table (no
+    sqlite-vec) must not fail the deprecation.
+    """
+    if not partitioned:
+        return
+    try:
+        await conn.execute(DEACTIVATE_EMBEDDING_SQL, (fact_id,))
+    except sqlite3.OperationalError as e:
+        logger.warning("Could not deactivate embedding of fact %d: %s", fact_id, e)
+
+
+def deactivate_embedding_sync(conn: sqlite3.Connection, fact_id: int, partitioned: bool) -> None:
+    """Clear the ``active`` flag of a deprecated fact's vector (sync, best-effort)."""
+    if not partitioned:
+        return
+    try:
+        conn.execute(DEACTIVATE_EMBEDDING_SQL, (fact_id,))
+    except sqlite3.OperationalError as e:
+        logger.warning("Could not deactivate embedding of fact %d: %s", fact_id, e)
+
+
+def knn_filters(
+    project: str | None, current_only: bool, top_k: int, partitioned: bool
+) -> tuple[str, list, int]:
+    """Filters applied inside the KNN, plus the ``k`` to ask for.
+
+    On partitioned tables, project and activity are vec0 partition/metadata
+    constraints. The KNN then only ranks candidate rows and ``k = top_k`` is
+    exact. Legacy tables over-fetch ``top_k * 3`` and filter afterwards.
+    """
+    if not partitioned:
+        return "", [], top_k * 3
+    sql, params = "", []
+    if project:
+        sql += " AND ve.project = ?"
+        params.append(project)
+    if current_only:
+        sql += " AND ve.active = 1"
+        return sql, params, top_k
+    # as_of queries still post-filter on validity windows.
+    return sql, params, top_k * 3
+
+
+# ─── KNN search ────────────────────────────────────────────
+
+
+_RESULT_COLUMNS = """
+            f.id, f.content, f.project, f.fact_type, f.confidence,
+            f.valid_from, f.valid_until, f.tags, f.source, f.meta,
+            {distance}, f.created_at, f.updated_at, f.tx_id, t.hash
+"""
+
+
+def _row_to_result(row) -> SearchResult:
+    try:
+        tags = json.loads(row[7]) if row[7] else []
+        meta = json.loads(row[9]) if row[9] else {}
+    except (json.JSONDecodeError, TypeError):
+        tags, meta = [], {}
+
+    return SearchResult(
+        fact_id=row[0],
+        content=row[1],
+        project=row[2],
+        fact_type=row[3],
+        confidence=row[4],
+        valid_from=row[5],
+        valid_until=row[6],
+        tags=tags,
+        source=row[8],
+        meta=meta,
+        score=1.0 - (row[10] if row[10] else 0.0),
+        created_at=row[11],
+        updated_at=row[12],
+        tx_id=row[13],
+        hash=row[14],
+    )
+
+
+async def ann_search(
+    conn: aiosqlite.Connection,
+    ann: "AnnIndexManager",
+    query_embedding: list[float],
+    top_k: int,
+    project: str,
+) -> list[SearchResult] | None:
+    """Answer a project-scoped KNN from the ANN index.
+
+    Returns ``None`` when the project has no index, so the caller runs the
+    exact sqlite-vec query instead.
+    """
+    hits = await asyncio.to_thread(ann.search, project, query_embedding, top_k)
+    if hits is None:
+        return None
+    if not hits:
+        return []
+
+    distances = dict(hits)
+    placeholders = ", ".join("?" for _ in hits)
+    cursor = await conn.execute(
+        f"SELECT {_RESULT_COLUMNS.format(distance='NULL')} "
+        "FROM facts AS f LEFT JOIN transactions t ON f.tx_id = t.id "
+        f"WHERE f.id IN ({placeholders}) AND f.valid_until IS NULL",
+        list(distances),
+    )
+    rows = await cursor.fetchall()
+    # Re-attach the index distance and keep the index's ranking.
+    rows = sorted(
+        (row[:10] + (distances[row[0]],) + row[11:] for row in rows),
+        key=lambda row: row[10],
+    )
+    return [_row_to_result(row) for row in rows]
 
 
 async def semantic_search(
@@ -27,23 +235,37 @@ async def semantic_search(
     top_k: int = 5,
     project: str | None = None,
     as_of: str | None = None,
+    vector_format: str = VECTOR_FORMAT,
+    ann: "AnnIndexManager | None" = None,
+    partitioned: bool = False,
 ) -> list[SearchResult]:
-    """Perform semantic vector search using sqlite-vec."""
-    embedding_json = json.dumps(query_embedding)
+    """Perform semantic vector search using sqlite-vec.
 
-    sql = """
-        SELECT
-            f.id, f.content, f.project, f.fact_type, f.confidence,
-            f.valid_from, f.valid_until, f.tags, f.source, f.meta,
-            ve.distance, f.created_at, f.updated_at, f.tx_id, t.hash
+    With an ``ann`` manager, project-scoped queries on current facts go
+    through the project's ANN index first; exact sqlite-vec KNN remains the
+    fallback. ``partitioned`` pre-filters the KNN on project and activity
+    (see ``knn_filters``).
+    """
+    if ann is not None and project and not as_of:
+        try:
+            results = await ann_search(conn, ann, query_embedding, top_k, project)
+            if results:
+                return results
+        except Exception as e:
+            logger.warning("ANN search failed, using exact search: %s", e)
+
+    sql = f"""
+        SELECT {_RESULT_COLUMNS.format(distance="ve.distance")}
         FROM fact_embeddings AS ve
         JOIN facts AS f ON f.id = ve.fact_id
         LEFT JOIN transactions t ON f.tx_id = t.id
-        WHERE ve.embedding MATCH ?
+        WHERE ve.embedding MATCH {vector_param(vector_format)}
             AND k = ?
     """
 
-    params: list = [embedding_json, top_k * 3]
+    knn_sql, knn_params, k = knn_filters(project, not as_of, top_k, partitioned)
+    sql += knn_sql
+    params: list = [encode_vector(query_embedding, vector_format), k, *knn_params]
 
     if project:
         sql += _FILTER_PROJECT
@@ -65,36 +287,7 @@ async def semantic_search(
         logger.error("Semantic search failed: %s", e)
         return []
 
-    results = []
-    for row in rows[:top_k]:
-        try:
-            tags = json.loads(row[7]) if row[7] else []
-            meta = json.loads(row[9]) if row[9] else {}
-        except (json.JSONDecodeError, TypeError):
-            tags, meta = [], {}
-
-        score = 1.0 - (row[10] if row[10] else 0.0)
-
-        results.append(
-            SearchResult(
-                fact_id=row[0],
-                content=row[1],
-                project=row[2],
-                fact_type=row[3],
-                confidence=row[4],
-                valid_from=row[5],
-                valid_until=row[6],
-                tags=tags,
-                source=row[8],
-                meta=meta,
-                score=score,
-                created_at=row[11],
-                updated_at=row[12],
-                tx_id=row[13],
-                hash=row[14],
-            )
-        )
-    return results
+    return [_row_to_result(row) for row in rows[:top_k]]
 
 
 def semantic_search_sync(
@@ -102,21 +295,23 @@ def semantic_search_sync(
     query_embedding: list[float],
     top_k: int = 5,
     project: str | None = None,
+    vector_format: str = VECTOR_FORMAT,
+    partitioned: bool = False,
 ) -> list[SearchResult]:
     """Vector KNN search (sync)."""
-    embedding_json = json.dumps(query_embedding)
-
-    sql = """
+    sql = f"""
         SELECT
             f.id, f.content, f.project, f.fact_type, f.confidence,
             f.source, f.tags, ve.distance
         FROM fact_embeddings AS ve
         JOIN facts AS f ON f.id = ve.fact_id
-        WHERE ve.embedding MATCH ?
+        WHERE ve.embedding MATCH {vector_param(vector_format)}
             AND k = ?
             AND f.valid_until IS NULL
     """
-    params: list = [embedding_json, top_k * 3]
+    knn_sql, knn_params, k = knn_filters(project, True, top_k, partitioned)
+    sql += knn_sql
+    params: list = [encode_vector(query_embedding, vector_format), k, *knn_params]
     if project:
         sql += _FILTER_PROJECT
         params.append(project)
@@ -153,3 +348,110 @@ def semantic_search_sync(
             )
         )
     return results
+
+
+# ─── Storage migration ─────────────────────────────────────
+
+
+def _decode_vector(blob: bytes, vector_format: str) -> list[float]:
+    """Decode a stored ``fact_embeddings`` blob back to a unit vector."""
+    if vector_format == "float32":
+        return unpack_float32(blob)
+    values = [v / 127.0 for v in struct.unpack(f"{len(blob)}b", blob)]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]
+
+
+def rewrite_vector_storage(
+    conn: sqlite3.Connection,
+    target_format: str = VECTOR_FORMAT,
+    batch_size: int = 1000,
+) -> dict:
+    """One-shot rewrite of ``fact_embeddings`` into ``target_format``.
+
+    vec0 tables cannot be altered or renamed, so rows are staged in a TEMP
+    table, the virtual table is recreated with the target column type and
+    the vectors are re-inserted in batches, all inside one transaction.
+    Unpartitioned tables are rewritten even when the format already
+    matches, so they pick up the project partition and active flag.
+
+    Returns:
+        dict with 'from', 'to', 'partitioned' (before the rewrite), the
+        'rewritten' row count and the 'dropped' count of vectors whose fact
+        row no longer exists.
+    """
+    from cortex.schema import CREATE_EMBEDDINGS_FLOAT32, CREATE_EMBEDDINGS_INT8
+
+    if target_format not in VECTOR_FORMATS:
+        raise ValueError(f"Unknown vector format: {target_format}")
+
+    source_format = detect_vector_format_sync(conn)
+    partitioned = detect_vector_partitioned_sync(conn)
+    stats = {
+        "from": source_format,
+        "to": target_format,
+        "partitioned": partitioned,
+        "rewritten": 0,
+        "dropped": 0,
+    }
+    if source_format == target_format and partitioned:
+        return stats
+    if conn.execute(_EMBEDDINGS_DDL).fetchone() is None:  # no vector table (no sqlite-vec)
+        return stats
+
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS _vec_staging "
+            "(fact_id INTEGER PRIMARY KEY, embedding BLOB NOT NULL)"
+        )
+        conn.execute("DELETE FROM _vec_staging")
+        conn.execute("INSERT INTO _vec_staging SELECT fact_id, embedding FROM fact_embeddings")
+        conn.execute("DROP TABLE fact_embeddings")
+        conn.execute(
+            (CREATE_EMBEDDINGS_INT8 if target_format == "int8" else CREATE_EMBEDDINGS_FLOAT32)
+            .strip()
+            .rstrip(";")
+        )
+
+        insert_sql = insert_embedding_sql(target_format, partitioned=True)
+        cursor = conn.execute("SELECT fact_id, embedding FROM _vec_staging ORDER BY fact_id")
+        while batch := cursor.fetchmany(batch_size):
+            inserted = conn.executemany(
+                insert_sql,
+                [
+                    (fid, encode_vector(_decode_vector(blob, source_format), target_format))
+                    for fid, blob in batch
+                ],
+            )
+            stats["rewritten"] += inserted.rowcount
+
+        # The partitioned insert copies project/active from facts, so vectors
+        # whose fact row is gone are not carried over.
+        orphans = [
+            row[0]
+            for row in conn.execute(
+                "SELECT fact_id FROM _vec_staging "
+                "WHERE fact_id NOT IN (SELECT id FROM facts) ORDER BY fact_id"
+            )
+        ]
+        stats["dropped"] = len(orphans)
+        if orphans:
+            logger.warning(
+                "Dropped %d embeddings without a fact row: %s%s",
+                len(orphans),
+                orphans[:20],
+                " ..." if len(orphans) > 20 else "",
+            )
+        conn.execute("DROP TABLE _vec_staging")
+        conn.commit()
+    except (sqlite3.Error, ValueError):
+        conn.rollback()
+        raise
+
+    logger.info(
+        "Rewrote %d embeddings: %s → %s", stats["rewritten"], source_format, target_format
+    )
+    return stats
@@ -15,6 +15,9 @@ import logging
 import sqlite3
 from dataclasses import dataclass, field
 
+from cortex.config import VECTOR_FORMAT
+from cortex.search.vector import encode_vector, knn_filters, vector_param
+
 logger = logging.getLogger("cortex.search_sync")
 
 # RRF smoothing constant (standard value from the RRF paper)
@@ -53,21 +56,23 @@ def semantic_search_sync(
     query_embedding: list[float],
     top_k: int = 5,
     project: str | None = None,
+    vector_format: str = VECTOR_FORMAT,
+    partitioned: bool = False,
 ) -> list[SyncSearchResult]:
     """Vector KNN search using sqlite-vec (sync)."""
-    embedding_json = json.dumps(query_embedding)
-
-    sql = """
+    sql = f"""
         SELECT
             f.id, f.content, f.project, f.fact_type, f.confidence,
             f.source, f.tags, ve.distance
         FROM fact_embeddings AS ve
         JOIN facts AS f ON f.id = ve.fact_id
-        WHERE ve.embedding MATCH ?
+        WHERE ve.embedding MATCH {vector_param(vector_format)}
             AND k = ?
             AND f.valid_until IS NULL
     """
-    params: list = [embedding_json, top_k * 3]
+    knn_sql, knn_params, k = knn_filters(project, True, top_k, partitioned)
+    sql += knn_sql
+    params: list = [encode_vector(query_embedding, vector_format), k, *knn_params]
 
     if project:
         sql += _PROJECT_FILTER
@@ -229,6 +234,8 @@ def hybrid_search_sync(
     project: str | None = None,
     vector_weight: float = 0.6,
     text_weight: float = 0.4,
+    vector_format: str = VECTOR_FORMAT,
+    partitioned: bool = False,
 ) -> list[SyncSearchResult]:
     """Hybrid search combining semantic + text via Reciprocal Rank Fusion (sync).
 
@@ -240,6 +247,8 @@ def hybrid_search_sync(
         query_embedding,
         top_k=top_k * 2,
         project=project,
+        vector_format=vector_format,
+        partitioned=partitioned,
     )
     txt_results = text_search_sync(
         conn,
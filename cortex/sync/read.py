@@ -7,6 +7,8 @@ import logging
 import sqlite3
 from typing import TYPE_CHECKING
 
+from cortex.graph import release_fact_mentions_sync
+from cortex.search.vector import deactivate_embedding_sync
 from cortex.sync.common import (
     MEMORY_DIR,
     SyncResult,
@@ -119,36 +121,46 @@ def _sync_ghosts(engine: CortexEngine, path: Path, result: SyncResult) -> None:
     # Deprecar ghosts anteriores (son snapshots temporales)
     conn = engine._get_sync_conn()
     try:
+        stale = [
+            row[0]
+            for row in conn.execute(
+                "SELECT id FROM facts WHERE fact_type = 'ghost' AND valid_until IS NULL"
+            )
+        ]
         conn.execute(
             "UPDATE facts SET valid_until = ? WHERE fact_type = 'ghost' AND valid_until IS NULL",
             (result.synced_at,),
         )
+        # Sacar sus vectores de la partición activa y sus menciones del grafo,
+        # como hace deprecate
+        for fact_id in stale:
+            if engine._vec_available:
+                deactivate_embedding_sync(conn, fact_id, engine._vector_partitioned)
+            release_fact_mentions_sync(conn, fact_id)
         conn.commit()
     except sqlite3.Error as e:
         result.errors.append(f"Error deprecando ghosts antiguos: {e}")
 
     # Insertar snapshot actual de cada proyecto
-    for project_name, ghost_data in data.items():
-        content = (
-            f"GHOST: {project_name} | "
-            f"Última tarea: {ghost_data.get('last_task', 'desconocida')} | "
-            f"Estado: {ghost_data.get('mood', 'desconocido')} | "
-            f"Bloqueado: {ghost_data.get('blocked_by', 'no')}"
-        )
-        try:
-            engine.store_sync(
-                project=project_name,
-                content=content,
-                fact_type="ghost",
-                tags=["ghost", "proyecto-estado", ghost_data.get("mood", "")],
-                confidence="verified",
-                source="sync-agent-memory",
-                meta=ghost_data,
-                valid_from=ghost_data.get("timestamp"),
-            )
-            result.ghosts_synced += 1
-        except (sqlite3.Error, ValueError) as e:
-            result.errors.append(f"Error sincronizando ghost {project_name}: {e}")
+    facts = [
+        {
+            "project": project_name,
+            "content": (
+                f"GHOST: {project_name} | "
+                f"Última tarea: {ghost_data.get('last_task', 'desconocida')} | "
+                f"Estado: {ghost_data.get('mood', 'desconocido')} | "
+                f"Bloqueado: {ghost_data.get('blocked_by', 'no')}"
+            ),
+            "fact_type": "ghost",
+            "tags": ["ghost", "proyecto-estado", ghost_data.get("mood", "")],
+            "confidence": "verified",
+            "source": "sync-agent-memory",
+            "meta": ghost_data,
+            "valid_from": ghost_data.get("timestamp"),
+        }
+        for project_name, ghost_data in data.items()
+    ]
+    result.ghosts_synced += _store_batch(engine, facts, result, "ghosts")
 
 
 def _sync_mistakes(engine: CortexEngine, path: Path, result: SyncResult) -> None:
@@ -166,22 +178,20 @@ def _sync_mistakes(engine: CortexEngine, path: Path, result: SyncResult) -> None
         )
 
     new_mistakes = calculate_fact_diff(existing, lines, generate_content)
-    for content, m in new_mistakes:
-        try:
-            engine.store_sync(
-                project=m.get("project", "__system__"),
-                content=content,
-                fact_type="error",
-                tags=m.get("tags", []),
-                confidence="verified",
-                source="sync-agent-memory",
-                valid_from=m.get("date"),
-                meta=m,
-            )
-            result.errors_synced += 1
-            existing.add(content)
-        except Exception as e:
-            result.errors.append(f"Error sync mistake: {e}")
+    facts = [
+        {
+            "project": m.get("project", "__system__"),
+            "content": content,
+            "fact_type": "error",
+            "tags": m.get("tags", []),
+            "confidence": "verified",
+            "source": "sync-agent-memory",
+            "valid_from": m.get("date"),
+            "meta": m,
+        }
+        for content, m in new_mistakes
+    ]
+    result.errors_synced += _store_batch(engine, facts, result, "mistakes")
 
 
 def _sync_bridges(engine: CortexEngine, path: Path, result: SyncResult) -> None:
@@ -199,19 +209,28 @@ def _sync_bridges(engine: CortexEngine, path: Path, result: SyncResult) -> None:
         )
 
     new_bridges = calculate_fact_diff(existing, lines, generate_content)
-    for content, b in new_bridges:
-        try:
-            engine.store_sync(
-                project="__bridges__",
-                content=content,
-                fact_type="bridge",
-                tags=[b.get("from", ""), b.get("to", ""), b.get("pattern", "")],
-                confidence="verified",
-                source="sync-agent-memory",
-                valid_from=b.get("date"),
-                meta=b,
-            )
-            result.bridges_synced += 1
-            existing.add(content)
-        except Exception as e:
-            result.errors.append(f"Error sync bridge: {e}")
+    facts = [
+        {
+            "project": "__bridges__",
+            "content": content,
+            "fact_type": "bridge",
+            "tags": [b.get("from", ""), b.get("to", ""), b.get("pattern", "")],
+            "confidence": "verified",
+            "source": "sync-agent-memory",
+            "valid_from": b.get("date"),
+            "meta": b,
+        }
+        for content, b in new_bridges
+    ]
+    result.bridges_synced += _store_batch(engine, facts, result, "bridges")
+
+
+def _store_batch(engine: CortexEngine, facts: list[dict], result: SyncResult, label: str) -> int:
+    """Almacena un lote de hechos con una sola llamada a embed_batch por chunk."""
+    if not facts:
+        return 0
+    try:
+        return len(engine.store_many_sync(facts))
+    except (sqlite3.Error, ValueError) as e:
+        result.errors.append(f"Error sincronizando {label}: {e}")
+        return 0
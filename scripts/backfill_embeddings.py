@@ -13,7 +13,6 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import json
 import logging
 import sqlite3
 import sys
@@ -24,6 +23,11 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from cortex.embeddings import LocalEmbedder  # noqa: E402
+from cortex.search.vector import (  # noqa: E402
+    detect_vector_format_sync,
+    encode_vector,
+    insert_embedding_sql,
+)
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger("backfill")
@@ -73,6 +77,8 @@ def backfill(
         return {"total": total, "embedded": 0, "skipped": 0, "dry_run": True}
 
     embedder = LocalEmbedder()
+    vector_format = detect_vector_format_sync(conn)
+    insert_sql = insert_embedding_sql(vector_format)
     embedded = 0
     skipped = 0
     start = time.time()
@@ -87,10 +93,7 @@ def backfill(
 
             for fact_id, embedding in zip(ids, embeddings):
                 try:
-                    conn.execute(
-                        "INSERT INTO fact_embeddings (fact_id, embedding) VALUES (?, ?)",
-                        (fact_id, json.dumps(embedding)),
-                    )
+                    conn.execute(insert_sql, (fact_id, encode_vector(embedding, vector_format)))
                     embedded += 1
                 except sqlite3.IntegrityError:
                     skipped += 1  # Already exists (race condition)
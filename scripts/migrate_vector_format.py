@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+CORTEX — Rewrite fact_embeddings into a different vector storage format.
+
+sqlite-vec already stores FLOAT[384] rows as raw float32, so databases
+written through the old JSON binding path need no rewrite to benefit from
+binary binding. This one-shot migration is for switching storage format,
+e.g. float32 (1,536 B/row) → int8 (384 B/row), or back. Running it with
+the current format upgrades an unpartitioned table to the project-partitioned
+layout used for pre-filtered KNN.
+
+Usage:
+    python scripts/migrate_vector_format.py --to int8 [--db PATH] [--batch-size N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cortex.search.vector import (  # noqa: E402
+    VECTOR_FORMATS,
+    detect_vector_format_sync,
+    detect_vector_partitioned_sync,
+    rewrite_vector_storage,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger("migrate_vector_format")
+
+DEFAULT_DB = Path.home() / ".cortex" / "cortex.db"
+
+
+def migrate(db_path: str, target_format: str, batch_size: int = 1000) -> dict:
+    """Rewrite all embeddings in ``db_path`` into ``target_format``."""
+    import sqlite_vec
+
+    conn = sqlite3.connect(db_path)
+    conn.enable_load_extension(True)
+    sqlite_vec.load(conn)
+    conn.enable_load_extension(False)
+
+    try:
+        current = detect_vector_format_sync(conn)
+        partitioned = detect_vector_partitioned_sync(conn)
+        if current == target_format and partitioned:
+            logger.info("✅ fact_embeddings is already %s — nothing to do", target_format)
+            return {"from": current, "to": target_format, "partitioned": True, "rewritten": 0}
+
+        logger.info("🔄 Rewriting fact_embeddings: %s → %s", current, target_format)
+        start = time.time()
+        stats = rewrite_vector_storage(conn, target_format, batch_size=batch_size)
+        stats["time"] = time.time() - start
+    finally:
+        conn.close()
+
+    logger.info("🎯 Rewrote %d embeddings in %.1fs", stats["rewritten"], stats["time"])
+    logger.info("   Set CORTEX_VECTOR_FORMAT=%s so new databases match.", target_format)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite CORTEX vector storage format")
+    parser.add_argument("--db", default=str(DEFAULT_DB), help="Database path")
+    parser.add_argument("--to", required=True, choices=VECTOR_FORMATS, help="Target format")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per executemany")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        logger.error("❌ Database not found: %s", args.db)
+        sys.exit(1)
+
+    migrate(args.db, args.to, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
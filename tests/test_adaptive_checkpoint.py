@@ -38,7 +38,8 @@ async def ledger(tmp_path):
             tx_start_id INTEGER NOT NULL,
             tx_end_id INTEGER NOT NULL,
             tx_count INTEGER NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            tree_levels BLOB
         );
     """)
     await conn.commit()
@@ -0,0 +1,193 @@
+"""Tests for the per-project ANN index (cortex.search.ann)."""
+
+import hashlib
+import sqlite3
+
+import pytest
+import pytest_asyncio
+
+np = pytest.importorskip("numpy")
+
+from cortex.search.ann import AnnIndexManager, IVFIndex  # noqa: E402
+
+
+def _vec_loadable() -> bool:
+    try:
+        import sqlite_vec
+
+        conn = sqlite3.connect(":memory:")
+        conn.enable_load_extension(True)
+        sqlite_vec.load(conn)
+        conn.close()
+        return True
+    except (ImportError, AttributeError, sqlite3.Error, OSError):
+        return False
+
+
+def _clustered(n: int, dim: int = 384, clusters: int = 16, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vecs = centers[rng.integers(0, clusters, n)] + 0.3 * rng.normal(size=(n, dim))
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    return np.arange(1, n + 1, dtype=np.int64), vecs.astype(np.float32)
+
+
+class TestIVFIndex:
+    def test_recall_against_brute_force(self):
+        ids, vecs = _clustered(2000)
+        index = IVFIndex.train(ids, vecs)
+        queries = _clustered(20, seed=1)[1]
+        recall = 0.0
+        for q in queries:
+            exact = set(ids[np.argsort(-(vecs @ q))[:10]].tolist())
+            found = {fid for fid, _ in index.search(q, 10, nprobe=8)}
+            recall += len(exact & found) / 10
+        assert recall / len(queries) >= 0.9
+
+    def test_removed_ids_are_never_returned(self):
+        ids, vecs = _clustered(500)
+        index = IVFIndex.train(ids, vecs)
+        best = index.search(vecs[0], 1, nprobe=4)[0][0]
+        index.remove([best])
+        assert best not in {fid for fid, _ in index.search(vecs[0], 50, nprobe=64)}
+        assert len(index) == 499
+
+    def test_single_adds_grow_buffers_geometrically(self):
+        ids, vecs = _clustered(1000)
+        index = IVFIndex.train(ids[:100], vecs[:100])
+        capacities = set()
+        for fid, vec in zip(ids[100:], vecs[100:], strict=True):
+            index.add(np.array([fid]), vec[None, :])
+            capacities.add(len(index._ids))
+        assert len(capacities) <= 5  # 200, 400, 800, 1600 — not one copy per add
+        assert len(index) == 1000
+        assert index.search(vecs[-1], 1, nprobe=64)[0][0] == ids[-1]
+
+        index.remove(ids[100:])
+        index.compact()
+        assert len(index._ids) == len(index._vecs) == 100
+
+    def test_save_load_roundtrip(self, tmp_path):
+        ids, vecs = _clustered(300)
+        index = IVFIndex.train(ids, vecs)
+        index.remove([1, 2, 3])
+        index.save(tmp_path / "p.npz")
+        loaded = IVFIndex.load(tmp_path / "p.npz")
+        assert len(loaded) == 297
+        assert loaded.search(vecs[10], 5, 4) == index.search(vecs[10], 5, 4)
+
+
+class FakeEmbedder:
+    def embed(self, text):
+        digest = hashlib.sha256(text.encode()).digest()
+        vec = [digest[i % len(digest)] / 255.0 - 0.5 for i in range(384)]
+        norm = sum(x * x for x in vec) ** 0.5
+        return [x / norm for x in vec]
+
+    def embed_batch(self, texts, batch_size=32):
+        return [self.embed(t) for t in texts]
+
+
+@pytest.mark.skipif(not _vec_loadable(), reason="sqlite-vec extension loading unavailable")
+class TestEngineIntegration:
+    @pytest_asyncio.fixture
+    async def engine(self, tmp_path):
+        from cortex.engine import CortexEngine
+
+        eng = CortexEngine(str(tmp_path / "ann.db"), ann_index=True)
+        await eng.init_db()
+        eng.embeddings._embedder = FakeEmbedder()
+        eng._ann = AnnIndexManager(
+            eng._db_path, index_dir=tmp_path / "ann", vector_format=eng._vector_format,
+            min_rows=10,
+        )
+        yield eng
+        await eng.close()
+
+    @pytest.mark.asyncio
+    async def test_search_uses_index_and_tracks_writes(self, engine):
+        ids = await engine.store_many(
+            [{"project": "big", "content": f"Fact number {i}"} for i in range(40)]
+        )
+        await engine.store("small", "Fact number 3")
+
+        results = await engine.search("Fact number 3", project="big", top_k=3)
+        assert results[0].fact_id == ids[3]
+        assert engine._ann._indexes["big"] is not None
+
+        new_id = await engine.store("big", "Brand new fact")
+        assert new_id in engine._ann._indexes["big"].ids
+        await engine.deprecate(ids[3])
+        assert ids[3] not in engine._ann._indexes["big"].ids
+        results = await engine.search("Fact number 3", project="big", top_k=3)
+        assert ids[3] not in [r.fact_id for r in results]
+
+    @pytest.mark.asyncio
+    async def test_index_is_persisted_and_reconciled(self, engine, tmp_path):
+        await engine.store_many(
+            [{"project": "big", "content": f"Persisted {i}"} for i in range(20)]
+        )
+        await engine.search("Persisted 1", project="big")
+        engine._ann.flush()
+        assert list((tmp_path / "ann").rglob("*.npz"))
+
+        fresh = AnnIndexManager(engine._db_path, index_dir=tmp_path / "ann", min_rows=10)
+        await engine.store("big", "Written while the index was offline")
+        index = fresh.get("big")
+        assert len(index) == 21
+        fresh.close()
+
+    @pytest.mark.asyncio
+    async def test_small_project_falls_back_to_exact(self, engine):
+        fid = await engine.store("tiny", "Lonely fact")
+        results = await engine.search("Lonely fact", project="tiny")
+        assert engine._ann.get("tiny") is None
+        assert results[0].fact_id == fid
+
+    @pytest.mark.asyncio
+    async def test_caller_vectors_are_not_normalized_in_place(self, engine):
+        await engine.store_many(
+            [{"project": "big", "content": f"Fact number {i}"} for i in range(20)]
+        )
+        query = np.full(384, 3.0, dtype=np.float32)
+        vecs = np.full((1, 384), 3.0, dtype=np.float32)
+
+        assert engine._ann.search("big", query, 3)
+        engine._ann.add("big", [999], vecs)
+
+        assert (query == 3.0).all() and (vecs == 3.0).all()
+
+    @pytest.mark.asyncio
+    async def test_rolled_back_store_is_not_indexed(self, engine):
+        from cortex.connection_pool import CortexConnectionPool
+        from cortex.engine_async import AsyncCortexEngine
+
+        await engine.store_many(
+            [{"project": "big", "content": f"Fact number {i}"} for i in range(20)]
+        )
+        assert engine._ann.get("big") is not None
+
+        fid = await engine.store("big", "Never committed", commit=False)
+        await (await engine.get_conn()).rollback()
+        assert fid not in engine._ann._indexes["big"].ids
+
+        pool = CortexConnectionPool(str(engine._db_path), min_connections=1, max_connections=2)
+        await pool.initialize()
+        async_engine = AsyncCortexEngine(pool, str(engine._db_path))
+        async_engine._embedder = FakeEmbedder()
+        async_engine._ann = engine._ann
+        async_engine._vector_format = engine._vector_format
+        async_engine._vector_partitioned = engine._vector_partitioned
+        try:
+            async with pool.acquire() as conn:
+                fid = await async_engine.store("big", "Rolled back", commit=False, conn=conn)
+                await conn.rollback()
+            assert fid not in engine._ann._indexes["big"].ids
+
+            fid = await async_engine.store("big", "Committed")
+            assert fid in engine._ann._indexes["big"].ids
+            await async_engine.deprecate(fid)
+            assert fid not in engine._ann._indexes["big"].ids
+        finally:
+            await async_engine.close()
+            await pool.close()
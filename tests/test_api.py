@@ -135,3 +135,27 @@ class TestStatus:
     def test_status_requires_auth(self, client):
         resp = client.get("/v1/status")
         assert resp.status_code == 401
+
+
+def test_async_engine_uses_detected_vector_storage(tmp_path, monkeypatch):
+    """REST stores and searches use the fact_embeddings layout init_db found."""
+    import sqlite3
+
+    sqlite_vec = pytest.importorskip("sqlite_vec")
+    from cortex.search.vector import rewrite_vector_storage
+
+    db_path = str(tmp_path / "int8.db")
+    monkeypatch.setattr(cortex.config, "DB_PATH", db_path)
+    with TestClient(app):
+        pass  # creates the schema
+
+    conn = sqlite3.connect(db_path)
+    conn.enable_load_extension(True)
+    sqlite_vec.load(conn)
+    rewrite_vector_storage(conn, "int8")
+    conn.close()
+
+    with TestClient(app) as c:
+        async_engine = c.app.state.async_engine
+        assert async_engine._vector_format == "int8"
+        assert async_engine._vector_partitioned is c.app.state.engine._vector_partitioned
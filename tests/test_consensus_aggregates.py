@@ -0,0 +1,139 @@
+"""Tests for incrementally maintained consensus aggregates and their reconciliation."""
+
+import random
+import sqlite3
+
+import aiosqlite
+import pytest
+
+from cortex.consensus.aggregates import (
+    AGGREGATE_SQL,
+    consensus_score,
+    load_aggregate,
+    reconcile_aggregates,
+    record_vote,
+)
+from cortex.consensus.manager import ConsensusManager
+from cortex.migrations.mig_consensus import _migration_017_consensus_aggregates
+from cortex.schema import CREATE_AGENTS, CREATE_FACTS, CREATE_VOTES, CREATE_VOTES_V2
+
+AGENTS = {"a": 0.5, "b": 2.0, "c": 0.9, "d": 3.5}
+
+
+def _setup(db_path):
+    with sqlite3.connect(db_path) as setup:
+        setup.executescript(CREATE_FACTS + CREATE_VOTES + CREATE_AGENTS + CREATE_VOTES_V2)
+        setup.executemany(
+            "INSERT INTO facts (id, project, content, valid_from) VALUES (?, 'p', 'fact', '')",
+            [(i,) for i in range(1, 4)],
+        )
+        setup.executemany(
+            "INSERT INTO agents (id, public_key, name, reputation_score) VALUES (?, '', ?, ?)",
+            [(agent, agent, rep) for agent, rep in AGENTS.items()],
+        )
+        _migration_017_consensus_aggregates(setup)
+    setup.close()
+
+
+@pytest.fixture
+async def conn(tmp_path):
+    db_path = str(tmp_path / "consensus.db")
+    _setup(db_path)
+    conn = await aiosqlite.connect(db_path)
+    yield conn
+    await conn.close()
+
+
+async def _expected(conn, fact_id):
+    cursor = await conn.execute(AGGREGATE_SQL.format(where=" AND v.fact_id = ?"), (fact_id,))
+    row = await cursor.fetchone()
+    return (row[1], row[2], row[3]) if row else (0.0, 0.0, 0)
+
+
+class _Engine:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def get_conn(self):
+        return self.conn
+
+    async def _log_transaction(self, conn, project, action, detail):
+        return None
+
+
+class TestConsensusAggregates:
+    async def test_incremental_matches_full_recompute(self, conn):
+        rng = random.Random(7)
+        for _ in range(200):
+            fact_id, agent = rng.randint(1, 3), rng.choice(list(AGENTS))
+            await record_vote(conn, fact_id, agent, rng.choice((-1, 0, 1)), AGENTS[agent])
+
+        for fact_id in (1, 2, 3):
+            stored = await load_aggregate(conn, fact_id)
+            expected = await _expected(conn, fact_id)
+            assert stored[2] == expected[2]
+            assert stored[0] == pytest.approx(expected[0])
+            assert stored[1] == pytest.approx(expected[1])
+        report = await reconcile_aggregates(conn, repair=False)
+        assert report["drifted"] == []
+
+    async def test_replace_and_delete(self, conn):
+        await record_vote(conn, 1, "a", 1, 0.5)
+        assert await record_vote(conn, 1, "b", -1, 2.0) == (-1.5, 2.5, 2)
+        assert await record_vote(conn, 1, "b", 1, 2.0) == (2.5, 2.5, 2)
+        assert await record_vote(conn, 1, "a", 0, 0.5) == (2.0, 2.0, 1)
+        assert await record_vote(conn, 1, "b", 0, 2.0) == (0.0, 0.0, 0)
+        assert consensus_score(0.0, 0.0) == 1.0
+
+    async def test_inactive_agents_do_not_count(self, conn):
+        await conn.execute("UPDATE agents SET is_active = 0 WHERE id = 'd'")
+
+        assert await record_vote(conn, 2, "d", 1, 3.5, active=False) == (0.0, 0.0, 0)
+        assert await record_vote(conn, 2, "c", -1, 0.9) == (-0.9, 0.9, 1)
+        assert (await reconcile_aggregates(conn, [2], repair=False))["drifted"] == []
+
+    async def test_reconcile_repairs_drift(self, conn):
+        await record_vote(conn, 1, "a", 1, 0.5)
+        await record_vote(conn, 1, "b", -1, 2.0)
+        await record_vote(conn, 2, "c", 1, 0.9)
+        await conn.execute("UPDATE agents SET reputation_score = 4.0 WHERE id = 'a'")
+
+        audit = await reconcile_aggregates(conn, repair=False)
+        assert audit == {"facts_checked": 2, "drifted": [1], "repaired": 0}
+
+        report = await reconcile_aggregates(conn, [1])
+        assert report["repaired"] == 1
+        assert await load_aggregate(conn, 1) == (2.0, 6.0, 2)
+        assert (await reconcile_aggregates(conn, repair=False))["drifted"] == []
+
+    async def test_migration_backfills_existing_votes(self, tmp_path):
+        db_path = str(tmp_path / "legacy.db")
+        with sqlite3.connect(db_path) as setup:
+            setup.executescript(CREATE_FACTS + CREATE_AGENTS + CREATE_VOTES_V2)
+            setup.execute(
+                "INSERT INTO facts (id, project, content, valid_from) VALUES (1, 'p', 'f', '')"
+            )
+            setup.execute("INSERT INTO agents (id, public_key, name) VALUES ('x', '', 'x')")
+            setup.execute(
+                "INSERT INTO consensus_votes_v2 (fact_id, agent_id, vote, vote_weight, "
+                "agent_rep_at_vote) VALUES (1, 'x', -1, 1.5, 1.5)"
+            )
+            _migration_017_consensus_aggregates(setup)
+            row = setup.execute(
+                "SELECT weighted_sum, total_weight, vote_count, dispute_count "
+                "FROM consensus_aggregates WHERE fact_id = 1"
+            ).fetchone()
+        setup.close()
+        assert row == (-1.5, 1.5, 1, 1)
+
+    async def test_manager_scores_from_aggregate(self, conn):
+        manager = ConsensusManager(_Engine(conn))
+
+        assert await manager.vote_v2(1, "d", 1) == pytest.approx(2.0)
+        assert await manager.vote_v2(1, "a", -1) == pytest.approx(1.0 + 3.0 / 4.0)
+        cursor = await conn.execute("SELECT consensus_score, confidence FROM facts WHERE id = 1")
+        assert await cursor.fetchone() == (pytest.approx(1.75), "verified")
+
+        await manager.vote_v2(1, "d", 0)
+        assert await manager.vote_v2(1, "a", 0) == 1.0  # v1 fallback with no v2 votes
+        assert (await manager.reconcile_consensus())["drifted"] == []
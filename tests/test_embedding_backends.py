@@ -0,0 +1,101 @@
+"""Tests for LocalEmbedder inference backends and warm-up."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from cortex.embeddings import LocalEmbedder
+from cortex.embeddings.backends import OnnxEncoder, load_backend
+from cortex.embeddings.cache import EmbeddingCache
+
+np = pytest.importorskip("numpy")
+
+
+class FakeTokenizer:
+    """Whitespace tokenizer that pads to the longest text in the batch."""
+
+    def encode_batch(self, texts):
+        width = max(len(t.split()) for t in texts)
+        out = []
+        for t in texts:
+            n = len(t.split())
+            out.append(
+                SimpleNamespace(
+                    ids=list(range(1, n + 1)) + [0] * (width - n),
+                    attention_mask=[1] * n + [0] * (width - n),
+                )
+            )
+        return out
+
+
+class FakeSession:
+    """Hidden state of token i is [i, 1]; padding tokens are huge to catch leaks."""
+
+    def run(self, _outputs, feeds):
+        ids = feeds["input_ids"].astype(np.float32)
+        hidden = np.stack([ids, np.ones_like(ids)], axis=-1)
+        hidden[feeds["attention_mask"] == 0] = 1000.0
+        return [hidden]
+
+
+def _onnx_encoder():
+    encoder = OnnxEncoder.__new__(OnnxEncoder)
+    encoder._tokenizer = FakeTokenizer()
+    encoder._session = FakeSession()
+    encoder._inputs = {"input_ids", "attention_mask"}
+    return encoder
+
+
+class TestOnnxEncoder:
+    def test_mean_pooling_ignores_padding(self):
+        vectors = _onnx_encoder().encode(["a b c", "a"], normalize_embeddings=False)
+        assert vectors.tolist() == [[2.0, 1.0], [1.0, 1.0]]
+
+    def test_normalized_and_single_text(self):
+        vec = _onnx_encoder().encode("a b c")
+        assert vec.shape == (2,)
+        assert float(np.linalg.norm(vec)) == pytest.approx(1.0)
+
+    def test_batches_are_concatenated(self):
+        texts = ["a", "a b", "a b c", "a b c d", "a b c d e"]
+        vectors = _onnx_encoder().encode(texts, normalize_embeddings=False, batch_size=2)
+        assert vectors[:, 0].tolist() == [1.0, 1.5, 2.0, 2.5, 3.0]
+
+
+def test_unknown_backend_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown embedding backend"):
+        load_backend("tensorrt", "any-model", tmp_path)
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, normalize_embeddings=True, batch_size=32, show_progress_bar=False):
+        self.calls += 1
+        single = isinstance(texts, str)
+        out = np.ones((1 if single else len(texts), 3), dtype=np.float32)
+        return out[0] if single else out
+
+
+class TestLocalEmbedderBackend:
+    def test_int8_vectors_use_their_own_cache_namespace(self, tmp_path):
+        cache = EmbeddingCache(tmp_path / "c.db")
+        cache.put("m", "shared text", [0.5, 0.5, 0.5])
+        fp32 = LocalEmbedder(model_name="m", disk_cache=cache, backend="onnx")
+        int8 = LocalEmbedder(model_name="m", disk_cache=cache, backend="onnx-int8")
+        int8._model = CountingModel()
+
+        assert fp32.embed("shared text") == [0.5, 0.5, 0.5]
+        assert int8.embed("shared text") == [1.0, 1.0, 1.0]
+        assert int8._model.calls == 1
+        cache.close()
+
+    def test_warmup_runs_model_without_touching_cache(self, tmp_path):
+        cache = EmbeddingCache(tmp_path / "c.db")
+        embedder = LocalEmbedder(model_name="m", disk_cache=cache)
+        embedder._model = CountingModel()
+        embedder.warmup()
+        assert embedder._model.calls == 1
+        assert len(cache) == 0
+        cache.close()
@@ -0,0 +1,95 @@
+"""Tests for the persistent content-hash embedding cache."""
+
+import pytest
+
+from cortex.embeddings import LocalEmbedder
+from cortex.embeddings.cache import HIT_RATIO_GAUGE, EmbeddingCache, cache_key
+from cortex.metrics import metrics
+
+np = pytest.importorskip("numpy")
+
+MODEL = "test-model"
+
+
+class FakeModel:
+    """Stands in for SentenceTransformer; counts encoded texts."""
+
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts, normalize_embeddings=True, batch_size=32, show_progress_bar=False):
+        single = isinstance(texts, str)
+        batch = [texts] if single else texts
+        self.encoded += len(batch)
+        out = np.array([[float(len(t)), 1.0, 0.5] for t in batch], dtype=np.float32)
+        return out[0] if single else out
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = EmbeddingCache(tmp_path / "cache.db", max_entries=3)
+    yield c
+    c.close()
+
+
+class TestEmbeddingCache:
+    def test_key_ignores_whitespace_and_includes_model(self):
+        assert cache_key(MODEL, "  hello   world\n") == cache_key(MODEL, "hello world")
+        assert cache_key(MODEL, "hello") != cache_key("other-model", "hello")
+
+    def test_roundtrip_and_misses(self, cache):
+        cache.put(MODEL, "a", [0.25, -1.0])
+        assert cache.get_many(MODEL, ["a", "b"]) == [[0.25, -1.0], None]
+        assert cache.hits == 1 and cache.misses == 1
+        assert metrics._gauges[HIT_RATIO_GAUGE] == pytest.approx(0.5)
+
+    def test_lru_eviction_keeps_recently_used(self, cache):
+        for text, vec in (("a", [1.0]), ("b", [2.0]), ("c", [3.0])):
+            cache.put(MODEL, text, vec)
+        cache.get(MODEL, "a")  # refresh "a" (buffered, written with the next put)
+        cache.put(MODEL, "d", [4.0])
+        assert len(cache) <= 3  # trimmed below the bound, not to it
+        assert cache.get(MODEL, "a") == [1.0]
+        assert cache.get(MODEL, "d") == [4.0]
+        assert cache.get(MODEL, "b") is None
+
+    def test_reads_do_not_write(self, cache):
+        cache.put(MODEL, "a", [1.0])
+        conn = cache._get_conn()
+        before = conn.total_changes
+        assert cache.get(MODEL, "a") == [1.0]
+        assert conn.total_changes == before
+
+    def test_shared_between_instances(self, tmp_path):
+        first = EmbeddingCache(tmp_path / "shared.db")
+        first.put(MODEL, "persisted", [0.5])
+        first.close()
+        second = EmbeddingCache(tmp_path / "shared.db")
+        assert second.get(MODEL, "persisted") == [0.5]
+        second.close()
+
+
+class TestLocalEmbedderDiskCache:
+    def _embedder(self, cache):
+        embedder = LocalEmbedder(model_name=MODEL, disk_cache=cache)
+        embedder._model = FakeModel()
+        return embedder
+
+    def test_batch_only_encodes_misses(self, cache):
+        embedder = self._embedder(cache)
+        embedder.embed_batch(["one", "two"])
+        vectors = embedder.embed_batch(["one", "three", "two"])
+        assert embedder._model.encoded == 3
+        assert vectors[0] == [3.0, 1.0, 0.5]
+        assert vectors[1] == [5.0, 1.0, 0.5]
+
+    def test_cold_process_hits_disk_cache(self, tmp_path):
+        warm = self._embedder(EmbeddingCache(tmp_path / "c.db"))
+        warm.embed("re-stored content")
+
+        cold = self._embedder(EmbeddingCache(tmp_path / "c.db"))
+        assert cold.embed("re-stored content") == [17.0, 1.0, 0.5]
+        assert cold._model.encoded == 0
+
+    def test_disk_cache_can_be_disabled(self):
+        assert LocalEmbedder(disk_cache=False)._disk_cache is None
@@ -5,7 +5,14 @@ Tests quantize/dequantize roundtrip, compression ratio, and edge cases.
 
 import pytest
 
-from cortex.compression import compression_ratio, dequantize_int8, quantize_int8
+from cortex.compression import (
+    compression_ratio,
+    dequantize_int8,
+    int8_values,
+    pack_float32,
+    quantize_int8,
+    unpack_float32,
+)
 
 try:
     import numpy as np
@@ -84,6 +91,32 @@ class TestInt8Quantization:
         assert abs(restored[0] - 0.5) < 0.01
 
 
+class TestFloat32Packing:
+    """Tests for the raw float32 blob bound to sqlite-vec."""
+
+    def test_packed_size(self):
+        """float32 packed: 4 bytes per dimension, no header."""
+        assert len(pack_float32([0.1] * 384)) == 1536
+
+    def test_roundtrip_exact(self):
+        """Values representable in float32 survive a roundtrip unchanged."""
+        embedding = [0.5, -0.25, 0.0, 1.0]
+        assert unpack_float32(pack_float32(embedding)) == embedding
+
+    def test_little_endian_layout(self):
+        """Layout must match sqlite-vec's little-endian float32 blob."""
+        import struct
+
+        assert pack_float32([1.0, -2.0]) == struct.pack("<2f", 1.0, -2.0)
+
+    @pytest.mark.skipif(not _NP_AVAILABLE, reason="numpy required")
+    def test_int8_values_strips_scale(self):
+        """int8_values() drops the 4-byte scale header from quantize_int8()."""
+        packed = quantize_int8([0.1] * 384)
+        assert int8_values(packed) == packed[4:]
+        assert len(int8_values(packed)) == 384
+
+
 class TestCompressionRatio:
     """Tests for compression_ratio() reporting."""
 
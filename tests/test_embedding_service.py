@@ -0,0 +1,130 @@
+"""Tests for the shared embedding service (Unix-socket sidecar)."""
+
+import asyncio
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+from cortex.embeddings.service import EmbeddingService, EmbeddingServiceClient
+
+
+class FakeEmbedder:
+    """Records each embed_batch call; vectors encode the text length."""
+
+    def __init__(self, fail: bool = False, bad_text: str | None = None):
+        self.fail = fail
+        self.bad_text = bad_text
+        self.calls: list[list[str]] = []
+        self._lock = threading.Lock()
+
+    def embed_batch(self, texts, batch_size=32):
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        if self.bad_text in texts:
+            raise ValueError(f"cannot embed {self.bad_text!r}")
+        with self._lock:
+            self.calls.append(list(texts))
+        return [[float(len(t)), 0.5, -1.0] for t in texts]
+
+
+@pytest.fixture
+def socket_path():
+    # AF_UNIX paths are limited to ~104 bytes, so avoid pytest's long tmp_path.
+    tmp = tempfile.mkdtemp(prefix="cx-")
+    yield Path(tmp) / "embed.sock"
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+@pytest_asyncio.fixture
+async def service(socket_path):
+    svc = EmbeddingService(socket_path, embedder=FakeEmbedder(), window_ms=50, max_batch=64)
+    await svc.start()
+    yield svc
+    await svc.close()
+
+
+class TestEmbeddingService:
+    @pytest.mark.asyncio
+    async def test_client_roundtrip(self, service):
+        client = EmbeddingServiceClient(service.socket_path)
+        try:
+            vectors = await asyncio.to_thread(client.embed_batch, ["ab", "abcd"])
+            single = await asyncio.to_thread(client.embed, "xyz")
+        finally:
+            client.close()
+        assert vectors == [[2.0, 0.5, -1.0], [4.0, 0.5, -1.0]]
+        assert single == [3.0, 0.5, -1.0]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_batch(self, service):
+        client = EmbeddingServiceClient(service.socket_path)
+        texts = ["same", "same", "other", "same", "third", "other"]
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(len(texts)) as pool:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(pool, client.embed, t) for t in texts)
+            )
+        assert [r[0] for r in results] == [float(len(t)) for t in texts]
+        calls = service.embedder.calls
+        assert len(calls) < len(texts)
+        for call in calls:
+            assert len(call) == len(set(call))
+
+    @pytest.mark.asyncio
+    async def test_model_error_reaches_client(self, service):
+        service.embedder.fail = True
+        client = EmbeddingServiceClient(service.socket_path)
+        try:
+            with pytest.raises(RuntimeError, match="model unavailable"):
+                await asyncio.to_thread(client.embed, "boom")
+        finally:
+            client.close()
+
+    @pytest.mark.asyncio
+    async def test_bad_request_fails_alone(self, service):
+        service.embedder.bad_text = "poison"
+        good, bad, other = await asyncio.gather(
+            service.submit(["fine"]),
+            service.submit(["poison"]),
+            service.submit(["also fine", "fine"]),
+            return_exceptions=True,
+        )
+        assert good == [[4.0, 0.5, -1.0]]
+        assert isinstance(bad, ValueError)
+        assert other == [[9.0, 0.5, -1.0], [4.0, 0.5, -1.0]]
+
+    @pytest.mark.asyncio
+    async def test_close_cancels_idle_connections(self, socket_path):
+        svc = EmbeddingService(socket_path, embedder=FakeEmbedder())
+        await svc.start()
+        _, writer = await asyncio.open_unix_connection(str(socket_path))
+        try:
+            await asyncio.sleep(0.05)
+            (handler,) = [
+                t
+                for t in asyncio.all_tasks()
+                if t.get_coro().__qualname__ == "EmbeddingService._handle"
+            ]
+            await asyncio.wait_for(svc.close(), 2)
+            assert handler.cancelled()
+        finally:
+            writer.close()
+
+    def test_client_rejects_empty_text(self, socket_path):
+        with pytest.raises(ValueError):
+            EmbeddingServiceClient(socket_path).embed("   ")
+
+
+def test_create_embedder_honours_service_mode(monkeypatch):
+    from cortex import config
+    from cortex.embeddings import LocalEmbedder, create_embedder
+
+    monkeypatch.setattr(config, "EMBEDDINGS_MODE", "service")
+    assert isinstance(create_embedder(), EmbeddingServiceClient)
+    monkeypatch.setattr(config, "EMBEDDINGS_MODE", "local")
+    assert isinstance(create_embedder(), LocalEmbedder)
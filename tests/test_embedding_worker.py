@@ -0,0 +1,173 @@
+"""Tests for deferred embeddings — embedding_outbox queue and EmbeddingWorker."""
+
+import asyncio
+import hashlib
+import sqlite3
+
+import pytest
+import pytest_asyncio
+
+from cortex.embeddings.worker import QUEUE_DEPTH_GAUGE, EmbeddingWorker, queue_depth
+from cortex.engine import CortexEngine
+from cortex.metrics import metrics
+
+
+def _vec_loadable() -> bool:
+    try:
+        import sqlite_vec
+
+        conn = sqlite3.connect(":memory:")
+        conn.enable_load_extension(True)
+        sqlite_vec.load(conn)
+        conn.close()
+        return True
+    except (ImportError, AttributeError, sqlite3.Error, OSError):
+        return False
+
+
+pytestmark = pytest.mark.skipif(
+    not _vec_loadable(), reason="sqlite-vec extension loading unavailable"
+)
+
+
+class FakeEmbedder:
+    """Deterministic 384-d embedder; counts embed_batch calls."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.batches = 0
+
+    def embed(self, text):
+        digest = hashlib.sha256(text.encode()).digest()
+        vec = [digest[i % len(digest)] / 255.0 + 0.01 for i in range(384)]
+        norm = sum(x * x for x in vec) ** 0.5
+        return [x / norm for x in vec]
+
+    def embed_batch(self, texts, batch_size=32):
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        self.batches += 1
+        return [self.embed(t) for t in texts]
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    eng = CortexEngine(str(tmp_path / "deferred.db"), deferred_embed=True)
+    await eng.init_db()
+    eng.embeddings._embedder = FakeEmbedder()
+    # Created but not started: tests drain by hand instead of racing a thread.
+    eng._get_embedding_worker()
+    yield eng
+    await eng.close()
+
+
+def _count(engine, sql):
+    import sqlite_vec
+
+    conn = sqlite3.connect(str(engine._db_path))
+    conn.enable_load_extension(True)
+    sqlite_vec.load(conn)
+    try:
+        return conn.execute(sql).fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestDeferredStore:
+    @pytest.mark.asyncio
+    async def test_store_queues_instead_of_embedding(self, engine):
+        await engine.store("p", "Deferred fact about SQLite")
+        assert _count(engine, "SELECT COUNT(*) FROM embedding_outbox WHERE status = 'pending'") == 1
+        assert engine.embeddings._embedder.batches == 0
+
+    @pytest.mark.asyncio
+    async def test_store_many_queues_every_fact(self, engine):
+        await engine.store_many([{"project": "p", "content": f"Bulk {i}"} for i in range(5)])
+        assert _count(engine, "SELECT COUNT(*) FROM embedding_outbox") == 5
+
+    @pytest.mark.asyncio
+    async def test_search_falls_back_to_fts_for_queued_facts(self, engine):
+        embedded_id = await engine.store("p", "Alpha embedded fact")
+        await engine.process_embedding_outbox_async()
+        queued_id = await engine.store("p", "Zebra queued fact")
+
+        results = await engine.search("Zebra", project="p", top_k=5)
+        ids = [r.fact_id for r in results]
+        assert queued_id in ids
+        assert embedded_id in ids
+
+
+class TestEmbeddingWorker:
+    @pytest.mark.asyncio
+    async def test_drain_fills_embeddings_and_reports_depth(self, engine):
+        await engine.store_many([{"project": "p", "content": f"Fact {i}"} for i in range(7)])
+        worker = EmbeddingWorker(engine._db_path, FakeEmbedder(), batch_size=3)
+        try:
+            assert worker.drain() == 7
+            assert metrics._gauges[QUEUE_DEPTH_GAUGE] == 0
+        finally:
+            worker.stop()
+        assert _count(engine, "SELECT COUNT(*) FROM fact_embeddings") == 7
+        assert _count(engine, "SELECT COUNT(*) FROM embedding_outbox WHERE status = 'processed'") == 7
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_retried_then_marked_failed(self, engine):
+        await engine.store("p", "Unlucky fact")
+        worker = EmbeddingWorker(engine._db_path, FakeEmbedder(fail=True))
+        try:
+            for _ in range(5):
+                assert worker.drain_once() == 0
+            assert queue_depth(worker._get_conn()) == 0
+        finally:
+            worker.stop()
+        assert _count(engine, "SELECT status FROM embedding_outbox") == "failed"
+
+    @pytest.mark.asyncio
+    async def test_background_thread_drains_queue(self, engine):
+        worker = engine.start_embedding_worker()
+        assert worker.running
+        await engine.store("p", "Picked up by the thread")
+        for _ in range(50):
+            if _count(engine, "SELECT COUNT(*) FROM fact_embeddings") == 1:
+                break
+            await asyncio.sleep(0.05)
+        assert _count(engine, "SELECT COUNT(*) FROM fact_embeddings") == 1
+
+    @pytest.mark.asyncio
+    async def test_drained_batch_is_added_to_ann_index(self, engine, tmp_path):
+        pytest.importorskip("numpy")
+        from cortex.search.ann import AnnIndexManager
+
+        ann = AnnIndexManager(
+            engine._db_path, index_dir=tmp_path / "ann", vector_format=engine._vector_format,
+            min_rows=10,
+        )
+        worker = EmbeddingWorker(engine._db_path, FakeEmbedder(), ann=ann)
+        try:
+            await engine.store_many([{"project": "p", "content": f"Fact {i}"} for i in range(20)])
+            worker.drain()
+            assert ann.get("p") is not None
+
+            fid = await engine.store("p", "Embedded after the index was built")
+            worker.drain()
+            assert fid in ann._indexes["p"].ids
+        finally:
+            worker.stop()
+            ann.close()
+
+
+class TestEngineOwnedWorker:
+    @pytest.mark.asyncio
+    async def test_cli_store_is_embedded_without_the_api(self, tmp_path):
+        eng = CortexEngine(str(tmp_path / "cli.db"), deferred_embed=True)
+        await eng.init_db()
+        eng.embeddings._embedder = FakeEmbedder()
+
+        try:
+            eng.store_sync("p", "Stored from the CLI")
+            assert eng._embedding_worker is not None and eng._embedding_worker.running
+        finally:
+            await eng.close()
+
+        assert _count(eng, "SELECT COUNT(*) FROM fact_embeddings") == 1
+        assert _count(eng, "SELECT COUNT(*) FROM embedding_outbox WHERE status = 'pending'") == 0
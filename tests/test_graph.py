@@ -59,6 +59,42 @@ class TestEntityExtraction:
         assert extract_entities("") == []
         assert extract_entities("hello world") == []
 
+    def test_matches_per_pattern_scan(self):
+        from cortex.graph.patterns import COMMON_WORDS, ENTITY_PATTERNS
+
+        def reference(content):
+            seen, entities = set(), []
+            for entity_type, pattern in ENTITY_PATTERNS:
+                for match in pattern.finditer(content):
+                    name = match.group(1).strip()
+                    if len(name) < 2 or len(name) > 100 or name.lower() in seen:
+                        continue
+                    if entity_type == "project" and name.lower() in COMMON_WORDS:
+                        continue
+                    seen.add(name.lower())
+                    entities.append({"name": name, "entity_type": entity_type})
+            return entities
+
+        corpus = [
+            "Using sqlite-vec and SENTENCE-TRANSFORMERS with Next.js, node.js and npm",
+            "CortexEngine.py calls GitHub via https://github.com/a/b?x=1 and api.example.com",
+            "foo_bar.com `engine.py` 'schema.sql' real-time cortex-memory a-b-c x-1 open-source",
+            "Pythonic pytest-cov uses PyTest, pipx, pip-tools, MEM0 and mem0ai",
+            "Dotless ı and İstanbul, long ſqlite, Kelvin \u212aubernetes: DOCKER vs Docker",
+            "Índice señal: migración a FastAPI sobre PostgreSQL con Redis — naroa-2026",
+            "no entities here at all",
+        ]
+        for content in corpus:
+            assert extract_entities(content) == reference(content), content
+
+    def test_tool_pattern_matches_ignorecase(self):
+        from cortex.graph.patterns import ENTITY_PATTERNS, TOOL_NAMES, TOOL_PATTERN
+
+        tool = dict(ENTITY_PATTERNS)["tool"]
+        for name in TOOL_NAMES:
+            for text in (name, name.upper(), name.lower(), f"x{name} {name}-y {name}_z"):
+                assert TOOL_PATTERN.findall(text) == tool.findall(text), text
+
 
 class TestRelationshipDetection:
     """Tests for detect_relationships()."""
@@ -129,6 +165,67 @@ class TestGraphDBOperations:
         assert ent_count >= 2
         assert rel_count >= 1
 
+    def test_batch_matches_one_by_one(self, engine, tmp_path):
+        from cortex.graph import process_fact_graph_sync, process_facts_graph_sync
+
+        facts = [
+            (1, "engine.py depends on SQLite and FastAPI", "cortex", "2025-01-01T00:00:00"),
+            (2, "FastAPI uses SQLite for engine.py", "cortex", "2025-01-02T00:00:00"),
+            (3, "SQLite powers FastAPI", "other", "2025-01-03T00:00:00"),
+            (4, "engine.py depends on SQLite", "cortex", "2025-01-04T00:00:00"),
+        ]
+        other = CortexEngine(db_path=str(tmp_path / "one_by_one.db"), auto_embed=False)
+        other.init_db_sync()
+        one_by_one = other._get_sync_conn()
+        totals = [process_fact_graph_sync(one_by_one, *fact) for fact in facts]
+
+        batched = engine._get_sync_conn()
+        assert process_facts_graph_sync(batched, facts) == (
+            sum(t[0] for t in totals),
+            sum(t[1] for t in totals),
+        )
+
+        def dump(conn):
+            entities = conn.execute(
+                "SELECT name, project, entity_type, first_seen, last_seen, mention_count "
+                "FROM entities ORDER BY project, name"
+            ).fetchall()
+            relations = conn.execute(
+                "SELECT s.name, t.name, s.project, r.relation_type, r.weight, r.first_seen, "
+                "r.source_fact_id FROM entity_relations r "
+                "JOIN entities s ON s.id = r.source_entity_id "
+                "JOIN entities t ON t.id = r.target_entity_id ORDER BY 3, 1, 2"
+            ).fetchall()
+            return entities, relations
+
+        assert dump(batched) == dump(one_by_one)
+        assert ("FastAPI", "cortex", "tool", "2025-01-01T00:00:00", "2025-01-02T00:00:00", 2) in (
+            dump(batched)[0]
+        )
+
+    def test_unique_keys_migration_merges_duplicates(self, engine):
+        from cortex.migrations.mig_graph import _migration_018_graph_unique_keys
+
+        conn = engine._get_sync_conn()
+        conn.executescript(
+            "DROP INDEX idx_entities_name_project; DROP INDEX idx_relations_pair;"
+            "INSERT INTO entities (id, name, project, first_seen, last_seen, mention_count) "
+            "VALUES (1, 'A', 'p', 't1', 't2', 2), (2, 'B', 'p', 't1', 't1', 1), "
+            "(3, 'A', 'p', 't0', 't3', 1);"
+            "INSERT INTO entity_relations "
+            "(source_entity_id, target_entity_id, weight, first_seen) "
+            "VALUES (1, 2, 1.5, 't1'), (3, 2, 1.0, 't0');"
+        )
+
+        _migration_018_graph_unique_keys(conn)
+
+        assert conn.execute(
+            "SELECT id, first_seen, last_seen, mention_count FROM entities WHERE name = 'A'"
+        ).fetchall() == [(1, "t0", "t3", 3)]
+        assert conn.execute(
+            "SELECT source_entity_id, target_entity_id, weight FROM entity_relations"
+        ).fetchall() == [(1, 2, 2.0)]
+
 
 class TestGraphQueries:
     """Tests for graph query operations."""
@@ -158,6 +255,152 @@ class TestGraphQueries:
         assert result is None
 
 
+class TestGraphTraversal:
+    """Recursive SQL traversal and the in-memory snapshot."""
+
+    @pytest.fixture
+    def graph(self, engine, monkeypatch):
+        from cortex.graph import traversal
+
+        traversal.clear_snapshots()
+        monkeypatch.setattr(traversal, "GRAPH_SNAPSHOT_HOT_CALLS", 0)
+        conn = engine._get_sync_conn()
+        # A - B - C - D, a shortcut A - E - D and an isolated F.
+        conn.executescript(
+            "INSERT INTO entities (id, name, entity_type, project, first_seen, last_seen) "
+            "VALUES (1, 'A', 'tool', 'p', '', ''), (2, 'B', 'tool', 'p', '', ''), "
+            "(3, 'C', 'tool', 'p', '', ''), (4, 'D', 'tool', 'p', '', ''), "
+            "(5, 'E', 'tool', 'p', '', ''), (6, 'F', 'tool', 'p', '', '');"
+            "INSERT INTO entity_relations "
+            "(id, source_entity_id, target_entity_id, relation_type, weight, first_seen) "
+            "VALUES (1, 1, 2, 'uses', 1.0, ''), (2, 3, 2, 'uses', 2.0, ''), "
+            "(3, 3, 4, 'uses', 1.0, ''), (4, 1, 5, 'uses', 1.5, ''), "
+            "(5, 5, 4, 'uses', 1.0, '');"
+            "INSERT INTO transactions (project, action, hash) VALUES ('p', 'seed', 'h1');"
+        )
+        yield conn
+        traversal.clear_snapshots()
+
+    async def test_sql_matches_snapshot(self, graph, monkeypatch):
+        from cortex.graph import traversal
+
+        backend = SQLiteBackend(graph)
+        calls = [
+            ("find_path", ("A", "D", 3)),
+            ("find_path", ("D", "B", 2)),
+            ("find_path", ("A", "F", 5)),
+            ("find_path", ("A", "D", 1)),
+            ("find_context_subgraph", (["B"], 2, 50)),
+            ("find_context_subgraph", (["A", "C"], 1, 50)),
+            ("find_context_subgraph", (["A"], 3, 3)),
+        ]
+        sql = [await getattr(backend, name)(*args) for name, args in calls]
+        monkeypatch.setattr(traversal, "GRAPH_SNAPSHOT_HOT_CALLS", 1)
+        snapshot = [await getattr(backend, name)(*args) for name, args in calls]
+
+        assert traversal._SNAPSHOTS
+        assert snapshot == sql
+        assert sql[0] == [
+            {"source": "A", "target": "E", "type": "uses", "weight": 1.5},
+            {"source": "intermediate", "target": "D", "type": "uses", "weight": 1.0},
+        ]
+        assert [step["target"] for step in sql[1]] == ["C", "B"]
+        assert sql[2] == sql[3] == []
+        assert [n["name"] for n in sql[4]["nodes"]] == ["B", "A", "C", "D", "E"]
+        assert len(sql[4]["edges"]) == 4  # E - D is past the last expanded level
+        # The budget is spent after one level, so D is never reached.
+        assert [n["name"] for n in sql[6]["nodes"]] == ["A", "B", "E"]
+
+    async def test_snapshot_follows_ledger_head(self, graph, monkeypatch):
+        from cortex.graph import traversal
+
+        monkeypatch.setattr(traversal, "GRAPH_SNAPSHOT_HOT_CALLS", 1)
+        backend = SQLiteBackend(graph)
+        assert await backend.find_path("A", "F") == []
+
+        graph.executescript(
+            "INSERT INTO entity_relations "
+            "(source_entity_id, target_entity_id, relation_type, weight, first_seen) "
+            "VALUES (6, 1, 'uses', 1.0, '');"
+            "INSERT INTO transactions (project, action, hash) VALUES ('p', 'link', 'h2');"
+        )
+
+        assert [step["target"] for step in await backend.find_path("A", "F")] == ["F"]
+
+
+    async def test_batched_subgraphs_match_single_lookups(self, graph):
+        backend = SQLiteBackend(graph)
+        seed_sets = [["B"], ["A", "F"], ["D"], []]
+
+        batched = await backend.find_context_subgraphs(seed_sets, depth=2, max_nodes=4)
+
+        single = [await backend.find_context_subgraph(s, 2, 4) for s in seed_sets[:3]]
+        assert batched == single + [{"nodes": [], "edges": []}]
+
+    def test_fact_seeds_cached_per_fact(self):
+        from cortex.graph import fact_seeds
+
+        seeds = fact_seeds(10_001, "We use SQLite and FastAPI")
+        assert seeds == ["SQLite", "FastAPI"]
+        assert fact_seeds(10_001, "We use SQLite and FastAPI") is seeds
+        assert fact_seeds(10_001, "Moved to Redis") == ["Redis"]
+
+
+class TestFactEntities:
+    """The fact_entities index written at ingest."""
+
+    def _mentions(self, engine, name):
+        row = engine._get_sync_conn().execute(
+            "SELECT mention_count FROM entities WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0]
+
+    async def test_recall_and_deprecation(self, engine):
+        first = engine.store_sync("p", "We use SQLite and FastAPI")
+        second = engine.store_sync("p", "SQLite is embedded")
+        assert self._mentions(engine, "SQLite") == 2
+
+        facts = await engine.recall_entity("SQLite", project="p")
+        assert [f.id for f in facts] == [second, first]
+        assert await engine.recall_entity("SQLite", project="other") == []
+
+        assert engine.deprecate_sync(first)
+        assert not engine.deprecate_sync(first)
+        assert self._mentions(engine, "SQLite") == 1
+        assert self._mentions(engine, "FastAPI") == 0
+        assert [f.id for f in await engine.recall_entity("SQLite")] == [second]
+        await engine.close()
+
+    def test_migration_backfills_active_facts(self, engine):
+        from cortex.migrations.mig_graph import _migration_019_fact_entities
+
+        kept = engine.store_sync("p", "We use SQLite and FastAPI")
+        gone = engine.store_sync("p", "Redis cache")
+        engine.deprecate_sync(gone)
+        conn = engine._get_sync_conn()
+        expected = conn.execute("SELECT * FROM fact_entities WHERE fact_id = ?", (kept,)).fetchall()
+        conn.execute("DELETE FROM fact_entities")
+
+        _migration_019_fact_entities(conn)
+
+        assert conn.execute("SELECT * FROM fact_entities").fetchall() == expected
+        assert len(expected) == 2
+
+    async def test_graph_context_seeds_from_index(self, engine):
+        from types import SimpleNamespace
+
+        from cortex.graph import attach_graph_context
+
+        fact_id = engine.store_sync("p", "engine.py depends on SQLite")
+        # Seeds come from the index, not from the (stale) result text.
+        result = SimpleNamespace(fact_id=fact_id, content="no entities here", graph_context=None)
+        conn = await engine.get_conn()
+        await attach_graph_context(conn, [result], depth=1)
+        names = {node["name"] for node in result.graph_context["nodes"]}
+        assert names == {"engine.py", "SQLite"}
+        await engine.close()
+
+
 class TestEngineGraphIntegration:
     """Test that store() auto-extracts entities."""
 
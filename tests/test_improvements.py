@@ -135,6 +135,113 @@ class TestStoreMany:
         recalled = await engine.recall("rollback_test")
         assert len(recalled) == 0, f"Expected 0 facts after rollback, got {len(recalled)}"
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("commit_chunks, kept", [(False, 0), (True, 3)])
+    async def test_batch_store_failing_chunk(self, engine, monkeypatch, commit_chunks, kept):
+        """A failing chunk undoes the whole batch unless chunks commit separately."""
+        store_chunk = engine.facts._store_chunk
+        calls = []
+
+        async def flaky(conn, chunk):
+            calls.append(chunk)
+            if len(calls) == 2:
+                raise RuntimeError("disk full")
+            return await store_chunk(conn, chunk)
+
+        monkeypatch.setattr(engine.facts, "_store_chunk", flaky)
+        facts = [{"project": "flaky", "content": f"Flaky fact {i}"} for i in range(7)]
+        with pytest.raises(RuntimeError):
+            await engine.store_many(facts, chunk_size=3, commit_chunks=commit_chunks)
+        assert len(await engine.recall("flaky")) == kept
+
+    @pytest.mark.asyncio
+    async def test_batch_store_chunks_keep_ledger_chain(self, engine):
+        """Chunked bulk writes link every fact to a correctly chained tx."""
+        facts = [{"project": "chunked", "content": f"Chunked fact {i}"} for i in range(7)]
+        ids = await engine.store_many(facts, chunk_size=3)
+        assert len(set(ids)) == 7
+
+        conn = await engine.get_conn()
+        cursor = await conn.execute("SELECT id, tx_id FROM facts ORDER BY id")
+        tx_by_fact = dict(await cursor.fetchall())
+        assert all(tx_by_fact[i] is not None for i in ids)
+
+        cursor = await conn.execute("SELECT prev_hash, hash FROM transactions ORDER BY id")
+        rows = await cursor.fetchall()
+        assert rows[0][0] == "GENESIS"
+        for (_, prev), (linked, _) in zip(rows, rows[1:], strict=False):
+            assert linked == prev
+
+    @pytest.mark.asyncio
+    async def test_batch_store_accepts_store_keywords(self, engine):
+        """A list of store() kwargs can be passed to store_many unchanged."""
+        facts = [{"project": "kw", "content": "From store() kwargs", "tx_id": 99, "commit": True}]
+        (fid,) = await engine.store_many(facts)
+
+        conn = await engine.get_conn()
+        cursor = await conn.execute(
+            "SELECT t.action, t.detail FROM facts f JOIN transactions t ON t.id = f.tx_id "
+            "WHERE f.id = ?",
+            (fid,),
+        )
+        action, detail = await cursor.fetchone()
+        assert action == "store" and json.loads(detail)["fact_id"] == fid
+
+    @pytest.mark.asyncio
+    async def test_batch_store_failed_chunk_leaves_committed_head(self, engine, monkeypatch):
+        """Writes racing a chunk rollback chain off the last committed chunk."""
+        import asyncio
+
+        import cortex.facts.manager as manager
+
+        link = manager.link_transactions_async
+        calls = []
+
+        async def flaky_link(conn, fact_ids, tx_ids):
+            calls.append(fact_ids)
+            if len(calls) == 2:  # second chunk: its ledger rows are already appended
+                raise RuntimeError("disk full")
+            await link(conn, fact_ids, tx_ids)
+
+        conn = await engine.get_conn()
+        rollback = conn.rollback
+
+        async def slow_rollback():
+            await rollback()
+            await asyncio.sleep(0.05)  # let the concurrent store run meanwhile
+
+        monkeypatch.setattr(manager, "link_transactions_async", flaky_link)
+        monkeypatch.setattr(conn, "rollback", slow_rollback)
+
+        async def store_during_rollback():
+            while len(calls) < 2:
+                await asyncio.sleep(0)
+            return await engine.store("racer", "Stored while chunk 2 rolls back")
+
+        facts = [{"project": "flaky", "content": f"Flaky fact {i}"} for i in range(7)]
+        racer = asyncio.create_task(store_during_rollback())
+        with pytest.raises(RuntimeError):
+            await engine.store_many(facts, chunk_size=3, commit_chunks=True)
+        await racer
+        monkeypatch.setattr(manager, "link_transactions_async", link)
+        await engine.store_many([{"project": "flaky", "content": "Next batch"}])
+
+        cursor = await conn.execute("SELECT prev_hash, hash FROM transactions ORDER BY id")
+        rows = await cursor.fetchall()
+        assert len(rows) == 3 + 1 + 1
+        for (_, prev), (linked, _) in zip(rows, rows[1:], strict=False):
+            assert linked == prev
+
+    def test_store_many_sync_chunks_and_outbox(self, tmp_path):
+        eng = CortexEngine(str(tmp_path / "sync.db"), auto_embed=False)
+        eng.init_db_sync()
+        facts = [{"project": "s", "content": f"Sync fact {i}"} for i in range(5)]
+        ids = eng.store_many_sync(facts, chunk_size=2)
+        assert len(ids) == 5
+        conn = eng._get_sync_conn()
+        assert conn.execute("SELECT COUNT(*) FROM graph_outbox").fetchone()[0] == 5
+        eng.close_sync()
+
     def test_database_transaction_error_exists(self):
         """Verify DatabaseTransactionError is importable and properly typed."""
         from cortex.exceptions import CortexError, DatabaseTransactionError
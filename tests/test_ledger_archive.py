@@ -0,0 +1,186 @@
+"""Tests for streaming ledger segment export, verification and import."""
+
+import sqlite3
+
+import pytest
+
+from cortex.canonical import canonical_json, compute_tx_hash
+from cortex.engine.ledger_archive import (
+    SegmentReader,
+    archived_through,
+    export_segments,
+    import_segments,
+    verify_segments,
+)
+from cortex.merkle import pack_levels
+from cortex.migrations.mig_ledger import (
+    _migration_010_immutable_ledger,
+    _migration_016_merkle_tree_levels,
+)
+from cortex.schema import CREATE_TRANSACTIONS
+
+ROOT_SIZE = 4
+
+
+def _create(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(CREATE_TRANSACTIONS)
+    _migration_010_immutable_ledger(conn)
+    _migration_016_merkle_tree_levels(conn)
+    conn.commit()
+    return conn
+
+
+def _append(conn, count):
+    """Append ``count`` chained transactions, checkpointing every ROOT_SIZE."""
+    row = conn.execute("SELECT id, hash FROM transactions ORDER BY id DESC LIMIT 1").fetchone()
+    last_id, prev = row if row else (0, "GENESIS")
+    for i in range(last_id + 1, last_id + count + 1):
+        detail = canonical_json({"n": i, "text": "é" * (i % 3)})
+        ts = f"2026-01-01T00:{i // 60:02d}:{i % 60:02d}"
+        h = compute_tx_hash(prev, "p", "store", detail, ts)
+        conn.execute(
+            "INSERT INTO transactions (id, project, action, detail, prev_hash, hash, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (i, "p", "store", detail, prev, h, ts),
+        )
+        prev = h
+    start = conn.execute("SELECT COALESCE(MAX(tx_end_id), 0) FROM merkle_roots").fetchone()[0] + 1
+    while start + ROOT_SIZE - 1 <= last_id + count:
+        end = start + ROOT_SIZE - 1
+        leaves = [
+            r[0]
+            for r in conn.execute(
+                "SELECT hash FROM transactions WHERE id BETWEEN ? AND ? ORDER BY id", (start, end)
+            )
+        ]
+        root, levels = pack_levels(leaves)
+        conn.execute(
+            "INSERT INTO merkle_roots (root_hash, tx_start_id, tx_end_id, tx_count, tree_levels) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (root, start, end, ROOT_SIZE, levels),
+        )
+        start = end + 1
+    conn.commit()
+
+
+@pytest.fixture
+def source(tmp_path):
+    conn = _create(str(tmp_path / "source.db"))
+    _append(conn, 22)  # 5 checkpoints, 2 transactions past the last one
+    yield conn
+    conn.close()
+
+
+def _export(tmp_path, **kwargs):
+    return export_segments(tmp_path / "source.db", tmp_path / "archive", segment_size=8, **kwargs)
+
+
+class TestLedgerArchive:
+    def test_export_covers_whole_checkpoints(self, tmp_path, source):
+        written = _export(tmp_path)
+
+        assert [(s["first_tx"], s["last_tx"]) for s in written] == [(1, 8), (9, 16), (17, 20)]
+        assert archived_through(tmp_path / "archive") == 20
+        audit = source.execute(
+            "SELECT filename, tx_start_id, tx_end_id FROM audit_exports ORDER BY id"
+        ).fetchall()
+        assert audit == [
+            ("ledger-000000000001-000000000008.cxl", 1, 8),
+            ("ledger-000000000009-000000000016.cxl", 9, 16),
+            ("ledger-000000000017-000000000020.cxl", 17, 20),
+        ]
+
+        with SegmentReader(written[0]["path"]) as reader:
+            records = list(reader.records())
+            assert reader.prev_hash == "GENESIS"
+            assert reader.root == written[0]["root"]
+            assert reader.crc_ok
+        assert [r[0] for r in records] == ["T"] * 4 + ["M"] + ["T"] * 4 + ["M"]
+
+    def test_export_appends_only_new_checkpoints(self, tmp_path, source):
+        _export(tmp_path)
+        _append(source, 6)  # closes checkpoints 21-24 and 25-28
+
+        written = _export(tmp_path)
+
+        assert [(s["first_tx"], s["last_tx"]) for s in written] == [(21, 28)]
+        assert _export(tmp_path) == []
+
+    def test_verify_clean_archive(self, tmp_path, source):
+        _export(tmp_path)
+
+        report = verify_segments([tmp_path / "archive"])
+
+        assert report["valid"], report["violations"]
+        assert report["segments"] == 3
+        assert report["tx_checked"] == 20
+        assert report["roots_checked"] == 5
+        assert report["last_hash"] == source.execute(
+            "SELECT hash FROM transactions WHERE id = 20"
+        ).fetchone()[0]
+
+    def test_verify_detects_tampered_detail(self, tmp_path, source):
+        source.execute("UPDATE transactions SET detail = '{\"n\":99}' WHERE id = 10")
+        source.commit()
+        _export(tmp_path)
+
+        report = verify_segments([tmp_path / "archive"])
+
+        assert not report["valid"]
+        assert {v["type"] for v in report["violations"]} == {"hash_mismatch"}
+        assert report["violations"][0]["tx_id"] == 10
+
+    def test_verify_detects_missing_segment(self, tmp_path, source):
+        written = _export(tmp_path)
+
+        report = verify_segments([written[0]["path"], written[2]["path"]])
+
+        assert [v["type"] for v in report["violations"]] == ["segment_gap", "chain_break"]
+
+    def test_truncated_segment_is_reported(self, tmp_path, source):
+        written = _export(tmp_path)
+        path = written[1]["path"]
+        with open(path, "r+b") as fh:
+            fh.truncate(written[1]["bytes"] // 2)
+
+        report = verify_segments([tmp_path / "archive"])
+
+        assert not report["valid"]
+        assert report["violations"][-1]["type"] == "segment_corrupt"
+        assert report["segments"] == 1
+
+    def test_import_round_trip(self, tmp_path, source):
+        _export(tmp_path)
+        target = tmp_path / "target.db"
+        _create(str(target)).close()
+
+        report = import_segments(target, [tmp_path / "archive"])
+
+        assert report["valid"], report["violations"]
+        assert len(report["imported"]) == 3
+        with sqlite3.connect(target) as conn:
+            for table, columns in (
+                ("transactions", "id, project, action, detail, prev_hash, hash, timestamp"),
+                ("merkle_roots", "root_hash, tx_start_id, tx_end_id, tx_count, tree_levels"),
+            ):
+                query = f"SELECT {columns} FROM {table} WHERE id <= 20 ORDER BY id"
+                assert conn.execute(query).fetchall() == source.execute(query).fetchall()
+
+        again = import_segments(target, [tmp_path / "archive"])
+        assert again["valid"] and again["imported"] == [] and len(again["skipped"]) == 3
+
+    def test_import_rolls_back_bad_segment(self, tmp_path, source):
+        source.execute("UPDATE merkle_roots SET root_hash = ? WHERE tx_start_id = 9", ("0" * 64,))
+        source.commit()
+        _export(tmp_path)
+        target = tmp_path / "target.db"
+        _create(str(target)).close()
+
+        report = import_segments(target, [tmp_path / "archive"])
+
+        assert not report["valid"]
+        assert report["violations"][0]["type"] == "merkle_mismatch"
+        assert report["imported"] == ["ledger-000000000001-000000000008.cxl"]
+        with sqlite3.connect(target) as conn:
+            assert conn.execute("SELECT MAX(id) FROM transactions").fetchone()[0] == 8
@@ -0,0 +1,190 @@
+"""Tests for streaming, watermarked ledger verification."""
+
+import sqlite3
+from contextlib import asynccontextmanager
+
+import aiosqlite
+import pytest
+
+from cortex.canonical import canonical_json, compute_tx_hash
+from cortex.engine.ledger import ImmutableLedger
+from cortex.migrations.mig_ledger import (
+    _migration_010_immutable_ledger,
+    _migration_015_integrity_throughput,
+)
+from cortex.schema import CREATE_META, CREATE_TRANSACTIONS
+
+ROOT_SIZE = 4
+
+
+class _Pool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+@pytest.fixture
+async def ledger(tmp_path):
+    db_path = str(tmp_path / "ledger.db")
+    with sqlite3.connect(db_path) as setup:
+        setup.executescript(CREATE_TRANSACTIONS + CREATE_META)
+        _migration_010_immutable_ledger(setup)
+        _migration_015_integrity_throughput(setup)
+    setup.close()
+
+    conn = await aiosqlite.connect(db_path)
+    ledger = ImmutableLedger(_Pool(conn))
+    ledger._conn = conn
+    yield ledger
+    await conn.close()
+
+
+async def _append(ledger, count):
+    """Append ``count`` chained transactions, checkpointing every ROOT_SIZE."""
+    conn = ledger._conn
+    cursor = await conn.execute("SELECT hash FROM transactions ORDER BY id DESC LIMIT 1")
+    row = await cursor.fetchone()
+    prev = row[0] if row else "GENESIS"
+    for i in range(count):
+        detail = canonical_json({"n": i})
+        ts = f"2026-01-01T00:00:{i:02d}"
+        h = compute_tx_hash(prev, "p", "store", detail, ts)
+        await conn.execute(
+            "INSERT INTO transactions (project, action, detail, prev_hash, hash, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ("p", "store", detail, prev, h, ts),
+        )
+        prev = h
+    await conn.commit()
+
+    while True:
+        cursor = await conn.execute("SELECT COALESCE(MAX(tx_end_id), 0) FROM merkle_roots")
+        start = (await cursor.fetchone())[0] + 1
+        cursor = await conn.execute("SELECT MAX(id) FROM transactions")
+        if (await cursor.fetchone())[0] < start + ROOT_SIZE - 1:
+            break
+        end = start + ROOT_SIZE - 1
+        root = await ledger.compute_merkle_root_async(start, end)
+        await conn.execute(
+            "INSERT INTO merkle_roots (root_hash, tx_start_id, tx_end_id, tx_count) "
+            "VALUES (?, ?, ?, ?)",
+            (root, start, end, ROOT_SIZE),
+        )
+    await conn.commit()
+
+
+class TestLedgerVerify:
+    async def test_clean_ledger_streams_in_pages(self, ledger):
+        await _append(ledger, 10)
+        report = await ledger.verify_integrity_async(batch_size=3)
+
+        assert report["valid"]
+        assert report["tx_checked"] == 10
+        assert report["roots_checked"] == 2
+        assert report["verified_to"] == 8
+
+    async def test_incremental_checks_only_new_range(self, ledger):
+        await _append(ledger, 8)
+        await ledger.verify_integrity_async()
+        await _append(ledger, 6)
+
+        report = await ledger.verify_integrity_async()
+        assert report["valid"]
+        assert report["tx_checked"] == 6
+        assert report["roots_checked"] == 1
+        assert report["verified_to"] == 12
+
+    async def test_tail_past_last_checkpoint_is_rechecked(self, ledger):
+        await _append(ledger, 6)
+        first = await ledger.verify_integrity_async()
+        second = await ledger.verify_integrity_async()
+        assert first["verified_to"] == second["verified_to"] == 4
+        assert second["tx_checked"] == 2
+
+    async def test_full_mode_finds_tampering_behind_watermark(self, ledger):
+        await _append(ledger, 8)
+        await ledger.verify_integrity_async()
+        await ledger._conn.execute("UPDATE transactions SET detail = '{}' WHERE id = 2")
+        await ledger._conn.commit()
+
+        assert (await ledger.verify_integrity_async())["valid"]
+        report = await ledger.verify_integrity_async("full")
+        assert not report["valid"]
+        assert {v["type"] for v in report["violations"]} == {"hash_mismatch"}
+        assert report["verified_to"] == 0
+
+    async def test_rewritten_anchor_resets_watermark(self, ledger):
+        await _append(ledger, 8)
+        await ledger.verify_integrity_async()
+        await ledger._conn.execute("UPDATE transactions SET hash = 'forged' WHERE id = 8")
+        await ledger._conn.commit()
+
+        report = await ledger.verify_integrity_async()
+        types = {v["type"] for v in report["violations"]}
+        assert "watermark_mismatch" in types and "merkle_mismatch" in types
+        assert report["tx_checked"] == 8
+
+    async def test_missing_checkpoint_rows_are_reported(self, ledger):
+        await _append(ledger, 8)
+        await ledger._conn.execute("DELETE FROM transactions WHERE id > 6")
+        await ledger._conn.commit()
+
+        report = await ledger.verify_integrity_async("full")
+        assert [v["merkle_id"] for v in report["violations"]] == [2]
+        assert report["verified_to"] == 4
+
+    async def test_interrupted_full_run_resumes(self, ledger):
+        await _append(ledger, 12)
+        cursor = await ledger._conn.execute("SELECT hash FROM transactions WHERE id = 4")
+        anchor = {"root_id": 1, "tx_id": 4, "hash": (await cursor.fetchone())[0]}
+        await ledger._save_anchor(ledger._conn, "ledger_verify_full", anchor)
+
+        report = await ledger.verify_integrity_async("full")
+        assert report["valid"]
+        assert report["tx_checked"] == 8
+        assert report["verified_to"] == 12
+
+        again = await ledger.verify_integrity_async("full")
+        assert again["tx_checked"] == 12
+
+    async def test_records_mode_in_integrity_checks(self, ledger):
+        await _append(ledger, 4)
+        await ledger.verify_integrity_async("full")
+        cursor = await ledger._conn.execute(
+            "SELECT check_type, status, tx_checked, tx_per_sec FROM integrity_checks"
+        )
+        check_type, status, tx_checked, tx_per_sec = await cursor.fetchone()
+        assert (check_type, status, tx_checked) == ("full", "ok", 4)
+        assert tx_per_sec > 0
+
+    async def test_unknown_mode_rejected(self, ledger):
+        with pytest.raises(ValueError):
+            await ledger.verify_integrity_async("partial")
+
+
+class TestParallelLedgerVerify:
+    async def test_matches_serial_on_clean_ledger(self, ledger):
+        await _append(ledger, 14)
+        report = await ledger.verify_integrity_async("full", workers=2)
+
+        assert report["valid"]
+        assert report["tx_checked"] == 14
+        assert report["roots_checked"] == 3
+        assert report["verified_to"] == 12
+
+    async def test_stitches_segment_boundaries(self, ledger):
+        await _append(ledger, 14)
+        # Break the link into the second checkpoint and tamper inside the third
+        await ledger._conn.execute("UPDATE transactions SET prev_hash = 'x' WHERE id = 5")
+        await ledger._conn.execute("UPDATE transactions SET detail = '{}' WHERE id = 10")
+        await ledger._conn.commit()
+
+        serial = await ledger.verify_integrity_async("full")
+        parallel = await ledger.verify_integrity_async("full", workers=2)
+
+        assert not parallel["valid"]
+        assert parallel["violations"] == serial["violations"]
+        assert parallel["verified_to"] == serial["verified_to"] == 4
@@ -0,0 +1,231 @@
+"""Tests for ledger appends (cached head, group commit) and inclusion proofs."""
+
+import asyncio
+import sqlite3
+
+import aiosqlite
+import pytest
+
+from cortex.connection_pool import CortexConnectionPool
+from cortex.engine import CortexEngine
+from cortex.engine.bulk import log_transactions_sync
+from cortex.engine.ledger_writer import LedgerGroupCommitter, LedgerWriter
+from cortex.engine_async import AsyncCortexEngine
+from cortex.merkle import pack_levels
+from cortex.schema import CREATE_TRANSACTIONS
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    eng = CortexEngine(db_path=tmp_path / "writer.db", auto_embed=False)
+    await eng.init_db()
+    yield eng
+    await eng.close()
+
+
+async def _chain(conn):
+    cursor = await conn.execute("SELECT prev_hash, hash FROM transactions ORDER BY id")
+    return await cursor.fetchall()
+
+
+def _linked(rows):
+    prev = "GENESIS"
+    for p_hash, c_hash in rows:
+        if p_hash != prev:
+            return False
+        prev = c_hash
+    return True
+
+
+class TestLedgerWriter:
+    async def test_head_read_once_for_consecutive_writes(self, engine):
+        for i in range(5):
+            await engine.store("p", f"fact number {i}")
+
+        assert engine._ledger_writer.reloads == 1
+        assert _linked(await _chain(await engine.get_conn()))
+
+    async def test_foreign_commit_forces_reload(self, engine):
+        await engine.store("p", "first fact")
+        with sqlite3.connect(engine._db_path) as other:
+            log_transactions_sync(other, [("p", "external", {"n": 1})])
+        other.close()
+        await engine.store("p", "second fact")
+
+        assert engine._ledger_writer.reloads == 2
+        assert _linked(await _chain(await engine.get_conn()))
+
+    async def test_sync_and_async_writes_stay_linked(self, engine):
+        await engine.store("p", "async fact")
+        engine.store_sync("p", "sync fact")
+        await engine.store("p", "async again")
+
+        assert _linked(await _chain(await engine.get_conn()))
+
+    async def test_rollback_invalidates_head(self, tmp_path):
+        conn = await aiosqlite.connect(str(tmp_path / "rollback.db"))
+        await conn.executescript(CREATE_TRANSACTIONS)
+        writer = LedgerWriter()
+
+        await writer.append(conn, "p", "store", {"n": 1})
+        await conn.rollback()
+        writer.invalidate()
+        await writer.append(conn, "p", "store", {"n": 2})
+        await conn.commit()
+
+        rows = await _chain(conn)
+        await conn.close()
+        assert len(rows) == 1 and _linked(rows)
+
+    async def test_checkpoints_run_in_background(self, engine, monkeypatch):
+        monkeypatch.setattr("cortex.engine.ledger.CHECKPOINT_MAX", 3)
+        for i in range(7):
+            await engine.store("p", f"fact number {i}")
+        await engine._ledger_writer.drain()
+
+        conn = await engine.get_conn()
+        cursor = await conn.execute("SELECT tx_start_id, tx_end_id FROM merkle_roots ORDER BY id")
+        assert (await cursor.fetchall())[0] == (1, 3)
+        assert (await engine.verify_ledger("full"))["valid"]
+
+
+@pytest.fixture
+async def grouped(tmp_path):
+    db_path = str(tmp_path / "group.db")
+    setup = CortexEngine(db_path=db_path, auto_embed=False)
+    await setup.init_db()
+    await setup.close()
+
+    pool = CortexConnectionPool(db_path, min_connections=1, max_connections=4)
+    await pool.initialize()
+    eng = AsyncCortexEngine(pool, db_path)
+    eng._auto_embed = False
+    eng._ledger_group = LedgerGroupCommitter(
+        CortexConnectionPool(db_path, min_connections=1, max_connections=1),
+        eng._ledger_writer,
+    )
+    yield eng
+    await eng.close()
+    await eng._ledger_writer.drain()
+    await pool.close()
+
+
+class TestLedgerGroupCommit:
+    async def test_concurrent_stores_share_commits(self, grouped):
+        ids = await asyncio.gather(*(grouped.store("p", f"fact number {i}") for i in range(20)))
+
+        assert grouped._ledger_group.groups < 20
+        async with grouped.session() as conn:
+            cursor = await conn.execute(
+                "SELECT f.id, json_extract(t.detail, '$.fact_id') "
+                "FROM facts f JOIN transactions t ON t.id = f.tx_id ORDER BY f.id"
+            )
+            assert [tuple(r) for r in await cursor.fetchall()] == [(i, i) for i in ids]
+            assert _linked(await _chain(conn))
+        assert (await grouped._get_ledger().verify_integrity_async("full"))["valid"]
+
+    async def test_failing_operation_is_rolled_back_alone(self, grouped):
+        async def broken(conn):
+            await grouped._log_transaction(conn, "p", "store", {"n": "lost"})
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            grouped.store("p", "before"),
+            grouped._ledger_group.run(broken),
+            grouped.store("p", "after"),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[1], RuntimeError)
+        async with grouped.session() as conn:
+            rows = await _chain(conn)
+        assert len(rows) == 2 and _linked(rows)
+
+    async def test_deprecate_goes_through_group(self, grouped):
+        fact_id = await grouped.store("p", "soon deprecated")
+        assert await grouped.deprecate(fact_id, "outdated")
+
+        async with grouped.session() as conn:
+            cursor = await conn.execute("SELECT action FROM transactions ORDER BY id")
+            assert [r[0] for r in await cursor.fetchall()] == ["store", "deprecate"]
+
+
+class TestInclusionProof:
+    async def test_proof_from_stored_levels(self, engine, monkeypatch):
+        monkeypatch.setattr("cortex.engine.ledger.CHECKPOINT_MAX", 5)
+        for i in range(6):
+            await engine.store("p", f"fact number {i}")
+        await engine._ledger_writer.drain()
+
+        proof = await engine.ledger_proof(4)
+        assert proof["valid"] and proof["source"] == "stored"
+        assert (proof["checkpoint_id"], proof["index"]) == (1, 3)
+        assert len(proof["proof"]) == 3
+        assert await engine.ledger_proof(6) is None
+
+    async def test_legacy_checkpoint_is_rebuilt(self, engine, monkeypatch):
+        monkeypatch.setattr("cortex.engine.ledger.CHECKPOINT_MAX", 3)
+        for i in range(3):
+            await engine.store("p", f"fact number {i}")
+        await engine._ledger_writer.drain()
+        conn = await engine.get_conn()
+        await conn.execute("UPDATE merkle_roots SET tree_levels = NULL")
+        await conn.commit()
+
+        proof = await engine.ledger_proof(3)
+        assert proof["valid"] and proof["source"] == "rebuilt"
+
+    async def test_tampered_transaction_fails_proof(self, engine, monkeypatch):
+        monkeypatch.setattr("cortex.engine.ledger.CHECKPOINT_MAX", 4)
+        for i in range(4):
+            await engine.store("p", f"fact number {i}")
+        await engine._ledger_writer.drain()
+        conn = await engine.get_conn()
+        await conn.execute("UPDATE transactions SET hash = ? WHERE id = 2", ("0" * 64,))
+        await conn.commit()
+
+        assert not (await engine.ledger_proof(2))["valid"]
+        assert not (await engine.ledger_proof(1))["valid"]  # tx 2 is its sibling leaf
+        assert (await engine.ledger_proof(3))["valid"]  # only stored nodes on its path
+
+
+class TestIncrementalCheckpoints:
+    async def _roots(self, engine):
+        conn = await engine.get_conn()
+        cursor = await conn.execute(
+            "SELECT tx_start_id, tx_end_id, root_hash, tree_levels FROM merkle_roots ORDER BY id"
+        )
+        roots = await cursor.fetchall()
+        rebuilt = []
+        for start, end, _, _ in roots:
+            cursor = await conn.execute(
+                "SELECT hash FROM transactions WHERE id BETWEEN ? AND ? ORDER BY id", (start, end)
+            )
+            rebuilt.append(pack_levels([r[0] for r in await cursor.fetchall()]))
+        return roots, rebuilt
+
+    async def test_sealed_trees_match_table_rebuild(self, engine, monkeypatch):
+        monkeypatch.setattr("cortex.engine.ledger.CHECKPOINT_MAX", 4)
+        for i in range(9):
+            await engine.store("p", f"fact number {i}")
+        await engine.store("p", "commit the last sealed range")
+        await engine._ledger_writer.drain()
+
+        roots, rebuilt = await self._roots(engine)
+        assert [(r[0], r[1]) for r in roots] == [(1, 4), (5, 8)]
+        assert [(r[2], r[3]) for r in roots] == rebuilt
+
+    async def test_foreign_commit_falls_back_to_table(self, engine, monkeypatch):
+        monkeypatch.setattr("cortex.engine.ledger.CHECKPOINT_MAX", 3)
+        await engine.store("p", "first fact")
+        with sqlite3.connect(engine._db_path) as other:
+            log_transactions_sync(other, [("p", "external", {"n": n}) for n in range(4)])
+        other.close()
+        for i in range(4):
+            await engine.store("p", f"fact number {i}")
+        await engine._ledger_writer.drain()
+
+        roots, rebuilt = await self._roots(engine)
+        assert [(r[0], r[1]) for r in roots] == [(1, 3), (4, 6), (7, 9)]
+        assert [(r[2], r[3]) for r in roots] == rebuilt
+        assert (await engine.verify_ledger("full"))["valid"]
@@ -3,18 +3,18 @@ Tests for the canonical Merkle tree implementations.
 
 Tests both:
   - cortex.consensus.merkle (used by vote_ledger)
-  - cortex.engine.ledger (used by ImmutableLedger)
+  - cortex.merkle (the shared engine, used by ImmutableLedger)
 """
 
 import hashlib
 
 import pytest
 
-# ── consensus/merkle.py ──────────────────────────────────────────────
-
-
+from cortex import merkle as ledger_merkle
 from cortex.consensus.merkle import MerkleTree, compute_merkle_root, verify_merkle_proof
 
+# ── consensus/merkle.py ──────────────────────────────────────────────
+
 
 class TestComputeMerkleRoot:
     def test_empty_list_returns_empty(self):
@@ -104,3 +104,66 @@ class TestMerkleTreeConsensus:
         items = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(16)]
         tree = MerkleTree(items)
         assert tree.root == compute_merkle_root(items)
+
+
+# ── cortex/merkle.py packed levels ───────────────────────────────────
+
+
+class TestPackedLevels:
+    @pytest.mark.parametrize("n", [1, 2, 3, 7, 8, 13])
+    def test_root_matches_tree(self, n):
+        leaves = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(n)]
+        root, packed = ledger_merkle.pack_levels(leaves)
+        assert root == ledger_merkle.MerkleTree(leaves).get_root()
+        assert len(packed) == ledger_merkle.DIGEST_SIZE * sum(ledger_merkle.level_sizes(n))
+
+    @pytest.mark.parametrize("n", [2, 5, 9])
+    def test_proofs_match_rebuilt_tree(self, n):
+        leaves = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(n)]
+        tree = ledger_merkle.MerkleTree(leaves)
+        root, packed = ledger_merkle.pack_levels(leaves)
+        for idx, leaf in enumerate(leaves):
+            sibling = leaves[idx ^ 1] if (idx ^ 1) < n else leaf
+            proof = ledger_merkle.proof_from_levels(packed, n, idx, sibling)
+            assert proof == tree.get_proof(idx)
+            assert ledger_merkle.MerkleTree.verify_proof(leaf, proof, root)
+
+    def test_empty_leaves_rejected(self):
+        with pytest.raises(ValueError):
+            ledger_merkle.pack_levels([])
+
+
+class TestUnifiedEngine:
+    @pytest.mark.parametrize("n", [1, 2, 3, 6, 16, 17])
+    def test_accumulator_matches_batch_build(self, n):
+        leaves = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(n)]
+        acc = ledger_merkle.MerkleAccumulator()
+        for i, leaf in enumerate(leaves, 1):
+            acc.append(leaf)
+            assert acc.pack() == ledger_merkle.pack_levels(leaves[:i])
+
+    def test_roots_match_hex_string_scheme(self):
+        leaves = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(11)]
+        level = leaves
+        while len(level) > 1:
+            level = [
+                hashlib.sha256(
+                    (level[i] + (level[i + 1] if i + 1 < len(level) else level[i])).encode()
+                ).hexdigest()
+                for i in range(0, len(level), 2)
+            ]
+        assert ledger_merkle.merkle_root(leaves) == level[0] == compute_merkle_root(leaves)
+
+    def test_non_digest_leaves_hash_as_strings(self):
+        leaves = ["forged", "GENESIS", "A" * 64]
+        first = hashlib.sha256(b"forgedGENESIS").hexdigest()
+        second = hashlib.sha256(("A" * 128).encode()).hexdigest()
+        assert ledger_merkle.merkle_root(leaves) == hashlib.sha256(
+            (first + second).encode()
+        ).hexdigest()
+
+    def test_consensus_tree_levels(self):
+        items = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(5)]
+        tree = MerkleTree(items)
+        assert [len(level) for level in tree.tree] == [5, 3, 2, 1]
+        assert tree.tree[-1][0] == tree.root
@@ -0,0 +1,162 @@
+"""Tests for bulk reputation recomputation from votes, outcomes and trust edges."""
+
+import sqlite3
+from datetime import datetime, timezone
+
+import aiosqlite
+import numpy as np
+import pytest
+
+from cortex.consensus.aggregates import reconcile_aggregates
+from cortex.consensus.reputation import propagate_trust, recompute_reputation
+from cortex.migrations.mig_consensus import _migration_017_consensus_aggregates
+from cortex.schema import (
+    CREATE_AGENTS,
+    CREATE_FACTS,
+    CREATE_OUTCOMES,
+    CREATE_TRANSACTIONS,
+    CREATE_TRUST_EDGES,
+    CREATE_VOTES_V2,
+)
+
+NOW = datetime(2026, 7, 1, tzinfo=timezone.utc)
+TODAY = "2026-07-01 00:00:00"
+
+
+@pytest.fixture
+def db(tmp_path):
+    db_path = str(tmp_path / "reputation.db")
+    with sqlite3.connect(db_path) as setup:
+        setup.executescript(
+            CREATE_FACTS
+            + CREATE_AGENTS
+            + CREATE_VOTES_V2
+            + CREATE_TRUST_EDGES
+            + CREATE_OUTCOMES
+            + CREATE_TRANSACTIONS
+        )
+        setup.executemany(
+            "INSERT INTO facts (id, project, content, valid_from) VALUES (?, 'p', 'fact', '')",
+            [(i,) for i in range(1, 5)],
+        )
+        setup.executemany(
+            "INSERT INTO agents (id, public_key, name) VALUES (?, '', ?)",
+            [(agent, agent) for agent in "abcd"],
+        )
+        # Fact 4 stays unresolved; fact 3 was first verified, then disputed.
+        setup.executemany(
+            "INSERT INTO consensus_outcomes (fact_id, final_state, final_score, total_votes, "
+            "unique_agents, reputation_sum) VALUES (?, ?, 1.0, 2, 2, 1.0)",
+            [(1, "verified"), (2, "verified"), (3, "verified"), (3, "disputed")],
+        )
+        _migration_017_consensus_aggregates(setup)
+    setup.close()
+    return db_path
+
+
+def _vote(db_path, fact_id, agent, value, created_at=TODAY):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO consensus_votes_v2 (fact_id, agent_id, vote, vote_weight, "
+            "agent_rep_at_vote, created_at) VALUES (?, ?, ?, 0.5, 0.5, ?)",
+            (fact_id, agent, value, created_at),
+        )
+    conn.close()
+
+
+def _agents(db_path):
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT id, reputation_score, total_votes, successful_votes, disputed_votes "
+            "FROM agents"
+        ).fetchall()
+    conn.close()
+    return {row[0]: row[1:] for row in rows}
+
+
+class TestRecomputeReputation:
+    def test_accuracy_and_counters(self, db):
+        for fact_id, value in ((1, 1), (2, 1), (3, -1), (4, 1)):
+            _vote(db, fact_id, "a", value)
+            _vote(db, fact_id, "b", -value)
+
+        report = recompute_reputation(db, now=NOW, damping=0.0)
+        agents = _agents(db)
+
+        assert agents["a"] == (pytest.approx(4 / 5), 4, 3, 0)
+        assert agents["b"] == (pytest.approx(1 / 5), 4, 0, 3)
+        assert agents["c"] == (0.5, 0, 0, 0)  # untouched
+        assert report["resolved_votes"] == 6
+        assert report["updated"] == 2
+
+    def test_half_life_decay(self, db):
+        _vote(db, 1, "a", 1, "2026-05-02 00:00:00")  # 60 days old
+
+        recompute_reputation(db, now=NOW, half_life_days=60, damping=0.0)
+
+        assert _agents(db)["a"][0] == pytest.approx(1.5 / 2.5)
+
+    def test_trust_propagation(self, db):
+        for fact_id in (1, 2, 3):
+            _vote(db, fact_id, "a", 1 if fact_id < 3 else -1)
+        with sqlite3.connect(db) as conn:
+            conn.executemany(
+                "INSERT INTO trust_edges (source_agent, target_agent, trust_weight) "
+                "VALUES (?, ?, ?)",
+                [("a", "c", 1.0), ("d", "c", 0.0), ("c", "c", 1.0)],
+            )
+        conn.close()
+
+        report = recompute_reputation(db, now=NOW, damping=0.5)
+        agents = _agents(db)
+
+        assert report["edges"] == 1
+        assert report["converged"]
+        assert agents["a"][0] == pytest.approx(0.8)
+        assert agents["c"][0] == pytest.approx(0.5 * 0.5 + 0.5 * 0.8)
+        assert agents["d"][0] == 0.5
+
+    async def test_aggregates_and_scores_follow_new_reputation(self, db):
+        for agent, value in (("a", 1), ("b", 1), ("c", -1)):
+            _vote(db, 1, agent, value)
+            _vote(db, 2, agent, value)
+        _vote(db, 4, "d", -1)
+
+        report = recompute_reputation(db, now=NOW)
+
+        assert report["facts_rescored"] == 3
+        async with aiosqlite.connect(db) as conn:
+            audit = await reconcile_aggregates(conn, repair=False)
+            assert audit == {"facts_checked": 3, "drifted": [], "repaired": 0}
+            cursor = await conn.execute("SELECT confidence FROM facts WHERE id = 4")
+            assert await cursor.fetchone() == ("disputed",)
+            # Logged so the project's ledger head (and search cache key) moves
+            cursor = await conn.execute("SELECT project, action, detail FROM transactions")
+            assert await cursor.fetchall() == [("p", "rescore_reputation", '{"facts":3}')]
+
+    def test_dry_run_writes_nothing(self, db):
+        _vote(db, 1, "a", 1)
+        before = _agents(db)
+
+        report = recompute_reputation(db, now=NOW, dry_run=True)
+
+        assert report["changed"] == 1
+        assert report["updated"] == 0
+        assert _agents(db) == before
+
+    def test_rejects_bad_parameters(self, db):
+        with pytest.raises(ValueError):
+            recompute_reputation(db, half_life_days=0)
+        with pytest.raises(ValueError):
+            recompute_reputation(db, damping=1.0)
+
+
+def test_propagate_trust_converges_on_cycles():
+    base = np.array([0.9, 0.1, 0.5])
+    src, dst = np.array([0, 1, 2]), np.array([1, 2, 0])
+
+    scores, iterations, converged = propagate_trust(base, src, dst, np.ones(3), 0.5)
+
+    assert converged and iterations > 1
+    # Fixed point: x = 0.5 * base + 0.5 * x[src of each dst]
+    assert scores == pytest.approx(0.5 * base + 0.5 * scores[[2, 0, 1]])
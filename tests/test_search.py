@@ -104,3 +104,323 @@ class TestTextSearch:
         results = await text_search(conn, "Rust")
         fact_ids = {r.fact_id for r in results}
         assert fact_id not in fact_ids
+
+
+def _result(fact_id: int):
+    from cortex.search.models import SearchResult
+
+    return SearchResult(
+        fact_id=fact_id,
+        content=f"fact {fact_id}",
+        project="alpha",
+        fact_type="knowledge",
+        confidence="stated",
+        valid_from="2026-01-01",
+        valid_until=None,
+        tags=[],
+        created_at="2026-01-01",
+        updated_at="2026-01-01",
+    )
+
+
+@pytest.mark.asyncio
+class TestHybridExecutor:
+    async def test_legs_run_concurrently_and_match_rrf(self, monkeypatch):
+        import asyncio
+        import time
+
+        from cortex.search import hybrid
+
+        sem = [_result(i) for i in (1, 2, 3)]
+        txt = [_result(i) for i in (3, 4)]
+
+        async def fake_semantic(*args, **kwargs):
+            await asyncio.sleep(0.2)
+            return sem
+
+        async def fake_text(*args, **kwargs):
+            await asyncio.sleep(0.1)  # lands first
+            return txt
+
+        monkeypatch.setattr(hybrid, "semantic_search", fake_semantic)
+        monkeypatch.setattr(hybrid, "text_search", fake_text)
+
+        start = time.perf_counter()
+        results = await hybrid.hybrid_search(None, "q", [0.0], top_k=4)
+        assert time.perf_counter() - start < 0.28
+
+        expected = hybrid.rrf_merge(list(sem), list(txt), 4)
+        assert [r.fact_id for r in results] == [r.fact_id for r in expected]
+        # The semantic leg's object is kept even though text finished first
+        assert next(r for r in results if r.fact_id == 3) is sem[2]
+
+    async def test_stream_yields_provisional_then_final(self, monkeypatch):
+        import asyncio
+        import time
+
+        from cortex.search import hybrid
+
+        sem = [_result(i) for i in (1, 2, 3)]
+        txt = [_result(i) for i in (3, 4)]
+
+        async def fake_semantic(*args, **kwargs):
+            await asyncio.sleep(0.3)
+            return sem
+
+        async def fake_text(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return txt
+
+        monkeypatch.setattr(hybrid, "semantic_search", fake_semantic)
+        monkeypatch.setattr(hybrid, "text_search", fake_text)
+
+        start = time.perf_counter()
+        rankings = []
+        async for ranking in hybrid.hybrid_search_stream(None, "q", [0.0], top_k=4):
+            rankings.append((time.perf_counter() - start, ranking, [r.score for r in ranking]))
+
+        assert len(rankings) == 2
+        (first_at, provisional, scores), (_, final, _) = rankings
+        assert first_at < 0.2
+        assert [r.fact_id for r in provisional] == [3, 4]
+        expected = hybrid.rrf_merge(list(sem), list(txt), 4)
+        assert [r.fact_id for r in final] == [r.fact_id for r in expected]
+        # The final fusion rescoring must not touch what was already handed out
+        assert [r.score for r in provisional] == scores
+
+    async def test_stream_cancels_pending_leg_on_early_exit(self, monkeypatch):
+        import asyncio
+
+        from cortex.search import hybrid
+
+        cancelled = asyncio.Event()
+
+        async def slow_semantic(*args, **kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def fake_text(*args, **kwargs):
+            return [_result(1)]
+
+        monkeypatch.setattr(hybrid, "semantic_search", slow_semantic)
+        monkeypatch.setattr(hybrid, "text_search", fake_text)
+
+        stream = hybrid.hybrid_search_stream(None, "q", [0.0], top_k=4)
+        provisional = await anext(stream)
+        assert [r.fact_id for r in provisional] == [1]
+        await stream.aclose()
+        assert cancelled.is_set()
+
+    async def test_fts_probe_cached_per_connection(self, search_engine):
+        from cortex.search.utils import _FTS5_CONNECTIONS, _has_fts5
+
+        conn = await search_engine.get_conn()
+        assert await _has_fts5(conn)
+        assert conn in _FTS5_CONNECTIONS
+
+
+def _vec_loadable() -> bool:
+    import sqlite3
+
+    try:
+        import sqlite_vec
+
+        conn = sqlite3.connect(":memory:")
+        conn.enable_load_extension(True)
+        sqlite_vec.load(conn)
+        conn.close()
+        return True
+    except (ImportError, AttributeError, sqlite3.Error, OSError):
+        return False
+
+
+class TestVectorCodec:
+    def test_float32_param_is_plain_placeholder(self):
+        from cortex.search.vector import encode_vector, vector_param
+
+        assert vector_param("float32") == "?"
+        assert len(encode_vector([0.1] * 384, "float32")) == 1536
+
+    def test_int8_param_is_tagged(self):
+        from cortex.search.vector import encode_vector, vector_param
+
+        assert vector_param("int8") == "vec_int8(?)"
+        assert len(encode_vector([0.1] * 384, "int8")) == 384
+
+    def test_parse_vector_format(self):
+        from cortex.schema import CREATE_EMBEDDINGS_FLOAT32, CREATE_EMBEDDINGS_INT8
+        from cortex.search.vector import parse_vector_format
+
+        assert parse_vector_format(CREATE_EMBEDDINGS_FLOAT32) == "float32"
+        assert parse_vector_format(CREATE_EMBEDDINGS_INT8) == "int8"
+
+    def test_parse_vector_partitioned(self):
+        from cortex.schema import CREATE_EMBEDDINGS_FLOAT32, CREATE_EMBEDDINGS_INT8
+        from cortex.search.vector import parse_vector_partitioned
+
+        assert parse_vector_partitioned(CREATE_EMBEDDINGS_FLOAT32)
+        assert parse_vector_partitioned(CREATE_EMBEDDINGS_INT8)
+        assert not parse_vector_partitioned(_LEGACY_EMBEDDINGS)
+
+    def test_knn_filters_are_exact_only_when_partitioned(self):
+        from cortex.search.vector import knn_filters
+
+        sql, params, k = knn_filters("alpha", True, 5, partitioned=True)
+        assert "ve.project = ?" in sql and "ve.active = 1" in sql
+        assert params == ["alpha"] and k == 5
+
+        assert knn_filters("alpha", True, 5, partitioned=False) == ("", [], 15)
+        # as_of queries cannot use the active flag and still over-fetch
+        assert knn_filters(None, False, 5, partitioned=True) == ("", [], 15)
+
+
+_LEGACY_EMBEDDINGS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS fact_embeddings USING vec0(
+    fact_id INTEGER PRIMARY KEY,
+    embedding FLOAT[384]
+);
+"""
+
+
+@pytest.mark.skipif(not _vec_loadable(), reason="sqlite-vec extension loading unavailable")
+class TestVectorStorageRewrite:
+    def _conn(self, embeddings_ddl=None, projects=("alpha",) * 5):
+        import sqlite3
+
+        import sqlite_vec
+
+        from cortex.schema import CREATE_EMBEDDINGS_FLOAT32, CREATE_FACTS
+
+        conn = sqlite3.connect(":memory:")
+        conn.enable_load_extension(True)
+        sqlite_vec.load(conn)
+        conn.executescript(CREATE_FACTS)
+        conn.executescript(embeddings_ddl or CREATE_EMBEDDINGS_FLOAT32)
+        conn.executemany(
+            "INSERT INTO facts (project, content, valid_from) VALUES (?, ?, datetime('now'))",
+            [(project, f"fact {i}") for i, project in enumerate(projects)],
+        )
+        return conn
+
+    def _unit(self, hot: int) -> list[float]:
+        vec = [0.01] * 384
+        vec[hot] = 1.0
+        norm = sum(v * v for v in vec) ** 0.5
+        return [v / norm for v in vec]
+
+    def test_roundtrip_preserves_rows_and_ranking(self):
+        from cortex.search.vector import (
+            detect_vector_format_sync,
+            encode_vector,
+            insert_embedding_sql,
+            rewrite_vector_storage,
+            vector_param,
+        )
+
+        conn = self._conn()
+        for fid in range(1, 6):
+            conn.execute(
+                insert_embedding_sql("float32", partitioned=True),
+                (fid, encode_vector(self._unit(fid))),
+            )
+        conn.commit()
+
+        stats = rewrite_vector_storage(conn, "int8")
+        assert stats == {
+            "from": "float32", "to": "int8", "partitioned": True, "rewritten": 5, "dropped": 0,
+        }
+        assert detect_vector_format_sync(conn) == "int8"
+
+        row = conn.execute(
+            "SELECT fact_id FROM fact_embeddings "
+            f"WHERE embedding MATCH {vector_param('int8')} AND k = 1",
+            (encode_vector(self._unit(3), "int8"),),
+        ).fetchone()
+        assert row[0] == 3
+
+        assert rewrite_vector_storage(conn, "float32")["rewritten"] == 5
+        assert detect_vector_format_sync(conn) == "float32"
+
+    def test_noop_when_already_in_format(self):
+        from cortex.search.vector import rewrite_vector_storage
+
+        conn = self._conn()
+        assert rewrite_vector_storage(conn, "float32")["rewritten"] == 0
+
+    def test_missing_vector_table_is_tolerated(self):
+        import sqlite3
+
+        from cortex.schema import CREATE_FACTS
+        from cortex.search.vector import (
+            deactivate_embedding_sync,
+            detect_vector_partitioned_sync,
+            rewrite_vector_storage,
+        )
+
+        conn = sqlite3.connect(":memory:")
+        conn.executescript(CREATE_FACTS)
+        assert not detect_vector_partitioned_sync(conn)
+        deactivate_embedding_sync(conn, 1, partitioned=True)  # no sqlite-vec: no-op
+        assert rewrite_vector_storage(conn, "int8")["rewritten"] == 0
+
+    def test_legacy_table_is_upgraded_to_partitioned(self):
+        from cortex.search.vector import (
+            detect_vector_partitioned_sync,
+            encode_vector,
+            insert_embedding_sql,
+            rewrite_vector_storage,
+        )
+
+        conn = self._conn(_LEGACY_EMBEDDINGS)
+        assert not detect_vector_partitioned_sync(conn)
+        for fid in range(1, 6):
+            conn.execute(insert_embedding_sql("float32"), (fid, encode_vector(self._unit(fid))))
+        conn.commit()
+
+        stats = rewrite_vector_storage(conn, "float32")
+        assert stats["partitioned"] is False and stats["rewritten"] == 5
+        assert detect_vector_partitioned_sync(conn)
+        projects = conn.execute("SELECT DISTINCT project FROM fact_embeddings").fetchall()
+        assert projects == [("alpha",)]
+
+    def test_vectors_without_fact_are_reported(self, caplog):
+        from cortex.search.vector import encode_vector, insert_embedding_sql, rewrite_vector_storage
+
+        conn = self._conn(_LEGACY_EMBEDDINGS, projects=("alpha",) * 3)
+        for fid in range(1, 6):
+            conn.execute(insert_embedding_sql("float32"), (fid, encode_vector(self._unit(fid))))
+        conn.commit()
+
+        stats = rewrite_vector_storage(conn, "float32")
+        assert (stats["rewritten"], stats["dropped"]) == (3, 2)
+        assert "[4, 5]" in caplog.text
+
+    def test_small_project_gets_exact_top_k(self):
+        from cortex.search.vector import (
+            deactivate_embedding_sync,
+            encode_vector,
+            insert_embedding_sql,
+            semantic_search_sync,
+        )
+
+        # 40 "big" facts sit right next to the query; 3 "small" facts are far away.
+        conn = self._conn(projects=("big",) * 40 + ("small",) * 3)
+        rows = [(fid, encode_vector(self._unit(0))) for fid in range(1, 41)]
+        rows += [(fid, encode_vector(self._unit(fid))) for fid in range(41, 44)]
+        conn.executemany(insert_embedding_sql("float32", partitioned=True), rows)
+        conn.commit()
+
+        query = self._unit(0)
+        legacy = semantic_search_sync(conn, query, top_k=3, project="small")
+        assert legacy == []  # post-filtering starves the small tenant
+
+        hits = semantic_search_sync(conn, query, top_k=3, project="small", partitioned=True)
+        assert sorted(r.fact_id for r in hits) == [41, 42, 43]
+
+        conn.execute("UPDATE facts SET valid_until = datetime('now') WHERE id = 42")
+        deactivate_embedding_sync(conn, 42, partitioned=True)
+        hits = semantic_search_sync(conn, query, top_k=3, project="small", partitioned=True)
+        assert sorted(r.fact_id for r in hits) == [41, 43]
@@ -0,0 +1,112 @@
+"""Tests for the engine-level search result cache."""
+
+import pytest
+
+from cortex.engine import CortexEngine
+from cortex.search.cache import SearchCache
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    eng = CortexEngine(db_path=tmp_path / "cache.db", auto_embed=False)
+    eng._search_cache = SearchCache(size=100)
+    await eng.init_db()
+    await eng.store("alpha", "Python is a great language")
+    await eng.store("beta", "Python supports async/await")
+    yield eng
+    await eng.close()
+
+
+class TestSearchCache:
+    def test_key_normalizes_query_and_separates_parameters(self):
+        key = SearchCache.result_key
+        assert key(1, "  python   async ", "a", 5, None) == key(1, "python async", "a", 5, None)
+        assert key(1, "python", "a", 5, None) != key(1, "python", "a", 10, None)
+        assert key(1, "python", "a", 5, None) != key(2, "python", "a", 5, None)
+        assert key(1, "python", None, 5, None) != key(1, "python", "a", 5, None)
+
+    async def test_repeat_search_hits_and_returns_copies(self, engine):
+        cache = engine._search_cache
+        first = await engine.search("Python", project="alpha")
+        first[0].score = -1.0
+        second = await engine.search("Python", project="alpha")
+
+        assert cache.hits == 1 and cache.misses == 1
+        assert [r.fact_id for r in second] == [r.fact_id for r in first]
+        assert second[0].score != -1.0
+
+    async def test_write_to_other_project_keeps_entries(self, engine):
+        cache = engine._search_cache
+        await engine.search("Python", project="alpha")
+        await engine.store("beta", "Python in beta again")
+        await engine.search("Python", project="alpha")
+        assert cache.hits == 1
+
+    async def test_write_to_same_project_invalidates(self, engine):
+        cache = engine._search_cache
+        before = await engine.search("Python", project="alpha")
+        await engine.store("alpha", "Python typing is gradual")
+        after = await engine.search("Python", project="alpha")
+
+        assert cache.hits == 0
+        assert len(after) == len(before) + 1
+
+    async def test_vote_invalidates_fact_project(self, engine):
+        cache = engine._search_cache
+        results = await engine.search("Python", project="alpha")
+        await engine.vote(results[0].fact_id, "agent-1", 1)
+        await engine.search("Python", project="alpha")
+        assert cache.hits == 0
+
+    async def test_vote_keeps_other_project_entries(self, engine):
+        cache = engine._search_cache
+        alpha = await engine.search("Python", project="alpha")
+        await engine.search("Python", project="beta")
+        await engine.vote(alpha[0].fact_id, "agent-1", 1)
+        await engine.search("Python", project="beta")
+        assert cache.hits == 1
+
+    async def test_reputation_recompute_invalidates_rescored_project(self, engine):
+        cache = engine._search_cache
+        results = await engine.search("Python", project="alpha")
+        agent_id = await engine.consensus.register_agent("rater")
+        await engine.consensus.vote_v2(results[0].fact_id, agent_id, 1)
+        await engine.search("Python", project="alpha")
+
+        await engine.consensus.recompute_reputation()
+        await engine.search("Python", project="alpha")
+        assert cache.hits == 0
+
+    async def test_reconcile_repair_invalidates_rescored_project(self, engine):
+        cache = engine._search_cache
+        results = await engine.search("Python", project="alpha")
+        agent_id = await engine.consensus.register_agent("rater")
+        await engine.consensus.vote_v2(results[0].fact_id, agent_id, 1)
+        conn = await engine.get_conn()
+        await conn.execute("UPDATE consensus_aggregates SET weighted_sum = -5.0")
+        await conn.commit()
+        await engine.search("Python", project="alpha")
+
+        report = await engine.consensus.reconcile_consensus()
+        await engine.search("Python", project="alpha")
+        assert report["drifted"] == [results[0].fact_id]
+        assert cache.hits == 0
+
+    async def test_unscoped_search_sees_any_write(self, engine):
+        cache = engine._search_cache
+        await engine.search("Python")
+        await engine.store("gamma", "Python packaging")
+        await engine.search("Python")
+        assert cache.hits == 0
+
+    async def test_query_embedding_computed_once(self):
+        cache = SearchCache(size=10)
+        calls = []
+
+        def embed(text):
+            calls.append(text)
+            return [0.1, 0.2]
+
+        assert await cache.embed("hello  world", embed) == [0.1, 0.2]
+        assert await cache.embed("hello world", embed) == [0.1, 0.2]
+        assert calls == ["hello  world"]
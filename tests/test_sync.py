@@ -9,6 +9,7 @@ import json
 import pytest
 
 from cortex.engine import CortexEngine
+from cortex.search.vector import encode_vector, insert_embedding_sql
 from cortex.sync import (
     SyncResult,
     WritebackResult,
@@ -136,6 +137,53 @@ class TestSyncMemory:
         result = sync_memory(engine)
         assert result.ghosts_synced >= 1
 
+    def test_resync_deactivates_old_ghost_vectors(self, engine, agent_memory, monkeypatch):
+        """Superseded ghosts leave the active vector partition."""
+        if not engine._vec_available:
+            pytest.skip("sqlite-vec not available")
+        monkeypatch.setattr("cortex.sync.read.MEMORY_DIR", agent_memory)
+        monkeypatch.setattr(
+            "cortex.sync.common.SYNC_STATE_FILE",
+            agent_memory.parent / "sync_state.json",
+        )
+        sync_memory(engine)
+        conn = engine._get_sync_conn()
+        (ghost_id,) = conn.execute("SELECT id FROM facts WHERE fact_type = 'ghost'").fetchone()
+        conn.execute(
+            insert_embedding_sql(engine._vector_format, engine._vector_partitioned),
+            (ghost_id, encode_vector([0.1] * 384, engine._vector_format)),
+        )
+        conn.commit()
+        ghosts = json.loads((agent_memory / "ghosts.json").read_text(encoding="utf-8"))
+        ghosts["test-project"]["mood"] = "blocked"
+        (agent_memory / "ghosts.json").write_text(json.dumps(ghosts), encoding="utf-8")
+
+        sync_memory(engine)
+
+        row = conn.execute(
+            "SELECT active FROM fact_embeddings WHERE fact_id = ?", (ghost_id,)
+        ).fetchone()
+        assert row == (0,)
+
+    def test_resync_releases_old_ghost_mentions(self, engine, agent_memory, monkeypatch):
+        """Superseded ghosts stop counting towards their entities' mentions."""
+        monkeypatch.setattr("cortex.sync.read.MEMORY_DIR", agent_memory)
+        monkeypatch.setattr(
+            "cortex.sync.common.SYNC_STATE_FILE",
+            agent_memory.parent / "sync_state.json",
+        )
+        mentions = "SELECT mention_count FROM entities WHERE name = 'test-project'"
+        sync_memory(engine)
+        conn = engine._get_sync_conn()
+        (before,) = conn.execute(mentions).fetchone()
+        ghosts = json.loads((agent_memory / "ghosts.json").read_text(encoding="utf-8"))
+        ghosts["test-project"]["mood"] = "blocked"
+        (agent_memory / "ghosts.json").write_text(json.dumps(ghosts), encoding="utf-8")
+
+        sync_memory(engine)
+
+        assert conn.execute(mentions).fetchone() == (before,)
+
 
 class TestWriteBack:
     """Tests for write-back (CORTEX → JSON)."""
@@ -0,0 +1,126 @@
+"""Tests for batched vote appends, background checkpoints and streaming vote verification."""
+
+import hashlib
+import sqlite3
+from contextlib import asynccontextmanager
+
+import aiosqlite
+import pytest
+
+from cortex.canonical import compute_vote_hash
+from cortex.consensus.vote_ledger import ImmutableVoteLedger
+from cortex.migrations.mig_ledger import _migration_014_vote_ledger_refinement
+from cortex.schema import CREATE_META
+
+
+class _Pool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+@pytest.fixture
+async def conn(tmp_path):
+    db_path = str(tmp_path / "votes.db")
+    with sqlite3.connect(db_path) as setup:
+        setup.executescript(CREATE_META)
+        _migration_014_vote_ledger_refinement(setup)
+    setup.close()
+
+    conn = await aiosqlite.connect(db_path)
+    yield conn
+    await conn.close()
+
+
+@pytest.fixture
+def ledger(conn):
+    ledger = ImmutableVoteLedger(_Pool(conn))
+    ledger.MERKLE_BATCH_SIZE = 4
+    return ledger
+
+
+async def _count(conn, table):
+    async with conn.execute(f"SELECT COUNT(*) FROM {table}") as cursor:
+        return (await cursor.fetchone())[0]
+
+
+class TestVoteLedger:
+    async def test_append_votes_chains_one_batch(self, ledger, conn):
+        entries = await ledger.append_votes(
+            [(1, "alice", 1), (1, "bob", -1, 2.5), (2, "carol:x", 1, 10, "sig")]
+        )
+
+        assert [e.id for e in entries] == [1, 2, 3]
+        assert entries[0].prev_hash == ImmutableVoteLedger.GENESIS_HASH
+        assert entries[1].prev_hash == entries[0].hash
+        assert entries[2].signature == "sig"
+        # Integer weights hash like the REAL they are read back as
+        assert entries[2].hash == compute_vote_hash(
+            entries[1].hash, 2, "carol:x", 1, 10.0, entries[2].timestamp
+        )
+        report = await ledger.verify_chain_integrity()
+        assert report["valid"], report["violations"]
+        assert report["votes_checked"] == 3
+
+    async def test_checkpoints_are_created_in_background(self, ledger, conn):
+        await ledger.append_votes([(1, f"agent-{i}", 1) for i in range(6)])
+        await ledger.drain()
+        assert await _count(conn, "vote_merkle_roots") == 1
+
+        for i in range(3):
+            await ledger.append_vote(2, f"agent-{i}", -1)
+        await ledger.drain()
+        assert await _count(conn, "vote_merkle_roots") == 2
+        assert ledger._pending == 1
+
+        report = await ledger.verify_chain_integrity()
+        assert report["valid"], report["violations"]
+        assert report["checkpoints_checked"] == 2
+
+    async def test_legacy_colon_hashes_still_verify(self, ledger, conn):
+        ts = "2026-01-01T00:00:00+00:00"
+        payload = f"{ImmutableVoteLedger.GENESIS_HASH}:1:alice:1:1.0:{ts}"
+        legacy = hashlib.sha256(payload.encode()).hexdigest()
+        await conn.execute(
+            "INSERT INTO vote_ledger (fact_id, agent_id, vote, vote_weight, prev_hash, hash, "
+            "timestamp) VALUES (1, 'alice', 1, 1.0, ?, ?, ?)",
+            (ImmutableVoteLedger.GENESIS_HASH, legacy, ts),
+        )
+        await conn.commit()
+        await ledger.append_vote(1, "bob", 1)
+
+        report = await ledger.verify_chain_integrity("full")
+
+        assert report["valid"], report["violations"]
+        assert report["votes_checked"] == 2
+
+    async def test_incremental_verification_resumes_from_watermark(self, ledger, conn):
+        await ledger.append_votes([(1, f"agent-{i}", 1) for i in range(9)])
+        await ledger.drain()
+
+        first = await ledger.verify_chain_integrity()
+        assert first["votes_checked"] == 9
+        assert first["verified_to"] == 8
+
+        second = await ledger.verify_chain_integrity()
+        assert second["valid"]
+        assert second["votes_checked"] == 1
+        assert second["checkpoints_checked"] == 0
+
+    async def test_tampering_is_detected(self, ledger, conn):
+        await ledger.append_votes([(1, f"agent-{i}", 1) for i in range(8)])
+        await ledger.drain()
+        assert (await ledger.verify_chain_integrity())["verified_to"] == 8
+
+        await conn.execute("UPDATE vote_ledger SET vote = -1 WHERE id = 6")
+        await conn.commit()
+        assert (await ledger.verify_chain_integrity())["valid"]  # behind the watermark
+
+        report = await ledger.verify_chain_integrity("full")
+        assert not report["valid"]
+        assert [v["type"] for v in report["violations"]] == ["DATA_TAMPERING"]
+        assert report["violations"][0]["vote_id"] == 6
+        assert report["verified_to"] == 4